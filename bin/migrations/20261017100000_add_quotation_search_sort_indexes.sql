@@ -0,0 +1,31 @@
+-- Migration: Add keyset indexes for quotation search sorting
+-- Date: 2026-10-17
+-- Purpose: GET /api/quotations pages by (sort column, id). These indexes let
+--          every page, however deep, be an index range scan instead of a sort
+--          over all matching quotations. PostgreSQL scans them in either
+--          direction, so they serve both ascending and descending sorts.
+
+-- ============================================================================
+-- INDEXES: (sort column, id) for sort=date, quote_number, created_time
+-- ============================================================================
+CREATE INDEX IF NOT EXISTS idx_quotation_date_id
+    ON quotation_webpage_input_details_save(quotation_date, id);
+
+CREATE INDEX IF NOT EXISTS idx_quote_number_id
+    ON quotation_webpage_input_details_save(full_main_quote_number, id);
+
+CREATE INDEX IF NOT EXISTS idx_created_time_id
+    ON quotation_webpage_input_details_save(created_time, id);
+
+-- ============================================================================
+-- STATISTICS: Refresh planner statistics (also used by count=estimate)
+-- ============================================================================
+ANALYZE quotation_webpage_input_details_save;
+
+-- ============================================================================
+-- VERIFICATION: Show the indexes on the quotation table
+-- ============================================================================
+SELECT indexname, indexdef
+FROM pg_indexes
+WHERE tablename = 'quotation_webpage_input_details_save'
+ORDER BY indexname;
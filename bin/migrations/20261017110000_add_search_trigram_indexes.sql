@@ -0,0 +1,63 @@
+-- Migration: Add trigram indexes for the partial-match quotation search filters
+-- Date: 2026-10-17
+-- Purpose: GET /api/quotations filters with ILIKE '%term%' on recipient, subject,
+--          generated-by and person-name columns. B-tree indexes cannot serve a
+--          leading wildcard; pg_trgm GIN indexes can, for search terms of 3 or
+--          more characters. (The quote number filters match prefixes of the
+--          generated quote_* part columns, which have their own B-tree indexes.)
+
+-- ============================================================================
+-- 1. EXTENSION: pg_trgm (ships with PostgreSQL contrib)
+-- ============================================================================
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+-- ============================================================================
+-- 2. INDEXES: recipient_details (recipient_name, company_name, phone_number, email)
+-- ============================================================================
+CREATE INDEX IF NOT EXISTS idx_recipient_name_trgm
+    ON recipient_details USING gin (recipient_name gin_trgm_ops);
+
+CREATE INDEX IF NOT EXISTS idx_recipient_company_trgm
+    ON recipient_details USING gin (to_company_name gin_trgm_ops);
+
+CREATE INDEX IF NOT EXISTS idx_recipient_phone_trgm
+    ON recipient_details USING gin (phone_number gin_trgm_ops);
+
+CREATE INDEX IF NOT EXISTS idx_recipient_email_trgm
+    ON recipient_details USING gin (email gin_trgm_ops);
+
+-- ============================================================================
+-- 3. INDEXES: quotation_webpage_input_details_save (subject, generated_by)
+-- ============================================================================
+CREATE INDEX IF NOT EXISTS idx_quotation_subject_trgm
+    ON quotation_webpage_input_details_save USING gin (subject gin_trgm_ops);
+
+CREATE INDEX IF NOT EXISTS idx_quotation_generated_by_trgm
+    ON quotation_webpage_input_details_save USING gin (generated_by gin_trgm_ops);
+
+-- ============================================================================
+-- 4. INDEXES: sales_details / project_manager_details (sales and office person)
+-- ============================================================================
+CREATE INDEX IF NOT EXISTS idx_sales_person_name_trgm
+    ON sales_details USING gin (sales_person_name gin_trgm_ops);
+
+CREATE INDEX IF NOT EXISTS idx_manager_name_trgm
+    ON project_manager_details USING gin (manager_name gin_trgm_ops);
+
+ANALYZE recipient_details;
+ANALYZE quotation_webpage_input_details_save;
+ANALYZE sales_details;
+ANALYZE project_manager_details;
+
+-- ============================================================================
+-- VERIFICATION: The search predicates can use the trigram indexes
+-- (sequential scans disabled so small tables still show the index plan;
+-- expect "Bitmap Index Scan on idx_..._trgm")
+-- ============================================================================
+BEGIN;
+SET LOCAL enable_seqscan = off;
+EXPLAIN SELECT id FROM recipient_details WHERE recipient_name ILIKE '%ohn%';
+EXPLAIN SELECT id FROM recipient_details WHERE email ILIKE '%@example%';
+EXPLAIN SELECT id FROM quotation_webpage_input_details_save WHERE subject ILIKE '%tank%';
+EXPLAIN SELECT id FROM sales_details WHERE sales_person_name ILIKE '%var%';
+ROLLBACK;
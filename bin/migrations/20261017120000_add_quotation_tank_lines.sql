@@ -0,0 +1,65 @@
+-- Migration: Add quotation_tank_lines table
+-- Date: 2026-10-17
+-- Purpose: One row per tank option of a saved quotation, normalized from
+--          quotation_webpage_input_details_save.tanks_data with numeric
+--          dimensions, so the tank type / support system / size search filters
+--          are indexed lookups instead of decoding every quotation's JSON.
+--          /api/save-quotation and revision creation keep it up to date.
+--
+-- After running this migration, fill it for existing quotations once:
+--     cd server && python backfill_tank_lines.py
+
+-- ============================================================================
+-- 1. CREATE TABLE: quotation_tank_lines
+-- ============================================================================
+CREATE TABLE IF NOT EXISTS quotation_tank_lines (
+    id SERIAL PRIMARY KEY,
+    quotation_id INTEGER NOT NULL
+        REFERENCES quotation_webpage_input_details_save(id) ON DELETE CASCADE,
+    tank_number INTEGER NOT NULL,
+    option_number INTEGER NOT NULL DEFAULT 1,
+    tank_name VARCHAR(255),
+    tank_type VARCHAR(255),
+    support_system VARCHAR(100),
+    length DOUBLE PRECISION,     -- metres
+    width DOUBLE PRECISION,      -- metres
+    height DOUBLE PRECISION,     -- metres
+    quantity INTEGER
+);
+
+-- ============================================================================
+-- 2. INDEXES: quotation lookup, size range queries, partial-match type/support
+-- ============================================================================
+CREATE INDEX IF NOT EXISTS idx_tank_lines_quotation
+    ON quotation_tank_lines(quotation_id);
+
+CREATE INDEX IF NOT EXISTS idx_tank_lines_length
+    ON quotation_tank_lines(length);
+
+CREATE INDEX IF NOT EXISTS idx_tank_lines_width
+    ON quotation_tank_lines(width);
+
+CREATE INDEX IF NOT EXISTS idx_tank_lines_height
+    ON quotation_tank_lines(height);
+
+-- Trigram indexes need pg_trgm (20261017110000_add_search_trigram_indexes.sql)
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE INDEX IF NOT EXISTS idx_tank_lines_type_trgm
+    ON quotation_tank_lines USING gin (tank_type gin_trgm_ops);
+
+CREATE INDEX IF NOT EXISTS idx_tank_lines_support_trgm
+    ON quotation_tank_lines USING gin (support_system gin_trgm_ops);
+
+-- ============================================================================
+-- COMMENT: Table documentation
+-- ============================================================================
+COMMENT ON TABLE quotation_tank_lines IS 'Tank options of each saved quotation, derived from tanks_data for search';
+
+-- ============================================================================
+-- VERIFICATION: Show table structure
+-- ============================================================================
+SELECT column_name, data_type, is_nullable
+FROM information_schema.columns
+WHERE table_name = 'quotation_tank_lines'
+ORDER BY ordinal_position;
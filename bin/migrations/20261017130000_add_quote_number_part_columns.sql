@@ -0,0 +1,54 @@
+-- Migration: Add generated quote-number part columns
+-- Date: 2026-10-17
+-- Purpose: The quotation search filters on the parts of full_main_quote_number
+--          (GRPPT/2512/MM/0324-R1): company code, year/month, series and base
+--          number. Stored generated columns keep those parts next to the row so
+--          each filter is an index lookup (exact company code; prefix match on
+--          year/month, series and number).
+
+-- ============================================================================
+-- 1. ALTER TABLE: Add generated columns (computed by PostgreSQL on write)
+-- ============================================================================
+ALTER TABLE quotation_webpage_input_details_save
+    ADD COLUMN IF NOT EXISTS quote_company_code TEXT
+        GENERATED ALWAYS AS (upper(split_part(full_main_quote_number, '/', 1))) STORED,
+    ADD COLUMN IF NOT EXISTS quote_yearmonth TEXT
+        GENERATED ALWAYS AS (split_part(full_main_quote_number, '/', 2)) STORED,
+    ADD COLUMN IF NOT EXISTS quote_series TEXT
+        GENERATED ALWAYS AS (upper(split_part(full_main_quote_number, '/', 3))) STORED,
+    ADD COLUMN IF NOT EXISTS quote_base_number TEXT
+        GENERATED ALWAYS AS (split_part(split_part(full_main_quote_number, '/', 4), '-', 1)) STORED;
+
+-- ============================================================================
+-- 2. INDEXES: text_pattern_ops so LIKE 'prefix%' can use the index under any collation
+-- ============================================================================
+CREATE INDEX IF NOT EXISTS idx_quote_company_code
+    ON quotation_webpage_input_details_save(quote_company_code);
+
+CREATE INDEX IF NOT EXISTS idx_quote_yearmonth
+    ON quotation_webpage_input_details_save(quote_yearmonth text_pattern_ops);
+
+CREATE INDEX IF NOT EXISTS idx_quote_series
+    ON quotation_webpage_input_details_save(quote_series text_pattern_ops);
+
+CREATE INDEX IF NOT EXISTS idx_quote_base_number
+    ON quotation_webpage_input_details_save(quote_base_number text_pattern_ops);
+
+ANALYZE quotation_webpage_input_details_save;
+
+-- ============================================================================
+-- COMMENT: Add column comments for documentation
+-- ============================================================================
+COMMENT ON COLUMN quotation_webpage_input_details_save.quote_company_code IS 'Company code part of full_main_quote_number (upper case)';
+COMMENT ON COLUMN quotation_webpage_input_details_save.quote_yearmonth IS 'YYMM part of full_main_quote_number';
+COMMENT ON COLUMN quotation_webpage_input_details_save.quote_series IS 'Series (person code) part of full_main_quote_number (upper case)';
+COMMENT ON COLUMN quotation_webpage_input_details_save.quote_base_number IS 'Quotation number part of full_main_quote_number, without the -R revision suffix';
+
+-- ============================================================================
+-- VERIFICATION: Show the generated columns
+-- ============================================================================
+SELECT column_name, data_type, is_generated, generation_expression
+FROM information_schema.columns
+WHERE table_name = 'quotation_webpage_input_details_save'
+AND column_name LIKE 'quote\_%'
+ORDER BY ordinal_position;
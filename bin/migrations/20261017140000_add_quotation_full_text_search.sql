@@ -0,0 +1,69 @@
+-- Migration: Add full-text search document to saved quotations
+-- Date: 2026-10-17
+-- Purpose: Ranked keyword search (q= on /api/quotations) over the quotation
+--          subject, project location, recipient company and the points of its
+--          contractual terms & specifications. Each quotation keeps a weighted
+--          tsvector (subject A, location/company B, terms D) behind a GIN index.
+--          /api/save-quotation and revision creation refresh it after writing
+--          the quotation and its terms; this migration fills existing rows.
+
+-- ============================================================================
+-- 1. FUNCTIONS: Text of the terms, and the search document of one quotation
+-- ============================================================================
+-- Every details/custom point of every terms section, one per line
+CREATE OR REPLACE FUNCTION quotation_terms_text(p_full_main_quote_number VARCHAR)
+RETURNS TEXT AS $$
+    SELECT string_agg(point #>> '{}', E'\n')
+    FROM contractual_terms_specifications t
+    CROSS JOIN LATERAL (VALUES
+        (t.note::jsonb), (t.material_specifications::jsonb), (t.warranty_conditions::jsonb),
+        (t.terms_and_conditions::jsonb), (t.supplier_scope::jsonb), (t.customer_scope::jsonb),
+        (t.note_second::jsonb), (t.scope_of_work::jsonb), (t.work_excluded::jsonb)
+    ) AS sections(section)
+    CROSS JOIN LATERAL (VALUES ('details'), ('custom')) AS keys(key)
+    CROSS JOIN LATERAL jsonb_path_query(sections.section -> keys.key, 'lax $[*] ? (@.type() == "string")') AS point
+    WHERE t.full_main_quote_number = p_full_main_quote_number
+$$ LANGUAGE sql STABLE;
+
+CREATE OR REPLACE FUNCTION quotation_search_document(p_quotation_id INTEGER)
+RETURNS tsvector AS $$
+    SELECT setweight(to_tsvector('english', coalesce(q.subject, '')), 'A')
+        || setweight(to_tsvector('english', coalesce(q.project_location, '')), 'B')
+        || setweight(to_tsvector('english', coalesce(r.to_company_name, '')), 'B')
+        || setweight(to_tsvector('english', coalesce(quotation_terms_text(q.full_main_quote_number), '')), 'D')
+    FROM quotation_webpage_input_details_save q
+    LEFT JOIN recipient_details r ON r.id = q.recipient_id
+    WHERE q.id = p_quotation_id
+$$ LANGUAGE sql STABLE;
+
+-- ============================================================================
+-- 2. ALTER TABLE: Add the search document column and fill it
+-- ============================================================================
+ALTER TABLE quotation_webpage_input_details_save
+    ADD COLUMN IF NOT EXISTS search_document tsvector;
+
+UPDATE quotation_webpage_input_details_save
+SET search_document = quotation_search_document(id);
+
+-- ============================================================================
+-- 3. INDEX: GIN index for search_document @@ websearch_to_tsquery(...)
+-- ============================================================================
+CREATE INDEX IF NOT EXISTS idx_quotation_search_document
+    ON quotation_webpage_input_details_save USING gin (search_document);
+
+ANALYZE quotation_webpage_input_details_save;
+
+-- ============================================================================
+-- COMMENT: Add column comments for documentation
+-- ============================================================================
+COMMENT ON COLUMN quotation_webpage_input_details_save.search_document IS 'Full-text search document (quotation_search_document), refreshed on save';
+
+-- ============================================================================
+-- VERIFICATION: Every quotation has a document; the index serves a keyword query
+-- ============================================================================
+SELECT COUNT(*) AS quotations, COUNT(search_document) AS with_search_document
+FROM quotation_webpage_input_details_save;
+
+EXPLAIN SELECT id
+FROM quotation_webpage_input_details_save
+WHERE search_document @@ websearch_to_tsquery('english', 'water tank');
@@ -0,0 +1,64 @@
+-- Migration: Unique keys for the save-quotation upserts
+-- Date: 2026-10-17
+-- Purpose: /api/save-quotation writes the recipient, the quotation and its
+--          contractual terms with INSERT ... ON CONFLICT DO UPDATE, which needs
+--          a unique constraint on each conflict key:
+--            recipient_details                   (recipient_name, to_company_name)  -- new
+--            (NULLS NOT DISTINCT, PostgreSQL 15+: recipients without a company
+--            conflict like any other, instead of being inserted again)
+--            quotation_webpage_input_details_save (company_id, quotation_number, revision_number)
+--            contractual_terms_specifications    (full_main_quote_number)    -- already unique
+--          Recipients saved twice under the same name and company are merged
+--          first (lowest id kept, quotations moved to it).
+
+-- ============================================================================
+-- 1. MERGE: Duplicate recipients (same name and company)
+-- ============================================================================
+WITH duplicates AS (
+    SELECT id, MIN(id) OVER (PARTITION BY recipient_name, to_company_name) AS keep_id
+    FROM recipient_details
+)
+UPDATE quotation_webpage_input_details_save q
+SET recipient_id = d.keep_id
+FROM duplicates d
+WHERE q.recipient_id = d.id AND d.id <> d.keep_id;
+
+DELETE FROM recipient_details r
+USING recipient_details kept
+WHERE kept.recipient_name = r.recipient_name
+  AND kept.to_company_name IS NOT DISTINCT FROM r.to_company_name
+  AND kept.id < r.id;
+
+-- ============================================================================
+-- 2. CONSTRAINTS: Conflict keys (skipped when already present)
+-- ============================================================================
+DO $$
+BEGIN
+    -- Also replaces a plain UNIQUE version of the recipient key
+    IF NOT EXISTS (
+        SELECT 1 FROM pg_constraint
+        WHERE conname = 'unique_recipient_per_company'
+          AND pg_get_constraintdef(oid) LIKE '%NULLS NOT DISTINCT%'
+    ) THEN
+        ALTER TABLE recipient_details DROP CONSTRAINT IF EXISTS unique_recipient_per_company;
+        ALTER TABLE recipient_details
+            ADD CONSTRAINT unique_recipient_per_company UNIQUE NULLS NOT DISTINCT (recipient_name, to_company_name);
+    END IF;
+    IF NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conname = 'unique_quote_per_company') THEN
+        ALTER TABLE quotation_webpage_input_details_save
+            ADD CONSTRAINT unique_quote_per_company UNIQUE (company_id, quotation_number, revision_number);
+    END IF;
+END $$;
+
+-- ============================================================================
+-- VERIFICATION: The conflict keys exist and no duplicate recipients are left
+-- ============================================================================
+SELECT conrelid::regclass AS table_name, conname AS constraint_name, pg_get_constraintdef(oid) AS definition
+FROM pg_constraint
+WHERE conname IN ('unique_recipient_per_company', 'unique_quote_per_company')
+ORDER BY conname;
+
+SELECT recipient_name, to_company_name, COUNT(*) AS duplicates
+FROM recipient_details
+GROUP BY recipient_name, to_company_name
+HAVING COUNT(*) > 1;
@@ -0,0 +1,45 @@
+-- Migration: Delta-encoded storage of quotation revisions
+-- Date: 2026-10-17
+-- Purpose: Revisions after R0 (-R1, -R2 ...) no longer need a full copy of
+--          tanks_data / form_options / additional_data. Such a revision keeps
+--          revision_delta, a JSON Patch (RFC 6902) against an earlier revision of
+--          the same quotation stored in full (delta_base_id); tanks_data is '{}'
+--          and form_options / additional_data are NULL. Bases are always full
+--          rows, so a revision is rebuilt from one base and one patch. A revision
+--          whose delta is large is stored in full and becomes the base of later
+--          revisions (REVISION_DELTA_MAX_PERCENT, server/revision_deltas.py).
+--
+-- After running this migration, encode existing revisions once:
+--     cd server && python encode_revision_deltas.py
+-- then VACUUM the table (VACUUM FULL during a quiet period to shrink its TOAST).
+
+-- ============================================================================
+-- 1. ALTER TABLE: Add the delta columns
+-- ============================================================================
+ALTER TABLE quotation_webpage_input_details_save
+    ADD COLUMN IF NOT EXISTS delta_base_id INTEGER
+        REFERENCES quotation_webpage_input_details_save(id) ON DELETE RESTRICT,
+    ADD COLUMN IF NOT EXISTS revision_delta JSONB;
+
+-- ============================================================================
+-- 2. INDEX: Revisions stored against a base (looked up when the base changes)
+-- ============================================================================
+CREATE INDEX IF NOT EXISTS idx_quotation_delta_base_id
+    ON quotation_webpage_input_details_save(delta_base_id)
+    WHERE delta_base_id IS NOT NULL;
+
+-- ============================================================================
+-- COMMENT: Add column comments for documentation
+-- ============================================================================
+COMMENT ON COLUMN quotation_webpage_input_details_save.delta_base_id IS 'Full revision this revision is stored against (NULL: stored in full)';
+COMMENT ON COLUMN quotation_webpage_input_details_save.revision_delta IS 'JSON Patch of {tanksData, formOptions, additionalData} against the delta_base_id revision';
+
+-- ============================================================================
+-- VERIFICATION: Bases are full rows of the same quotation
+-- ============================================================================
+SELECT COUNT(*) FILTER (WHERE q.delta_base_id IS NOT NULL) AS delta_revisions,
+       COUNT(*) FILTER (WHERE b.delta_base_id IS NOT NULL
+                           OR b.company_id <> q.company_id
+                           OR b.quotation_number <> q.quotation_number) AS invalid_bases
+FROM quotation_webpage_input_details_save q
+LEFT JOIN quotation_webpage_input_details_save b ON b.id = q.delta_base_id;
@@ -828,10 +828,10 @@ export default function NewQuotationForm({ onPreviewUpdate, onCompanyChange, isA
     }
   };
 
-  // Fetch recipient list
-  const fetchRecipients = async () => {
+  // Recipients and recipient company names matching what was typed (server-side prefix index)
+  const fetchRecipientSuggestions = async (query: string) => {
     try {
-      const response = await fetch(getApiUrl('api/recipients'));
+      const response = await fetch(getApiUrl(`api/recipients/suggest?q=${encodeURIComponent(query)}&limit=10`));
       if (response.ok) {
         const data = await response.json();
         setRecipientOptions(
@@ -849,25 +849,47 @@ export default function NewQuotationForm({ onPreviewUpdate, onCompanyChange, isA
         );
       }
     } catch (error) {
-      console.error('Error fetching recipients:', error);
+      console.error('Error fetching recipient suggestions:', error);
     }
   };
 
-  const fetchCompanyNames = async () => {
+  const fetchCompanyNameSuggestions = async (query: string) => {
     try {
-      const response = await fetch(getApiUrl('api/company-names'));
+      const response = await fetch(getApiUrl(`api/recipients/suggest?q=${encodeURIComponent(query)}&limit=10`));
       if (response.ok) {
         const data = await response.json();
         setCompanyNameOptions(
-          data.company_names.map((name: string) => ({ value: name, label: name }))
+          data.companies.map((name: string) => ({ value: name, label: name }))
         );
       }
     } catch (error) {
-      console.error('Error fetching company names:', error);
+      console.error('Error fetching company name suggestions:', error);
     }
   };
 
-  // Fetch company and recipient lists on component mount
+  // Suggest recipients as the name is typed (debounced)
+  useEffect(() => {
+    const query = recipientName.trim();
+    if (!query) {
+      setRecipientOptions([]);
+      return;
+    }
+    const timer = setTimeout(() => fetchRecipientSuggestions(query), 150);
+    return () => clearTimeout(timer);
+  }, [recipientName]);
+
+  // Suggest company names once at least 2 characters are typed (debounced)
+  useEffect(() => {
+    const query = companyName.trim();
+    if (query.length < 2) {
+      setCompanyNameOptions([]);
+      return;
+    }
+    const timer = setTimeout(() => fetchCompanyNameSuggestions(query), 150);
+    return () => clearTimeout(timer);
+  }, [companyName]);
+
+  // Fetch company list on component mount
   useEffect(() => {
     const fetchCompanies = async () => {
       try {
@@ -883,47 +905,7 @@ export default function NewQuotationForm({ onPreviewUpdate, onCompanyChange, isA
       }
     };
 
-    const fetchRecipientsInitial = async () => {
-      try {
-        const response = await fetch(getApiUrl('api/recipients'));
-        if (response.ok) {
-          const data = await response.json();
-          setRecipientOptions(
-            data.recipients.map((recipient: any) => ({
-              value: recipient.name,
-              label: recipient.name,
-              metadata: {
-                role: recipient.role,
-                company: recipient.company,
-                location: recipient.location,
-                phone: recipient.phone,
-                email: recipient.email
-              }
-            }))
-          );
-        }
-      } catch (error) {
-        console.error('Error fetching recipients:', error);
-      }
-    };
-
-    const fetchCompanyNamesInitial = async () => {
-      try {
-        const response = await fetch(getApiUrl('api/company-names'));
-        if (response.ok) {
-          const data = await response.json();
-          setCompanyNameOptions(
-            data.company_names.map((name: string) => ({ value: name, label: name }))
-          );
-        }
-      } catch (error) {
-        console.error('Error fetching company names:', error);
-      }
-    };
-
     fetchCompanies();
-    fetchRecipientsInitial();
-    fetchCompanyNamesInitial();
   }, []);
 
   // Fetch company details when fromCompany changes
@@ -1115,8 +1097,8 @@ export default function NewQuotationForm({ onPreviewUpdate, onCompanyChange, isA
         toast.success('Quotation saved to database successfully!');
         // Clear sessionStorage after successful save
         sessionStorage.removeItem('newQuotationFormData');
-        // Refresh recipient list to include newly added recipient
-        fetchRecipients();
+        // Refresh recipient suggestions to include newly added recipient
+        fetchRecipientSuggestions(recipientName.trim());
       } else {
         const errorData = await saveResponse.json();
         throw new Error(errorData.error || 'Failed to save quotation');
@@ -1296,8 +1278,8 @@ export default function NewQuotationForm({ onPreviewUpdate, onCompanyChange, isA
             toast.success('Quotation saved to database!');
             // Clear sessionStorage after successful export and save
             sessionStorage.removeItem('newQuotationFormData');
-            // Refresh recipient list to include newly added recipient
-            fetchRecipients();
+            // Refresh recipient suggestions to include newly added recipient
+            fetchRecipientSuggestions(recipientName.trim());
           } else {
             console.warn('Failed to save quotation to database');
           }
@@ -1846,6 +1828,7 @@ export default function NewQuotationForm({ onPreviewUpdate, onCompanyChange, isA
                   placeholder="Enter or select recipient name"
                   showOnFocus={false}  // Only show dropdown after typing starts
                   maxResults={10}  // Show maximum 10 recipients in dropdown
+                  filterOptions={false}  // Already matched by /api/recipients/suggest
                   onKeyDown={e => {
                     if (e.key === 'Enter') {
                       const next = document.querySelector('#role');
@@ -1884,6 +1867,7 @@ export default function NewQuotationForm({ onPreviewUpdate, onCompanyChange, isA
                 showOnFocus={false}
                 minLength={2}
                 maxResults={10}
+                filterOptions={false}
                 onKeyDown={e => {
                   if (e.key === 'Enter') {
                     const next = document.querySelector('#location');
@@ -831,10 +831,10 @@ export default function QuotationRevisionForm({ onPreviewUpdate, onCompanyChange
     }
   };
 
-  // Fetch recipient list
-  const fetchRecipients = async () => {
+  // Recipients and recipient company names matching what was typed (server-side prefix index)
+  const fetchRecipientSuggestions = async (query: string) => {
     try {
-      const response = await fetch(getApiUrl('api/recipients'));
+      const response = await fetch(getApiUrl(`api/recipients/suggest?q=${encodeURIComponent(query)}&limit=10`));
       if (response.ok) {
         const data = await response.json();
         setRecipientOptions(
@@ -852,25 +852,47 @@ export default function QuotationRevisionForm({ onPreviewUpdate, onCompanyChange
         );
       }
     } catch (error) {
-      console.error('Error fetching recipients:', error);
+      console.error('Error fetching recipient suggestions:', error);
     }
   };
 
-  const fetchCompanyNames = async () => {
+  const fetchCompanyNameSuggestions = async (query: string) => {
     try {
-      const response = await fetch(getApiUrl('api/company-names'));
+      const response = await fetch(getApiUrl(`api/recipients/suggest?q=${encodeURIComponent(query)}&limit=10`));
       if (response.ok) {
         const data = await response.json();
         setCompanyNameOptions(
-          data.company_names.map((name: string) => ({ value: name, label: name }))
+          data.companies.map((name: string) => ({ value: name, label: name }))
         );
       }
     } catch (error) {
-      console.error('Error fetching company names:', error);
+      console.error('Error fetching company name suggestions:', error);
     }
   };
 
-  // Fetch company and recipient lists on component mount
+  // Suggest recipients as the name is typed (debounced)
+  useEffect(() => {
+    const query = recipientName.trim();
+    if (!query) {
+      setRecipientOptions([]);
+      return;
+    }
+    const timer = setTimeout(() => fetchRecipientSuggestions(query), 150);
+    return () => clearTimeout(timer);
+  }, [recipientName]);
+
+  // Suggest company names once at least 2 characters are typed (debounced)
+  useEffect(() => {
+    const query = companyName.trim();
+    if (query.length < 2) {
+      setCompanyNameOptions([]);
+      return;
+    }
+    const timer = setTimeout(() => fetchCompanyNameSuggestions(query), 150);
+    return () => clearTimeout(timer);
+  }, [companyName]);
+
+  // Fetch company list on component mount
   useEffect(() => {
     const fetchCompanies = async () => {
       try {
@@ -886,47 +908,7 @@ export default function QuotationRevisionForm({ onPreviewUpdate, onCompanyChange
       }
     };
 
-    const fetchRecipientsInitial = async () => {
-      try {
-        const response = await fetch(getApiUrl('api/recipients'));
-        if (response.ok) {
-          const data = await response.json();
-          setRecipientOptions(
-            data.recipients.map((recipient: any) => ({
-              value: recipient.name,
-              label: recipient.name,
-              metadata: {
-                role: recipient.role,
-                company: recipient.company,
-                location: recipient.location,
-                phone: recipient.phone,
-                email: recipient.email
-              }
-            }))
-          );
-        }
-      } catch (error) {
-        console.error('Error fetching recipients:', error);
-      }
-    };
-
-    const fetchCompanyNamesInitial = async () => {
-      try {
-        const response = await fetch(getApiUrl('api/company-names'));
-        if (response.ok) {
-          const data = await response.json();
-          setCompanyNameOptions(
-            data.company_names.map((name: string) => ({ value: name, label: name }))
-          );
-        }
-      } catch (error) {
-        console.error('Error fetching company names:', error);
-      }
-    };
-
     fetchCompanies();
-    fetchRecipientsInitial();
-    fetchCompanyNamesInitial();
   }, []);
 
   // Fetch company details when fromCompany changes
@@ -1360,8 +1342,8 @@ export default function QuotationRevisionForm({ onPreviewUpdate, onCompanyChange
         toast.success('Quotation saved to database successfully!');
         // Clear sessionStorage after successful save
         sessionStorage.removeItem('quotationRevisionFormData');
-        // Refresh recipient list to include newly added recipient
-        fetchRecipients();
+        // Refresh recipient suggestions to include newly added recipient
+        fetchRecipientSuggestions(recipientName.trim());
       } else {
         const errorData = await saveResponse.json();
         throw new Error(errorData.error || 'Failed to save quotation');
@@ -1544,8 +1526,8 @@ export default function QuotationRevisionForm({ onPreviewUpdate, onCompanyChange
             toast.success('Quotation saved to database!');
             // Clear sessionStorage after successful export and save
             sessionStorage.removeItem('quotationRevisionFormData');
-            // Refresh recipient list to include newly added recipient
-            fetchRecipients();
+            // Refresh recipient suggestions to include newly added recipient
+            fetchRecipientSuggestions(recipientName.trim());
           } else {
             console.warn('Failed to save quotation to database');
           }
@@ -2270,6 +2252,7 @@ export default function QuotationRevisionForm({ onPreviewUpdate, onCompanyChange
                   placeholder="Enter or select recipient name"
                   showOnFocus={false}  // Only show dropdown after typing starts
                   maxResults={10}  // Show maximum 10 recipients in dropdown
+                  filterOptions={false}  // Already matched by /api/recipients/suggest
                   onKeyDown={e => {
                     if (e.key === 'Enter') {
                       const next = document.querySelector('#role');
@@ -2308,6 +2291,7 @@ export default function QuotationRevisionForm({ onPreviewUpdate, onCompanyChange
                 showOnFocus={false}
                 minLength={2}
                 maxResults={10}
+                filterOptions={false}
                 onKeyDown={(e: any) => {
                   if (e.key === 'Enter') {
                     const next = document.querySelector('#location');
@@ -65,6 +65,8 @@ export default function SearchQuotationForm({
 
   const [dateFilterType, setDateFilterType] = useState<'day' | 'week' | 'month'>('day');
   const [quotations, setQuotations] = useState<any[]>([]);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [totalCount, setTotalCount] = useState<number | null>(null);
   const [selectedQuotation, setSelectedQuotation] = useState<any>(null);
   const [leftPersonSig,  setLeftPersonSig]  = useState({ name: '', title: '', mobile: '', email: '', signatureImage: '' });
   const [rightPersonSig, setRightPersonSig] = useState({ name: '', title: '', mobile: '', email: '', signatureImage: '' });
@@ -87,6 +89,8 @@ export default function SearchQuotationForm({
         if (formData.searchValues !== undefined) setSearchValues(formData.searchValues);
         if (formData.dateFilterType !== undefined) setDateFilterType(formData.dateFilterType);
         if (formData.quotations !== undefined) setQuotations(formData.quotations);
+        if (formData.nextCursor !== undefined) setNextCursor(formData.nextCursor);
+        if (formData.totalCount !== undefined) setTotalCount(formData.totalCount);
         if (formData.selectedQuotation !== undefined) setSelectedQuotation(formData.selectedQuotation);
         
         console.log('✓ Search form data restored from session');
@@ -105,13 +109,15 @@ export default function SearchQuotationForm({
       searchValues,
       dateFilterType,
       quotations,
+      nextCursor,
+      totalCount,
       selectedQuotation,
     };
     
     sessionStorage.setItem('searchQuotationFormData', JSON.stringify(formData));
-  }, [isActive, filters, searchValues, dateFilterType, quotations, selectedQuotation]);
+  }, [isActive, filters, searchValues, dateFilterType, quotations, nextCursor, totalCount, selectedQuotation]);
 
-  const handleSearch = async () => {
+  const handleSearch = async (loadMore = false) => {
     try {
       // Build query parameters
       const params = new URLSearchParams();
@@ -193,6 +199,12 @@ export default function SearchQuotationForm({
         }
       }
       
+      // Following pages continue from the last result; the total is only counted once
+      if (loadMore && nextCursor) {
+        params.append('after', nextCursor);
+        params.append('count', 'none');
+      }
+      
       const response = await fetch(getApiUrl(`api/quotations?${params.toString()}`));
       
       if (!response.ok) {
@@ -200,8 +212,14 @@ export default function SearchQuotationForm({
       }
       
       const data = await response.json();
-      setQuotations(data.quotations || []);
-      toast.success(`Found ${data.count || 0} quotation(s)`);
+      setNextCursor(data.next_cursor || null);
+      if (loadMore) {
+        setQuotations((previous) => [...previous, ...(data.quotations || [])]);
+      } else {
+        setQuotations(data.quotations || []);
+        setTotalCount(data.count ?? null);
+        toast.success(`Found ${data.count || 0} quotation(s)`);
+      }
     } catch (error) {
       console.error('Error:', error);
       toast.error('Failed to search quotations');
@@ -1201,7 +1219,7 @@ export default function SearchQuotationForm({
           </div>
 
           <Button
-            onClick={handleSearch}
+            onClick={() => handleSearch()}
             className="w-full bg-blue-400 hover:bg-blue-500 text-white rounded-lg transition-colors duration-200 shadow-sm font-medium"
           >
             <Search className="mr-2 h-4 w-4" />
@@ -1213,7 +1231,9 @@ export default function SearchQuotationForm({
       {quotations.length > 0 && (
         <Card className="border border-blue-200 rounded-xl shadow-sm bg-white">
           <CardHeader className="bg-white text-blue-600 border-b border-blue-200 rounded-t-xl px-6 py-2">
-            <CardTitle className="text-base font-semibold">Search Results ({quotations.length})</CardTitle>
+            <CardTitle className="text-base font-semibold">
+              Search Results ({quotations.length}{totalCount !== null && totalCount > quotations.length ? ` of ${totalCount}` : ''})
+            </CardTitle>
           </CardHeader>
           <CardContent className="pt-3 px-6">
             <div className="space-y-3 max-h-96 overflow-y-auto">
@@ -1277,6 +1297,15 @@ export default function SearchQuotationForm({
                 </div>
               ))}
             </div>
+            {nextCursor && (
+              <Button
+                onClick={() => handleSearch(true)}
+                variant="outline"
+                className="w-full mt-3 border-blue-200 text-blue-600 hover:bg-blue-50 rounded-lg font-medium"
+              >
+                Load More
+              </Button>
+            )}
           </CardContent>
         </Card>
       )}
@@ -29,6 +29,7 @@ interface AutocompleteInputProps {
   maxResults?: number  // Maximum number of suggestions to show in dropdown
   minLength?: number  // Minimum characters to type before showing dropdown (only applies when showOnFocus=false)
   disabled?: boolean  // Disable the input field
+  filterOptions?: boolean  // If false, options are already matched to the input (e.g. by the server) and shown as given
 }
 
 export function AutocompleteInput({
@@ -43,6 +44,7 @@ export function AutocompleteInput({
   maxResults,  // Optional limit on number of results
   minLength = 1,  // Default to 1 character minimum
   disabled = false,  // Default to false
+  filterOptions = true,  // Default to filtering options by the typed text
 }: AutocompleteInputProps) {
   const [inputValue, setInputValue] = React.useState(value)
   const [showSuggestions, setShowSuggestions] = React.useState(false)
@@ -56,7 +58,7 @@ export function AutocompleteInput({
   }, [value])
 
   React.useEffect(() => {
-    if (inputValue) {
+    if (inputValue && filterOptions) {
       const filtered = options.filter((option) =>
         option.label.toLowerCase().includes(inputValue.toLowerCase())
       )
@@ -66,7 +68,7 @@ export function AutocompleteInput({
       // Apply maxResults limit even when showing all options
       setFilteredOptions(maxResults ? options.slice(0, maxResults) : options)
     }
-  }, [inputValue, options, maxResults])
+  }, [inputValue, options, maxResults, filterOptions])
 
   React.useEffect(() => {
     const handleClickOutside = (event: MouseEvent) => {
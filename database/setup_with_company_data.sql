@@ -1,9 +1,10 @@
 -- ============================================================================
 -- GRP QUOTATION GENERATOR - DATABASE SETUP WITH COMPANY DATA
--- Creates all 7 tables + inserts data from JSON files
+-- Creates all 8 tables + inserts data from JSON files
 -- ============================================================================
 
 -- Drop existing tables if they exist (for clean setup)
+DROP TABLE IF EXISTS quotation_tank_lines CASCADE;
 DROP TABLE IF EXISTS quotation_webpage_input_details_save CASCADE;
 DROP TABLE IF EXISTS contractual_terms_specifications CASCADE;
 DROP TABLE IF EXISTS default_contractual_terms_specifications CASCADE;
@@ -40,7 +41,10 @@ CREATE TABLE recipient_details (
     phone_number VARCHAR(50),
     email VARCHAR(255),
     created_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    last_updated_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    last_updated_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    -- /api/save-quotation upserts recipients on this key; a NULL company is one
+    -- value too, so such recipients are not duplicated (PostgreSQL 15+)
+    CONSTRAINT unique_recipient_per_company UNIQUE NULLS NOT DISTINCT (recipient_name, to_company_name)
 );
 
 -- ============================================================================
@@ -138,11 +142,38 @@ CREATE TABLE quotation_webpage_input_details_save (
     status VARCHAR(50) DEFAULT 'draft' CHECK (status IN ('draft', 'sent', 'approved', 'rejected', 'revised')),
     revision_number INTEGER DEFAULT 0,
     revision TEXT,
+    -- Revision stored as a JSON Patch against a full revision (delta_base_id); NULL when stored in full
+    delta_base_id INTEGER REFERENCES quotation_webpage_input_details_save(id) ON DELETE RESTRICT,
+    revision_delta JSONB,
     created_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     last_updated_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    -- Parts of full_main_quote_number for the search filters
+    quote_company_code TEXT GENERATED ALWAYS AS (upper(split_part(full_main_quote_number, '/', 1))) STORED,
+    quote_yearmonth TEXT GENERATED ALWAYS AS (split_part(full_main_quote_number, '/', 2)) STORED,
+    quote_series TEXT GENERATED ALWAYS AS (upper(split_part(full_main_quote_number, '/', 3))) STORED,
+    quote_base_number TEXT GENERATED ALWAYS AS (split_part(split_part(full_main_quote_number, '/', 4), '-', 1)) STORED,
+    -- Full-text search document, refreshed on save (quotation_search_document)
+    search_document tsvector,
     CONSTRAINT unique_quote_per_company UNIQUE (company_id, quotation_number, revision_number)
 );
 
+-- ============================================================================
+-- TABLE 8: QUOTATION_TANK_LINES (tank options from tanks_data, for search)
+-- ============================================================================
+CREATE TABLE quotation_tank_lines (
+    id SERIAL PRIMARY KEY,
+    quotation_id INTEGER NOT NULL REFERENCES quotation_webpage_input_details_save(id) ON DELETE CASCADE,
+    tank_number INTEGER NOT NULL,
+    option_number INTEGER NOT NULL DEFAULT 1,
+    tank_name VARCHAR(255),
+    tank_type VARCHAR(255),
+    support_system VARCHAR(100),
+    length DOUBLE PRECISION,
+    width DOUBLE PRECISION,
+    height DOUBLE PRECISION,
+    quantity INTEGER
+);
+
 -- ============================================================================
 -- TRIGGERS: Auto-update timestamps
 -- ============================================================================
@@ -240,6 +271,36 @@ CREATE TRIGGER trigger_auto_generate_quote_number
     BEFORE INSERT OR UPDATE ON quotation_webpage_input_details_save
     FOR EACH ROW EXECUTE FUNCTION auto_generate_quote_number();
 
+-- ============================================================================
+-- FUNCTIONS: Full-text search document of a quotation
+-- ============================================================================
+-- Every details/custom point of every terms section, one per line
+CREATE OR REPLACE FUNCTION quotation_terms_text(p_full_main_quote_number VARCHAR)
+RETURNS TEXT AS $$
+    SELECT string_agg(point #>> '{}', E'\n')
+    FROM contractual_terms_specifications t
+    CROSS JOIN LATERAL (VALUES
+        (t.note::jsonb), (t.material_specifications::jsonb), (t.warranty_conditions::jsonb),
+        (t.terms_and_conditions::jsonb), (t.supplier_scope::jsonb), (t.customer_scope::jsonb),
+        (t.note_second::jsonb), (t.scope_of_work::jsonb), (t.work_excluded::jsonb)
+    ) AS sections(section)
+    CROSS JOIN LATERAL (VALUES ('details'), ('custom')) AS keys(key)
+    CROSS JOIN LATERAL jsonb_path_query(sections.section -> keys.key, 'lax $[*] ? (@.type() == "string")') AS point
+    WHERE t.full_main_quote_number = p_full_main_quote_number
+$$ LANGUAGE sql STABLE;
+
+-- Subject (A), project location and recipient company (B), terms (D)
+CREATE OR REPLACE FUNCTION quotation_search_document(p_quotation_id INTEGER)
+RETURNS tsvector AS $$
+    SELECT setweight(to_tsvector('english', coalesce(q.subject, '')), 'A')
+        || setweight(to_tsvector('english', coalesce(q.project_location, '')), 'B')
+        || setweight(to_tsvector('english', coalesce(r.to_company_name, '')), 'B')
+        || setweight(to_tsvector('english', coalesce(quotation_terms_text(q.full_main_quote_number), '')), 'D')
+    FROM quotation_webpage_input_details_save q
+    LEFT JOIN recipient_details r ON r.id = q.recipient_id
+    WHERE q.id = p_quotation_id
+$$ LANGUAGE sql STABLE;
+
 -- ============================================================================
 -- INDEXES: Performance optimization
 -- ============================================================================
@@ -250,6 +311,34 @@ CREATE INDEX idx_status ON quotation_webpage_input_details_save(status);
 CREATE INDEX idx_company ON quotation_webpage_input_details_save(company_id);
 CREATE INDEX idx_sales_person ON quotation_webpage_input_details_save(sales_person_id);
 CREATE INDEX idx_recipient ON quotation_webpage_input_details_save(recipient_id);
+-- Keyset pagination of quotation search (sort column, id)
+CREATE INDEX idx_quotation_date_id ON quotation_webpage_input_details_save(quotation_date, id);
+CREATE INDEX idx_quote_number_id ON quotation_webpage_input_details_save(full_main_quote_number, id);
+CREATE INDEX idx_created_time_id ON quotation_webpage_input_details_save(created_time, id);
+-- Quote number part filters (exact company code, prefix for the others)
+CREATE INDEX idx_quote_company_code ON quotation_webpage_input_details_save(quote_company_code);
+CREATE INDEX idx_quote_yearmonth ON quotation_webpage_input_details_save(quote_yearmonth text_pattern_ops);
+CREATE INDEX idx_quote_series ON quotation_webpage_input_details_save(quote_series text_pattern_ops);
+CREATE INDEX idx_quote_base_number ON quotation_webpage_input_details_save(quote_base_number text_pattern_ops);
+-- Full-text keyword search (q=)
+CREATE INDEX idx_quotation_search_document ON quotation_webpage_input_details_save USING gin (search_document);
+CREATE INDEX idx_quotation_delta_base_id ON quotation_webpage_input_details_save(delta_base_id) WHERE delta_base_id IS NOT NULL;
+-- Trigram indexes for the partial-match (ILIKE '%term%') search filters
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+CREATE INDEX idx_recipient_name_trgm ON recipient_details USING gin (recipient_name gin_trgm_ops);
+CREATE INDEX idx_recipient_company_trgm ON recipient_details USING gin (to_company_name gin_trgm_ops);
+CREATE INDEX idx_recipient_phone_trgm ON recipient_details USING gin (phone_number gin_trgm_ops);
+CREATE INDEX idx_recipient_email_trgm ON recipient_details USING gin (email gin_trgm_ops);
+CREATE INDEX idx_quotation_subject_trgm ON quotation_webpage_input_details_save USING gin (subject gin_trgm_ops);
+CREATE INDEX idx_sales_person_name_trgm ON sales_details USING gin (sales_person_name gin_trgm_ops);
+CREATE INDEX idx_manager_name_trgm ON project_manager_details USING gin (manager_name gin_trgm_ops);
+-- Tank search (quotation_tank_lines)
+CREATE INDEX idx_tank_lines_quotation ON quotation_tank_lines(quotation_id);
+CREATE INDEX idx_tank_lines_length ON quotation_tank_lines(length);
+CREATE INDEX idx_tank_lines_width ON quotation_tank_lines(width);
+CREATE INDEX idx_tank_lines_height ON quotation_tank_lines(height);
+CREATE INDEX idx_tank_lines_type_trgm ON quotation_tank_lines USING gin (tank_type gin_trgm_ops);
+CREATE INDEX idx_tank_lines_support_trgm ON quotation_tank_lines USING gin (support_system gin_trgm_ops);
 
 -- ============================================================================
 -- VIEWS: Convenient data retrieval
@@ -1,26 +1,59 @@
-from fastapi import FastAPI, HTTPException, Depends
-from fastapi.responses import FileResponse
+from fastapi import FastAPI, HTTPException, Depends, Header, Body
+from fastapi.responses import FileResponse, JSONResponse, Response, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Union
+import asyncio
+import base64
+import json
 import os
+import stat
 import tempfile
+import time
 
 import os
 import sys
 from datetime import datetime, date
 from pathlib import Path
 import pandas as pd
-# Import the generator class
-from user_input_tank_generator import TankInvoiceGenerator
+# Quotation request schema and document rendering
+from quotation_request import (
+    TankOption, TankData, DismantlingTankItem, CylindricalTankItem,
+    TermSection, AdditionalDetail, QuotationRequest, FanoutRecipient, FanoutQuotationRequest,
+)
+from quotation_render import render_quotation, render_quotation_fanout
+from tank_catalogue import cylindrical_catalogue
+from tank_lines import replace_tank_lines, tank_lines_from_data
+from quotation_totals import quotation_totals
+from payload_cache import payload_cache
+from reference_data import reference_data, ReferenceSnapshot
+from dataset_etags import dataset_payloads, conditional_json
+from recipient_index import recipient_index, recipient_item, SUGGEST_DEFAULT_LIMIT, SUGGEST_MAX_LIMIT
+from template_cache import template_cache
+from quotation_saves import write_quotation
+from json_patches import JsonPatchError, JsonPatchTestFailed, apply_patch, patched_members
+from revision_deltas import (
+    load_revisions, materialize, plan_revision, rebase_dependents, store_columns, stored_document,
+)
+from search_documents import (
+    search_document, keyword_query, headline, refresh_search_document, supports_full_text,
+    TERMS_HEADLINE_OPTIONS,
+)
+from invoice_table_xml import DEFAULT_TABLE_ENGINE, TABLE_ENGINES
+from worker_pools import (
+    run_blocking, offload, int_env, generation_pool, batch_generation_pool, GenerationPoolFull,
+)
+from generation_jobs import generation_jobs, GenerationJobsFull
 # Import database models and session
 from models import (
     SalesDetails, ProjectManagerDetails, CompanyDetails, 
     RecipientDetails, QuotationWebpageInputDetailsSave,
-    ContractualTermsSpecifications
+    ContractualTermsSpecifications, QuotationTankLine
 )
-from database import get_session
+from database import get_session, engine
 from sqlmodel import Session, select
+from sqlalchemy import Float, cast, exists, false, func, tuple_
+from sqlalchemy.orm import aliased
 
 try:
     from network_storage import NetworkStorage
@@ -32,6 +65,8 @@ except Exception as network_import_error:
 
 app = FastAPI()
 
+DOCX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+
 
 def resolve_docker_mount_path(network_path: str, company_code: str) -> Optional[str]:
     """Map UNC/network storage path to local Docker mount path when available."""
@@ -110,7 +145,8 @@ async def root():
 
 
 @app.get("/api/cylindrical-tank-size")
-async def get_cylindrical_tank_size(material: str, orientation: str, capacity: float):
+@offload
+def get_cylindrical_tank_size(material: str, orientation: str, capacity: float):
     """
     Look up the size of a cylindrical tank from the dimensions Excel file.
     material: 'PVC' or 'GRP'
@@ -118,985 +154,573 @@ async def get_cylindrical_tank_size(material: str, orientation: str, capacity: f
     capacity: capacity in US gallons
     """
     try:
-        generator = TankInvoiceGenerator.__new__(TankInvoiceGenerator)
-        generator.template_path = ""
-        size_str = generator.get_cylindrical_tank_size(material, orientation, capacity)
+        size_str = cylindrical_catalogue.get_size(material, orientation, capacity)
         return {"size": size_str, "material": material, "orientation": orientation, "capacity": capacity}
     except Exception as e:
         print(f"⚠ Error looking up cylindrical size: {e}")
         return {"size": "SIZE N/A", "error": str(e)}
 
 
-class TankOption(BaseModel):
-    tankName: str
-    quantity: int
-    hasPartition: bool
-    tankType: str
-    length: str
-    width: str
-    height: str
-    unit: str
-    unitPrice: str
-    needFreeBoard: Optional[bool] = False
-    freeBoardSize: Optional[str] = ""
-    supportSystem: Optional[str] = "Internal"  # "Internal" or "External"
-    hasDiscount: Optional[bool] = False
-    discountedTotalPrice: Optional[str] = ""
-
-
-class TankData(BaseModel):
-    tankNumber: int
-    optionEnabled: bool
-    optionNumbers: int
-    options: List[TankOption]
-
-
-class DismantlingTankItem(BaseModel):
-    tankName: str
-    length: str = ""
-    width: str = ""
-    height: str = ""
-    unit: str = ""
-    quantity: float = 1
-    unitPrice: float = 0.0
-    hasDiscount: bool = False
-    discountedTotalPrice: str = ""
-
-
-class CylindricalTankItem(BaseModel):
-    tankName: str
-    material: str        # "PVC" or "GRP"
-    layers: Optional[int] = None
-    groundLocation: Optional[str] = "Above Ground"  # "Above Ground" or "Below Ground"
-    orientation: str     # "Horizontal" or "Vertical"
-    capacity: float      # in US Gallons (or selected gallon type)
-    unit: str = "Nos"
-    quantity: float = 1
-    unitPrice: float = 0.0
-    hasDiscount: bool = False
-    discountedTotalPrice: str = ""
-
-
-
-class TermSection(BaseModel):
-    action: str
-    details: List[str]
-    custom: List[str]
-
-class AdditionalDetail(BaseModel):
-    key: str
-    value: str
-
-class QuotationRequest(BaseModel):
-    fromCompany: str
-    companyCode: Optional[str] = ""
-    companyShortName: Optional[str] = ""  # company_name from company_details.xlsx
-    templatePath: Optional[str] = ""
-    recipientTitle: str
-    recipientName: str
-    role: Optional[str] = ""
-    companyName: str
-    location: Optional[str] = ""
-    phoneNumber: Optional[str] = ""
-    email: Optional[str] = ""
-    quotationDate: str
-    quotationFrom: str
-    salesPersonName: Optional[str] = ""
-    officePersonName: Optional[str] = ""
-    quotationNumber: str
-    revisionNumber: int = 0
-    subject: str
-    projectLocation: str
-    generatedBy: Optional[str] = ""
-    additionalDetails: Optional[List[AdditionalDetail]] = []
-    gallonType: Optional[str] = "USG"
-    numberOfTanks: int
-    showSubTotal: bool
-    showVat: bool
-    showGrandTotal: bool
-    tanks: List[TankData]
-    dismantlingTanks: Optional[List[DismantlingTankItem]] = []
-    cylindricalTanks: Optional[List[CylindricalTankItem]] = []
-    terms: Dict[str, TermSection]
+@app.get("/api/cylindrical-tank-catalogue")
+@offload
+def get_cylindrical_tank_catalogue(material: Optional[str] = None, orientation: Optional[str] = None):
+    """
+    List the cylindrical tank catalogue for UI dropdowns.
+    material: optional 'PVC' or 'GRP' filter
+    orientation: optional 'Horizontal' or 'Vertical' filter
+    """
+    try:
+        entries = cylindrical_catalogue.listing(material, orientation)
+        return {"sizes": entries, "count": len(entries)}
+    except Exception as e:
+        print(f"⚠ Error listing cylindrical tank catalogue: {e}")
+        raise HTTPException(status_code=500, detail=f"Error listing cylindrical tank catalogue: {str(e)}")
 
 
-@app.post("/generate-quotation")
-async def generate_quotation(request: QuotationRequest, session: Session = Depends(get_session)):
-    try:
-        # Load environment variables
-        from dotenv import load_dotenv
-        script_dir = os.path.dirname(__file__)
-        env_file = os.path.join(script_dir, '.env')
-        if os.path.exists(env_file):
-            load_dotenv(dotenv_path=env_file, override=True)
-        
-        # Debug: Log terms data received from frontend
-        print(f"\n{'='*60}")
-        print(f"GENERATE QUOTATION - TERMS DEBUG")
-        print(f"{'='*60}")
-        if hasattr(request, 'terms') and request.terms:
-            for term_key, term_value in request.terms.items():
-                print(f"  {term_key}:")
-                print(f"    action: {term_value.action}")
-                print(f"    details count: {len(term_value.details)}")
-                print(f"    custom count: {len(term_value.custom)}")
-                if term_value.custom:
-                    print(f"    custom entries:")
-                    for idx, entry in enumerate(term_value.custom, 1):
-                        print(f"      {idx}. {entry}")
-        print(f"{'='*60}\n")
-        
-        # Use template path from request if provided, otherwise use default mapping
-        if request.templatePath:
-            template_filename = request.templatePath
-            # Add .docx extension if not present
-            if not template_filename.endswith('.docx'):
-                template_filename = template_filename + '.docx'
-        else:
-            # Fallback to old mapping
-            template_map = {
-                "GRP TANKS TRADING L.L.C": "grp_template.docx",
-                "GRP PIPECO TANKS TRADING L.L.C": "pipeco_template.docx",
-                "COLEX TANKS TRADING L.L.C": "colex_template.docx",
-            }
-            template_filename = template_map.get(request.fromCompany, "grp_template.docx")
-        
-        # Get DATA_PATH from .env and construct template path
-        from sync_excel_to_db import get_data_path
-        data_path = get_data_path()
-        template_path = os.path.join(data_path, "template", template_filename)
-        
-        # Verify template file exists
-        if not os.path.exists(template_path):
-            print(f"⚠ Template file not found: {template_path}")
-            print(f"Template filename requested: {template_filename}")
-            print(f"DATA_PATH: {data_path}")
-            raise HTTPException(status_code=404, detail=f"Template file not found: {template_filename}")
-        
-        print(f"✓ Using template: {template_path}")
-        
-        # Initialize generator
-        generator = TankInvoiceGenerator(template_path=template_path)
-        
-        # Use company code from request if provided, otherwise use default mapping
-        if request.companyCode:
-            company_code = request.companyCode
+def plan_quotation(request: QuotationRequest, table_engine: str,
+                   snapshot: Optional[ReferenceSnapshot] = None) -> dict:
+    """
+    Resolve everything generation needs from .env and the reference data:
+    template, quote number, signature details and storage path. Blocking;
+    runs in the worker_pools blocking pool. Companies and persons come from
+    the process-wide reference snapshot (pass one to share it across several
+    quotations).
+    """
+    snapshot = snapshot or reference_data.snapshot()
+    # Load environment variables
+    from dotenv import load_dotenv
+    script_dir = os.path.dirname(__file__)
+    env_file = os.path.join(script_dir, '.env')
+    if os.path.exists(env_file):
+        load_dotenv(dotenv_path=env_file, override=True)
+    
+    # Debug: Log terms data received from frontend
+    print(f"\n{'='*60}")
+    print(f"GENERATE QUOTATION - TERMS DEBUG")
+    print(f"{'='*60}")
+    if hasattr(request, 'terms') and request.terms:
+        for term_key, term_value in request.terms.items():
+            print(f"  {term_key}:")
+            print(f"    action: {term_value.action}")
+            print(f"    details count: {len(term_value.details)}")
+            print(f"    custom count: {len(term_value.custom)}")
+            if term_value.custom:
+                print(f"    custom entries:")
+                for idx, entry in enumerate(term_value.custom, 1):
+                    print(f"      {idx}. {entry}")
+    print(f"{'='*60}\n")
+    
+    # Use template path from request if provided, otherwise use default mapping
+    if request.templatePath:
+        template_filename = request.templatePath
+        # Add .docx extension if not present
+        if not template_filename.endswith('.docx'):
+            template_filename = template_filename + '.docx'
+    else:
+        # Fallback to old mapping
+        template_map = {
+            "GRP TANKS TRADING L.L.C": "grp_template.docx",
+            "GRP PIPECO TANKS TRADING L.L.C": "pipeco_template.docx",
+            "COLEX TANKS TRADING L.L.C": "colex_template.docx",
+        }
+        template_filename = template_map.get(request.fromCompany, "grp_template.docx")
+    
+    # Get DATA_PATH from .env and construct template path
+    from sync_excel_to_db import get_data_path
+    data_path = get_data_path()
+    template_path = os.path.join(data_path, "template", template_filename)
+    
+    # Verify template file exists
+    if not os.path.exists(template_path):
+        print(f"⚠ Template file not found: {template_path}")
+        print(f"Template filename requested: {template_filename}")
+        print(f"DATA_PATH: {data_path}")
+        raise HTTPException(status_code=404, detail=f"Template file not found: {template_filename}")
+    
+    print(f"✓ Using template: {template_path}")
+    
+    # Use company code from request if provided, otherwise use default mapping
+    if request.companyCode:
+        company_code = request.companyCode
+    else:
+        # Fallback to old mapping
+        company_code_map = {
+            "GRP TANKS TRADING L.L.C": "GRP",
+            "GRP PIPECO TANKS TRADING L.L.C": "GRPPT",
+            "COLEX TANKS TRADING L.L.C": "CLX",
+        }
+        company_code = company_code_map.get(request.fromCompany, "GRP")
+    
+    # Extract YYMM from quotation date (format: DD/MM/YY)
+    date_parts = request.quotationDate.split('/')
+    yymm = f"{date_parts[2]}{date_parts[1]}" if len(date_parts) == 3 else "0000"
+    
+    # Get person code from reference data
+    person_code = ""
+    
+    if request.quotationFrom == 'Sales' and request.salesPersonName:
+        person_name = request.salesPersonName.split('(')[0].strip()
+        result = snapshot.sales_by_name.get(person_name)
+        if result:
+            person_code = result.code
+    elif request.officePersonName:
+        person_name = request.officePersonName.split('(')[0].strip()
+        result = snapshot.manager_by_name.get(person_name)
+        if result:
+            person_code = result.code
+    
+    person_code = person_code or "XX"
+    constructed_quote_number = f"{company_code}/{yymm}/{person_code}/{request.quotationNumber}"
+    
+    # Add revision suffix if revision number is greater than 0
+    if request.revisionNumber > 0:
+        constructed_quote_number = f"{constructed_quote_number}-R{request.revisionNumber}"
+    
+    # Signature block details (names, titles, contacts and sign image)
+    signature = None
+    if request.quotationFrom == 'Sales' or request.quotationFrom == 'Office':
+        sig_type = 's' if request.quotationFrom == 'Sales' else 'o'
+        
+        left_name = ""
+        left_title = ""
+        left_mobile = ""
+        left_email = ""
+        right_name = ""
+        right_title = ""
+        right_mobile = ""
+        right_email = ""
+        signature_image = ""
+        
+        # Get company domain from reference data
+        company_result = snapshot.company_by_full_name.get(request.fromCompany)
+        if company_result and company_result.company_domain:
+            company_domain = company_result.company_domain
         else:
-            # Fallback to old mapping
-            company_code_map = {
-                "GRP TANKS TRADING L.L.C": "GRP",
-                "GRP PIPECO TANKS TRADING L.L.C": "GRPPT",
-                "COLEX TANKS TRADING L.L.C": "CLX",
-            }
-            company_code = company_code_map.get(request.fromCompany, "GRP")
+            # Fallback to default domain
+            company_domain = "grptanks.com"
         
-        # Extract YYMM from quotation date (format: DD/MM/YY)
-        date_parts = request.quotationDate.split('/')
-        yymm = f"{date_parts[2]}{date_parts[1]}" if len(date_parts) == 3 else "0000"
-        
-        # Get person code from database
-        person_code = ""
+        # Helper function to construct email using company domain
+        def construct_email(email_name, domain):
+            if not email_name or not domain:
+                return ""
+            return f"{email_name}@{domain}"
         
         try:
-            if request.quotationFrom == 'Sales' and request.salesPersonName:
-                person_name = request.salesPersonName.split('(')[0].strip()
-                statement = select(SalesDetails).where(SalesDetails.sales_person_name == person_name)
-                result = session.exec(statement).first()
-                if result:
-                    person_code = result.code
-            elif request.officePersonName:
-                person_name = request.officePersonName.split('(')[0].strip()
-                statement = select(ProjectManagerDetails).where(ProjectManagerDetails.manager_name == person_name)
-                result = session.exec(statement).first()
-                if result:
-                    person_code = result.code
-        except Exception as e:
-            print(f"⚠ Error fetching CODE from database: {e}")
-        
-        person_code = person_code or "XX"
-        constructed_quote_number = f"{company_code}/{yymm}/{person_code}/{request.quotationNumber}"
-        
-        # Add revision suffix if revision number is greater than 0
-        if request.revisionNumber > 0:
-            constructed_quote_number = f"{constructed_quote_number}-R{request.revisionNumber}"
-        
-        # Set header data
-        # Add role to recipient name with hyphen if role is provided
-        recipient_name_with_role = request.recipientName
-        if request.role and request.role.strip():
-            recipient_name_with_role = f"{request.recipientName} - {request.role}"
-        generator.recipient_name = recipient_name_with_role
-        
-        # Add M/S. prefix to company name
-        company_name_with_prefix = f"M/s. {request.companyName}"
-        generator.recipient_company = company_name_with_prefix
-        generator.recipient_location = request.location or ""
-        # Add PHONE: and EMAIL: prefixes with uppercase
-        generator.recipient_phone = f"{request.phoneNumber}" if request.phoneNumber and request.phoneNumber.strip() else ""
-        generator.recipient_email = f"{request.email}" if request.email and request.email.strip() else ""
-        generator.quote_date = request.quotationDate
-        generator.quote_number = constructed_quote_number
-        generator.subject = request.subject
-        generator.project = request.projectLocation
-        # Include additional details even with empty/null values (use empty strings for null)
-        generator.additional_details = [
-            (detail.key or "", detail.value or "") 
-            for detail in request.additionalDetails
-        ] if request.additionalDetails else []
-        generator.gallon_type = request.gallonType if request.gallonType else "USG"
-        
-        # Set company full name from frontend (for "Yours truly" and NOTE sections)
-        generator.company_full_name = request.fromCompany
-        # Set company short name from frontend (for tank description)
-        generator.company_short_name = request.companyShortName if request.companyShortName else None
-        
-        # Process tanks data - convert from UI format to generator format
-        generator.tanks = []
-        # SL.NO must be continuous across all sections: dismantling (1..) → cylindrical → panel
-        sl_no = len(request.dismantlingTanks or []) + len(request.cylindricalTanks or []) + 1
-        
-        # Roman numeral conversion helper
-        def to_roman(num):
-            val = [1000, 900, 500, 400, 100, 90, 50, 40, 10, 9, 5, 4, 1]
-            syms = ['M', 'CM', 'D', 'CD', 'C', 'XC', 'L', 'XL', 'X', 'IX', 'V', 'IV', 'I']
-            roman_num = ''
-            i = 0
-            while num > 0:
-                for _ in range(num // val[i]):
-                    roman_num += syms[i]
-                    num -= val[i]
-                i += 1
-            return roman_num
-        
-        for tank_data in request.tanks:
-            num_options = len(tank_data.options)
-            for option_idx, option in enumerate(tank_data.options):
-                # Parse dimensions - Allow null/empty values
-                def parse_dimension(dim_str, field_name="dimension"):
-                    """Parse dimension string, return None if empty/null"""
-                    if not dim_str or str(dim_str).strip() == '' or str(dim_str).strip() == 'None':
-                        return None
-                    dim_str = str(dim_str).strip().replace(" ", "")
-                    if "(" in dim_str:
-                        return float(dim_str.split("(")[0])
-                    try:
-                        return float(dim_str)
-                    except ValueError:
-                        return None
-                
-                # Parse dimensions (can be None)
-                length = parse_dimension(option.length, "length")
-                width = parse_dimension(option.width, "width")
-                height = parse_dimension(option.height, "height")
-                
-                # Tank name is optional - no validation needed
-                
-                # Calculate volume (only if all dimensions are provided)
-                volume_m3 = 0.0
-                gallons = 0.0
-                if length and width and height:
-                    volume_m3 = length * width * height
+            if sig_type == 's':  # UI "Sales"
+                # Get sales person details from reference data
+                if request.salesPersonName:
+                    person_name = request.salesPersonName.split('(')[0].strip() if '(' in request.salesPersonName else request.salesPersonName.strip()
+                    selected_sales = snapshot.sales_by_name.get(person_name)
                     
-                    # Calculate gallons
-                    gallon_type_to_use = request.gallonType if request.gallonType else "USG"
-                    if gallon_type_to_use == "USG":
-                        gallons = volume_m3 * 264.172
-                    else:
-                        gallons = volume_m3 * 219.969
+                    if selected_sales:
+                        left_name = selected_sales.sales_person_name
+                        left_title = selected_sales.designation or "Sales Executive"
+                        left_mobile = selected_sales.phone_number or ""
+                        left_email = construct_email(selected_sales.email_name, company_domain)
+                        
+                        # Get signature image from DATA_PATH/signs&seals
+                        # Use sign_path from DB (e.g. 'VV_sign'), fallback to '{code}_sign'
+                        sign_base = (selected_sales.sign_path or f"{selected_sales.code}_sign").strip()
+                        # Remove extension if already present in DB value
+                        if '.' in os.path.basename(sign_base):
+                            sign_base = os.path.splitext(sign_base)[0]
+                        signature_image = reference_data.signature_image(data_path, sign_base)
                 
-                # Handle free board - user inputs in cm, convert to meters
-                free_board_m = 0.3  # Default 30cm
-                need_free_board = option.needFreeBoard if option.needFreeBoard else False
-                if need_free_board and option.freeBoardSize:
-                    try:
-                        free_board_cm = float(option.freeBoardSize)
-                        free_board_m = free_board_cm / 100.0  # Convert cm to meters
-                    except ValueError:
-                        free_board_m = 0.3  # Default if conversion fails
+                # Right side: Office Person (Project Manager)
+                if request.officePersonName:
+                    person_name = request.officePersonName.split('(')[0].strip() if '(' in request.officePersonName else request.officePersonName.strip()
+                    selected_pm = snapshot.manager_by_name.get(person_name)
+                else:
+                    # Use first project manager as default
+                    selected_pm = snapshot.default_manager
                 
-                # Calculate net volume based on free board (only if dimensions exist)
-                net_volume_m3 = 0.0
-                if length and width and height:
-                    net_volume_m3 = length * width * (height - free_board_m)
+                if selected_pm:
+                    right_name = selected_pm.manager_name
+                    right_title = selected_pm.designation or "Manager - Projects"
+                    right_mobile = selected_pm.phone_number or ""
+                    right_email = construct_email(selected_pm.email_name, company_domain)
                 
-                # Determine skid based on height (only if height exists)
-                skid = ""
-                if height:
-                    if 2.0 <= height <= 3.0:
-                        skid = "SKID BASE - HDG HOLLOW SECTION 50 X 50 X 3 MM (SQUARE TUBE)"
-                    elif 1.0 <= height <= 1.5:
-                        skid = "WITHOUT SKID"
-                    elif height > 3.0:
-                        skid = "SKID BASE - I BEAM SKID"
+            else:  # sig_type == 'o', UI "Office"
+                # Get project manager details from reference data
+                if request.officePersonName:
+                    person_name = request.officePersonName.split('(')[0].strip() if '(' in request.officePersonName else request.officePersonName.strip()
+                    selected_pm = snapshot.manager_by_name.get(person_name)
+                else:
+                    # Use first project manager as default
+                    selected_pm = snapshot.default_manager
                 
-                # Calculate total price - use discounted price if discount is enabled
-                has_discount = option.hasDiscount if hasattr(option, 'hasDiscount') and option.hasDiscount else False
-                unit_price = float(option.unitPrice) if option.unitPrice else 0.0
-                quantity = float(option.quantity) if option.quantity else 0.0
+                if selected_pm:
+                    left_name = selected_pm.manager_name
+                    left_title = selected_pm.designation or "Manager - Projects"
+                    left_mobile = selected_pm.phone_number or ""
+                    left_email = construct_email(selected_pm.email_name, company_domain)
+                    
+                    # Get signature image from DATA_PATH/signs&seals
+                    sign_base = (selected_pm.sign_path or f"{selected_pm.code}_sign").strip()
+                    if '.' in os.path.basename(sign_base):
+                        sign_base = os.path.splitext(sign_base)[0]
+                    signature_image = reference_data.signature_image(data_path, sign_base)
                 
-                if has_discount and option.discountedTotalPrice:
-                    total_price = float(option.discountedTotalPrice)
-                else:
-                    total_price = quantity * unit_price
+                # No right signatory for office
+                right_name = ""
+                right_title = ""
+                right_mobile = ""
+                right_email = ""
                 
-                tank = {
-                    "sl_no": sl_no,
-                    "name": option.tankName or "",
-                    "partition": option.hasPartition,
-                    "type": option.tankType or "",
-                    "length": length if length else 0.0,
-                    "length_display": option.length or "",
-                    "width": width if width else 0.0,
-                    "width_display": option.width or "",
-                    "height": height if height else 0.0,
-                    "volume_m3": volume_m3,
-                    "gallons": gallons,
-                    "free_board": free_board_m,
-                    "need_free_board": need_free_board,
-                    "net_volume_m3": net_volume_m3,
-                    "net_height": (height - free_board_m) if height else 0.0,
-                    "skid": skid,
-                    "unit": option.unit or "",
-                    "qty": quantity,
-                    "unit_price": unit_price,
-                    "total_price": total_price,
-                    "option_number": option_idx + 1,
-                    "option_total": num_options,
-                    "option_roman": to_roman(option_idx + 1),
-                    "support_system": option.supportSystem if hasattr(option, 'supportSystem') and option.supportSystem else "Internal",
-                    "has_discount": has_discount
-                }
-                generator.tanks.append(tank)
-            
-            # Increment sl_no only after all options of this tank
-            sl_no += 1
-        
-        # ── Process Dismantling Tanks ──
-        generator.dismantling_tanks = []
-        for item in (request.dismantlingTanks or []):
-            unit_price = float(item.unitPrice) if item.unitPrice else 0.0
-            quantity   = float(item.quantity) if item.quantity else 0.0
-            if item.hasDiscount and item.discountedTotalPrice:
-                total_price = float(item.discountedTotalPrice)
-            else:
-                total_price = unit_price * quantity
-            generator.dismantling_tanks.append({
-                "tank_name":   item.tankName or "",
-                "length":      item.length or "",
-                "width":       item.width or "",
-                "height":      item.height or "",
-                "unit":        item.unit or "",
-                "quantity":    quantity,
-                "unit_price":  unit_price,
-                "total_price": total_price,
-                "has_discount": item.hasDiscount,
-            })
+        except Exception as e:
+            print(f"⚠ Error reading signature details: {e}")
+            # Fallback to extracting name from provided fields
+            if request.quotationFrom == 'Sales' and request.salesPersonName:
+                left_name = request.salesPersonName.split('(')[0].strip()
+                left_title = 'Sales Executive'
+            elif request.quotationFrom == 'Office' and request.officePersonName:
+                left_name = request.officePersonName.split('(')[0].strip()
+                left_title = 'Manager - Projects'
+        
+        signature = {
+            'left_name': left_name,
+            'left_title': left_title,
+            'left_mobile': left_mobile,
+            'left_email': left_email,
+            'right_name': right_name,
+            'right_title': right_title,
+            'right_mobile': right_mobile,
+            'right_email': right_email,
+            'signature_image': signature_image
+        }
+    
+    # Get company-specific output directory from reference data
+    company_details = snapshot.company_by_code.get(company_code)
+    if company_details and company_details.company_storage_path:
+        output_dir = company_details.company_storage_path
+    else:
+        # Fallback to Final_Doc/{company_code} if not in database
+        script_dir = os.path.dirname(__file__)
+        output_dir = os.path.join(script_dir, "Final_Doc", company_code)
+    
+    return {
+        "template_path": template_path,
+        "table_engine": table_engine,
+        "company_code": company_code,
+        "quote_number": constructed_quote_number,
+        "signature": signature,
+        "output_dir": output_dir,
+    }
 
-        # ── Process Cylindrical Tanks ──
-        generator.cylindrical_tanks = []
-        gallon_type_for_cyl = request.gallonType if request.gallonType else "USG"
-        for item in (request.cylindricalTanks or []):
-            unit_price = float(item.unitPrice) if item.unitPrice else 0.0
-            quantity   = float(item.quantity) if item.quantity else 0.0
-            if item.hasDiscount and item.discountedTotalPrice:
-                total_price = float(item.discountedTotalPrice)
-            else:
-                total_price = unit_price * quantity
-            # Look up the size from the dimensions Excel
-            try:
-                size_str = generator.get_cylindrical_tank_size(
-                    item.material, item.orientation, float(item.capacity)
-                )
-            except Exception:
-                size_str = "SIZE N/A"
-            generator.cylindrical_tanks.append({
-                "tank_name":      item.tankName or "",
-                "material":       item.material or "PVC",
-                "orientation":    item.orientation or "Vertical",
-                "layers":         int(item.layers) if item.layers else None,
-                "ground_location": item.groundLocation or "Above Ground",
-                "capacity":       float(item.capacity) if item.capacity else 0.0,
-                "size":           size_str,
-                "unit":           item.unit or "Nos",
-                "quantity":       quantity,
-                "unit_price":     unit_price,
-                "total_price":    total_price,
-                "has_discount":   item.hasDiscount,
-            })
 
-        # Calculate total pages (estimate based on tanks)
-        tanks_per_page = 3
-        total_item_count = len(generator.tanks) + len(generator.dismantling_tanks) + len(generator.cylindrical_tanks)
-        generator.total_pages = max(1, (total_item_count + tanks_per_page - 1) // tanks_per_page)
-        generator.quote_page = f"1/{generator.total_pages}"
-        
-        # Check if ladder is needed
-        generator.needs_ladder = any(float(tank.get('height', 0)) > 2.0 for tank in generator.tanks)
-        
-        # Check if any tank has discount enabled (across all sections)
-        generator.has_discount = (
-            any(tank.get('has_discount', False) for tank in generator.tanks) or
-            any(t.get('has_discount', False) for t in generator.dismantling_tanks) or
-            any(t.get('has_discount', False) for t in generator.cylindrical_tanks)
-        )
-        
-        # Set flags for showing totals
-        generator.show_sub_total = request.showSubTotal
-        generator.show_vat = request.showVat
-        generator.show_grand_total = request.showGrandTotal
-        
-        # Set sections configuration based on terms
-        generator.sections = {
-            'note': request.terms['note'].action == 'yes' if 'note' in request.terms else False,
-            'closing': True,  # Default closing paragraph
-            'signature': request.quotationFrom == 'Sales' or request.quotationFrom == 'Office',
-            'material_spec': request.terms['materialSpecification'].action == 'yes' if 'materialSpecification' in request.terms else False,
-            'warranty': request.terms['warrantyExclusions'].action == 'yes' if 'warrantyExclusions' in request.terms else False,
-            'terms': request.terms['termsConditions'].action == 'yes' if 'termsConditions' in request.terms else False,
-            'extra_note': request.terms['extraNote'].action == 'yes' if 'extraNote' in request.terms else True,  # Default to True
-            'supplier_scope': request.terms['supplierScope'].action == 'yes' if 'supplierScope' in request.terms else False,
-            'customer_scope': request.terms['customerScope'].action == 'yes' if 'customerScope' in request.terms else False,
-            'scope_of_work': request.terms['scopeOfWork'].action == 'yes' if 'scopeOfWork' in request.terms else False,
-            'work_excluded': request.terms['workExcluded'].action == 'yes' if 'workExcluded' in request.terms else False,
-            'final_note': False,  # Can be enabled if needed
-            'thank_you': True,
+def write_document(path: str, document: bytes) -> str:
+    """Write rendered .docx bytes to path (replacing it) and make the file editable"""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(document)
+    try:
+        current_permissions = os.stat(path).st_mode
+        os.chmod(path, current_permissions | stat.S_IWRITE | stat.S_IREAD)
+    except Exception as perm_error:
+        print(f"⚠ Warning: Could not set file permissions: {perm_error}")
+    print(f"✓ Document saved as: {path}")
+    return path
+
+
+def store_quotation(plan: dict, document: bytes) -> dict:
+    """Save the rendered document to the company's storage path (local, Docker mount or SMB)"""
+    company_code = plan['company_code']
+    output_dir = plan['output_dir']
+    # Format: GRPPT_2602_MM_4186.docx or GRPPT_2602_MM_4186-R1.docx
+    output_filename = f"{plan['quote_number'].replace('/', '_')}.docx"
+    
+    # Normalize storage path from DB (handles malformed network paths like 192.168.0.10\\share\\folder)
+    raw_output_dir = str(output_dir).strip()
+    
+    # Check if this is already an absolute Linux path (starts with /)
+    is_absolute_linux_path = raw_output_dir.startswith('/')
+    
+    normalized_output_dir = raw_output_dir.replace('\\', '/')
+    normalized_parts = [part.strip() for part in normalized_output_dir.split('/') if part.strip()]
+    normalized_output_dir = '/'.join(normalized_parts)
+    
+    # Restore leading / for absolute Linux paths (like /mnt/grp_quotations)
+    if is_absolute_linux_path and normalized_output_dir and not normalized_output_dir.startswith('/'):
+        normalized_output_dir = '/' + normalized_output_dir
+
+    if normalized_output_dir and not normalized_output_dir.startswith('/'):
+        first_segment = normalized_output_dir.split('/')[0]
+        looks_like_network_host = '.' in first_segment or first_segment.lower() == 'localhost'
+        if looks_like_network_host:
+            normalized_output_dir = f"//{normalized_output_dir}"
+
+    if normalized_output_dir:
+        output_dir = normalized_output_dir
+
+    # Use Docker mount path resolution for all companies (GRP, GRPPT, CLX)
+    mount_output_dir = resolve_docker_mount_path(output_dir, company_code)
+    if mount_output_dir:
+        # Check if the mount base directory exists (not the full subdirectory path)
+        # For example, check /mnt/grp_quotations, /mnt/grp_pipeco_quotations, or /mnt/colex_quotations
+        configured_mounts = {
+            "GRP": os.getenv("GRP_STORAGE_MOUNT", "/mnt/grp_quotations"),
+            "GRPPT": os.getenv("GRPPT_STORAGE_MOUNT", "/mnt/grp_pipeco_quotations"),
+            "CLX": os.getenv("CLX_STORAGE_MOUNT", "/mnt/colex_quotations"),
         }
-        
-        # Set section content
-        generator.section_content = {}
-        
-        # NOTE section
-        if generator.sections['note']:
-            note_data = request.terms['note']
-            generator.section_content['note'] = note_data.details + note_data.custom
-        
-        # MATERIAL SPECIFICATION
-        if generator.sections['material_spec']:
-            mat_spec_data = request.terms['materialSpecification']
-            generator.section_content['material_spec'] = mat_spec_data.details + mat_spec_data.custom
-        
-        # WARRANTY
-        if generator.sections['warranty']:
-            warranty_data = request.terms['warrantyExclusions']
-            generator.section_content['warranty'] = warranty_data.details + warranty_data.custom
-        
-        # TERMS AND CONDITIONS
-        if generator.sections['terms']:
-            terms_data = request.terms['termsConditions']
-            # For terms, we need to format as dict for key-value terms
-            # and keep a list for plain custom terms without colons
-            terms_list = terms_data.details + terms_data.custom
-            print(f"  Terms & Conditions - Total entries: {len(terms_list)}")
-            print(f"    Default entries: {len(terms_data.details)}")
-            print(f"    Custom entries: {len(terms_data.custom)}")
-            if terms_data.custom:
-                print(f"    Custom entries content: {terms_data.custom}")
-            
-            generator.section_content['terms'] = {}
-            generator.section_content['terms_plain'] = []  # For custom terms without colons
-            
-            for idx, term in enumerate(terms_list):
-                if ':' in term:
-                    key, value = term.split(':', 1)
-                    key_clean = key.strip()
-                    value_clean = value.strip()
-                    generator.section_content['terms'][key_clean] = value_clean
-                    print(f"      Added formatted term: '{key_clean}' = '{value_clean[:50]}...'")
-                else:
-                    # Add plain custom terms to separate list
-                    generator.section_content['terms_plain'].append(term.strip())
-                    print(f"      Added plain term: {term[:50]}")
-            
-            print(f"    Final terms dict has {len(generator.section_content['terms'])} formatted entries")
-            print(f"    Final terms_plain list has {len(generator.section_content['terms_plain'])} plain entries")
-        
-        # EXTRA NOTE
-        if generator.sections['extra_note']:
-            if 'extraNote' in request.terms:
-                extra_note_data = request.terms['extraNote']
-                generator.section_content['extra_note'] = extra_note_data.details + extra_note_data.custom
-            else:
-                # Use default extra note content
-                company_name = generator._get_company_name()
-                generator.section_content['extra_note'] = [
-                    "Any deviations from this quotation to suit the site's condition will have additional cost implications.",
-                    "If the work is indefinitely delayed beyond 30 days after the delivery of materials due to the issues caused by the customer or site condition, the Company will not be liable for any damage to the supplied materials.",
-                    "The submission of all related documents, including the warranty certificate, will be done upon receiving the final payment.",
-                    "Any additional test / lab charges incurred from third parties / external agencies are under the scope of the contractor / client.",
-                    f"Until receiving the final settlement from the client, {company_name} has reserved the right to use the supplied materials at the site.",
-                    "The testing and commissioning should be completed within a period of 15 to 30 days from the installation completion date by the Contractor/Client.",
-                    "For the net volume, a minimum of 30 cm freeboard area is to be calculated from the total height of the tank."
-                ]
-        
-        # SUPPLIER SCOPE
-        if generator.sections['supplier_scope']:
-            supplier_data = request.terms['supplierScope']
-            generator.section_content['supplier_scope'] = supplier_data.details + supplier_data.custom
-        
-        # CUSTOMER SCOPE
-        if generator.sections['customer_scope']:
-            customer_data = request.terms['customerScope']
-            generator.section_content['customer_scope'] = customer_data.details + customer_data.custom
-        
-        # SCOPE OF WORK
-        if generator.sections['scope_of_work']:
-            scope_of_work_data = request.terms['scopeOfWork']
-            generator.section_content['scope_of_work'] = scope_of_work_data.details + scope_of_work_data.custom
-        
-        # WORK EXCLUDED
-        if generator.sections['work_excluded']:
-            work_excluded_data = request.terms['workExcluded']
-            generator.section_content['work_excluded'] = work_excluded_data.details + work_excluded_data.custom
-        
-        # Set signature info based on sales person or office person
-        if generator.sections['signature']:
-            sig_type = 's' if request.quotationFrom == 'Sales' else 'o'
-            
-            left_name = ""
-            left_title = ""
-            left_mobile = ""
-            left_email = ""
-            right_name = ""
-            right_title = ""
-            right_mobile = ""
-            right_email = ""
-            signature_image = ""
-            
-            # Get company domain from database
-            company_domain = ""
-            try:
-                statement = select(CompanyDetails).where(CompanyDetails.full_name == request.fromCompany)
-                company_result = session.exec(statement).first()
-                if company_result and company_result.company_domain:
-                    company_domain = company_result.company_domain
-                else:
-                    # Fallback to default domain
-                    company_domain = "grptanks.com"
-            except Exception as e:
-                print(f"⚠ Error fetching company domain: {e}")
-                company_domain = "grptanks.com"
-            
-            # Helper function to construct email using company domain
-            def construct_email(email_name, domain):
-                if not email_name or not domain:
-                    return ""
-                return f"{email_name}@{domain}"
-            
+        mount_base = configured_mounts.get(company_code)
+        if mount_base and os.path.isdir(mount_base):
+            print(f"📦 Using Docker-mounted path instead of SMB UNC: {mount_output_dir}")
+            output_dir = mount_output_dir
+        else:
+            print(f"⚠ Mount base '{mount_base}' not found, will attempt SMB or fallback")
+
+    print(f"📂 Storage path resolved: raw='{raw_output_dir}' -> normalized='{output_dir}'")
+    
+    # Check if this is a network path
+    is_network_path = output_dir.startswith('//') or output_dir.startswith('\\\\')
+    
+    if not is_network_path:
+        # Only create local directories
+        os.makedirs(output_dir, exist_ok=True)
+    
+    output_path = os.path.join(output_dir, output_filename)
+    
+    # Delete existing file if it exists
+    if is_network_path:
+        # Check and delete from network share
+        if NETWORK_STORAGE_AVAILABLE:
             try:
-                if sig_type == 's':  # UI "Sales"
-                    # Get sales person details from database
-                    if request.salesPersonName:
-                        person_name = request.salesPersonName.split('(')[0].strip() if '(' in request.salesPersonName else request.salesPersonName.strip()
-                        statement = select(SalesDetails).where(SalesDetails.sales_person_name == person_name)
-                        selected_sales = session.exec(statement).first()
-                        
-                        if selected_sales:
-                            left_name = selected_sales.sales_person_name
-                            left_title = selected_sales.designation or "Sales Executive"
-                            left_mobile = selected_sales.phone_number or ""
-                            left_email = construct_email(selected_sales.email_name, company_domain)
-                            
-                            # Get signature image from DATA_PATH/signs&seals
-                            # Use sign_path from DB (e.g. 'VV_sign'), fallback to '{code}_sign'
-                            sign_base = (selected_sales.sign_path or f"{selected_sales.code}_sign").strip()
-                            # Remove extension if already present in DB value
-                            if '.' in os.path.basename(sign_base):
-                                sign_base = os.path.splitext(sign_base)[0]
-                            signs_dir = os.path.join(data_path, 'signs&seals')
-                            for ext in ['.png', '.jpg', '.jpeg']:
-                                if signature_image:
-                                    break
-                                for name_variant in [sign_base, sign_base.lower()]:
-                                    candidate = os.path.join(signs_dir, name_variant + ext)
-                                    if os.path.exists(candidate):
-                                        signature_image = candidate
-                                        break
-                    
-                    # Right side: Office Person (Project Manager)
-                    if request.officePersonName:
-                        person_name = request.officePersonName.split('(')[0].strip() if '(' in request.officePersonName else request.officePersonName.strip()
-                        statement = select(ProjectManagerDetails).where(ProjectManagerDetails.manager_name == person_name)
-                        selected_pm = session.exec(statement).first()
-                    else:
-                        # Use first project manager as default
-                        statement = select(ProjectManagerDetails)
-                        selected_pm = session.exec(statement).first()
-                    
-                    if selected_pm:
-                        right_name = selected_pm.manager_name
-                        right_title = selected_pm.designation or "Manager - Projects"
-                        right_mobile = selected_pm.phone_number or ""
-                        right_email = construct_email(selected_pm.email_name, company_domain)
-                    
-                else:  # sig_type == 'o', UI "Office"
-                    # Get project manager details from database
-                    if request.officePersonName:
-                        person_name = request.officePersonName.split('(')[0].strip() if '(' in request.officePersonName else request.officePersonName.strip()
-                        statement = select(ProjectManagerDetails).where(ProjectManagerDetails.manager_name == person_name)
-                        selected_pm = session.exec(statement).first()
-                    else:
-                        # Use first project manager as default
-                        statement = select(ProjectManagerDetails)
-                        selected_pm = session.exec(statement).first()
-                    
-                    if selected_pm:
-                        left_name = selected_pm.manager_name
-                        left_title = selected_pm.designation or "Manager - Projects"
-                        left_mobile = selected_pm.phone_number or ""
-                        left_email = construct_email(selected_pm.email_name, company_domain)
-                        
-                        # Get signature image from DATA_PATH/signs&seals
-                        sign_base = (selected_pm.sign_path or f"{selected_pm.code}_sign").strip()
-                        if '.' in os.path.basename(sign_base):
-                            sign_base = os.path.splitext(sign_base)[0]
-                        signs_dir = os.path.join(data_path, 'signs&seals')
-                        for ext in ['.png', '.jpg', '.jpeg']:
-                            if signature_image:
-                                break
-                            for name_variant in [sign_base, sign_base.lower()]:
-                                candidate = os.path.join(signs_dir, name_variant + ext)
-                                if os.path.exists(candidate):
-                                    signature_image = candidate
-                                    break
-                    
-                    # No right signatory for office
-                    right_name = ""
-                    right_title = ""
-                    right_mobile = ""
-                    right_email = ""
+                smb_username = os.getenv('SMB_USERNAME')
+                smb_password = os.getenv('SMB_PASSWORD')
+                
+                if smb_username and smb_password:
+                    storage = NetworkStorage(smb_username, smb_password)
+                    network_full_path = f"{output_dir}/{output_filename}".replace('\\', '/')
                     
+                    if storage.file_exists(network_full_path):
+                        print(f"⚠ File '{output_filename}' already exists on network share - replacing...")
+                        if storage.delete_file(network_full_path):
+                            print(f"✓ Successfully deleted existing file from network share")
+                        else:
+                            print(f"⚠ Could not delete existing file from network share")
             except Exception as e:
-                print(f"⚠ Error reading database for signature: {e}")
-                # Fallback to extracting name from provided fields
-                if request.quotationFrom == 'Sales' and request.salesPersonName:
-                    left_name = request.salesPersonName.split('(')[0].strip()
-                    left_title = 'Sales Executive'
-                elif request.quotationFrom == 'Office' and request.officePersonName:
-                    left_name = request.officePersonName.split('(')[0].strip()
-                    left_title = 'Manager - Projects'
-            
-            generator.section_content['signature'] = {
-                'left_name': left_name,
-                'left_title': left_title,
-                'left_mobile': left_mobile,
-                'left_email': left_email,
-                'right_name': right_name,
-                'right_title': right_title,
-                'right_mobile': right_mobile,
-                'right_email': right_email,
-                'signature_image': signature_image
-            }
-        
-        # Closing paragraph content
-        if generator.sections['closing']:
-            generator.section_content['closing'] = (
-                "We hope the above offer meets your requirements and awaiting the valuable order confirmation.\n"
-                "If you have any questions concerning the offer, please contact the undersigned."
-            )
-        
-        # DEBUG: Check section_content right before document generation
-        print(f"\n{'='*60}")
-        print(f"FINAL CHECK BEFORE DOCUMENT GENERATION")
-        print(f"{'='*60}")
-        if 'terms' in generator.section_content:
-            print(f"  terms section exists: {len(generator.section_content['terms'])} entries")
-            for key, val in generator.section_content['terms'].items():
-                print(f"    - {key}: {val[:40]}...")
-        else:
-            print(f"  ⚠️  NO TERMS in section_content!")
-        print(f"{'='*60}\n")
-        
-        # Generate the document
-        generator.create_invoice_table()
-        
-        # Save the document to company-specific path from database
-        # Format: GRPPT_2602_MM_4186.docx or GRPPT_2602_MM_4186-R1.docx
-        output_filename = f"{constructed_quote_number.replace('/', '_')}.docx"
-        
-        # Get company-specific output directory from database
+                print(f"⚠ Error checking/deleting network file: {e}")
+    elif os.path.exists(output_path):
         try:
-            statement = select(CompanyDetails).where(CompanyDetails.code == company_code)
-            company_details = session.exec(statement).first()
-            if company_details and company_details.company_storage_path:
-                output_dir = company_details.company_storage_path
-            else:
-                # Fallback to Final_Doc/{company_code} if not in database
-                script_dir = os.path.dirname(__file__)
-                output_dir = os.path.join(script_dir, "Final_Doc", company_code)
+            print(f"⚠ File '{output_filename}' already exists - replacing with new version...")
+            os.remove(output_path)
+            print(f"✓ Successfully deleted existing file")
+        except PermissionError:
+            error_msg = (
+                f"Cannot replace '{output_filename}' because it is currently open. "
+                f"Please close the file in Word or any other application and try again."
+            )
+            print(f"❌ {error_msg}")
+            raise HTTPException(status_code=409, detail=error_msg)
         except Exception as e:
-            print(f"⚠ Error fetching company storage path from database: {e}")
-            # Fallback to Final_Doc/{company_code}
-            script_dir = os.path.dirname(__file__)
-            output_dir = os.path.join(script_dir, "Final_Doc", company_code)
-
-        # Normalize storage path from DB (handles malformed network paths like 192.168.0.10\\share\\folder)
-        raw_output_dir = str(output_dir).strip()
-        
-        # Check if this is already an absolute Linux path (starts with /)
-        is_absolute_linux_path = raw_output_dir.startswith('/')
-        
-        normalized_output_dir = raw_output_dir.replace('\\', '/')
-        normalized_parts = [part.strip() for part in normalized_output_dir.split('/') if part.strip()]
-        normalized_output_dir = '/'.join(normalized_parts)
-        
-        # Restore leading / for absolute Linux paths (like /mnt/grp_quotations)
-        if is_absolute_linux_path and normalized_output_dir and not normalized_output_dir.startswith('/'):
-            normalized_output_dir = '/' + normalized_output_dir
-
-        if normalized_output_dir and not normalized_output_dir.startswith('/'):
-            first_segment = normalized_output_dir.split('/')[0]
-            looks_like_network_host = '.' in first_segment or first_segment.lower() == 'localhost'
-            if looks_like_network_host:
-                normalized_output_dir = f"//{normalized_output_dir}"
-
-        if normalized_output_dir:
-            output_dir = normalized_output_dir
-
-        # Use Docker mount path resolution for all companies (GRP, GRPPT, CLX)
-        mount_output_dir = resolve_docker_mount_path(output_dir, company_code)
-        if mount_output_dir:
-            # Check if the mount base directory exists (not the full subdirectory path)
-            # For example, check /mnt/grp_quotations, /mnt/grp_pipeco_quotations, or /mnt/colex_quotations
-            configured_mounts = {
-                "GRP": os.getenv("GRP_STORAGE_MOUNT", "/mnt/grp_quotations"),
-                "GRPPT": os.getenv("GRPPT_STORAGE_MOUNT", "/mnt/grp_pipeco_quotations"),
-                "CLX": os.getenv("CLX_STORAGE_MOUNT", "/mnt/colex_quotations"),
-            }
-            mount_base = configured_mounts.get(company_code)
-            if mount_base and os.path.isdir(mount_base):
-                print(f"📦 Using Docker-mounted path instead of SMB UNC: {mount_output_dir}")
-                output_dir = mount_output_dir
-            else:
-                print(f"⚠ Mount base '{mount_base}' not found, will attempt SMB or fallback")
-
-        print(f"📂 Storage path resolved: raw='{raw_output_dir}' -> normalized='{output_dir}'")
-        
-        # Check if this is a network path
-        is_network_path = output_dir.startswith('//') or output_dir.startswith('\\\\')
+            error_msg = f"Could not delete existing file: {str(e)}"
+            print(f"❌ {error_msg}")
+            raise HTTPException(status_code=500, detail=error_msg)
+    
+    print(f"📁 Saving document...")
+    print(f"   Output directory: {output_dir}")
+    print(f"   Output filename: {output_filename}")
+    print(f"   Full path: {output_path}")
+    
+    # Check if this is a network path (starts with // or \\)
+    is_network_path = output_dir.startswith('//') or output_dir.startswith('\\\\')
+    
+    if is_network_path:
+        # Save to network share using SMB
+        print(f"🌐 Detected network path, using SMB/CIFS protocol")
+        
+        if not NETWORK_STORAGE_AVAILABLE:
+            raise HTTPException(
+                status_code=500, 
+                detail="Network storage not available. Please install pysmb: pip install pysmb"
+            )
         
-        if not is_network_path:
-            # Only create local directories
-            os.makedirs(output_dir, exist_ok=True)
+        # Get SMB credentials from environment
+        smb_username = os.getenv('SMB_USERNAME')
+        smb_password = os.getenv('SMB_PASSWORD')
         
-        output_path = os.path.join(output_dir, output_filename)
+        if not smb_username or not smb_password:
+            raise HTTPException(
+                status_code=500,
+                detail="SMB credentials not configured. Set SMB_USERNAME and SMB_PASSWORD environment variables."
+            )
         
-        # Delete existing file if it exists
-        if is_network_path:
-            # Check and delete from network share
-            if NETWORK_STORAGE_AVAILABLE:
-                try:
-                    smb_username = os.getenv('SMB_USERNAME')
-                    smb_password = os.getenv('SMB_PASSWORD')
-                    
-                    if smb_username and smb_password:
-                        storage = NetworkStorage(smb_username, smb_password)
-                        network_full_path = f"{output_dir}/{output_filename}".replace('\\', '/')
-                        
-                        if storage.file_exists(network_full_path):
-                            print(f"⚠ File '{output_filename}' already exists on network share - replacing...")
-                            if storage.delete_file(network_full_path):
-                                print(f"✓ Successfully deleted existing file from network share")
-                            else:
-                                print(f"⚠ Could not delete existing file from network share")
-                except Exception as e:
-                    print(f"⚠ Error checking/deleting network file: {e}")
-        elif os.path.exists(output_path):
-            try:
-                print(f"⚠ File '{output_filename}' already exists - replacing with new version...")
-                os.remove(output_path)
-                print(f"✓ Successfully deleted existing file")
-            except PermissionError:
-                error_msg = (
-                    f"Cannot replace '{output_filename}' because it is currently open. "
-                    f"Please close the file in Word or any other application and try again."
-                )
-                print(f"❌ {error_msg}")
-                raise HTTPException(status_code=409, detail=error_msg)
-            except Exception as e:
-                error_msg = f"Could not delete existing file: {str(e)}"
-                print(f"❌ {error_msg}")
-                raise HTTPException(status_code=500, detail=error_msg)
+        # Save to temporary local file first
+        temp_dir = tempfile.gettempdir()
+        temp_file_path = os.path.join(temp_dir, output_filename)
         
-        print(f"📁 Saving document...")
-        print(f"   Output directory: {output_dir}")
-        print(f"   Output filename: {output_filename}")
-        print(f"   Full path: {output_path}")
+        print(f"   Saving to temporary file: {temp_file_path}")
+        saved_path = write_document(temp_file_path, document)
         
-        # Check if this is a network path (starts with // or \\)
-        is_network_path = output_dir.startswith('//') or output_dir.startswith('\\\\')
+        if not os.path.exists(saved_path):
+            raise HTTPException(status_code=500, detail="Failed to generate document locally")
         
-        if is_network_path:
-            # Save to network share using SMB
-            print(f"🌐 Detected network path, using SMB/CIFS protocol")
-            
-            if not NETWORK_STORAGE_AVAILABLE:
-                raise HTTPException(
-                    status_code=500, 
-                    detail="Network storage not available. Please install pysmb: pip install pysmb"
-                )
+        # Upload to network share
+        try:
+            storage = NetworkStorage(smb_username, smb_password)
+            network_full_path = f"{output_dir}/{output_filename}".replace('\\', '/')
             
-            # Get SMB credentials from environment
-            smb_username = os.getenv('SMB_USERNAME')
-            smb_password = os.getenv('SMB_PASSWORD')
+            print(f"   Uploading to network share: {network_full_path}")
+            success = storage.save_file(saved_path, network_full_path, create_dirs=True)
             
-            if not smb_username or not smb_password:
+            if not success:
                 raise HTTPException(
                     status_code=500,
-                    detail="SMB credentials not configured. Set SMB_USERNAME and SMB_PASSWORD environment variables."
+                    detail=f"Failed to upload file to network share: {network_full_path}"
                 )
             
-            # Save to temporary local file first
-            temp_dir = tempfile.gettempdir()
-            temp_file_path = os.path.join(temp_dir, output_filename)
+            # Clean up temp file
+            os.remove(saved_path)
+            print(f"   Cleaned up temporary file")
             
-            print(f"   Saving to temporary file: {temp_file_path}")
-            saved_path = generator.save(temp_file_path)
+            actual_path = network_full_path
+            print(f"✓ Document successfully saved to network share: {actual_path}")
             
-            if not os.path.exists(saved_path):
-                raise HTTPException(status_code=500, detail="Failed to generate document locally")
-            
-            # Upload to network share
-            try:
-                storage = NetworkStorage(smb_username, smb_password)
-                network_full_path = f"{output_dir}/{output_filename}".replace('\\', '/')
-                
-                print(f"   Uploading to network share: {network_full_path}")
-                success = storage.save_file(saved_path, network_full_path, create_dirs=True)
-                
-                if not success:
-                    raise HTTPException(
-                        status_code=500,
-                        detail=f"Failed to upload file to network share: {network_full_path}"
-                    )
-                
-                # Clean up temp file
+        except Exception as e:
+            # Clean up temp file on error
+            if os.path.exists(saved_path):
                 os.remove(saved_path)
-                print(f"   Cleaned up temporary file")
-                
-                actual_path = network_full_path
-                print(f"✓ Document successfully saved to network share: {actual_path}")
-                
-            except Exception as e:
-                # Clean up temp file on error
-                if os.path.exists(saved_path):
-                    os.remove(saved_path)
 
-                print(f"🔄 SMB failed with error: {str(e)}")
-                print(f"   Attempting Docker mount fallback...")
-                
-                # Standard fallback logic for all companies (GRP, GRPPT, CLX)
-                mount_fallback = resolve_docker_mount_path(output_dir, company_code)
-                print(f"   Mount fallback path: {mount_fallback}")
-                
-                if mount_fallback:
-                    try:
-                        # If mount_fallback is a directory path, use it; if it's a file path, use its directory
-                        fallback_dir = os.path.dirname(mount_fallback) if os.path.splitext(mount_fallback)[1] else mount_fallback
-                        print(f"   Fallback directory: {fallback_dir}")
-                        print(f"   Creating directory if needed...")
-                        os.makedirs(fallback_dir, exist_ok=True)
-                        print(f"   ✓ Directory exists/created")
-                        
-                        fallback_full_path = os.path.join(fallback_dir, output_filename)
-                        print(f"   Saving to: {fallback_full_path}")
-                        local_saved = generator.save(fallback_full_path)
-                        print(f"   Generator returned: {local_saved}")
-                        
-                        # Verify file was actually created
-                        if os.path.exists(local_saved):
-                            actual_path = local_saved
-                            file_size = os.path.getsize(local_saved)
-                            print(f"✓ SMB failed, saved via Docker mount fallback: {actual_path} ({file_size} bytes)")
-                        elif os.path.exists(fallback_full_path):
-                            actual_path = fallback_full_path
-                            file_size = os.path.getsize(fallback_full_path)
-                            print(f"✓ SMB failed, saved via Docker mount fallback: {actual_path} ({file_size} bytes)")
-                        else:
-                            raise Exception(f"File not found after save at {local_saved} or {fallback_full_path}")
-                        
-                        return {
-                            "success": True,
-                            "filename": output_filename,
-                            "filepath": f"{company_code}/{output_filename}",
-                            "absolute_filepath": actual_path,
-                            "message": "Quotation generated successfully (saved via mount fallback)"
-                        }
-                    except Exception as fallback_error:
-                        print(f"⚠ Mount fallback also failed:")
-                        print(f"   Error: {fallback_error}")
-                        import traceback
-                        traceback.print_exc()
-
-                raise HTTPException(
-                    status_code=500,
-                    detail=(
-                        f"Error uploading to network share: {str(e)}. "
-                        f"SMB access denied likely due to share permissions/credentials. "
-                        f"Update company_storage_path to Docker mount paths (/mnt/...) or fix SMB user permissions."
-                    )
-                )
-        else:
-            # Save to local filesystem (including Docker mounts)
-            print(f"💾 Saving to local/mounted filesystem...")
-            print(f"   Directory: {output_dir}")
+            print(f"🔄 SMB failed with error: {str(e)}")
+            print(f"   Attempting Docker mount fallback...")
             
-            # Verify directory exists or can be created
-            try:
-                if not os.path.exists(output_dir):
-                    print(f"   Directory doesn't exist, creating: {output_dir}")
-                    os.makedirs(output_dir, exist_ok=True)
-                    print(f"   ✓ Directory created")
-                else:
-                    print(f"   ✓ Directory exists")
+            # Standard fallback logic for all companies (GRP, GRPPT, CLX)
+            mount_fallback = resolve_docker_mount_path(output_dir, company_code)
+            print(f"   Mount fallback path: {mount_fallback}")
+            
+            if mount_fallback:
+                try:
+                    # If mount_fallback is a directory path, use it; if it's a file path, use its directory
+                    fallback_dir = os.path.dirname(mount_fallback) if os.path.splitext(mount_fallback)[1] else mount_fallback
+                    print(f"   Fallback directory: {fallback_dir}")
+                    print(f"   Creating directory if needed...")
+                    os.makedirs(fallback_dir, exist_ok=True)
+                    print(f"   ✓ Directory exists/created")
                     
-                # Check if directory is writable
-                if not os.access(output_dir, os.W_OK):
-                    raise PermissionError(f"Directory is not writable: {output_dir}")
+                    fallback_full_path = os.path.join(fallback_dir, output_filename)
+                    print(f"   Saving to: {fallback_full_path}")
+                    local_saved = write_document(fallback_full_path, document)
+                    print(f"   write_document() returned: {local_saved}")
                     
-            except Exception as dir_error:
-                print(f"❌ Error with output directory: {dir_error}")
-                raise HTTPException(
-                    status_code=500, 
-                    detail=f"Cannot create or access output directory: {output_dir}. Error: {str(dir_error)}"
+                    # Verify file was actually created
+                    if os.path.exists(local_saved):
+                        actual_path = local_saved
+                        file_size = os.path.getsize(local_saved)
+                        print(f"✓ SMB failed, saved via Docker mount fallback: {actual_path} ({file_size} bytes)")
+                    elif os.path.exists(fallback_full_path):
+                        actual_path = fallback_full_path
+                        file_size = os.path.getsize(fallback_full_path)
+                        print(f"✓ SMB failed, saved via Docker mount fallback: {actual_path} ({file_size} bytes)")
+                    else:
+                        raise Exception(f"File not found after save at {local_saved} or {fallback_full_path}")
+                    
+                    return {
+                        "success": True,
+                        "filename": output_filename,
+                        "filepath": f"{company_code}/{output_filename}",
+                        "absolute_filepath": actual_path,
+                        "message": "Quotation generated successfully (saved via mount fallback)"
+                    }
+                except Exception as fallback_error:
+                    print(f"⚠ Mount fallback also failed:")
+                    print(f"   Error: {fallback_error}")
+                    import traceback
+                    traceback.print_exc()
+
+            raise HTTPException(
+                status_code=500,
+                detail=(
+                    f"Error uploading to network share: {str(e)}. "
+                    f"SMB access denied likely due to share permissions/credentials. "
+                    f"Update company_storage_path to Docker mount paths (/mnt/...) or fix SMB user permissions."
                 )
-            
-            saved_path = generator.save(output_path)
-            
-            print(f"✓ Generator.save() returned: {saved_path}")
-            print(f"   Checking if file exists at: {saved_path}")
-            
-            # Check both the returned path and the requested path
-            if os.path.exists(saved_path):
-                actual_path = saved_path
-                file_size = os.path.getsize(saved_path)
-                print(f"✓ Document successfully saved at: {actual_path} ({file_size} bytes)")
-            elif os.path.exists(output_path):
-                actual_path = output_path
-                file_size = os.path.getsize(output_path)
-                print(f"✓ Document successfully saved at: {actual_path} ({file_size} bytes)")
+            )
+    else:
+        # Save to local filesystem (including Docker mounts)
+        print(f"💾 Saving to local/mounted filesystem...")
+        print(f"   Directory: {output_dir}")
+        
+        # Verify directory exists or can be created
+        try:
+            if not os.path.exists(output_dir):
+                print(f"   Directory doesn't exist, creating: {output_dir}")
+                os.makedirs(output_dir, exist_ok=True)
+                print(f"   ✓ Directory created")
             else:
-                print(f"❌ File not found at either location!")
-                print(f"   Expected: {output_path}")
-                print(f"   Returned: {saved_path}")
-                print(f"   Directory contents:")
-                try:
-                    if os.path.exists(output_dir):
-                        files = os.listdir(output_dir)
-                        for f in files[:10]:  # Show first 10 files
-                            print(f"     - {f}")
-                except Exception as list_error:
-                    print(f"   Could not list directory: {list_error}")
-                raise HTTPException(status_code=500, detail="Failed to generate document - file not found after save")
-        
-        # Return JSON with file details instead of the file itself
-        return {
-            "success": True,
-            "filename": output_filename,
-            "filepath": f"{company_code}/{output_filename}",
-            "absolute_filepath": actual_path,
-            "message": "Quotation generated successfully"
-        }
+                print(f"   ✓ Directory exists")
+                
+            # Check if directory is writable
+            if not os.access(output_dir, os.W_OK):
+                raise PermissionError(f"Directory is not writable: {output_dir}")
+                
+        except Exception as dir_error:
+            print(f"❌ Error with output directory: {dir_error}")
+            raise HTTPException(
+                status_code=500, 
+                detail=f"Cannot create or access output directory: {output_dir}. Error: {str(dir_error)}"
+            )
+        
+        saved_path = write_document(output_path, document)
         
+        print(f"✓ write_document() returned: {saved_path}")
+        print(f"   Checking if file exists at: {saved_path}")
+        
+        # Check both the returned path and the requested path
+        if os.path.exists(saved_path):
+            actual_path = saved_path
+            file_size = os.path.getsize(saved_path)
+            print(f"✓ Document successfully saved at: {actual_path} ({file_size} bytes)")
+        elif os.path.exists(output_path):
+            actual_path = output_path
+            file_size = os.path.getsize(output_path)
+            print(f"✓ Document successfully saved at: {actual_path} ({file_size} bytes)")
+        else:
+            print(f"❌ File not found at either location!")
+            print(f"   Expected: {output_path}")
+            print(f"   Returned: {saved_path}")
+            print(f"   Directory contents:")
+            try:
+                if os.path.exists(output_dir):
+                    files = os.listdir(output_dir)
+                    for f in files[:10]:  # Show first 10 files
+                        print(f"     - {f}")
+            except Exception as list_error:
+                print(f"   Could not list directory: {list_error}")
+            raise HTTPException(status_code=500, detail="Failed to generate document - file not found after save")
+    
+    # Return JSON with file details instead of the file itself
+    return {
+        "success": True,
+        "filename": output_filename,
+        "filepath": f"{company_code}/{output_filename}",
+        "absolute_filepath": actual_path,
+        "message": "Quotation generated successfully"
+    }
+
+
+def resolve_table_engine(request: QuotationRequest) -> str:
+    """Table engine requested for the quotation (400 when unknown)"""
+    table_engine = request.tableEngine or DEFAULT_TABLE_ENGINE
+    if table_engine not in TABLE_ENGINES:
+        raise HTTPException(status_code=400, detail=f"Invalid table engine: {table_engine}. Use one of {', '.join(TABLE_ENGINES)}")
+    return table_engine
+
+
+@app.post("/generate-quotation")
+async def generate_quotation(request: QuotationRequest):
+    table_engine = resolve_table_engine(request)
+    try:
+        # Planning and file/SMB writes run in the blocking pool, python-docx
+        # rendering in the generation pool, so the event loop stays free
+        plan = await run_blocking(plan_quotation, request, table_engine)
+        document = await generation_pool.run(render_quotation, request, plan)
+        return await run_blocking(store_quotation, plan, document)
+        
+    except GenerationPoolFull as e:
+        print(f"⚠ {e}")
+        raise HTTPException(status_code=503, detail=str(e))
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Error generating quotation: {str(e)}")
         import traceback
@@ -1104,26 +728,232 @@ async def generate_quotation(request: QuotationRequest, session: Session = Depen
         raise HTTPException(status_code=500, detail=f"Error generating quotation: {str(e)}")
 
 
+
+async def run_generation_job(job, request: QuotationRequest, table_engine: str) -> dict:
+    """Job pipeline: same plan / render / store steps as /generate-quotation"""
+    with job.phase("planning", "rendering"):
+        plan = await run_blocking(plan_quotation, request, table_engine)
+    with job.phase("rendering"):
+        job.document = await generation_pool.run(render_quotation, request, plan, wait=True)
+    with job.phase("uploading", "uploading"):
+        return await run_blocking(store_quotation, plan, job.document)
+
+
+@app.post("/api/generation-jobs", status_code=202)
+async def create_generation_job(request: QuotationRequest):
+    """
+    Queue a quotation for background generation and return the job at once.
+    Poll GET /api/generation-jobs/{id}; download the document when done.
+    """
+    table_engine = resolve_table_engine(request)
+    try:
+        job = generation_jobs.submit(
+            lambda job: run_generation_job(job, request, table_engine),
+            label=request.quotationNumber,
+        )
+    except GenerationJobsFull as e:
+        print(f"⚠ {e}")
+        raise HTTPException(status_code=503, detail=str(e))
+    print(f"📥 Queued generation job {job.id} for quotation {request.quotationNumber}")
+    return job.to_dict()
+
+
+@app.get("/api/generation-jobs/{job_id}")
+async def get_generation_job(job_id: str):
+    """Status (queued/rendering/uploading/done/failed), phase timings and result of a job"""
+    job = generation_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Generation job not found: {job_id}")
+    return job.to_dict()
+
+
+@app.get("/api/generation-jobs/{job_id}/download")
+async def download_generation_job(job_id: str):
+    """Download the document rendered by a finished job"""
+    job = generation_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Generation job not found: {job_id}")
+    if job.status == "done" and job.document_evicted:
+        raise HTTPException(status_code=410, detail=f"Document of generation job {job_id} is no longer kept. Generate it again")
+    if job.status != "done" or job.document is None:
+        raise HTTPException(status_code=409, detail=f"Generation job {job_id} is {job.status}, document not available")
+    return Response(
+        content=job.document,
+        media_type=DOCX_MEDIA_TYPE,
+        headers={"Content-Disposition": f'attachment; filename="{job.result["filename"]}"'},
+    )
+
+
+# Upper bound on quotations accepted by one /generate-quotations/batch call
+BATCH_MAX_QUOTATIONS = max(int_env("BATCH_MAX_QUOTATIONS", 50), 1)
+
+
+def plan_quotation_batch(requests: List[QuotationRequest]) -> list:
+    """Plan every quotation of a batch against one reference snapshot (errors per item)"""
+    snapshot = reference_data.snapshot()
+    plans = []
+    for request in requests:
+        try:
+            plans.append(plan_quotation(request, resolve_table_engine(request), snapshot))
+        except Exception as e:
+            plans.append(e)
+    return plans
+
+
+async def run_batch_item(index: int, request: QuotationRequest, plan) -> dict:
+    """Render and store one batch item; failures become an error line, not a batch error"""
+    started = time.perf_counter()
+    item = {"index": index, "quotationNumber": request.quotationNumber}
+    try:
+        if isinstance(plan, Exception):
+            raise plan
+        document = await batch_generation_pool.run(render_quotation, request, plan, wait=True)
+        item.update(await run_blocking(store_quotation, plan, document))
+    except Exception as e:
+        print(f"❌ Batch item {index} ({request.quotationNumber}) failed: {e}")
+        item.update({
+            "success": False,
+            "status_code": getattr(e, "status_code", 500),
+            "error": str(getattr(e, "detail", e)),
+        })
+    item["elapsed"] = round(time.perf_counter() - started, 3)
+    return item
+
+
+@app.post("/generate-quotations/batch")
+async def generate_quotations_batch(requests: List[QuotationRequest]):
+    """
+    Generate several quotations in parallel worker processes.
+
+    Streams newline-delimited JSON: one line per quotation as it finishes
+    (same fields as /generate-quotation plus index and elapsed, or
+    success=false with status_code and error), then a summary line.
+    """
+    if not requests:
+        raise HTTPException(status_code=400, detail="No quotations in batch")
+    if len(requests) > BATCH_MAX_QUOTATIONS:
+        raise HTTPException(status_code=400, detail=f"Batch too large: {len(requests)} quotations (max {BATCH_MAX_QUOTATIONS})")
+
+    started = time.perf_counter()
+    # Reference data is looked up once for the whole batch, before streaming starts
+    plans = await run_blocking(plan_quotation_batch, requests)
+    print(f"📦 Batch of {len(requests)} quotations planned, rendering on {batch_generation_pool.workers} {batch_generation_pool.kind} worker(s)")
+
+    async def stream_results():
+        tasks = [asyncio.create_task(run_batch_item(index, request, plan))
+                 for index, (request, plan) in enumerate(zip(requests, plans))]
+        failed = 0
+        try:
+            for next_item in asyncio.as_completed(tasks):
+                item = await next_item
+                failed += not item["success"]
+                yield json.dumps(item) + "\n"
+            yield json.dumps({
+                "done": True,
+                "count": len(tasks),
+                "failed": failed,
+                "elapsed": round(time.perf_counter() - started, 3),
+            }) + "\n"
+        finally:
+            # Client went away: drop items that have not started rendering
+            for task in tasks:
+                task.cancel()
+
+    return StreamingResponse(stream_results(), media_type="application/x-ndjson")
+
+
+@app.post("/generate-quotation/fan-out")
+async def generate_quotation_fanout(request: FanoutQuotationRequest):
+    """
+    Generate one quotation for several recipients. The body (tanks table,
+    terms, signature) is rendered once; only the "To." block, quote number
+    and header quote box are rebuilt per recipient. One result per recipient.
+    """
+    if not request.recipients:
+        raise HTTPException(status_code=400, detail="No recipients given")
+    if len(request.recipients) > BATCH_MAX_QUOTATIONS:
+        raise HTTPException(status_code=400, detail=f"Too many recipients: {len(request.recipients)} (max {BATCH_MAX_QUOTATIONS})")
+    quote_keys = [(r.quotationNumber, r.revisionNumber) for r in request.recipients]
+    if len(set(quote_keys)) != len(quote_keys):
+        raise HTTPException(status_code=400, detail="Each recipient needs its own quotation number / revision")
+    resolve_table_engine(request.quotation)
+
+    requests = request.recipient_requests()
+    try:
+        plans = await run_blocking(plan_quotation_batch, requests)
+        for plan in plans:
+            if isinstance(plan, Exception):
+                raise plan
+
+        started = time.perf_counter()
+        documents = await generation_pool.run(render_quotation_fanout, requests, plans)
+        print(f"✓ Fan-out rendered {len(documents)} documents in {time.perf_counter() - started:.2f}s")
+
+        results = []
+        for index, (plan, document) in enumerate(zip(plans, documents)):
+            try:
+                result = await run_blocking(store_quotation, plan, document)
+            except Exception as e:
+                print(f"❌ Fan-out recipient {index} ({plan['quote_number']}) failed: {e}")
+                result = {
+                    "success": False,
+                    "status_code": getattr(e, "status_code", 500),
+                    "error": str(getattr(e, "detail", e)),
+                }
+            results.append({"index": index, "recipientName": requests[index].recipientName, **result})
+
+        return {
+            "success": all(result["success"] for result in results),
+            "count": len(results),
+            "results": results,
+        }
+
+    except GenerationPoolFull as e:
+        print(f"⚠ {e}")
+        raise HTTPException(status_code=503, detail=str(e))
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"Error generating fan-out quotations: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail=f"Error generating quotation: {str(e)}")
+
+
 @app.get("/health")
 async def health_check():
     return {"status": "ok"}
 
 
+@app.get("/api/cache-stats")
+async def get_cache_stats():
+    """Hit/miss counters of the in-process caches"""
+    return {
+        "generation_jobs": generation_jobs.stats(),
+        "quotation_payloads": payload_cache.stats(),
+        "reference_data": reference_data.stats(),
+        "reference_lists": dataset_payloads.stats(),
+        "recipient_index": recipient_index.stats(),
+        "templates": template_cache.stats(),
+    }
+
+
 @app.get("/api/companies")
-async def get_companies(session: Session = Depends(get_session)):
+@offload
+def get_companies(if_none_match: Optional[str] = Header(None)):
     """
     Get all company names from company_details table in database
-    Returns list of full company names
+    Returns list of full company names (ETag; 304 for If-None-Match)
     """
     try:
-        # Query all companies from database
-        statement = select(CompanyDetails)
-        companies = session.exec(statement).all()
+        # All companies from the reference data snapshot
+        snapshot = reference_data.snapshot()
         
-        # Extract full_name from each company
-        company_names = [company.full_name for company in companies]
+        def build():
+            # Extract full_name from each company
+            return {"companies": [company.full_name for company in snapshot.companies]}
         
-        return {"companies": company_names}
+        return conditional_json(if_none_match, *dataset_payloads.get("companies", snapshot.version, build))
         
     except Exception as e:
         print(f"Error reading company names from database: {str(e)}")
@@ -1133,20 +963,20 @@ async def get_companies(session: Session = Depends(get_session)):
 
 
 @app.get("/api/company-details")
-async def get_company_details(name: str, session: Session = Depends(get_session)):
+@offload
+def get_company_details(name: str):
     """
     Get company details from company_details table in database based on full_name
     Returns: code, template_path, seal_path, company_domain
     """
     try:
-        # Query company by full_name from database
-        statement = select(CompanyDetails).where(CompanyDetails.full_name == name.strip())
-        company = session.exec(statement).first()
+        # Look up company by full_name in the reference data
+        snapshot = reference_data.snapshot()
+        company = snapshot.company_by_full_name.get(name.strip())
         
         if not company:
             # Get all companies for debugging
-            all_companies = session.exec(select(CompanyDetails)).all()
-            available_companies = [c.full_name for c in all_companies]
+            available_companies = [c.full_name for c in snapshot.companies]
             print(f"⚠ Company not found: '{name}'")
             print(f"Available companies: {available_companies}")
             raise HTTPException(status_code=404, detail=f"Company not found: {name}")
@@ -1171,35 +1001,40 @@ async def get_company_details(name: str, session: Session = Depends(get_session)
         raise HTTPException(status_code=500, detail=f"Error reading company details: {str(e)}")
 
 
+def recipients_version(session):
+    """Row count and newest last_updated_time of recipient_details: changes whenever a save adds or updates a recipient"""
+    return tuple(session.exec(
+        select(func.count(RecipientDetails.id), func.max(RecipientDetails.last_updated_time))
+    ).one())
+
+
 @app.get("/api/recipients")
-async def get_recipients(session: Session = Depends(get_session)):
+@offload
+def get_recipients(if_none_match: Optional[str] = Header(None), session: Session = Depends(get_session)):
     """
     Get all recipients with full details from recipient_details table in database
     Returns list of recipients with name, role, company, location, phone, email
+    (ETag; 304 for If-None-Match)
     """
     try:
-        # Query all recipients from database
-        statement = select(RecipientDetails)
-        recipients = session.exec(statement).all()
-        
-        # Build recipient list with all details
-        recipient_list = []
-        for recipient in recipients:
-            if recipient.recipient_name:  # Only include if name exists
-                recipient_list.append({
-                    "title": recipient.recipient_title or "Mr.",
-                    "name": recipient.recipient_name,
-                    "role": recipient.role_of_recipient or "",
-                    "company": recipient.to_company_name or "",
-                    "location": recipient.to_company_location or "",
-                    "phone": recipient.phone_number or "",
-                    "email": recipient.email or ""
-                })
-        
-        # Sort alphabetically by name
-        recipient_list.sort(key=lambda x: x["name"])
-        
-        return {"recipients": recipient_list}
+        def build():
+            # Query all recipients from database
+            statement = select(RecipientDetails)
+            recipients = session.exec(statement).all()
+            
+            # Build recipient list with all details
+            recipient_list = []
+            for recipient in recipients:
+                if recipient.recipient_name:  # Only include if name exists
+                    recipient_list.append(recipient_item(recipient))
+            
+            # Sort alphabetically by name
+            recipient_list.sort(key=lambda x: x["name"])
+            
+            return {"recipients": recipient_list}
+        
+        version = recipients_version(session)
+        return conditional_json(if_none_match, *dataset_payloads.get("recipients", version, build))
         
     except Exception as e:
         print(f"Error reading recipients from database: {str(e)}")
@@ -1208,22 +1043,50 @@ async def get_recipients(session: Session = Depends(get_session)):
         raise HTTPException(status_code=500, detail=f"Error reading recipients from database: {str(e)}")
 
 
+@app.get("/api/recipients/suggest")
+@offload
+def suggest_recipients(q: str = "", limit: int = SUGGEST_DEFAULT_LIMIT):
+    """
+    Recipients and recipient company names starting with what was typed, for autocomplete
+    
+    Served from the in-memory recipient index; matches names, company names,
+    phone numbers and emails by word prefix.
+    - q: Text typed so far
+    - limit: Most recipients / company names returned (default SUGGEST_DEFAULT_LIMIT, at most SUGGEST_MAX_LIMIT)
+    """
+    if not 1 <= limit <= SUGGEST_MAX_LIMIT:
+        raise HTTPException(status_code=400, detail=f"limit must be between 1 and {SUGGEST_MAX_LIMIT}")
+    try:
+        return recipient_index.suggest(q, limit)
+    except Exception as e:
+        print(f"Error suggesting recipients: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail=f"Error suggesting recipients: {str(e)}")
+
+
 @app.get("/api/company-names")
-async def get_company_names(session: Session = Depends(get_session)):
+@offload
+def get_company_names(if_none_match: Optional[str] = Header(None), session: Session = Depends(get_session)):
     """
     Get all unique company names from recipient_details table in database
     Returns list of unique company names from to_company_name column
+    (ETag; 304 for If-None-Match)
     """
     try:
-        # Query all recipients from database
-        statement = select(RecipientDetails)
-        recipients = session.exec(statement).all()
-        
-        # Extract unique company names
-        company_names = list(set([recipient.to_company_name for recipient in recipients if recipient.to_company_name]))
-        company_names.sort()  # Sort alphabetically
+        def build():
+            # Only the company column is needed
+            statement = select(RecipientDetails.to_company_name)
+            recipient_companies = session.exec(statement).all()
+            
+            # Extract unique company names
+            company_names = list(set([name for name in recipient_companies if name]))
+            company_names.sort()  # Sort alphabetically
+            
+            return {"company_names": company_names}
         
-        return {"company_names": company_names}
+        version = recipients_version(session)
+        return conditional_json(if_none_match, *dataset_payloads.get("company_names", version, build))
         
     except Exception as e:
         print(f"Error reading company names from database: {str(e)}")
@@ -1233,7 +1096,8 @@ async def get_company_names(session: Session = Depends(get_session)):
 
 
 @app.get("/api/recipient-details")
-async def get_recipient_details(name: str, session: Session = Depends(get_session)):
+@offload
+def get_recipient_details(name: str, session: Session = Depends(get_session)):
     """
     Get recipient details from recipient_details table in database based on recipient_name
     Returns: role, company name, location, phone, email
@@ -1305,7 +1169,8 @@ class SaveQuotationRequest(BaseModel):
 
 
 @app.post("/api/save-quotation")
-async def save_quotation(request: SaveQuotationRequest, session: Session = Depends(get_session)):
+@offload
+def save_quotation(request: SaveQuotationRequest, session: Session = Depends(get_session)):
     """
     Save quotation form data to database
     """
@@ -1320,48 +1185,50 @@ async def save_quotation(request: SaveQuotationRequest, session: Session = Depen
         print(f"📝 additionalData received: {request.additionalData}")
         print(f"📝 generatedBy received: {request.generatedBy}")
         
-        # Get company from database by full_name (not hardcoded)
-        statement = select(CompanyDetails).where(CompanyDetails.full_name == request.fromCompany)
-        company = session.exec(statement).first()
+        # Company, sales person and project manager from the reference data snapshot
+        sales_person_name = None
+        if request.quotationFrom == 'Sales' and request.salesPersonName:
+            sales_person_name = request.salesPersonName.split('(')[0].strip()
+        manager_name = request.officePersonName.split('(')[0].strip() if request.officePersonName else None
+        
+        def resolve(snapshot):
+            return (
+                snapshot.company_by_full_name.get(request.fromCompany),
+                snapshot.sales_by_name.get(sales_person_name) if sales_person_name is not None else None,
+                snapshot.manager_by_name.get(manager_name) if manager_name is not None else None,
+            )
+        
+        snapshot = reference_data.snapshot()
+        company, sales_person, pm = resolve(snapshot)
+        if not company or (sales_person_name is not None and not sales_person) or (manager_name is not None and not pm):
+            # Possibly added since the snapshot was read: check the tables once
+            reference_data.expire()
+            snapshot = reference_data.snapshot()
+            company, sales_person, pm = resolve(snapshot)
+        
         if not company:
             print(f"⚠ Company not found in database: {request.fromCompany}")
-            # Try to list all available companies for debugging
-            all_companies = session.exec(select(CompanyDetails)).all()
-            available = [c.full_name for c in all_companies]
+            # List all available companies for debugging
+            available = [c.full_name for c in snapshot.companies]
             print(f"Available companies: {available}")
             raise HTTPException(status_code=404, detail=f"Company not found: {request.fromCompany}")
         
         print(f"✓ Found company: {company.full_name} (ID: {company.id}, Code: {company.code})")
         
-        # Create or update recipient
-        statement = select(RecipientDetails).where(
-            RecipientDetails.recipient_name == request.recipientName,
-            RecipientDetails.to_company_name == request.companyName
+        now = datetime.utcnow()
+        
+        # Recipient, created or updated by name and company (unique per company)
+        recipient_row = RecipientDetails(
+            recipient_title=request.recipientTitle,
+            recipient_name=request.recipientName,
+            role_of_recipient=request.role,
+            to_company_name=request.companyName,
+            to_company_location=request.location,
+            phone_number=request.phoneNumber,
+            email=request.email,
+            created_time=now,
+            last_updated_time=now
         )
-        recipient = session.exec(statement).first()
-        
-        if recipient:
-            # Update existing recipient
-            recipient.recipient_title = request.recipientTitle
-            recipient.role_of_recipient = request.role
-            recipient.to_company_location = request.location
-            recipient.phone_number = request.phoneNumber
-            recipient.email = request.email
-            recipient.last_updated_time = datetime.utcnow()
-        else:
-            # Create new recipient
-            recipient = RecipientDetails(
-                recipient_title=request.recipientTitle,
-                recipient_name=request.recipientName,
-                role_of_recipient=request.role,
-                to_company_name=request.companyName,
-                to_company_location=request.location,
-                phone_number=request.phoneNumber,
-                email=request.email
-            )
-            session.add(recipient)
-        
-        session.flush()  # Get recipient ID
         
         # Get sales person or project manager
         sales_person_id = None
@@ -1373,26 +1240,20 @@ async def save_quotation(request: SaveQuotationRequest, session: Session = Depen
         print(f"✍️ GeneratedBy: '{request.generatedBy}'")
         
         # Only process sales person for Sales quotations
-        if request.quotationFrom == 'Sales' and request.salesPersonName:
-            person_name = request.salesPersonName.split('(')[0].strip()
-            statement = select(SalesDetails).where(SalesDetails.sales_person_name == person_name)
-            sales_person = session.exec(statement).first()
+        if sales_person_name is not None:
             if sales_person:
                 sales_person_id = sales_person.id
                 print(f"✓ Found sales person: {sales_person.sales_person_name} (ID: {sales_person_id})")
             else:
-                print(f"⚠ Sales person not found: {person_name}")
+                print(f"⚠ Sales person not found: {sales_person_name}")
         
         # Process office/project manager
-        if request.officePersonName:
-            person_name = request.officePersonName.split('(')[0].strip()
-            statement = select(ProjectManagerDetails).where(ProjectManagerDetails.manager_name == person_name)
-            pm = session.exec(statement).first()
+        if manager_name is not None:
             if pm:
                 project_manager_id = pm.id
                 print(f"✓ Found project manager: {pm.manager_name} (ID: {project_manager_id})")
             else:
-                print(f"⚠ Project manager not found: {person_name}")
+                print(f"⚠ Project manager not found: {manager_name}")
         
         # Convert empty generatedBy to None
         generated_by_value = request.generatedBy if request.generatedBy else None
@@ -1408,70 +1269,39 @@ async def save_quotation(request: SaveQuotationRequest, session: Session = Depen
         except:
             quotation_date = date.today()
         
-        # Check if quotation already exists by composite key (company_id, quotation_number, revision_number)
+        # Revisions after R0 are stored as a delta against an earlier full revision when compact
+        document = {
+            "tanksData": request.tanksData,
+            "formOptions": request.formOptions or {},
+            "additionalData": request.additionalData or {}
+        }
+        revisions = load_revisions(session, company.id, request.quotationNumber, lock=True)
+        stored, current, dependents = plan_revision(revisions, request.revisionNumber, document)
+        
+        # Quotation, created or updated by composite key (company_id, quotation_number, revision_number)
         # This matches the unique constraint "unique_quote_per_company"
-        print(f"Checking for existing quotation: company_id={company.id}, quote_number={request.quotationNumber}, revision={request.revisionNumber}")
-        statement = select(QuotationWebpageInputDetailsSave).where(
-            QuotationWebpageInputDetailsSave.company_id == company.id,
-            QuotationWebpageInputDetailsSave.quotation_number == request.quotationNumber,
-            QuotationWebpageInputDetailsSave.revision_number == request.revisionNumber
+        quotation_row = QuotationWebpageInputDetailsSave(
+            quotation_number=request.quotationNumber,
+            full_main_quote_number=request.fullQuoteNumber,
+            final_doc_file_path=request.finalDocFilePath,
+            company_id=company.id,
+            sales_person_id=sales_person_id,
+            project_manager_id=project_manager_id,
+            quotation_date=quotation_date,
+            subject=request.subject,
+            project_location=request.projectLocation,
+            generated_by=generated_by_value,
+            revision_number=request.revisionNumber,
+            status=request.status,
+            created_time=now,
+            last_updated_time=now,
+            **quotation_totals(request.tanksData),
+            **stored
         )
-        existing_quotation = session.exec(statement).first()
-        
-        if existing_quotation:
-            print(f"⚠ Found existing quotation (ID: {existing_quotation.id}), updating with new data...")
-            # Update existing quotation
-            existing_quotation.full_main_quote_number = request.fullQuoteNumber
-            existing_quotation.quotation_number = request.quotationNumber
-            existing_quotation.final_doc_file_path = request.finalDocFilePath
-            existing_quotation.company_id = company.id
-            existing_quotation.recipient_id = recipient.id
-            existing_quotation.sales_person_id = sales_person_id
-            existing_quotation.project_manager_id = project_manager_id
-            existing_quotation.quotation_date = quotation_date
-            existing_quotation.subject = request.subject
-            existing_quotation.project_location = request.projectLocation
-            existing_quotation.generated_by = generated_by_value
-            existing_quotation.tanks_data = request.tanksData
-            existing_quotation.form_options = request.formOptions or {}
-            existing_quotation.additional_data = request.additionalData or {}
-            existing_quotation.revision_number = request.revisionNumber
-            existing_quotation.status = request.status
-            existing_quotation.last_updated_time = datetime.utcnow()
-            
-            print(f"✓ Updated existing quotation: {request.fullQuoteNumber} (revision: {request.revisionNumber})")
-        else:
-            print(f"No existing quotation found, creating new: {request.fullQuoteNumber} (revision: {request.revisionNumber})")
-            # Create new quotation
-            quotation = QuotationWebpageInputDetailsSave(
-                quotation_number=request.quotationNumber,
-                full_main_quote_number=request.fullQuoteNumber,
-                final_doc_file_path=request.finalDocFilePath,
-                company_id=company.id,
-                recipient_id=recipient.id,
-                sales_person_id=sales_person_id,
-                project_manager_id=project_manager_id,
-                quotation_date=quotation_date,
-                subject=request.subject,
-                project_location=request.projectLocation,
-                generated_by=generated_by_value,
-                tanks_data=request.tanksData,
-                form_options=request.formOptions or {},
-                additional_data=request.additionalData or {},
-                revision_number=request.revisionNumber,
-                status=request.status
-            )
-            session.add(quotation)
-            print(f"✓ Created new quotation: {request.fullQuoteNumber} (quotation_number: {quotation.quotation_number}, revision_number: {quotation.revision_number})")
         
-        # Save contractual terms & specifications
+        # Contractual terms & specifications: created, or only the sections sent updated
+        terms_row, terms_columns = None, ()
         if request.terms:
-            # Check if terms already exist
-            statement = select(ContractualTermsSpecifications).where(
-                ContractualTermsSpecifications.full_main_quote_number == request.fullQuoteNumber
-            )
-            existing_terms = session.exec(statement).first()
-            
             # Map frontend terms to database columns
             terms_mapping = {
                 'note': 'note',
@@ -1484,35 +1314,55 @@ async def save_quotation(request: SaveQuotationRequest, session: Session = Depen
                 'scopeOfWork': 'scope_of_work',
                 'workExcluded': 'work_excluded'
             }
-            
-            if existing_terms:
-                # Update existing terms
-                for frontend_key, db_column in terms_mapping.items():
-                    if frontend_key in request.terms:
-                        setattr(existing_terms, db_column, request.terms[frontend_key])
-                existing_terms.last_updated_time = datetime.utcnow()
-                print(f"✓ Updated contractual terms for: {request.fullQuoteNumber}")
-            else:
-                # Create new terms
-                terms_data = {}
-                for frontend_key, db_column in terms_mapping.items():
-                    if frontend_key in request.terms:
-                        terms_data[db_column] = request.terms[frontend_key]
-                
-                contractual_terms = ContractualTermsSpecifications(
-                    full_main_quote_number=request.fullQuoteNumber,
-                    **terms_data
-                )
-                session.add(contractual_terms)
-                print(f"✓ Created contractual terms for: {request.fullQuoteNumber}")
+            terms_data = {}
+            for frontend_key, db_column in terms_mapping.items():
+                if frontend_key in request.terms:
+                    terms_data[db_column] = request.terms[frontend_key]
+            terms_row = ContractualTermsSpecifications(
+                full_main_quote_number=request.fullQuoteNumber,
+                created_time=now,
+                last_updated_time=now,
+                **terms_data
+            )
+            terms_columns = (*terms_data, "last_updated_time")
         
+        # Recipient, quotation, terms and the normalized tank lines (used by the
+        # tank search filters) in one statement on PostgreSQL
+        tank_lines = tank_lines_from_data(request.tanksData)
+        recipient, saved_quotation, contractual_terms = write_quotation(
+            session, recipient_row, quotation_row, tank_lines, terms_row, terms_columns
+        )
+        recipient_created = recipient.inserted
+        print(f"✓ {'Created' if recipient_created else 'Updated'} recipient: {recipient.recipient_name} (ID: {recipient.id})")
+        action = "Created new" if saved_quotation.inserted else "Updated existing"
+        print(f"✓ {action} quotation: {request.fullQuoteNumber} (ID: {saved_quotation.id}, revision: {request.revisionNumber})")
+        if stored["delta_base_id"]:
+            print(f"✓ Stored as delta against quotation ID {stored['delta_base_id']} ({len(stored['revision_delta'])} change(s))")
+        if dependents:
+            # Later revisions stored against this one are re-encoded against its new content
+            rebase_dependents(dependents, stored_document(current), saved_quotation.id, document)
+            print(f"✓ Re-encoded {len(dependents)} dependent revision(s)")
+        
+        print(f"✓ Saved {len(tank_lines)} tank line(s)")
+        if contractual_terms is not None:
+            action = "Created" if contractual_terms.inserted else "Updated"
+            print(f"✓ {action} contractual terms for: {request.fullQuoteNumber}")
+        
+        # Full-text search document covers the quotation, recipient company and terms
+        if refresh_search_document(session, saved_quotation.id):
+            print(f"✓ Refreshed search document")
+        
+        saved_quotation_id = saved_quotation.id
         session.commit()
+        payload_cache.invalidate(saved_quotation_id)
+        recipient_index.upsert(recipient.id, recipient_item(recipient), recipient.last_updated_time, recipient_created)
         
         print(f"{'='*60}\n")
         
         return {
             "success": True,
             "message": "Quotation saved successfully",
+            "id": saved_quotation_id,
             "fullQuoteNumber": request.fullQuoteNumber
         }
         
@@ -1526,8 +1376,92 @@ async def save_quotation(request: SaveQuotationRequest, session: Session = Depen
         raise HTTPException(status_code=500, detail=f"Error saving quotation: {str(e)}")
 
 
+# contractual_terms_specifications column -> frontend terms key
+TERMS_COLUMNS_TO_FRONTEND = {
+    'note': 'note',
+    'material_specifications': 'materialSpecification',
+    'warranty_conditions': 'warrantyExclusions',  # Frontend uses warrantyExclusions
+    'terms_and_conditions': 'termsConditions',    # Frontend uses termsConditions
+    'supplier_scope': 'supplierScope',
+    'customer_scope': 'customerScope',
+    'note_second': 'extraNote',
+    'scope_of_work': 'scopeOfWork',
+    'work_excluded': 'workExcluded'
+}
+
+
+def join_quotation_related(statement, delta_base):
+    """Outer-join the rows a quotation payload is built from onto a select from the quotation table"""
+    Q = QuotationWebpageInputDetailsSave
+    return (
+        statement
+        .outerjoin(CompanyDetails, CompanyDetails.id == Q.company_id)
+        .outerjoin(RecipientDetails, RecipientDetails.id == Q.recipient_id)
+        .outerjoin(SalesDetails, SalesDetails.id == Q.sales_person_id)
+        .outerjoin(ProjectManagerDetails, ProjectManagerDetails.id == Q.project_manager_id)
+        .outerjoin(ContractualTermsSpecifications,
+                   ContractualTermsSpecifications.full_main_quote_number == Q.full_main_quote_number)
+        .outerjoin(delta_base, delta_base.id == Q.delta_base_id)
+    )
+
+
+def quotation_version(session, *criteria):
+    """
+    (id, version) of the first quotation matching criteria, or None. The version
+    holds the last_updated_time of the quotation and of every row its payload is
+    built from, so a recipient updated by another quotation's save or a
+    reference data sync also makes cached payloads stale.
+    """
+    Q = QuotationWebpageInputDetailsSave
+    DeltaBase = aliased(QuotationWebpageInputDetailsSave, name="delta_base")
+    statement = join_quotation_related(
+        select(Q.id, Q.last_updated_time, CompanyDetails.last_updated_time, RecipientDetails.last_updated_time,
+               SalesDetails.last_updated_time, ProjectManagerDetails.last_updated_time,
+               ContractualTermsSpecifications.last_updated_time, DeltaBase.last_updated_time),
+        DeltaBase,
+    ).where(*criteria)
+    row = session.exec(statement).first()
+    if row is None:
+        return None
+    return row[0], tuple(row[1:])
+
+
+def load_quotation_bundle(session, *criteria):
+    """
+    First quotation matching criteria with its related rows, in one joined query:
+    (quotation, company, recipient, sales_person, project_manager, contractual_terms),
+    missing relations as None; None when no quotation matches. A revision stored
+    as a delta comes with its base row and is returned materialized.
+    """
+    Q = QuotationWebpageInputDetailsSave
+    DeltaBase = aliased(QuotationWebpageInputDetailsSave, name="delta_base")
+    statement = join_quotation_related(
+        select(Q, CompanyDetails, RecipientDetails, SalesDetails, ProjectManagerDetails,
+               ContractualTermsSpecifications, DeltaBase),
+        DeltaBase,
+    ).where(*criteria)
+    row = session.exec(statement).first()
+    if row is None:
+        return None
+    *bundle, base = row
+    materialize(session, bundle[0], base)
+    return tuple(bundle)
+
+
+def terms_for_frontend(contractual_terms):
+    """Non-empty terms sections keyed by their frontend names"""
+    terms_data = {}
+    if contractual_terms:
+        for db_column, frontend_key in TERMS_COLUMNS_TO_FRONTEND.items():
+            db_value = getattr(contractual_terms, db_column, None)
+            if db_value:
+                terms_data[frontend_key] = db_value
+    return terms_data
+
+
 @app.get("/api/quotation")
-async def get_quotation(quote_number: str, revision: str = "0", session: Session = Depends(get_session)):
+@offload
+def get_quotation(quote_number: str, revision: str = "0", session: Session = Depends(get_session)):
     """
     Retrieve quotation form data by quotation number and revision
     Query parameters: 
@@ -1547,51 +1481,36 @@ async def get_quotation(quote_number: str, revision: str = "0", session: Session
         except ValueError:
             raise HTTPException(status_code=400, detail=f"Invalid revision number: {revision}")
         
-        # Query quotation with all related data using quotation_number AND revision_number
-        statement = select(QuotationWebpageInputDetailsSave).where(
+        # Find the quotation by quotation_number AND revision_number; its
+        # version tells whether a cached payload is still current
+        version = quotation_version(
+            session,
             QuotationWebpageInputDetailsSave.quotation_number == quote_number,
             QuotationWebpageInputDetailsSave.revision_number == revision_int
         )
-        quotation = session.exec(statement).first()
         
-        if not quotation:
+        if not version:
             raise HTTPException(status_code=404, detail=f"Quotation not found: {quote_number}-{revision}")
         
-        # Get related data
-        company = session.get(CompanyDetails, quotation.company_id)
-        recipient = session.get(RecipientDetails, quotation.recipient_id)
-        sales_person = session.get(SalesDetails, quotation.sales_person_id)
-        project_manager = None
-        if quotation.project_manager_id:
-            project_manager = session.get(ProjectManagerDetails, quotation.project_manager_id)
+        cached = payload_cache.get("quotation", *version)
+        if cached is not None:
+            print(f"✓ Served quotation {version[0]} from cache")
+            print(f"{'='*60}\n")
+            return Response(content=cached, media_type="application/json")
         
-        print(f"✓ Found company: {company.full_name if company else 'None'} (ID: {quotation.company_id})")
+        # Quotation with its company, recipient, sales person, project manager
+        # and terms in one query
+        bundle = load_quotation_bundle(session, QuotationWebpageInputDetailsSave.id == version[0])
         
-        # Get contractual terms using the full_main_quote_number from the found quotation
-        statement_terms = select(ContractualTermsSpecifications).where(
-            ContractualTermsSpecifications.full_main_quote_number == quotation.full_main_quote_number
-        )
-        contractual_terms = session.exec(statement_terms).first()
+        if not bundle:
+            raise HTTPException(status_code=404, detail=f"Quotation not found: {quote_number}-{revision}")
+        
+        quotation, company, recipient, sales_person, project_manager, contractual_terms = bundle
+        
+        print(f"✓ Found company: {company.full_name if company else 'None'} (ID: {quotation.company_id})")
         
         # Map database columns to frontend terms
-        terms_data = {}
-        if contractual_terms:
-            db_to_frontend_mapping = {
-                'note': 'note',
-                'material_specifications': 'materialSpecification',
-                'warranty_conditions': 'warrantyExclusions',  # Frontend uses warrantyExclusions
-                'terms_and_conditions': 'termsConditions',    # Frontend uses termsConditions
-                'supplier_scope': 'supplierScope',
-                'customer_scope': 'customerScope',
-                'note_second': 'extraNote',
-                'scope_of_work': 'scopeOfWork',
-                'work_excluded': 'workExcluded'
-            }
-            
-            for db_column, frontend_key in db_to_frontend_mapping.items():
-                db_value = getattr(contractual_terms, db_column, None)
-                if db_value:
-                    terms_data[frontend_key] = db_value
+        terms_data = terms_for_frontend(contractual_terms)
         
         # Build response
         response = {
@@ -1628,7 +1547,9 @@ async def get_quotation(quote_number: str, revision: str = "0", session: Session
         print(f"📝 generatedBy being returned: {response.get('generatedBy')}")
         print(f"{'='*60}\n")
         
-        return response
+        body = JSONResponse(content=response).body
+        payload_cache.put("quotation", *version, body)
+        return Response(content=body, media_type="application/json")
         
     except HTTPException:
         raise
@@ -1639,8 +1560,208 @@ async def get_quotation(quote_number: str, revision: str = "0", session: Session
         raise HTTPException(status_code=500, detail=f"Error retrieving quotation: {str(e)}")
 
 
+def like_pattern(value, starts_with=False):
+    """'%value%' (or 'value%') for LIKE/ILIKE, with %, _ and the escape character escaped"""
+    escaped = value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"{escaped}%" if starts_with else f"%{escaped}%"
+
+
+# Quotation search paging: default and maximum page size
+SEARCH_PAGE_SIZE = max(int_env("SEARCH_PAGE_SIZE", 50), 1)
+SEARCH_MAX_PAGE_SIZE = max(int_env("SEARCH_MAX_PAGE_SIZE", 200), SEARCH_PAGE_SIZE)
+# Tank size search tolerance in metres
+TANK_SIZE_TOLERANCE = 0.1
+
+# sort parameter -> (column, descending); id breaks ties so the keyset is unique
+SEARCH_SORTS = {
+    "date": (QuotationWebpageInputDetailsSave.quotation_date, False),
+    "-date": (QuotationWebpageInputDetailsSave.quotation_date, True),
+    "quote_number": (QuotationWebpageInputDetailsSave.full_main_quote_number, False),
+    "-quote_number": (QuotationWebpageInputDetailsSave.full_main_quote_number, True),
+    "created_time": (QuotationWebpageInputDetailsSave.created_time, False),
+    "-created_time": (QuotationWebpageInputDetailsSave.created_time, True),
+}
+# Keyword search (q) rank, best first; the default sort when q is given
+RELEVANCE_SORT = "relevance"
+SEARCH_COUNT_MODES = ("exact", "estimate", "none")
+
+
+def encode_search_cursor(sort, value, row_id):
+    """Opaque cursor pointing just after (value, row_id) in the given sort"""
+    if isinstance(value, (date, datetime)):
+        value = value.isoformat()
+    payload = json.dumps([sort, value, row_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_search_cursor(cursor, sort):
+    """(value, row_id) from a cursor made by encode_search_cursor for the same sort"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        cursor_sort, value, row_id = json.loads(base64.urlsafe_b64decode(padded))
+        if cursor_sort != sort or not isinstance(row_id, int):
+            raise ValueError("cursor does not match sort")
+        if sort == RELEVANCE_SORT:
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                raise ValueError("bad cursor value")
+            return float(value), row_id
+        column = SEARCH_SORTS[sort][0]
+        if column is QuotationWebpageInputDetailsSave.quotation_date:
+            value = date.fromisoformat(value)
+        elif column is QuotationWebpageInputDetailsSave.created_time:
+            value = datetime.fromisoformat(value)
+        elif not isinstance(value, str):
+            raise ValueError("bad cursor value")
+        return value, row_id
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor. Start the search again without 'after'")
+
+
+def estimate_row_count(session, statement):
+    """Planner row estimate for statement on PostgreSQL, None elsewhere"""
+    bind = session.get_bind()
+    if bind.dialect.name != "postgresql":
+        return None
+    compiled = statement.compile(dialect=bind.dialect)
+    plan = session.connection().exec_driver_sql(
+        "EXPLAIN (FORMAT JSON) " + compiled.string, compiled.params
+    ).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def search_statement(
+    recipient_name=None, company_name=None, date_from=None, date_to=None, quote_company=None,
+    quote_yearmonth=None, quote_series=None, quote_number=None, generated_by=None, phone_number=None,
+    subject=None, email=None, sales_person=None, office_person=None, tank_type=None, support_system=None,
+    tank_length=None, tank_width=None, tank_height=None, keywords=None,
+):
+    """
+    The filtered GET /api/quotations query (filters as the endpoint's query
+    parameters; keywords from keyword_query()), before sorting and paging
+    """
+    Q = QuotationWebpageInputDetailsSave
+    
+    # One query: recipient and company are joined for the response, sales
+    # person / project manager only when filtered on.
+    columns = [
+        Q.id, Q.quotation_number, Q.full_main_quote_number, Q.revision_number,
+        Q.quotation_date, Q.subject, Q.generated_by, Q.status,
+        RecipientDetails.id.label("joined_recipient_id"), RecipientDetails.recipient_name,
+        RecipientDetails.to_company_name, CompanyDetails.id.label("joined_company_id"),
+        CompanyDetails.full_name.label("from_company"),
+    ]
+    statement = (
+        select(*columns)
+        .outerjoin(RecipientDetails, RecipientDetails.id == Q.recipient_id)
+        .outerjoin(CompanyDetails, CompanyDetails.id == Q.company_id)
+    )
+    
+    # Partial, case-insensitive matches (like the old Python `in` checks)
+    text_filters = [
+        (recipient_name, RecipientDetails.recipient_name),
+        (company_name, RecipientDetails.to_company_name),
+        (phone_number, RecipientDetails.phone_number),
+        (email, RecipientDetails.email),
+        (subject, Q.subject),
+        (generated_by, Q.generated_by),
+    ]
+    if sales_person:
+        statement = statement.outerjoin(SalesDetails, SalesDetails.id == Q.sales_person_id)
+        text_filters.append((sales_person, SalesDetails.sales_person_name))
+    if office_person:
+        statement = statement.outerjoin(ProjectManagerDetails, ProjectManagerDetails.id == Q.project_manager_id)
+        text_filters.append((office_person, ProjectManagerDetails.manager_name))
+    for value, column in text_filters:
+        if value:
+            statement = statement.where(column.ilike(like_pattern(value), escape="\\"))
+    
+    # Date range filtering
+    try:
+        if date_from:
+            statement = statement.where(Q.quotation_date >= datetime.strptime(date_from, "%Y-%m-%d").date())
+        if date_to:
+            statement = statement.where(Q.quotation_date <= datetime.strptime(date_to, "%Y-%m-%d").date())
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid date format. Use YYYY-MM-DD")
+    
+    # Quote number component filtering - each component filters independently
+    # full_main_quote_number format: GRPPT/2512/MM/0324 or GRPPT/2512/MM/0324-R1
+    # The parts are generated, indexed columns: the company code is an exact
+    # match, year/month, series and number match as prefixes.
+    if quote_company:
+        statement = statement.where(Q.quote_company_code == quote_company.upper())
+    if quote_yearmonth:
+        statement = statement.where(
+            Q.quote_yearmonth.like(like_pattern(quote_yearmonth, starts_with=True), escape="\\"))
+    if quote_series:
+        statement = statement.where(
+            Q.quote_series.like(like_pattern(quote_series.upper(), starts_with=True), escape="\\"))
+    if quote_number:
+        # Base number, without any -R revision suffix
+        statement = statement.where(
+            Q.quote_base_number.like(like_pattern(quote_number, starts_with=True), escape="\\"))
+    
+    # Tank filters look up the normalized tank lines (quotation_tank_lines).
+    # Type and support system may match different lines; the given sizes
+    # must all match one line, within TANK_SIZE_TOLERANCE.
+    L = QuotationTankLine
+    if tank_type:
+        statement = statement.where(exists().where(
+            L.quotation_id == Q.id, L.tank_type.ilike(like_pattern(tank_type), escape="\\")
+        ))
+    if support_system:
+        statement = statement.where(exists().where(
+            L.quotation_id == Q.id, L.support_system.ilike(like_pattern(support_system), escape="\\")
+        ))
+    size_conditions = []
+    for value, column in ((tank_length, L.length), (tank_width, L.width), (tank_height, L.height)):
+        if value:
+            try:
+                size = float(value)
+            except ValueError:
+                size_conditions.append(false())  # not a number: nothing matches
+                continue
+            size_conditions.append(column.between(size - TANK_SIZE_TOLERANCE, size + TANK_SIZE_TOLERANCE))
+    if size_conditions:
+        statement = statement.where(exists().where(L.quotation_id == Q.id, *size_conditions))
+    
+    # Keyword search on the indexed search document
+    if keywords is not None:
+        statement = statement.where(search_document.bool_op("@@")(keywords))
+    return statement
+
+
+def search_page_statement(statement, sort, after, limit, keywords=None):
+    """
+    One page of search_statement() results in the given sort, with a
+    sort_value column for the next cursor; limit + 1 rows tell whether
+    there are more
+    """
+    Q = QuotationWebpageInputDetailsSave
+    # Keyset paging on (sort column, id): the cursor holds the last row's
+    # key, so every page is an index range scan however deep it is
+    if sort == RELEVANCE_SORT:
+        # float8 so the rank survives the round trip through the cursor exactly
+        sort_column, descending = cast(func.ts_rank(search_document, keywords), Float), True
+    else:
+        sort_column, descending = SEARCH_SORTS[sort]
+    sort_key = tuple_(sort_column, Q.id)
+    if after:
+        last_key = decode_search_cursor(after, sort)
+        statement = statement.where(sort_key < last_key if descending else sort_key > last_key)
+    if descending:
+        statement = statement.order_by(sort_column.desc(), Q.id.desc())
+    else:
+        statement = statement.order_by(sort_column.asc(), Q.id.asc())
+    statement = statement.add_columns(sort_column.label("sort_value"))
+    return statement.limit(limit + 1)
+
+
 @app.get("/api/quotations")
-async def search_quotations(
+@offload
+def search_quotations(
     recipient_name: Optional[str] = None,
     company_name: Optional[str] = None,
     date_from: Optional[str] = None,
@@ -1660,19 +1781,24 @@ async def search_quotations(
     tank_length: Optional[str] = None,
     tank_width: Optional[str] = None,
     tank_height: Optional[str] = None,
+    q: Optional[str] = None,
+    limit: int = SEARCH_PAGE_SIZE,
+    sort: Optional[str] = None,
+    after: Optional[str] = None,
+    count: str = "exact",
     session: Session = Depends(get_session)
 ):
     """
-    Search quotations based on filters
+    Search quotations based on filters, one page at a time
     Query parameters:
     - recipient_name: Filter by recipient name (partial match)
     - company_name: Filter by company name (partial match)
     - date_from: Filter by start date (YYYY-MM-DD format)
     - date_to: Filter by end date (YYYY-MM-DD format)
     - quote_company: Filter by company code in quote number (e.g., GRPPT, PIPECO)
-    - quote_yearmonth: Filter by year/month in quote number (e.g., 2512)
-    - quote_series: Filter by series in quote number (e.g., MM, JB)
-    - quote_number: Filter by quotation number (e.g., 0324)
+    - quote_yearmonth: Filter by year/month in quote number (prefix, e.g., 2512 or 25)
+    - quote_series: Filter by series in quote number (prefix, e.g., MM, JB)
+    - quote_number: Filter by quotation number (prefix, e.g., 0324 or 03)
     - generated_by: Filter by generated by name (partial match)
     - phone_number: Filter by recipient phone number (partial match)
     - subject: Filter by subject (partial match)
@@ -1684,8 +1810,31 @@ async def search_quotations(
     - tank_length: Filter by tank length in meters
     - tank_width: Filter by tank width in meters
     - tank_height: Filter by tank height in meters
+    - q: Keywords searched in subject, project location, recipient company and
+      contractual terms ("quoted phrase", or, -exclude); each result gets
+      'highlights' with the matched fields marked up (PostgreSQL only)
+    Paging:
+    - limit: Page size (default SEARCH_PAGE_SIZE, at most SEARCH_MAX_PAGE_SIZE)
+    - sort: date, quote_number or created_time; prefix with '-' for descending.
+      With q also relevance (the default with q; otherwise -date)
+    - after: next_cursor from the previous page
+    - count: exact (default), estimate (planner estimate on PostgreSQL) or none
     """
     try:
+        q = q.strip() if q else None
+        if q and not supports_full_text(session):
+            raise HTTPException(status_code=400, detail="Keyword search (q) needs the PostgreSQL database")
+        if sort is None:
+            sort = RELEVANCE_SORT if q else "-date"
+        if sort not in SEARCH_SORTS and not (q and sort == RELEVANCE_SORT):
+            sorts = list(SEARCH_SORTS) + ([RELEVANCE_SORT] if q else [])
+            raise HTTPException(status_code=400, detail=f"Invalid sort: {sort}. Use one of {', '.join(sorts)}")
+        if count not in SEARCH_COUNT_MODES:
+            raise HTTPException(status_code=400, detail=f"Invalid count: {count}. Use one of {', '.join(SEARCH_COUNT_MODES)}")
+        if not 1 <= limit <= SEARCH_MAX_PAGE_SIZE:
+            raise HTTPException(status_code=400, detail=f"limit must be between 1 and {SEARCH_MAX_PAGE_SIZE}")
+        
+
         print(f"\n{'='*60}")
         print(f"SEARCHING QUOTATIONS")
         print(f"{'='*60}")
@@ -1696,228 +1845,93 @@ async def search_quotations(
         print(f"  phone_number={phone_number}, subject={subject}, email={email}")
         print(f"  sales_person={sales_person}, office_person={office_person}")
         print(f"  tank_type={tank_type}, support_system={support_system}")
+
         print(f"  tank_length={tank_length}, tank_width={tank_width}, tank_height={tank_height}")
+        print(f"  q={q}, sort={sort}")
+        
+        Q = QuotationWebpageInputDetailsSave
+        keywords = keyword_query(q) if q else None
+        statement = search_statement(
+            recipient_name=recipient_name, company_name=company_name, date_from=date_from, date_to=date_to,
+            quote_company=quote_company, quote_yearmonth=quote_yearmonth, quote_series=quote_series,
+            quote_number=quote_number, generated_by=generated_by, phone_number=phone_number, subject=subject,
+            email=email, sales_person=sales_person, office_person=office_person, tank_type=tank_type,
+            support_system=support_system, tank_length=tank_length, tank_width=tank_width,
+            tank_height=tank_height, keywords=keywords,
+        )
         
-        # Build query
-        statement = select(QuotationWebpageInputDetailsSave)
-        
-        # Apply filters - we'll filter after fetching to avoid complex joins
-        quotations = session.exec(statement).all()
-        
-        # Filter in Python for simplicity
-        filtered_quotations = []
-        for quotation in quotations:
-            # Get recipient for filtering
-            recipient = session.get(RecipientDetails, quotation.recipient_id) if quotation.recipient_id else None
-            
-            # Get sales person for filtering
-            sales_person_obj = session.get(SalesDetails, quotation.sales_person_id) if quotation.sales_person_id else None
-            
-            # Get project manager for filtering
-            project_manager_obj = session.get(ProjectManagerDetails, quotation.project_manager_id) if quotation.project_manager_id else None
-            
-            # Apply filters
-            if recipient_name and recipient:
-                if recipient_name.lower() not in recipient.recipient_name.lower():
-                    continue
-            elif recipient_name:
-                continue
-            
-            if company_name and recipient:
-                if company_name.lower() not in (recipient.to_company_name or "").lower():
-                    continue
-            elif company_name:
-                continue
-            
-            # Phone number filtering
-            if phone_number and recipient:
-                if phone_number.lower() not in (recipient.phone_number or "").lower():
-                    continue
-            elif phone_number:
-                continue
-            
-            # Email filtering
-            if email and recipient:
-                if email.lower() not in (recipient.email or "").lower():
-                    continue
-            elif email:
-                continue
-            
-            # Subject filtering
-            if subject:
-                if subject.lower() not in (quotation.subject or "").lower():
-                    continue
-            
-            # Generated By filtering
-            if generated_by:
-                if generated_by.lower() not in (quotation.generated_by or "").lower():
-                    continue
-            
-            # Sales person filtering
-            if sales_person and sales_person_obj:
-                if sales_person.lower() not in (sales_person_obj.sales_person_name or "").lower():
-                    continue
-            elif sales_person:
-                continue
-            
-            # Office/Project Manager filtering
-            if office_person and project_manager_obj:
-                if office_person.lower() not in (project_manager_obj.manager_name or "").lower():
-                    continue
-            elif office_person:
-                continue
-            
-            # Tank-related filters (search in tanks_data JSON)
-            tanks_data = quotation.tanks_data or {}
-            tanks = tanks_data.get('tanks', []) if isinstance(tanks_data, dict) else []
-            
-            # Tank Type filtering (insulated/non-insulated)
-            if tank_type and tanks:
-                tank_type_match = False
-                for tank in tanks:
-                    tank_type_str = tank.get('type', '') or ''
-                    if tank_type.lower() in tank_type_str.lower():
-                        tank_type_match = True
-                        break
-                if not tank_type_match:
-                    continue
-            elif tank_type:
-                continue
-            
-            # Support System filtering
-            if support_system and tanks:
-                support_match = False
-                for tank in tanks:
-                    tank_support = tank.get('supportSystem', '') or tank.get('support_system', '') or ''
-                    if support_system.lower() in tank_support.lower():
-                        support_match = True
-                        break
-                if not support_match:
-                    continue
-            elif support_system:
-                continue
-            
-            # Tank Size filtering (length, width, height)
-            if (tank_length or tank_width or tank_height) and tanks:
-                size_match = False
-                for tank in tanks:
-                    match = True
-                    
-                    # Check length
-                    if tank_length:
-                        try:
-                            search_length = float(tank_length)
-                            tank_length_val = float(tank.get('length', 0) or 0)
-                            # Allow small tolerance (0.1m)
-                            if abs(tank_length_val - search_length) > 0.1:
-                                match = False
-                        except (ValueError, TypeError):
-                            match = False
-                    
-                    # Check width
-                    if tank_width and match:
-                        try:
-                            search_width = float(tank_width)
-                            tank_width_val = float(tank.get('width', 0) or 0)
-                            if abs(tank_width_val - search_width) > 0.1:
-                                match = False
-                        except (ValueError, TypeError):
-                            match = False
-                    
-                    # Check height
-                    if tank_height and match:
-                        try:
-                            search_height = float(tank_height)
-                            tank_height_val = float(tank.get('height', 0) or 0)
-                            if abs(tank_height_val - search_height) > 0.1:
-                                match = False
-                        except (ValueError, TypeError):
-                            match = False
-                    
-                    if match:
-                        size_match = True
-                        break
-                
-                if not size_match:
-                    continue
-            elif (tank_length or tank_width or tank_height):
-                continue
-            
-            # Date range filtering
-            if date_from or date_to:
-                from datetime import datetime
-                try:
-                    if date_from:
-                        from_date = datetime.strptime(date_from, "%Y-%m-%d").date()
-                        if quotation.quotation_date < from_date:
-                            continue
-                    if date_to:
-                        to_date = datetime.strptime(date_to, "%Y-%m-%d").date()
-                        if quotation.quotation_date > to_date:
-                            continue
-                except ValueError:
-                    raise HTTPException(status_code=400, detail="Invalid date format. Use YYYY-MM-DD")
-            
-            # Quote number component filtering - each component filters independently
-            # full_main_quote_number format: GRPPT/2512/MM/0324 or GRPPT/2512/MM/0324-R1
-            if quote_company or quote_yearmonth or quote_series or quote_number:
-                full_quote = quotation.full_main_quote_number or ""
-                
-                # Split by / to get components
-                quote_parts = full_quote.split('/')
-                
-                # Check each component independently
-                if quote_company:
-                    # First component is company code (exact match)
-                    if len(quote_parts) < 1 or quote_company.upper() != quote_parts[0].upper():
-                        continue
-                
-                if quote_yearmonth:
-                    # Second component is year/month
-                    if len(quote_parts) < 2 or quote_yearmonth not in quote_parts[1]:
-                        continue
-                
-                if quote_series:
-                    # Third component is series (person code)
-                    if len(quote_parts) < 3 or quote_series.upper() not in quote_parts[2].upper():
-                        continue
-                
-                if quote_number:
-                    # Fourth component is the number (may have -R suffix)
-                    if len(quote_parts) < 4:
-                        continue
-                    # Remove revision suffix if present
-                    number_part = quote_parts[3].split('-')[0]
-                    if quote_number not in number_part:
-                        continue
-            
-            filtered_quotations.append(quotation)
+        # Total matches, counted on the filtered query before paging
+        total = None
+        if count == "estimate":
+            total = estimate_row_count(session, statement)
+        if count == "exact" or (count == "estimate" and total is None):
+            total = session.exec(select(func.count()).select_from(statement.subquery())).one()
+        
+        filtered_quotations = session.exec(search_page_statement(statement, sort, after, limit, keywords)).all()
+        has_more = len(filtered_quotations) > limit
+        filtered_quotations = filtered_quotations[:limit]
+        next_cursor = None
+        if has_more:
+            last = filtered_quotations[-1]
+            next_cursor = encode_search_cursor(sort, last.sort_value, last.id)
+        
+        # Matched fields of this page's quotations, marked with <mark>
+        highlights = {}
+        if q and filtered_quotations:
+            fields = (
+                select(
+                    Q.id, Q.subject, Q.project_location,
+                    RecipientDetails.to_company_name.label("recipient_company"),
+                    func.quotation_terms_text(Q.full_main_quote_number).label("terms"),
+                )
+                .outerjoin(RecipientDetails, RecipientDetails.id == Q.recipient_id)
+                .where(Q.id.in_([quotation.id for quotation in filtered_quotations]))
+                .cte("page_fields")
+            )
+            highlight_rows = session.exec(select(
+                fields.c.id,
+                headline(fields.c.subject, keywords).label("subject"),
+                headline(fields.c.project_location, keywords).label("project_location"),
+                headline(fields.c.recipient_company, keywords).label("recipient_company"),
+                headline(fields.c.terms, keywords, TERMS_HEADLINE_OPTIONS).label("terms"),
+            )).all()
+            for row in highlight_rows:
+                marked = row._asdict()
+                row_id = marked.pop("id")
+                highlights[row_id] = {field: text for field, text in marked.items() if text}
         
         # Build response
         result = []
         for quotation in filtered_quotations:
-            # Get related data
-            recipient = session.get(RecipientDetails, quotation.recipient_id)
-            company = session.get(CompanyDetails, quotation.company_id)
-            
+            has_recipient = quotation.joined_recipient_id is not None
             result.append({
                 "id": quotation.id,
                 "quotation_number": quotation.quotation_number,
                 "full_main_quote_number": quotation.full_main_quote_number,
                 "revision_number": quotation.revision_number,
-                "recipient_name": recipient.recipient_name if recipient else "",
-                "recipient_company": recipient.to_company_name if recipient else "",
+                "recipient_name": quotation.recipient_name if has_recipient else "",
+                "recipient_company": quotation.to_company_name if has_recipient else "",
                 "quotation_date": quotation.quotation_date.isoformat(),
                 "subject": quotation.subject,
-                "from_company": company.full_name if company else "",
+                "from_company": quotation.from_company if quotation.joined_company_id is not None else "",
                 "generated_by": quotation.generated_by or "",
                 "status": quotation.status
             })
+            if q:
+                result[-1]["highlights"] = highlights.get(quotation.id, {})
         
-        print(f"✓ Found {len(result)} quotation(s)")
+        print(f"✓ Returning {len(result)} quotation(s) of {total if total is not None else '?'} ({count} count)")
         print(f"{'='*60}\n")
         
-        return {"quotations": result, "count": len(result)}
+        return {
+            "quotations": result,
+            "count": total,
+            "count_mode": count,
+            "limit": limit,
+            "sort": sort,
+            "has_more": has_more,
+            "next_cursor": next_cursor,
+        }
         
     except HTTPException:
         raise
@@ -1929,7 +1943,8 @@ async def search_quotations(
 
 
 @app.get("/api/quotations/{quotation_id}")
-async def get_quotation_by_id(quotation_id: int, session: Session = Depends(get_session)):
+@offload
+def get_quotation_by_id(quotation_id: int, session: Session = Depends(get_session)):
     """
     Get full quotation details by ID
     """
@@ -1939,45 +1954,26 @@ async def get_quotation_by_id(quotation_id: int, session: Session = Depends(get_
         print(f"{'='*60}")
         print(f"Quotation ID: {quotation_id}")
         
-        # Get quotation
-        quotation = session.get(QuotationWebpageInputDetailsSave, quotation_id)
+        # Cached payload if the quotation and its related rows have not changed since it was built
+        version = quotation_version(session, QuotationWebpageInputDetailsSave.id == quotation_id)
+        if not version:
+            raise HTTPException(status_code=404, detail=f"Quotation not found with ID: {quotation_id}")
+        cached = payload_cache.get("quotation_by_id", *version)
+        if cached is not None:
+            print(f"✓ Served quotation from cache")
+            print(f"{'='*60}\n")
+            return Response(content=cached, media_type="application/json")
         
-        if not quotation:
+        # Quotation with its related rows and terms in one query
+        bundle = load_quotation_bundle(session, QuotationWebpageInputDetailsSave.id == quotation_id)
+        
+        if not bundle:
             raise HTTPException(status_code=404, detail=f"Quotation not found with ID: {quotation_id}")
         
-        # Get related data
-        company = session.get(CompanyDetails, quotation.company_id)
-        recipient = session.get(RecipientDetails, quotation.recipient_id)
-        sales_person = session.get(SalesDetails, quotation.sales_person_id)
-        project_manager = None
-        if quotation.project_manager_id:
-            project_manager = session.get(ProjectManagerDetails, quotation.project_manager_id)
-        
-        # Get contractual terms
-        statement_terms = select(ContractualTermsSpecifications).where(
-            ContractualTermsSpecifications.full_main_quote_number == quotation.full_main_quote_number
-        )
-        contractual_terms = session.exec(statement_terms).first()
+        quotation, company, recipient, sales_person, project_manager, contractual_terms = bundle
         
         # Map database columns to frontend terms
-        terms_data = {}
-        if contractual_terms:
-            db_to_frontend_mapping = {
-                'note': 'note',
-                'material_specifications': 'materialSpecification',
-                'warranty_conditions': 'warrantyExclusions',
-                'terms_and_conditions': 'termsConditions',
-                'supplier_scope': 'supplierScope',
-                'customer_scope': 'customerScope',
-                'note_second': 'extraNote',
-                'scope_of_work': 'scopeOfWork',
-                'work_excluded': 'workExcluded'
-            }
-            
-            for db_column, frontend_key in db_to_frontend_mapping.items():
-                db_value = getattr(contractual_terms, db_column, None)
-                if db_value:
-                    terms_data[frontend_key] = db_value
+        terms_data = terms_for_frontend(contractual_terms)
         
         # Build response
         response = {
@@ -2014,7 +2010,9 @@ async def get_quotation_by_id(quotation_id: int, session: Session = Depends(get_
         print(f"📝 generatedBy being returned: {response['quotation'].get('generated_by')}")
         print(f"{'='*60}\n")
         
-        return response
+        body = JSONResponse(content=response).body
+        payload_cache.put("quotation_by_id", *version, body)
+        return Response(content=body, media_type="application/json")
         
     except HTTPException:
         raise
@@ -2025,8 +2023,70 @@ async def get_quotation_by_id(quotation_id: int, session: Session = Depends(get_
         raise HTTPException(status_code=500, detail=f"Error retrieving quotation by ID: {str(e)}")
 
 
+def decimal_or_none(value):
+    return float(value) if value is not None else None
+
+
+@app.get("/api/quotations/{quote_number}/revisions")
+@offload
+def get_quotation_revisions(quote_number: str, company: str, session: Session = Depends(get_session)):
+    """
+    Summary of every revision of a quotation, oldest first, for the revision picker
+    Query parameters:
+    - company: company code or full name (e.g., GRPPT), required: the same
+      quotation number is a different quotation under each company
+    """
+    try:
+        Q = QuotationWebpageInputDetailsSave
+        quotation_number = quote_number.strip()
+        snapshot = reference_data.snapshot()
+        company_row = snapshot.company_by_code.get(company.strip().upper()) or snapshot.company_by_full_name.get(company.strip())
+        if not company_row:
+            raise HTTPException(status_code=404, detail=f"Company not found: {company}")
+        # Range scan of unique_quote_per_company (company_id, quotation_number, revision_number)
+        rows = session.exec(select(
+            Q.id, Q.full_main_quote_number, Q.revision_number, Q.quotation_date,
+            Q.status, Q.subtotal, Q.discount_amount, Q.tax_amount, Q.total_amount,
+            Q.generated_by, Q.final_doc_file_path, Q.last_updated_time,
+        ).where(
+            Q.company_id == company_row.id, Q.quotation_number == quotation_number,
+        ).order_by(Q.revision_number)).all()
+
+        if not rows:
+            raise HTTPException(status_code=404, detail=f"Quotation not found: {quote_number}")
+
+        revisions = []
+        for row in rows:
+            revisions.append({
+                "id": row.id,
+                "full_main_quote_number": row.full_main_quote_number,
+                "revision_number": row.revision_number,
+                "quotation_date": row.quotation_date.isoformat(),
+                "status": row.status,
+                "subtotal": decimal_or_none(row.subtotal),
+                "discount_amount": decimal_or_none(row.discount_amount),
+                "tax_amount": decimal_or_none(row.tax_amount),
+                "total_amount": decimal_or_none(row.total_amount),
+                "generated_by": row.generated_by or "",
+                "final_doc_file_path": row.final_doc_file_path,
+                "last_updated_time": row.last_updated_time.isoformat(),
+            })
+
+        print(f"✓ {len(revisions)} revision(s) of quotation {quotation_number}")
+        return {"quotation_number": quotation_number, "from_company": company_row.full_name, "revisions": revisions}
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"⚠ Error retrieving quotation revisions: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail=f"Error retrieving quotation revisions: {str(e)}")
+
+
 @app.put("/api/quotations/{quotation_id}")
-async def update_quotation_revision(quotation_id: int, request: UpdateRevisionRequest, session: Session = Depends(get_session)):
+@offload
+def update_quotation_revision(quotation_id: int, request: UpdateRevisionRequest, session: Session = Depends(get_session)):
     """
     Update the revision number of a quotation
     Note: This creates a new quotation entry with the new revision number
@@ -2054,6 +2114,11 @@ async def update_quotation_revision(quotation_id: int, request: UpdateRevisionRe
         if existing and existing.id != quotation_id:
             raise HTTPException(status_code=400, detail=f"Quotation with revision {request.revision_number} already exists")
         
+        # Same content as the original, stored as a delta against an earlier full revision when compact
+        document = stored_document(materialize(session, original_quotation))
+        revisions = load_revisions(session, original_quotation.company_id, original_quotation.quotation_number, lock=True)
+        stored, _, _ = plan_revision(revisions, request.revision_number, document)
+        
         # Create new quotation entry with updated revision
         new_quotation = QuotationWebpageInputDetailsSave(
             quotation_number=original_quotation.quotation_number,
@@ -2067,14 +2132,17 @@ async def update_quotation_revision(quotation_id: int, request: UpdateRevisionRe
             project_manager_id=original_quotation.project_manager_id,
             subject=original_quotation.subject,
             project_location=original_quotation.project_location,
-            tanks_data=original_quotation.tanks_data,
-            form_options=original_quotation.form_options,
-            additional_data=original_quotation.additional_data,
-            status=original_quotation.status
+            status=original_quotation.status,
+            **quotation_totals(document["tanksData"]),
+            **stored
         )
         
         session.add(new_quotation)
+        session.flush()  # Get new quotation ID
+        replace_tank_lines(session, new_quotation.id, document["tanksData"])
+        refresh_search_document(session, new_quotation.id)
         session.commit()
+        payload_cache.invalidate(quotation_id)
         session.refresh(new_quotation)
         
         print(f"✓ Created new quotation with revision {request.revision_number}")
@@ -2097,27 +2165,154 @@ async def update_quotation_revision(quotation_id: int, request: UpdateRevisionRe
         raise HTTPException(status_code=500, detail=f"Error updating quotation revision: {str(e)}")
 
 
+# Members of the document PATCH /api/quotations/{id} edits -> quotation column
+PATCHABLE_QUOTATION_COLUMNS = {
+    'tanksData': 'tanks_data',
+    'formOptions': 'form_options',
+    'additionalData': 'additional_data',
+}
+
+
+@app.patch("/api/quotations/{quotation_id}")
+@offload
+def patch_quotation(
+    quotation_id: int,
+    patch: Union[List[Dict[str, Any]], Dict[str, Any]] = Body(...),
+    session: Session = Depends(get_session)
+):
+    """
+    Partially update a saved quotation draft
+    
+    The patch applies to the document
+        {"tanksData": ..., "formOptions": ..., "additionalData": ..., "terms": {"note": ..., ...}}
+    (terms keyed like /api/save-quotation). Send either a JSON Merge Patch
+    (RFC 7386, an object) or a JSON Patch (RFC 6902, an array of operations,
+    e.g. {"op": "replace", "path": "/tanksData/tanks/0/options/1/height", "value": "2"}).
+    Only the members the patch touches are read and written; the rows are
+    locked while the patch is applied. A failing "test" operation gives 409.
+    """
+    try:
+        members = patched_members(patch)
+        unknown = members - set(PATCHABLE_QUOTATION_COLUMNS) - {'terms'}
+        if unknown:
+            raise JsonPatchError(f"Cannot patch: {', '.join(sorted(unknown)) or 'the whole document'}")
+        
+        statement = select(QuotationWebpageInputDetailsSave).where(
+            QuotationWebpageInputDetailsSave.id == quotation_id
+        ).with_for_update()
+        quotation = session.exec(statement).first()
+        if not quotation:
+            raise HTTPException(status_code=404, detail=f"Quotation not found with ID: {quotation_id}")
+        
+        full_document = stored_document(materialize(session, quotation))
+        document = {
+            member: full_document[member]
+            for member, column in PATCHABLE_QUOTATION_COLUMNS.items()
+            if member in members and full_document[member] is not None
+        }
+        contractual_terms = None
+        if 'terms' in members:
+            statement = select(ContractualTermsSpecifications).where(
+                ContractualTermsSpecifications.full_main_quote_number == quotation.full_main_quote_number
+            ).with_for_update()
+            contractual_terms = session.exec(statement).first()
+            document['terms'] = terms_for_frontend(contractual_terms) if contractual_terms else {}
+        
+        patched = apply_patch(document, patch)
+        if not isinstance(patched, dict) or set(patched) - members:
+            raise JsonPatchError("Only tanksData, formOptions, additionalData and terms can be patched")
+        if not isinstance(patched.get('tanksData'), dict) and 'tanksData' in members:
+            raise JsonPatchError("tanksData must be an object")
+        for member in ('formOptions', 'additionalData'):
+            if member in patched and not isinstance(patched[member], dict):
+                raise JsonPatchError(f"{member} must be an object")
+        terms = patched.get('terms', {})
+        terms_columns = {frontend_key: column for column, frontend_key in TERMS_COLUMNS_TO_FRONTEND.items()}
+        if not isinstance(terms, dict) or set(terms) - set(terms_columns):
+            raise JsonPatchError(f"terms must be an object with the sections {', '.join(terms_columns)}")
+        
+        # Write back only what changed
+        updated = [
+            member for member in PATCHABLE_QUOTATION_COLUMNS
+            if member in members and patched.get(member) != document.get(member)
+        ]
+        if updated:
+            new_document = {**full_document, **{member: patched.get(member) for member in updated}}
+            # Stored in full or as a delta, like a save of this revision
+            revisions = load_revisions(session, quotation.company_id, quotation.quotation_number, lock=True)
+            stored, _, dependents = plan_revision(revisions, quotation.revision_number, new_document)
+            store_columns(quotation, stored)
+            if dependents:
+                rebase_dependents(dependents, full_document, quotation.id, new_document)
+            if 'tanksData' in updated:
+                for column, value in quotation_totals(new_document['tanksData']).items():
+                    setattr(quotation, column, value)
+        if 'tanksData' in updated:
+            line_count = replace_tank_lines(session, quotation.id, patched['tanksData'])
+            print(f"✓ Saved {line_count} tank line(s)")
+        
+        if 'terms' in members and terms != document['terms']:
+            if contractual_terms is None:
+                contractual_terms = ContractualTermsSpecifications(full_main_quote_number=quotation.full_main_quote_number)
+                session.add(contractual_terms)
+            for frontend_key, column in terms_columns.items():
+                setattr(contractual_terms, column, terms.get(frontend_key))
+            contractual_terms.last_updated_time = datetime.utcnow()
+            updated.append('terms')
+            # Full-text search document covers the terms
+            refresh_search_document(session, quotation.id)
+        
+        if updated:
+            quotation.last_updated_time = datetime.utcnow()
+            session.add(quotation)
+            session.commit()
+            payload_cache.invalidate(quotation_id)
+            print(f"✓ Patched quotation {quotation_id}: {', '.join(updated)}")
+        else:
+            session.rollback()  # Release the row locks
+        
+        return {
+            "success": True,
+            "id": quotation_id,
+            "updated": updated,
+            "lastUpdatedTime": quotation.last_updated_time.isoformat() if quotation.last_updated_time else None
+        }
+        
+    except HTTPException:
+        raise
+    except JsonPatchTestFailed as e:
+        session.rollback()
+        raise HTTPException(status_code=409, detail=str(e))
+    except JsonPatchError as e:
+        session.rollback()
+        raise HTTPException(status_code=400, detail=f"Invalid patch: {str(e)}")
+    except Exception as e:
+        session.rollback()
+        print(f"⚠ Error patching quotation: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail=f"Error patching quotation: {str(e)}")
+
+
 @app.get("/api/person-names/{person_type}")
-async def get_person_names(person_type: str, session: Session = Depends(get_session)):
+@offload
+def get_person_names(person_type: str, if_none_match: Optional[str] = Header(None)):
     """
     Get person names from database based on person type.
-    person_type can be 'sales' or 'office'
+    person_type can be 'sales' or 'office' (ETag; 304 for If-None-Match)
     """
     try:
+        snapshot = reference_data.snapshot()
         if person_type == "sales":
-            # Query sales_details table
-            statement = select(SalesDetails)
-            results = session.exec(statement).all()
-            names = [person.sales_person_name for person in results]
+            # sales_details rows from the reference data
+            build = lambda: {"names": [person.sales_person_name for person in snapshot.sales_persons]}
         elif person_type == "office":
-            # Query project_manager_details table
-            statement = select(ProjectManagerDetails)
-            results = session.exec(statement).all()
-            names = [person.manager_name for person in results]
+            # project_manager_details rows from the reference data
+            build = lambda: {"names": [person.manager_name for person in snapshot.project_managers]}
         else:
             raise HTTPException(status_code=400, detail="Invalid person type. Use 'sales' or 'office'")
         
-        return {"names": names}
+        return conditional_json(if_none_match, *dataset_payloads.get(f"person_names/{person_type}", snapshot.version, build))
         
     except HTTPException:
         raise
@@ -2129,7 +2324,8 @@ async def get_person_names(person_type: str, session: Session = Depends(get_sess
 
 
 @app.get("/api/person-code")
-async def get_person_code(name: str, type: str, session: Session = Depends(get_session)):
+@offload
+def get_person_code(name: str, type: str):
     """
     Get CODE from database based on person name and type.
     type can be 'sales' or 'office'
@@ -2149,9 +2345,8 @@ async def get_person_code(name: str, type: str, session: Session = Depends(get_s
         code = "XX"  # Default code
         
         if type == "sales":
-            # Query sales_details table
-            statement = select(SalesDetails).where(SalesDetails.sales_person_name == clean_name)
-            result = session.exec(statement).first()
+            # sales_details row from the reference data
+            result = reference_data.snapshot().sales_by_name.get(clean_name)
             if result:
                 code = result.code
                 print(f"✓ Found sales person CODE: {code}")
@@ -2159,9 +2354,8 @@ async def get_person_code(name: str, type: str, session: Session = Depends(get_s
                 print(f"⚠ Sales person not found: '{clean_name}'")
                 
         elif type == "office":
-            # Query project_manager_details table
-            statement = select(ProjectManagerDetails).where(ProjectManagerDetails.manager_name == clean_name)
-            result = session.exec(statement).first()
+            # project_manager_details row from the reference data
+            result = reference_data.snapshot().manager_by_name.get(clean_name)
             if result:
                 code = result.code
                 print(f"✓ Found project manager CODE: {code}")
@@ -2183,7 +2377,8 @@ async def get_person_code(name: str, type: str, session: Session = Depends(get_s
 
 
 @app.get("/api/person-details")
-async def get_person_details(name: str, type: str, company: Optional[str] = "", session: Session = Depends(get_session)):
+@offload
+def get_person_details(name: str, type: str, company: Optional[str] = ""):
     """
     Get full person details (name, designation, mobile, email) from database.
     type: 'sales' or 'office'
@@ -2191,21 +2386,15 @@ async def get_person_details(name: str, type: str, company: Optional[str] = "",
     """
     try:
         clean_name = name.split('(')[0].strip()
+        snapshot = reference_data.snapshot()
 
         # Get company domain if company provided (accepts code or full name)
         email_domain = ""
         if company:
-            try:
-                # Try by code first, then by full_name
-                stmt = select(CompanyDetails).where(CompanyDetails.code == company.strip())
-                co = session.exec(stmt).first()
-                if not co:
-                    stmt = select(CompanyDetails).where(CompanyDetails.full_name == company.strip())
-                    co = session.exec(stmt).first()
-                if co and co.company_domain:
-                    email_domain = co.company_domain
-            except Exception:
-                pass
+            # Try by code first, then by full_name
+            co = snapshot.company_by_code.get(company.strip()) or snapshot.company_by_full_name.get(company.strip())
+            if co and co.company_domain:
+                email_domain = co.company_domain
 
         result_name = clean_name
         designation = ""
@@ -2214,8 +2403,7 @@ async def get_person_details(name: str, type: str, company: Optional[str] = "",
         sign_path_val = ""
 
         if type == "sales":
-            stmt = select(SalesDetails).where(SalesDetails.sales_person_name == clean_name)
-            person = session.exec(stmt).first()
+            person = snapshot.sales_by_name.get(clean_name)
             if person:
                 result_name   = person.sales_person_name
                 designation   = person.designation or "Sales Executive"
@@ -2224,8 +2412,7 @@ async def get_person_details(name: str, type: str, company: Optional[str] = "",
                 email         = f"{email_name}@{email_domain}" if email_name and email_domain else ""
                 sign_path_val = person.sign_path or ""
         elif type == "office":
-            stmt = select(ProjectManagerDetails).where(ProjectManagerDetails.manager_name == clean_name)
-            person = session.exec(stmt).first()
+            person = snapshot.manager_by_name.get(clean_name)
             if person:
                 result_name   = person.manager_name
                 designation   = person.designation or "Manager - Projects"
@@ -2246,18 +2433,12 @@ async def get_person_details(name: str, type: str, company: Optional[str] = "",
                 _sign_base = sign_path_val.strip()
                 if '.' in os.path.basename(_sign_base):
                     _sign_base = os.path.splitext(_sign_base)[0]
-                _signs_dir = os.path.join(_data_path, 'signs&seals')
-                for _ext in ['.png', '.jpg', '.jpeg']:
-                    if signature_image_b64:
-                        break
-                    for _name in [_sign_base, _sign_base.lower()]:
-                        _candidate = os.path.join(_signs_dir, _name + _ext)
-                        if os.path.exists(_candidate):
-                            with open(_candidate, 'rb') as _f:
-                                _img = _b64.b64encode(_f.read()).decode('utf-8')
-                            _mime = 'image/png' if _ext == '.png' else 'image/jpeg'
-                            signature_image_b64 = f"data:{_mime};base64,{_img}"
-                            break
+                _candidate = reference_data.signature_image(_data_path, _sign_base)
+                if _candidate:
+                    with open(_candidate, 'rb') as _f:
+                        _img = _b64.b64encode(_f.read()).decode('utf-8')
+                    _mime = 'image/png' if _candidate.endswith('.png') else 'image/jpeg'
+                    signature_image_b64 = f"data:{_mime};base64,{_img}"
             except Exception:
                 pass
 
@@ -0,0 +1,61 @@
+"""
+Fill the total columns (subtotal, discount, VAT, total) from the tanks_data of every saved quotation
+One-off for quotations saved before the totals were computed on save; safe to re-run
+(each quotation's totals are recomputed). New saves keep them up to date.
+"""
+import sys
+
+from sqlmodel import Session, select
+
+from database import engine
+from models import QuotationWebpageInputDetailsSave
+from quotation_totals import quotation_totals
+from revision_deltas import materialize
+
+BATCH_SIZE = 500
+
+
+def backfill_quotation_totals(batch_size=BATCH_SIZE):
+    """Recompute the totals of all quotations, committing per batch of quotations"""
+    quotations_done = 0
+    last_id = 0
+    with Session(engine) as session:
+        while True:
+            rows = session.exec(
+                select(QuotationWebpageInputDetailsSave)
+                .where(QuotationWebpageInputDetailsSave.id > last_id)
+                .order_by(QuotationWebpageInputDetailsSave.id)
+                .limit(batch_size)
+            ).all()
+            if not rows:
+                break
+            last_id = rows[-1].id
+            for quotation in rows:
+                # Revisions stored as a delta get their tanks_data from the base
+                tanks_data = materialize(session, quotation).tanks_data
+                for column, value in quotation_totals(tanks_data).items():
+                    setattr(quotation, column, value)
+            session.commit()
+            quotations_done += len(rows)
+            print(f"  ✓ {quotations_done} quotation(s)")
+    return quotations_done
+
+
+def main():
+    print("\n" + "="*70)
+    print("BACKFILL QUOTATION TOTALS")
+    print("="*70)
+    try:
+        quotations_done = backfill_quotation_totals()
+    except Exception as e:
+        print(f"\n❌ ERROR backfilling quotation totals: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+    print(f"\n✅ SUCCESS: totals computed for {quotations_done} quotation(s)")
+    print("="*70 + "\n")
+    return True
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,61 @@
+"""
+Backfill quotation_tank_lines from the tanks_data of every saved quotation
+One-off after applying 20261017120000_add_quotation_tank_lines.sql; safe to re-run
+(each quotation's lines are rewritten). New saves keep the table up to date.
+"""
+import sys
+
+from sqlmodel import Session, select
+
+from database import engine
+from models import QuotationWebpageInputDetailsSave
+from revision_deltas import materialize
+from tank_lines import replace_tank_lines
+
+BATCH_SIZE = 500
+
+
+def backfill_tank_lines(batch_size=BATCH_SIZE):
+    """Rewrite tank lines for all quotations, committing per batch of quotations"""
+    quotations_done = 0
+    lines_written = 0
+    last_id = 0
+    with Session(engine) as session:
+        while True:
+            rows = session.exec(
+                select(QuotationWebpageInputDetailsSave)
+                .where(QuotationWebpageInputDetailsSave.id > last_id)
+                .order_by(QuotationWebpageInputDetailsSave.id)
+                .limit(batch_size)
+            ).all()
+            if not rows:
+                break
+            last_id = rows[-1].id
+            for quotation in rows:
+                # Revisions stored as a delta get their tanks_data from the base
+                tanks_data = materialize(session, quotation).tanks_data
+                lines_written += replace_tank_lines(session, quotation.id, tanks_data)
+            session.commit()
+            quotations_done += len(rows)
+            print(f"  ✓ {quotations_done} quotation(s), {lines_written} tank line(s)")
+    return quotations_done, lines_written
+
+
+def main():
+    print("\n" + "="*70)
+    print("BACKFILL QUOTATION TANK LINES")
+    print("="*70)
+    try:
+        quotations_done, lines_written = backfill_tank_lines()
+    except Exception as e:
+        print(f"\n❌ ERROR backfilling tank lines: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+    print(f"\n✅ SUCCESS: {lines_written} tank line(s) written for {quotations_done} quotation(s)")
+    print("="*70 + "\n")
+    return True
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -4,6 +4,8 @@ from typing import AsyncGenerator
 import os
 from dotenv import load_dotenv
 
+from worker_pools import DB_MAX_OVERFLOW, DB_POOL_SIZE
+
 
 # Load environment variables from .env file
 load_dotenv()
@@ -26,8 +28,8 @@ engine = create_engine(
     DATABASE_URL, 
     echo=False,  # Disable logging to reduce overhead
     pool_pre_ping=True,  # Verify connections before using them
-    pool_size=2,  # Reduced pool size to minimize threads
-    max_overflow=3,  # Reduced overflow
+    pool_size=DB_POOL_SIZE,  # Small pool; worker_pools sizes the blocking pool to fit it
+    max_overflow=DB_MAX_OVERFLOW,
     pool_timeout=30,
     pool_recycle=3600,
     connect_args={
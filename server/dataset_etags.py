@@ -0,0 +1,72 @@
+"""Strong ETags and conditional GET (If-None-Match -> 304) for the reference-data list endpoints"""
+import hashlib
+import threading
+
+from fastapi.responses import JSONResponse, Response
+
+
+# Browsers may keep the lists but revalidate on every use; unchanged lists
+# then cost a 304 with no body
+LIST_CACHE_CONTROL = "private, no-cache"
+
+
+def encode_json(content):
+    """(JSON body as FastAPI would send it, strong ETag of that body)"""
+    body = JSONResponse(content=content).body
+    return body, '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+def etag_matches(if_none_match, etag):
+    """If-None-Match uses weak comparison: W/"x" matches "x", and * matches anything"""
+    if not if_none_match:
+        return False
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in tags or any(tag.removeprefix("W/") == etag for tag in tags)
+
+
+def conditional_json(if_none_match, body, etag):
+    """304 when the client already has this ETag, otherwise the body"""
+    headers = {"ETag": etag, "Cache-Control": LIST_CACHE_CONTROL}
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+class DatasetPayloads:
+    """
+    Encoded body and ETag of each list, rebuilt only when its version changes.
+
+    The version is whatever cheaply identifies the data behind a list (the
+    reference snapshot fingerprint, or a count / newest last_updated_time
+    query); build() runs the full query and returns the response content.
+    """
+
+    def __init__(self):
+        self._entries = {}  # dataset -> (version, body, etag)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.builds = 0
+
+    def get(self, dataset, version, build):
+        """(body, etag) of dataset at version"""
+        with self._lock:
+            entry = self._entries.get(dataset)
+            if entry is not None and entry[0] == version:
+                self.hits += 1
+                return entry[1], entry[2]
+        body, etag = encode_json(build())
+        with self._lock:
+            self._entries[dataset] = (version, body, etag)
+            self.builds += 1
+        return body, etag
+
+    def stats(self):
+        with self._lock:
+            return {
+                "datasets": len(self._entries),
+                "hits": self.hits,
+                "builds": self.builds,
+            }
+
+
+dataset_payloads = DatasetPayloads()
@@ -0,0 +1,244 @@
+"""DOCX packaging that reuses the template's already-compressed zip entries"""
+import io
+import os
+import struct
+import time
+import zipfile
+import zlib
+
+from docx.opc.packuri import CONTENT_TYPES_URI, PACKAGE_URI
+
+try:
+    # Private in python-docx (pinned 1.1.0); without it write_package() uses doc.save()
+    from docx.opc.pkgwriter import _ContentTypesItem
+except ImportError:
+    _ContentTypesItem = None
+
+
+def _compression_level_from_env():
+    try:
+        level = int(os.getenv("DOCX_COMPRESSION_LEVEL", "6"))
+    except ValueError:
+        return 6
+    return min(max(level, 0), 9)
+
+
+# Deflate level for parts that changed (python-docx / zipfile default is 6)
+DEFAULT_COMPRESSION_LEVEL = _compression_level_from_env()
+
+_LOCAL_HEADER = struct.Struct('<4s5H3L2H')
+_CENTRAL_HEADER = struct.Struct('<4s6H3L5H2L')
+_END_RECORD = struct.Struct('<4s4H2LH')
+_ZIP64_END_RECORD = struct.Struct('<4sQ2H2L4Q')
+_ZIP64_END_LOCATOR = struct.Struct('<4sLQL')
+_ZIP64_EXTRA_ID = 0x0001
+_VERSION = 20
+_ZIP64_VERSION = 45
+_MADE_BY = (3 << 8) | _VERSION        # unix, like zipfile on posix
+# Sizes and offsets from _ZIP64_LIMIT on, and member counts from
+# _ZIP64_COUNT_LIMIT on, go in ZIP64 records; the classic fields then hold
+# the 0xFFFFFFFF / 0xFFFF markers
+_ZIP64_LIMIT = _ZIP64_MARKER = 0xFFFFFFFF
+_ZIP64_COUNT_LIMIT = _ZIP64_COUNT_MARKER = 0xFFFF
+_EXTERNAL_ATTR = 0o600 << 16          # what ZipFile.writestr() uses for names
+_UTF8_FLAG = 0x800
+
+
+class _Entry:
+    """One compressed zip member: the uncompressed blob plus its deflated bytes"""
+    __slots__ = ('blob', 'crc', 'size', 'method', 'data')
+
+    def __init__(self, blob, crc, method, data):
+        self.blob = blob
+        self.crc = crc
+        self.size = len(blob)
+        self.method = method
+        self.data = data
+
+    @classmethod
+    def compress(cls, blob, level):
+        compressor = zlib.compressobj(level, zlib.DEFLATED, -15)
+        data = compressor.compress(blob) + compressor.flush()
+        return cls(blob, zlib.crc32(blob), zipfile.ZIP_DEFLATED, data)
+
+
+def _raw_members(path):
+    """Read {membername: (ZipInfo, raw compressed bytes)} straight from a zip file"""
+    members = {}
+    with zipfile.ZipFile(path) as zf, open(path, 'rb') as fp:
+        for info in zf.infolist():
+            if info.compress_type not in (zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED):
+                continue
+            if info.flag_bits & 0x1:  # encrypted
+                continue
+            fp.seek(info.header_offset)
+            header = fp.read(_LOCAL_HEADER.size)
+            name_len, extra_len = struct.unpack('<2H', header[26:30])
+            fp.seek(info.header_offset + _LOCAL_HEADER.size + name_len + extra_len)
+            members[info.filename] = (info, fp.read(info.compress_size))
+    return members
+
+
+def _package_items(doc):
+    """(membername, blob) pairs in the order python-docx's PackageWriter writes them"""
+    package = doc.part.package
+    parts = package.parts
+    for part in parts:
+        part.before_marshal()
+    yield CONTENT_TYPES_URI.membername, _ContentTypesItem.from_parts(parts).blob
+    yield PACKAGE_URI.rels_uri.membername, package.rels.xml
+    for part in parts:
+        yield part.partname.membername, part.blob
+        if len(part.rels):
+            yield part.partname.rels_uri.membername, part.rels.xml
+
+
+class PackageIndex:
+    """
+    Compressed zip entries of a pristine template document.
+
+    Members whose bytes python-docx writes back unchanged (media, fonts,
+    ...) reuse the template file's own compressed data (stored members
+    are deflated once if that is smaller); XML parts that python-docx
+    re-serialises are deflated once here. A generated
+    document is then packaged by copying every entry whose blob still
+    matches and compressing only the parts that changed.
+    """
+
+    def __init__(self, entries):
+        self._entries = entries  # membername -> _Entry
+
+    @classmethod
+    def build(cls, doc, template_path=None):
+        if _ContentTypesItem is None:
+            return _EMPTY_INDEX
+        raw = _raw_members(template_path) if template_path else {}
+        entries = {}
+        for name, blob in _package_items(doc):
+            member = raw.get(name)
+            if member is not None and member[0].file_size == len(blob) \
+                    and member[0].CRC == zlib.crc32(blob):
+                info, data = member
+                entry = _Entry(blob, info.CRC, info.compress_type, data)
+                if info.compress_type == zipfile.ZIP_STORED:
+                    # Word often stores media uncompressed; deflate it once here
+                    # when that actually makes the package smaller
+                    deflated = _Entry.compress(blob, DEFAULT_COMPRESSION_LEVEL)
+                    if len(deflated.data) < len(data):
+                        entry = deflated
+                entries[name] = entry
+            else:
+                entries[name] = _Entry.compress(blob, DEFAULT_COMPRESSION_LEVEL)
+        return cls(entries)
+
+    def entry_for(self, name, blob, level):
+        """Reuse the pristine entry when blob is unchanged, else compress it"""
+        entry = self._entries.get(name)
+        if entry is not None and (entry.blob is blob or entry.blob == blob):
+            return entry
+        return _Entry.compress(blob, level)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+_EMPTY_INDEX = PackageIndex({})
+
+
+def _dos_datetime(timestamp):
+    year, month, day, hour, minute, second = time.localtime(timestamp)[:6]
+    dos_time = (hour << 11) | (minute << 5) | (second // 2)
+    dos_date = ((year - 1980) << 9) | (month << 5) | day
+    return dos_time, dos_date
+
+
+def write_package(doc, target, index=None, compresslevel=None):
+    """
+    Write doc as a .docx to target (a path or a writable binary stream).
+
+    Produces the same members as doc.save(); entries found unchanged in
+    index are copied as raw compressed bytes.
+    """
+    index = index or _EMPTY_INDEX
+    level = DEFAULT_COMPRESSION_LEVEL if compresslevel is None else compresslevel
+    if not 0 <= level <= 9:
+        raise ValueError(f"compression level must be between 0 and 9, got {level}")
+
+    if _ContentTypesItem is None:
+        doc.save(target)
+        return
+    if isinstance(target, (str, os.PathLike)):
+        with open(target, 'wb') as stream:
+            _write_zip(stream, doc, index, level)
+    else:
+        _write_zip(target, doc, index, level)
+
+
+def _zip64_extra(*values):
+    return struct.pack(f'<2H{len(values)}Q', _ZIP64_EXTRA_ID, 8 * len(values), *values)
+
+
+def _write_zip(stream, doc, index, level):
+    """
+    Write the zip from the stream's current position (offsets are absolute,
+    as zipfile writes them). Sizes or offsets past 4 GiB, and more than
+    65534 members, get ZIP64 records.
+    """
+    dos_time, dos_date = _dos_datetime(time.time())
+    central = []
+    offset = stream.tell()
+    for name, blob in _package_items(doc):
+        entry = index.entry_for(name, blob, level)
+        try:
+            encoded = name.encode('ascii')
+            flags = 0
+        except UnicodeEncodeError:
+            encoded = name.encode('utf-8')
+            flags = _UTF8_FLAG
+        compressed_size = len(entry.data)
+        large = entry.size >= _ZIP64_LIMIT or compressed_size >= _ZIP64_LIMIT
+        version = _ZIP64_VERSION if large or offset >= _ZIP64_LIMIT else _VERSION
+        if large:
+            local_extra = _zip64_extra(entry.size, compressed_size)
+            sizes = (_ZIP64_MARKER, _ZIP64_MARKER)
+        else:
+            local_extra = b''
+            sizes = (compressed_size, entry.size)
+        stream.write(_LOCAL_HEADER.pack(
+            b'PK\x03\x04', version, flags, entry.method, dos_time, dos_date,
+            entry.crc, *sizes, len(encoded), len(local_extra)))
+        stream.write(encoded)
+        stream.write(local_extra)
+        stream.write(entry.data)
+        # The central ZIP64 extra holds only the overflowing fields, in this order
+        zip64_values = [entry.size, compressed_size] if large else []
+        if offset >= _ZIP64_LIMIT:
+            zip64_values.append(offset)
+        central_extra = _zip64_extra(*zip64_values) if zip64_values else b''
+        central.append(_CENTRAL_HEADER.pack(
+            b'PK\x01\x02', _MADE_BY, version, flags, entry.method, dos_time, dos_date,
+            entry.crc, *sizes, len(encoded), len(central_extra), 0, 0, 0,
+            _EXTERNAL_ATTR, _ZIP64_MARKER if offset >= _ZIP64_LIMIT else offset) + encoded + central_extra)
+        offset += _LOCAL_HEADER.size + len(encoded) + len(local_extra) + compressed_size
+
+    directory = b''.join(central)
+    stream.write(directory)
+    count = len(central)
+    if count >= _ZIP64_COUNT_LIMIT or len(directory) >= _ZIP64_LIMIT or offset >= _ZIP64_LIMIT:
+        zip64_end = offset + len(directory)
+        stream.write(_ZIP64_END_RECORD.pack(
+            b'PK\x06\x06', _ZIP64_END_RECORD.size - 12, _MADE_BY, _ZIP64_VERSION, 0, 0,
+            count, count, len(directory), offset))
+        stream.write(_ZIP64_END_LOCATOR.pack(b'PK\x06\x07', 0, zip64_end, 1))
+        count, directory_size, offset = _ZIP64_COUNT_MARKER, _ZIP64_MARKER, _ZIP64_MARKER
+    else:
+        directory_size = len(directory)
+    stream.write(_END_RECORD.pack(
+        b'PK\x05\x06', 0, 0, count, count, directory_size, offset, 0))
+
+
+def package_bytes(doc, index=None, compresslevel=None):
+    """Return doc packaged as .docx bytes"""
+    stream = io.BytesIO()
+    write_package(doc, stream, index, compresslevel)
+    return stream.getvalue()
@@ -0,0 +1,76 @@
+"""
+Store existing quotation revisions as deltas against their base revision
+One-off after applying 20261017160000_add_revision_deltas.sql; safe to re-run
+(revisions already stored as deltas, and bases of other revisions, are left
+as they are). New saves and revisions are encoded as they are written.
+"""
+import json
+import sys
+
+from sqlalchemy import func
+from sqlmodel import Session, select
+
+from database import engine
+from models import QuotationWebpageInputDetailsSave
+from revision_deltas import load_revisions, plan_revision, store_columns, stored_document
+
+BATCH_SIZE = 200
+
+
+def _size(value):
+    return len(json.dumps(value, separators=(",", ":"), default=str))
+
+
+def encode_revision_deltas(batch_size=BATCH_SIZE):
+    """Encode the revisions of every quotation with more than one revision, committing per batch of quotations"""
+    Q = QuotationWebpageInputDetailsSave
+    quotations_done = 0
+    revisions_encoded = 0
+    bytes_before = 0
+    bytes_after = 0
+    with Session(engine) as session:
+        families = session.exec(
+            select(Q.company_id, Q.quotation_number)
+            .group_by(Q.company_id, Q.quotation_number)
+            .having(func.count(Q.id) > 1)
+            .order_by(Q.company_id, Q.quotation_number)
+        ).all()
+        for start in range(0, len(families), batch_size):
+            for company_id, quotation_number in families[start:start + batch_size]:
+                revisions = load_revisions(session, company_id, quotation_number, lock=True)
+                for quotation in revisions:
+                    if quotation.delta_base_id is not None:
+                        continue
+                    document = stored_document(quotation)
+                    stored, _, _ = plan_revision(revisions, quotation.revision_number, document)
+                    if stored["delta_base_id"] is not None:
+                        store_columns(quotation, stored)
+                        revisions_encoded += 1
+                        bytes_before += _size(document)
+                        bytes_after += _size(stored["revision_delta"])
+            session.commit()
+            quotations_done = min(start + batch_size, len(families))
+            print(f"  ✓ {quotations_done} quotation(s), {revisions_encoded} revision(s) encoded, "
+                  f"{bytes_before:,} -> {bytes_after:,} bytes of JSON")
+    return quotations_done, revisions_encoded
+
+
+def main():
+    print("\n" + "="*70)
+    print("ENCODE QUOTATION REVISIONS AS DELTAS")
+    print("="*70)
+    try:
+        quotations_done, revisions_encoded = encode_revision_deltas()
+    except Exception as e:
+        print(f"\n❌ ERROR encoding revision deltas: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+    print(f"\n✅ SUCCESS: {revisions_encoded} revision(s) of {quotations_done} quotation(s) stored as deltas")
+    print("   Run VACUUM (or VACUUM FULL during a quiet period) on quotation_webpage_input_details_save to reclaim the space")
+    print("="*70 + "\n")
+    return True
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,177 @@
+"""In-memory background jobs for quotation generation (submit, poll, download)"""
+import asyncio
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+from worker_pools import int_env
+
+
+# How many jobs run their pipeline at once, how many may wait for a slot
+# before new submissions get 503, and how long finished jobs (and their
+# rendered documents) are kept for polling / download
+GENERATION_JOB_CONCURRENCY = max(int_env("GENERATION_JOB_CONCURRENCY", 4), 1)
+GENERATION_JOB_QUEUE_SIZE = int_env("GENERATION_JOB_QUEUE_SIZE", 100)
+GENERATION_JOB_TTL_SECONDS = int_env("GENERATION_JOB_TTL_SECONDS", 3600)
+# Within the TTL, at most this many finished jobs are kept, and their rendered
+# documents take at most this many MB; the oldest finished go first
+GENERATION_JOB_MAX_FINISHED = max(int_env("GENERATION_JOB_MAX_FINISHED", 500), 1)
+GENERATION_JOB_MAX_DOCUMENT_MB = int_env("GENERATION_JOB_MAX_DOCUMENT_MB", 256)
+
+JOB_STATUSES = ("queued", "rendering", "uploading", "done", "failed")
+
+
+class GenerationJobsFull(Exception):
+    """Raised when too many jobs are already waiting"""
+
+
+class GenerationJob:
+    """State of one background generation: status, per-phase timings, result"""
+
+    def __init__(self, label=""):
+        self.id = uuid.uuid4().hex
+        self.label = label
+        self.status = "queued"
+        self.created_at = time.time()
+        self.finished_at = None
+        self.timings = {}  # phase -> seconds
+        self.result = None
+        self.error = None
+        self.error_status = None
+        self.document = None  # rendered .docx bytes, kept for download
+        self.document_evicted = False  # dropped to keep finished jobs within the memory cap
+
+    @contextmanager
+    def phase(self, name, status=None):
+        """Time a pipeline phase, optionally moving the job to a new status"""
+        if status:
+            self.status = status
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[name] = round(time.perf_counter() - started, 3)
+
+    @property
+    def finished(self):
+        return self.status in ("done", "failed")
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "label": self.label,
+            "status": self.status,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+            "timings": dict(self.timings),
+            "result": self.result,
+            "error": self.error,
+            "error_status": self.error_status,
+            "download_ready": self.document is not None,
+        }
+
+
+class GenerationJobStore:
+    """
+    Keeps jobs in memory and runs their pipelines as asyncio tasks.
+
+    A pipeline is an async callable taking the job; it fills job.document
+    and returns the result dict. At most `concurrency` pipelines run at a
+    time, the rest wait in "queued" (bounded by `queue_size`). Finished
+    jobs are dropped after `ttl` seconds, or sooner beyond `max_finished`
+    jobs; past `max_document_bytes` the oldest finished jobs lose their
+    document (still pollable, no longer downloadable).
+    """
+
+    def __init__(self, concurrency=GENERATION_JOB_CONCURRENCY,
+                 queue_size=GENERATION_JOB_QUEUE_SIZE, ttl=GENERATION_JOB_TTL_SECONDS,
+                 max_finished=GENERATION_JOB_MAX_FINISHED,
+                 max_document_bytes=GENERATION_JOB_MAX_DOCUMENT_MB * 1024 * 1024):
+        self.concurrency = concurrency
+        self.queue_size = queue_size
+        self.ttl = ttl
+        self.max_finished = max_finished
+        self.max_document_bytes = max_document_bytes
+        self._jobs = {}
+        self._tasks = set()
+        self._semaphore = None
+        self._lock = threading.Lock()
+
+    def _prune(self):
+        cutoff = time.time() - self.ttl
+        with self._lock:
+            finished = sorted(
+                (job for job in self._jobs.values() if job.finished and job.finished_at is not None),
+                key=lambda job: job.finished_at,
+            )
+            keep_from = max(len(finished) - self.max_finished, 0)
+            for position, job in enumerate(finished):
+                if position < keep_from or job.finished_at < cutoff:
+                    del self._jobs[job.id]
+            # Newest documents first until the byte budget is spent
+            kept_bytes = 0
+            for job in reversed(finished[keep_from:]):
+                if job.document is None or job.id not in self._jobs:
+                    continue
+                kept_bytes += len(job.document)
+                if kept_bytes > self.max_document_bytes:
+                    job.document = None
+                    job.document_evicted = True
+
+    def _waiting(self):
+        with self._lock:
+            return sum(1 for job in self._jobs.values() if job.status == "queued")
+
+    def submit(self, pipeline, label=""):
+        """Create a job and schedule its pipeline; must be called on the event loop"""
+        self._prune()
+        if self._waiting() >= self.queue_size:
+            raise GenerationJobsFull(
+                f"Too many quotation jobs waiting ({self.queue_size} queued). Please retry shortly."
+            )
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+
+        job = GenerationJob(label)
+        with self._lock:
+            self._jobs[job.id] = job
+        task = asyncio.get_running_loop().create_task(self._run(job, pipeline))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return job
+
+    async def _run(self, job, pipeline):
+        try:
+            with job.phase("queued"):
+                await self._semaphore.acquire()
+            try:
+                job.result = await pipeline(job)
+                job.status = "done"
+            finally:
+                self._semaphore.release()
+        except Exception as e:
+            job.error = str(getattr(e, "detail", e))
+            job.error_status = getattr(e, "status_code", 500)
+            job.status = "failed"
+            print(f"❌ Generation job {job.id} failed: {job.error}")
+        finally:
+            job.finished_at = time.time()
+            self._prune()
+
+    def get(self, job_id):
+        self._prune()
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def stats(self):
+        with self._lock:
+            counts = {status: 0 for status in JOB_STATUSES}
+            for job in self._jobs.values():
+                counts[job.status] += 1
+            document_bytes = sum(len(job.document) for job in self._jobs.values() if job.document is not None)
+        return {"concurrency": self.concurrency, "queue_size": self.queue_size,
+                "document_bytes": document_bytes, **counts}
+
+
+generation_jobs = GenerationJobStore()
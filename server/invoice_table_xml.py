@@ -0,0 +1,425 @@
+"""Single-pass lxml renderer for the combined quotation table"""
+import re
+from xml.sax.saxutils import escape
+
+from docx.oxml import parse_xml
+from docx.oxml.ns import nsdecls
+from docx.shared import Emu, Inches
+
+from quotation_styles import QUOTE_TEXT, QUOTE_BOLD, QUOTE_BODY, QUOTE_TABLE_HEADER
+
+
+# "docx" fills the table through the python-docx object API (the reference
+# implementation); "lxml" emits the whole <w:tbl> as one XML fragment.
+TABLE_ENGINES = ("docx", "lxml")
+DEFAULT_TABLE_ENGINE = "docx"
+
+COLUMN_WIDTHS = [Inches(0.6), Inches(9.625), Inches(1.1), Inches(1.0), Inches(1.4), Inches(1.4)]
+COLUMN_TWIPS = [width.twips for width in COLUMN_WIDTHS]
+
+# Paragraph spacing as written by paragraph_format (attributes in assignment order)
+SPACING_COMPACT = 'w:before="0" w:after="0"'
+SPACING_AFTER = 'w:after="0"'
+
+DESC_TABS = (Inches(1.05).twips, Inches(1.25).twips)
+CYLINDRICAL_TABS = (Inches(1.35).twips, Inches(1.55).twips)
+
+V_ALIGN_CENTER = '<w:vAlign w:val="center"/>'
+V_ALIGN_BOTTOM = '<w:vAlign w:val="bottom"/>'
+
+FOOTER_BORDERS = (
+    '<w:tcBorders>'
+    '<w:left w:val="none" w:sz="0" w:space="0" w:color="auto"/>'
+    '<w:bottom w:val="none" w:sz="0" w:space="0" w:color="auto"/>'
+    '<w:top w:val="single" w:sz="4" w:space="0" w:color="000000"/>'
+    '<w:right w:val="single" w:sz="4" w:space="0" w:color="000000"/>'
+    '</w:tcBorders>'
+)
+
+# Column-specific padding (see TankInvoiceGenerator._apply_column_specific_padding)
+DESC_MARGIN = '<w:tcMar><w:left w:w="20" w:type="dxa"/></w:tcMar>'
+PRICE_MARGIN = '<w:tcMar><w:right w:w="60" w:type="dxa"/></w:tcMar>'
+
+_SPECIAL_CHARS = re.compile(r'(\t|\r|\n)')
+
+
+def run_content_xml(text):
+    """Run content for text, split the way python-docx does (tabs and line breaks)."""
+    parts = []
+    for chunk in _SPECIAL_CHARS.split(text):
+        if chunk == '\t':
+            parts.append('<w:tab/>')
+        elif chunk in ('\r', '\n'):
+            parts.append('<w:br/>')
+        elif chunk:
+            if chunk.strip() != chunk:
+                parts.append('<w:t xml:space="preserve">%s</w:t>' % escape(chunk))
+            else:
+                parts.append('<w:t>%s</w:t>' % escape(chunk))
+    return ''.join(parts)
+
+
+def run_xml(text, bold=False, underline=False):
+    """A run in the Quote Text / Quote Bold character style (every run in the table has one)"""
+    return (
+        '<w:r><w:rPr><w:rStyle w:val="%s"/>' % (QUOTE_BOLD if bold else QUOTE_TEXT)
+        + ('<w:u w:val="single"/>' if underline else '')
+        + '</w:rPr>' + run_content_xml(text) + '</w:r>'
+    )
+
+
+def paragraph_xml(runs=(), style=None, spacing=None, tabs=(), hanging=None, align=None):
+    """A paragraph with its properties in schema order"""
+    ppr = []
+    if style:
+        ppr.append('<w:pStyle w:val="%s"/>' % style)
+    if tabs:
+        ppr.append('<w:tabs>%s</w:tabs>' % ''.join(
+            '<w:tab w:pos="%d" w:val="left"/>' % pos for pos in tabs))
+    if spacing:
+        ppr.append('<w:spacing %s/>' % spacing)
+    if hanging is not None:
+        ppr.append('<w:ind w:left="%d" w:hanging="%d"/>' % (hanging, hanging))
+    if align:
+        ppr.append('<w:jc w:val="%s"/>' % align)
+    if not ppr and not runs:
+        return '<w:p/>'
+    ppr_xml = '<w:pPr>%s</w:pPr>' % ''.join(ppr) if ppr else ''
+    return '<w:p>' + ppr_xml + ''.join(runs) + '</w:p>'
+
+
+class Cell:
+    """One <w:tc> of a row: grid span, vertical merge, extra tcPr and paragraphs"""
+    __slots__ = ('paragraphs', 'span', 'v_merge', 'props')
+
+    def __init__(self, paragraphs=None, span=1, v_merge=None, props=''):
+        self.paragraphs = paragraphs if paragraphs is not None else [paragraph_xml()]
+        self.span = span
+        self.v_merge = v_merge  # None, 'restart' or 'continue'
+        self.props = props
+
+
+def text_cell(text, align=None, props=''):
+    """Equivalent of cell.text = text followed by paragraph alignment"""
+    return Cell([paragraph_xml([run_xml(text)], align=align)], props=props)
+
+
+def row_xml(cells):
+    """Serialize one <w:tr>, applying final widths and column padding"""
+    parts = ['<w:tr>']
+    col = 0
+    for cell in cells:
+        columns = range(col, col + cell.span)
+        col += cell.span
+        tcpr = ['<w:tcPr><w:tcW w:type="dxa" w:w="%d"/>' % sum(COLUMN_TWIPS[c] for c in columns)]
+        if cell.span > 1:
+            tcpr.append('<w:gridSpan w:val="%d"/>' % cell.span)
+        if cell.v_merge == 'restart':
+            tcpr.append('<w:vMerge w:val="restart"/>')
+        elif cell.v_merge == 'continue':
+            tcpr.append('<w:vMerge/>')
+        tcpr.append(cell.props)
+        # Continuation cells of a vertical merge share the top cell's padding
+        if cell.v_merge != 'continue':
+            if 4 in columns or 5 in columns:
+                tcpr.append(PRICE_MARGIN)
+            elif 1 in columns:
+                tcpr.append(DESC_MARGIN)
+        tcpr.append('</w:tcPr>')
+        parts.append('<w:tc>' + ''.join(tcpr) + ''.join(cell.paragraphs) + '</w:tc>')
+    parts.append('</w:tr>')
+    return ''.join(parts)
+
+
+def format_quantity(qty):
+    return str(int(qty) if isinstance(qty, float) and qty.is_integer() else qty)
+
+
+class InvoiceTableXmlBuilder:
+    """
+    Renders the combined quotation table of a TankInvoiceGenerator as one
+    <w:tbl> element.
+
+    Every cell is written once with its final properties (width, merges,
+    alignment, padding and fonts), instead of being created empty and then
+    patched by several passes over the python-docx object model. The XML
+    is identical to what the "docx" engine produces, so both engines must
+    be kept in step when the table layout changes.
+    """
+
+    def __init__(self, generator):
+        self.generator = generator
+
+    def build(self):
+        """Return the parsed <w:tbl> element (table style and padding not yet applied)"""
+        gen = self.generator
+        rows = [self._header_row()]
+        rows.extend(self._dismantling_rows())
+        rows.extend(self._cylindrical_rows())
+        if gen.tanks:
+            rows.append(self._common_row())
+            rows.extend(self._tank_rows())
+        rows.extend(self._footer_rows())
+
+        col_width = Emu(gen.doc._block_width / 6)
+        grid = '<w:gridCol w:w="%d"/>' % col_width.twips
+        tbl_xml = (
+            '<w:tbl %s><w:tblPr><w:tblW w:type="auto" w:w="0"/>'
+            '<w:tblLook w:firstColumn="1" w:firstRow="1" w:lastColumn="0" w:lastRow="0"'
+            ' w:noHBand="0" w:noVBand="1" w:val="04A0"/></w:tblPr>'
+            '<w:tblGrid>%s</w:tblGrid>%s</w:tbl>'
+        ) % (nsdecls('w'), grid * 6, ''.join(row_xml(cells) for cells in rows))
+        return parse_xml(tbl_xml)
+
+    # ── header / section rows ──
+
+    def _header_row(self):
+        gen = self.generator
+        if getattr(gen, 'has_discount', False):
+            headers = ['SL.\nNO.', 'ITEM DESCRIPTION', 'UNIT', 'QTY', 'UNIT PRICE\n(AED)', 'DISCOUNTED TOTAL PRICE\n(AED)']
+        else:
+            headers = ['SL.\nNO.', 'ITEM DESCRIPTION', 'UNIT', 'QTY', 'UNIT PRICE\n(AED)', 'TOTAL PRICE\n(AED)']
+        if gen.template_path.lower().endswith("colex_template.docx"):
+            header_color = 'A3B463'
+        else:
+            header_color = '5F9EA0'
+        props = '<w:shd w:fill="%s"/>' % header_color + V_ALIGN_BOTTOM
+        return [Cell([paragraph_xml([run_xml(text, bold=True)], style=QUOTE_TABLE_HEADER)], props=props)
+                for text in headers]
+
+    def _full_width_row(self, text, style=None, spacing=None):
+        return [Cell([paragraph_xml([run_xml(text, bold=True)], style=style, spacing=spacing)], span=6)]
+
+    def _price_cells(self, unit, qty_text, unit_price, total_price):
+        """UNIT / QTY / UNIT PRICE / TOTAL cells shared by every item row"""
+        return [
+            text_cell(unit, align='center', props=V_ALIGN_CENTER),
+            text_cell(qty_text, align='center', props=V_ALIGN_CENTER),
+            text_cell(f"{unit_price:,.2f}" if unit_price else "", align='right', props=V_ALIGN_CENTER),
+            Cell([paragraph_xml([run_xml(""), run_xml(f"{total_price:,.2f}" if total_price else "", bold=True)],
+                                align='right')],
+                 props=V_ALIGN_CENTER),
+        ]
+
+    # ── dismantling / cylindrical ──
+
+    def _dismantling_rows(self):
+        gen = self.generator
+        if not gen.dismantling_tanks:
+            return []
+        rows = [self._full_width_row(" ", spacing=SPACING_COMPACT)]
+        for i, tank in enumerate(gen.dismantling_tanks):
+            runs = [run_xml("")]
+            tank_name = tank.get('tank_name', '').upper()
+            if tank_name:
+                runs.append(run_xml(tank_name, bold=True, underline=True))
+            paragraphs = [paragraph_xml(runs, style=QUOTE_BODY, tabs=DESC_TABS)]
+
+            length = tank.get('length', '')
+            width = tank.get('width', '')
+            height = tank.get('height', '')
+            if length or width or height:
+                try:
+                    l_val = float(length) if length else 0.0
+                    w_val = float(width) if width else 0.0
+                    h_val = float(height) if height else 0.0
+                    size_txt = f"SIZE\t:\t{l_val:.1f} M (L) X {w_val:.1f} M (W) X {h_val:.1f} M (H)"
+                except (ValueError, TypeError):
+                    size_txt = f"SIZE\t:\t{length} M (L) X {width} M (W) X {height} M (H)"
+                paragraphs.append(paragraph_xml([run_xml(size_txt, bold=True)],
+                                                style=QUOTE_BODY, tabs=DESC_TABS))
+
+            rows.append(
+                [text_cell(str(i + 1), align='center', props=V_ALIGN_CENTER), Cell(paragraphs)]
+                + self._price_cells(tank.get('unit', ''), format_quantity(tank.get('quantity', 0)),
+                                    tank.get('unit_price', 0.0), tank.get('total_price', 0.0))
+            )
+        return rows
+
+    def _cylindrical_rows(self):
+        gen = self.generator
+        rows = []
+        sl_no = len(gen.dismantling_tanks) + 1
+        for tank in gen.cylindrical_tanks:
+            rows.append(self._full_width_row(tank.get('tank_name', '').upper(), spacing=SPACING_COMPACT))
+
+            material = tank.get('material', 'PVC').upper()
+            orientation = tank.get('orientation', 'Vertical').upper()
+            layers = tank.get('layers', None)
+            ground_location = tank.get('ground_location', 'Above Ground')
+            capacity = tank.get('capacity', 0.0)
+            size_str = tank.get('size', '')
+            warranty = '1 YEAR' if material == 'GRP' else '3 YEAR'
+
+            is_above = (ground_location or 'Above Ground').strip().lower() != 'below ground'
+            if is_above:
+                above_text = f"ABOVE GROUND-{layers} LAYER" if layers else "ABOVE GROUND"
+            else:
+                above_text = f"BELOW GROUND-{layers} LAYER" if layers else "BELOW GROUND"
+            paragraphs = [paragraph_xml([run_xml(""), run_xml(above_text, bold=True, underline=True)],
+                                        style=QUOTE_BODY, tabs=CYLINDRICAL_TABS)]
+
+            type_str = f"{material} \u2013 {('VERTICAL' if orientation == 'VERTICAL' else 'HORIZONTAL')}"
+            gal_label = gen.gallon_type if gen.gallon_type else "USG"
+            for label, value in (("TYPE", type_str),
+                                 ("WARRANTY", warranty),
+                                 ("CAPACITY", f"{int(capacity)} {gal_label}"),
+                                 ("SIZE", size_str if size_str else "N/A")):
+                paragraphs.append(paragraph_xml([run_xml(f"{label}\t:\t{value}", bold=True)],
+                                                style=QUOTE_BODY, tabs=CYLINDRICAL_TABS,
+                                                hanging=CYLINDRICAL_TABS[1]))
+
+            rows.append(
+                [text_cell(str(sl_no), align='center', props=V_ALIGN_CENTER), Cell(paragraphs)]
+                + self._price_cells(tank.get('unit', ''), format_quantity(tank.get('quantity', 0)),
+                                    tank.get('unit_price', 0.0), tank.get('total_price', 0.0))
+            )
+            sl_no += 1
+        return rows
+
+    # ── panel tanks ──
+
+    def _common_row(self):
+        return self._full_width_row(self.generator._common_row_text(), style=QUOTE_BODY)
+
+    def _tank_rows(self):
+        gen = self.generator
+        # SL. NO. cells of a tank's options are merged vertically
+        option_counts = {}
+        for tank in gen.tanks:
+            option_counts[tank['sl_no']] = option_counts.get(tank['sl_no'], 0) + 1
+
+        rows = []
+        previous_sl_no = None
+        for tank in gen.tanks:
+            sl_no = tank['sl_no']
+            if option_counts[sl_no] == 1:
+                v_merge = None
+            elif sl_no != previous_sl_no:
+                v_merge = 'restart'
+            else:
+                v_merge = 'continue'
+            previous_sl_no = sl_no
+
+            if tank.get('option_number', 1) == 1:
+                sl_cell = text_cell(str(sl_no), align='center', props=V_ALIGN_CENTER)
+            else:
+                sl_cell = Cell()
+            sl_cell.v_merge = v_merge
+
+            qty = tank.get("qty", 0) or 0
+            rows.append(
+                [sl_cell, Cell(self._tank_description(tank))]
+                + self._price_cells(tank.get("unit", "") or "", format_quantity(qty) if qty else "",
+                                    tank.get('unit_price', 0.0) or 0.0, tank.get('total_price', 0.0) or 0.0)
+            )
+        return rows
+
+    def _tank_description(self, tank):
+        """ITEM DESCRIPTION paragraphs of a panel tank row (mirrors _fill_tank_row)"""
+        gen = self.generator
+        table_context = gen._get_table_context()
+        common_types = table_context["common_types"]
+        common_support = table_context["common_support"]
+
+        runs = [run_xml("")]
+        option_total = tank.get('option_total', 1)
+        option_roman = tank.get('option_roman', '')
+        if option_total > 1:
+            if common_support is None:
+                support_text = gen._get_support_system_text(tank.get('support_system', 'Internal'))
+                runs.append(run_xml(f"OPTION {option_roman} - {support_text}\n", bold=True))
+            else:
+                runs.append(run_xml(f"OPTION {option_roman}\n", bold=True))
+        elif common_support is None:
+            support_text = gen._get_support_system_text(tank.get('support_system', 'Internal'))
+            runs.append(run_xml(f"{support_text}\n", bold=True))
+
+        tank_name = (tank.get('name', '') or '').upper()
+        tank_skid = (tank.get('skid', '') or '').upper()
+        if tank_name:
+            partition_status = " (WITH PARTITION)" if tank.get('partition', False) else ""
+            if tank_skid and "skid" not in common_types:
+                for text in (tank_name + partition_status, " (", tank_skid, ")"):
+                    runs.append(run_xml(text, bold=True, underline=True))
+            else:
+                runs.append(run_xml(tank_name + partition_status, bold=True, underline=True))
+        elif tank_skid and "skid" not in common_types:
+            runs.append(run_xml(tank_skid, bold=True))
+        paragraphs = [paragraph_xml(runs, style=QUOTE_BODY, tabs=DESC_TABS)]
+
+        tank_type = (tank.get('type', '') or '').upper()
+        if "type" not in common_types and tank_type:
+            paragraphs.append(paragraph_xml([run_xml(f"Type\t:\t{tank_type}", bold=True)],
+                                            style=QUOTE_BODY, tabs=DESC_TABS,
+                                            hanging=DESC_TABS[1]))
+
+        def format_decimal(val):
+            try:
+                return f"{float(val):.1f}"
+            except Exception:
+                return str(val)
+
+        length_display = format_decimal(tank.get('length_display', '') or str(tank.get('length', '') or ''))
+        width_display = format_decimal(tank.get('width_display', '') or str(tank.get('width', '') or ''))
+        height_display = format_decimal(tank.get('height', '') or '')
+
+        runs = []
+        if length_display or width_display or height_display:
+            runs.append(run_xml(f"SIZE\t:\t{length_display} M (L) X {width_display} M (W) X {height_display} M (H)\n",
+                                bold=True))
+        volume_m3 = tank.get('volume_m3', 0.0) or 0.0
+        gallons = tank.get('gallons', 0.0) or 0.0
+        if volume_m3 > 0:
+            capacity_text = f"TOTAL CAPACITY\t:\t{volume_m3:.2f} M³ ({gallons:.0f} {gen.gallon_type})"
+            need_free_board = tank.get('need_free_board', False)
+            if need_free_board:
+                capacity_text += "\n"
+            runs.append(run_xml(capacity_text, bold=True))
+            if need_free_board:
+                net_volume_m3 = tank.get('net_volume_m3', volume_m3)
+                if gen.gallon_type == "USG":
+                    net_volume_gallons = net_volume_m3 * 264.172
+                else:
+                    net_volume_gallons = net_volume_m3 * 219.969
+                runs.append(run_xml(f"NET VOLUME\t:\t{net_volume_m3:.2f} M³ ({net_volume_gallons:.0f} {gen.gallon_type})\n",
+                                    bold=True))
+                free_board_m = tank.get('free_board', 0.3)
+                free_board_cm = free_board_m * 100
+                runs.append(run_xml(f"FREE BOARD\t:\t{free_board_cm:.0f} CM ({free_board_m:.1f} M)", bold=True))
+        paragraphs.append(paragraph_xml(runs, style=QUOTE_BODY, tabs=DESC_TABS))
+        return paragraphs
+
+    # ── totals ──
+
+    def _footer_rows(self):
+        gen = self.generator
+        subtotal = gen._get_combined_subtotal()
+        vat = subtotal * 0.05
+        grand_total = subtotal + vat
+        totals = []
+        if getattr(gen, 'show_sub_total', True):
+            label = 'DISCOUNTED SUB TOTAL:' if getattr(gen, 'has_discount', False) else 'SUB TOTAL:'
+            totals.append((label, subtotal))
+        if getattr(gen, 'show_vat', True):
+            totals.append(('VAT 5%:', vat))
+        if getattr(gen, 'show_grand_total', True):
+            totals.append(('GRAND TOTAL:', grand_total))
+
+        rows = []
+        for i, (label, amount) in enumerate(totals):
+            # SL. NO. + ITEM DESCRIPTION merged across all footer rows, borderless left/bottom
+            if i == 0:
+                blank = Cell(span=2, v_merge='restart' if len(totals) > 1 else None, props=FOOTER_BORDERS)
+            else:
+                blank = Cell(span=2, v_merge='continue')
+            label_cell = Cell([paragraph_xml([run_xml(label, bold=True)], spacing=SPACING_AFTER, align='left')],
+                              span=2)
+            rows.append([
+                blank,
+                label_cell,
+                Cell([paragraph_xml([run_xml(""), run_xml('AED', bold=True)], spacing=SPACING_AFTER, align='center')]),
+                Cell([paragraph_xml([run_xml(""), run_xml(f'{amount:,.2f}', bold=True)], spacing=SPACING_AFTER,
+                                    align='right')]),
+            ])
+        return rows
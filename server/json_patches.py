@@ -0,0 +1,200 @@
+"""JSON Patch (RFC 6902) and JSON Merge Patch (RFC 7386) for partial quotation updates"""
+import copy
+
+
+class JsonPatchError(ValueError):
+    """The patch is malformed or does not apply to the document"""
+
+
+class JsonPatchTestFailed(JsonPatchError):
+    """A "test" operation did not match (the document changed since the client read it)"""
+
+
+def merge_patch(target, patch):
+    """RFC 7386: objects are merged member by member, null removes a member, anything else replaces"""
+    if not isinstance(patch, dict):
+        return copy.deepcopy(patch)
+    result = dict(target) if isinstance(target, dict) else {}
+    for key, value in patch.items():
+        if value is None:
+            result.pop(key, None)
+        else:
+            result[key] = merge_patch(result.get(key), value)
+    return result
+
+
+def parse_pointer(pointer):
+    """RFC 6901 JSON Pointer ("/tanks/0/length") -> list of reference tokens"""
+    if not isinstance(pointer, str) or (pointer and not pointer.startswith("/")):
+        raise JsonPatchError(f"Invalid JSON pointer: {pointer!r}")
+    if not pointer:
+        return []
+    return [token.replace("~1", "/").replace("~0", "~") for token in pointer[1:].split("/")]
+
+
+def _array_index(container, token, pointer, allow_end=False):
+    if allow_end and token == "-":
+        return len(container)
+    if not token.isdigit() or (len(token) > 1 and token.startswith("0")):
+        raise JsonPatchError(f"Invalid array index {token!r} in {pointer}")
+    index = int(token)
+    if index > len(container) or (index == len(container) and not allow_end):
+        raise JsonPatchError(f"Array index {index} out of range in {pointer}")
+    return index
+
+
+def _resolve(document, tokens, pointer):
+    value = document
+    for token in tokens:
+        if isinstance(value, dict):
+            if token not in value:
+                raise JsonPatchError(f"Path not found: {pointer}")
+            value = value[token]
+        elif isinstance(value, list):
+            value = value[_array_index(value, token, pointer)]
+        else:
+            raise JsonPatchError(f"Path not found: {pointer}")
+    return value
+
+
+def _add(document, tokens, value, pointer):
+    if not tokens:
+        return value
+    parent = _resolve(document, tokens[:-1], pointer)
+    if isinstance(parent, dict):
+        parent[tokens[-1]] = value
+    elif isinstance(parent, list):
+        parent.insert(_array_index(parent, tokens[-1], pointer, allow_end=True), value)
+    else:
+        raise JsonPatchError(f"Path not found: {pointer}")
+    return document
+
+
+def _remove(document, tokens, pointer):
+    if not tokens:
+        raise JsonPatchError("Cannot remove the whole document")
+    parent = _resolve(document, tokens[:-1], pointer)
+    if isinstance(parent, dict):
+        if tokens[-1] not in parent:
+            raise JsonPatchError(f"Path not found: {pointer}")
+        return parent.pop(tokens[-1])
+    if isinstance(parent, list):
+        return parent.pop(_array_index(parent, tokens[-1], pointer))
+    raise JsonPatchError(f"Path not found: {pointer}")
+
+
+def apply_json_patch(document, operations):
+    """
+    RFC 6902: apply add / remove / replace / move / copy / test in order to
+    a copy of document. All or nothing: the first failing operation raises.
+    """
+    if not isinstance(operations, list):
+        raise JsonPatchError("A JSON Patch is an array of operations")
+    document = copy.deepcopy(document)
+    for operation in operations:
+        if not isinstance(operation, dict) or "op" not in operation or "path" not in operation:
+            raise JsonPatchError(f"Invalid operation: {operation!r}")
+        op, pointer = operation["op"], operation["path"]
+        tokens = parse_pointer(pointer)
+        if op in ("add", "replace", "test") and "value" not in operation:
+            raise JsonPatchError(f"'{op}' needs a value: {pointer}")
+        if op == "add":
+            document = _add(document, tokens, copy.deepcopy(operation["value"]), pointer)
+        elif op == "remove":
+            _remove(document, tokens, pointer)
+        elif op == "replace":
+            _resolve(document, tokens, pointer)  # must exist
+            if tokens:
+                _remove(document, tokens, pointer)
+            document = _add(document, tokens, copy.deepcopy(operation["value"]), pointer)
+        elif op in ("move", "copy"):
+            source = operation.get("from")
+            source_tokens = parse_pointer(source)
+            if op == "move" and tokens[:len(source_tokens)] == source_tokens and tokens != source_tokens:
+                raise JsonPatchError(f"Cannot move {source} into itself")
+            if op == "move":
+                value = _remove(document, source_tokens, source)
+            else:
+                value = copy.deepcopy(_resolve(document, source_tokens, source))
+            document = _add(document, tokens, value, pointer)
+        elif op == "test":
+            if _resolve(document, tokens, pointer) != operation["value"]:
+                raise JsonPatchTestFailed(f"Test failed at {pointer}")
+        else:
+            raise JsonPatchError(f"Unknown operation: {op!r}")
+    return document
+
+
+def patched_members(patch):
+    """Top-level members of the document a merge patch or JSON Patch touches"""
+    if isinstance(patch, dict):
+        return set(patch)
+    members = set()
+    for operation in patch if isinstance(patch, list) else []:
+        for key in ("path", "from"):
+            if isinstance(operation, dict) and key in operation:
+                tokens = parse_pointer(operation[key])
+                members.add(tokens[0] if tokens else "")
+    return members
+
+
+def apply_patch(document, patch):
+    """Merge patch when patch is an object, JSON Patch when it is an array of operations"""
+    if isinstance(patch, list):
+        return apply_json_patch(document, patch)
+    if isinstance(patch, dict):
+        return merge_patch(document, patch)
+    raise JsonPatchError("Patch must be a merge patch object or an array of JSON Patch operations")
+
+
+def _escape(token):
+    return str(token).replace("~", "~0").replace("/", "~1")
+
+
+def json_equal(a, b):
+    """Equal as JSON: unlike ==, 1 and true (or 1 and 1.0) differ"""
+    if type(a) is not type(b):
+        return False
+    if isinstance(a, dict):
+        return a.keys() == b.keys() and all(json_equal(a[key], b[key]) for key in a)
+    if isinstance(a, list):
+        return len(a) == len(b) and all(json_equal(x, y) for x, y in zip(a, b))
+    return a == b
+
+
+def diff_json(source, target, path=""):
+    """
+    JSON Patch that turns source into target. Objects are compared member by
+    member; arrays keep their common start and end, and the items between
+    are diffed in place, then removed or added.
+    """
+    if json_equal(source, target):
+        return []
+    if isinstance(source, dict) and isinstance(target, dict):
+        operations = [{"op": "remove", "path": f"{path}/{_escape(key)}"} for key in source if key not in target]
+        for key, value in target.items():
+            if key in source:
+                operations.extend(diff_json(source[key], value, f"{path}/{_escape(key)}"))
+            else:
+                operations.append({"op": "add", "path": f"{path}/{_escape(key)}", "value": copy.deepcopy(value)})
+        return operations
+    if isinstance(source, list) and isinstance(target, list):
+        shortest = min(len(source), len(target))
+        start = 0
+        while start < shortest and json_equal(source[start], target[start]):
+            start += 1
+        end = 0
+        while end < shortest - start and json_equal(source[-1 - end], target[-1 - end]):
+            end += 1
+        old_items = source[start:len(source) - end]
+        new_items = target[start:len(target) - end]
+        common = min(len(old_items), len(new_items))
+        operations = []
+        for index in range(common):
+            operations.extend(diff_json(old_items[index], new_items[index], f"{path}/{start + index}"))
+        for index in range(len(old_items) - 1, common - 1, -1):
+            operations.append({"op": "remove", "path": f"{path}/{start + index}"})
+        for index in range(common, len(new_items)):
+            operations.append({"op": "add", "path": f"{path}/{start + index}", "value": copy.deepcopy(new_items[index])})
+        return operations
+    return [{"op": "replace", "path": path, "value": copy.deepcopy(target)}]
@@ -1,6 +1,6 @@
 """SQLModel database models for quotation system"""
 from sqlmodel import SQLModel, Field, Relationship, Column
-from sqlalchemy import JSON
+from sqlalchemy import JSON, Computed, Text, UniqueConstraint
 from typing import Optional, List, Dict, Any
 from datetime import datetime, date
 from decimal import Decimal
@@ -108,6 +108,9 @@ class CompanyDetails(SQLModel, table=True):
 class RecipientDetails(SQLModel, table=True):
     """Recipient details table"""
     __tablename__ = "recipient_details"
+    # save-quotation upserts recipients on this key (a NULL company counts as one value)
+    __table_args__ = (UniqueConstraint("recipient_name", "to_company_name", name="unique_recipient_per_company",
+                                       postgresql_nulls_not_distinct=True),)
     
     id: Optional[int] = Field(default=None, primary_key=True)
     recipient_title: str = Field(default="Mr.")
@@ -124,6 +127,8 @@ class RecipientDetails(SQLModel, table=True):
 class QuotationWebpageInputDetailsSave(SQLModel, table=True):
     """Main quotation webpage input details save table"""
     __tablename__ = "quotation_webpage_input_details_save"
+    # save-quotation upserts quotations on this key
+    __table_args__ = (UniqueConstraint("company_id", "quotation_number", "revision_number", name="unique_quote_per_company"),)
     
     id: Optional[int] = Field(default=None, primary_key=True)
     quotation_number: str
@@ -149,8 +154,38 @@ class QuotationWebpageInputDetailsSave(SQLModel, table=True):
     status: str = Field(default="draft")
     revision_number: int = Field(default=0)
     revision: Optional[str] = None
+    # Revision stored as a JSON Patch of tanks_data/form_options/additional_data
+    # against a full revision (revision_deltas.py); both NULL when stored in full
+    delta_base_id: Optional[int] = Field(default=None, foreign_key="quotation_webpage_input_details_save.id", index=True)
+    revision_delta: Optional[List[Dict[str, Any]]] = Field(default=None, sa_column=Column(JSON))
     created_time: datetime = Field(default_factory=datetime.utcnow)
     last_updated_time: datetime = Field(default_factory=datetime.utcnow)
+    # Parts of full_main_quote_number (GRPPT/2512/MM/0324-R1), generated by the database
+    quote_company_code: Optional[str] = Field(default=None, sa_column=Column(
+        Text, Computed("upper(split_part(full_main_quote_number, '/', 1))", persisted=True)))
+    quote_yearmonth: Optional[str] = Field(default=None, sa_column=Column(
+        Text, Computed("split_part(full_main_quote_number, '/', 2)", persisted=True)))
+    quote_series: Optional[str] = Field(default=None, sa_column=Column(
+        Text, Computed("upper(split_part(full_main_quote_number, '/', 3))", persisted=True)))
+    quote_base_number: Optional[str] = Field(default=None, sa_column=Column(
+        Text, Computed("split_part(split_part(full_main_quote_number, '/', 4), '-', 1)", persisted=True)))
+
+
+class QuotationTankLine(SQLModel, table=True):
+    """One tank option of a saved quotation, normalized from tanks_data for search"""
+    __tablename__ = "quotation_tank_lines"
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    quotation_id: int = Field(foreign_key="quotation_webpage_input_details_save.id", index=True)
+    tank_number: int
+    option_number: int = Field(default=1)
+    tank_name: Optional[str] = None
+    tank_type: Optional[str] = None
+    support_system: Optional[str] = None
+    length: Optional[float] = Field(default=None, index=True)
+    width: Optional[float] = Field(default=None, index=True)
+    height: Optional[float] = Field(default=None, index=True)
+    quantity: Optional[int] = None
 
 
 class ContractualTermsSpecifications(SQLModel, table=True):
@@ -0,0 +1,88 @@
+"""Process-wide LRU cache of assembled quotation response payloads"""
+import threading
+from collections import OrderedDict
+
+from worker_pools import int_env
+
+
+# Upper bound on the encoded payloads kept in memory
+PAYLOAD_CACHE_MAX_BYTES = max(int_env("PAYLOAD_CACHE_MAX_BYTES", 64 * 1024 * 1024), 0)
+
+
+class PayloadCache:
+    """
+    Keeps encoded JSON response bodies, least recently used evicted first.
+
+    Keys are (kind, quotation id) and every entry remembers the version it
+    was built from (the last_updated_time of the quotation and of its
+    recipient, company, people, terms and delta base rows): a lookup with a
+    different version is a miss, so rows changed by another process or by
+    another quotation's save are never served stale. Saves also call
+    invalidate() so this process drops the entry straight away. The total
+    size of the stored bodies stays under max_bytes.
+    """
+
+    def __init__(self, max_bytes=PAYLOAD_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # (kind, quotation id) -> (version, body bytes)
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, kind, quotation_id, version):
+        """Cached body for this quotation version, or None"""
+        key = (kind, quotation_id)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != version:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, kind, quotation_id, version, body):
+        key = (kind, quotation_id)
+        with self._lock:
+            self._discard(key)
+            if len(body) > self.max_bytes:
+                return
+            self._entries[key] = (version, body)
+            self._size += len(body)
+            while self._size > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+                self.evictions += 1
+
+    def invalidate(self, quotation_id):
+        """Drop every cached payload of one quotation"""
+        with self._lock:
+            for key in [key for key in self._entries if key[1] == quotation_id]:
+                self._discard(key)
+
+    def _discard(self, key):
+        # Callers hold self._lock
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._size -= len(entry[1])
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._size,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+payload_cache = PayloadCache()
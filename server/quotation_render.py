@@ -0,0 +1,396 @@
+"""Render a quotation request into .docx bytes (runs inside the generation pool)"""
+from typing import List
+
+from quotation_request import QuotationRequest
+from user_input_tank_generator import TankInvoiceGenerator
+
+
+def apply_recipient(generator: TankInvoiceGenerator, request: QuotationRequest, plan: dict):
+    """Set the recipient-specific header fields: "To." block, quote number and date"""
+    # Add role to recipient name with hyphen if role is provided
+    recipient_name_with_role = request.recipientName
+    if request.role and request.role.strip():
+        recipient_name_with_role = f"{request.recipientName} - {request.role}"
+    generator.recipient_name = recipient_name_with_role
+    
+    # Add M/S. prefix to company name
+    company_name_with_prefix = f"M/s. {request.companyName}"
+    generator.recipient_company = company_name_with_prefix
+    generator.recipient_location = request.location or ""
+    # Add PHONE: and EMAIL: prefixes with uppercase
+    generator.recipient_phone = f"{request.phoneNumber}" if request.phoneNumber and request.phoneNumber.strip() else ""
+    generator.recipient_email = f"{request.email}" if request.email and request.email.strip() else ""
+    generator.quote_date = request.quotationDate
+    generator.quote_number = plan['quote_number']
+
+
+def build_generator(request: QuotationRequest, plan: dict) -> TankInvoiceGenerator:
+    """
+    Fill a TankInvoiceGenerator from the request and the values resolved
+    by plan_quotation() (template_path, table_engine, quote_number and
+    signature). Does not touch the database.
+    """
+    # Initialize generator
+    generator = TankInvoiceGenerator(template_path=plan['template_path'])
+    generator.table_engine = plan['table_engine']
+    
+    # Set header data
+    apply_recipient(generator, request, plan)
+    generator.subject = request.subject
+    generator.project = request.projectLocation
+    # Include additional details even with empty/null values (use empty strings for null)
+    generator.additional_details = [
+        (detail.key or "", detail.value or "") 
+        for detail in request.additionalDetails
+    ] if request.additionalDetails else []
+    generator.gallon_type = request.gallonType if request.gallonType else "USG"
+    
+    # Set company full name from frontend (for "Yours truly" and NOTE sections)
+    generator.company_full_name = request.fromCompany
+    # Set company short name from frontend (for tank description)
+    generator.company_short_name = request.companyShortName if request.companyShortName else None
+    
+    # Process tanks data - convert from UI format to generator format
+    generator.tanks = []
+    # SL.NO must be continuous across all sections: dismantling (1..) → cylindrical → panel
+    sl_no = len(request.dismantlingTanks or []) + len(request.cylindricalTanks or []) + 1
+    
+    # Roman numeral conversion helper
+    def to_roman(num):
+        val = [1000, 900, 500, 400, 100, 90, 50, 40, 10, 9, 5, 4, 1]
+        syms = ['M', 'CM', 'D', 'CD', 'C', 'XC', 'L', 'XL', 'X', 'IX', 'V', 'IV', 'I']
+        roman_num = ''
+        i = 0
+        while num > 0:
+            for _ in range(num // val[i]):
+                roman_num += syms[i]
+                num -= val[i]
+            i += 1
+        return roman_num
+    
+    for tank_data in request.tanks:
+        num_options = len(tank_data.options)
+        for option_idx, option in enumerate(tank_data.options):
+            # Parse dimensions - Allow null/empty values
+            def parse_dimension(dim_str, field_name="dimension"):
+                """Parse dimension string, return None if empty/null"""
+                if not dim_str or str(dim_str).strip() == '' or str(dim_str).strip() == 'None':
+                    return None
+                dim_str = str(dim_str).strip().replace(" ", "")
+                if "(" in dim_str:
+                    return float(dim_str.split("(")[0])
+                try:
+                    return float(dim_str)
+                except ValueError:
+                    return None
+            
+            # Parse dimensions (can be None)
+            length = parse_dimension(option.length, "length")
+            width = parse_dimension(option.width, "width")
+            height = parse_dimension(option.height, "height")
+            
+            # Tank name is optional - no validation needed
+            
+            # Calculate volume (only if all dimensions are provided)
+            volume_m3 = 0.0
+            gallons = 0.0
+            if length and width and height:
+                volume_m3 = length * width * height
+                
+                # Calculate gallons
+                gallon_type_to_use = request.gallonType if request.gallonType else "USG"
+                if gallon_type_to_use == "USG":
+                    gallons = volume_m3 * 264.172
+                else:
+                    gallons = volume_m3 * 219.969
+            
+            # Handle free board - user inputs in cm, convert to meters
+            free_board_m = 0.3  # Default 30cm
+            need_free_board = option.needFreeBoard if option.needFreeBoard else False
+            if need_free_board and option.freeBoardSize:
+                try:
+                    free_board_cm = float(option.freeBoardSize)
+                    free_board_m = free_board_cm / 100.0  # Convert cm to meters
+                except ValueError:
+                    free_board_m = 0.3  # Default if conversion fails
+            
+            # Calculate net volume based on free board (only if dimensions exist)
+            net_volume_m3 = 0.0
+            if length and width and height:
+                net_volume_m3 = length * width * (height - free_board_m)
+            
+            # Determine skid based on height (only if height exists)
+            skid = ""
+            if height:
+                if 2.0 <= height <= 3.0:
+                    skid = "SKID BASE - HDG HOLLOW SECTION 50 X 50 X 3 MM (SQUARE TUBE)"
+                elif 1.0 <= height <= 1.5:
+                    skid = "WITHOUT SKID"
+                elif height > 3.0:
+                    skid = "SKID BASE - I BEAM SKID"
+            
+            # Calculate total price - use discounted price if discount is enabled
+            has_discount = option.hasDiscount if hasattr(option, 'hasDiscount') and option.hasDiscount else False
+            unit_price = float(option.unitPrice) if option.unitPrice else 0.0
+            quantity = float(option.quantity) if option.quantity else 0.0
+            
+            if has_discount and option.discountedTotalPrice:
+                total_price = float(option.discountedTotalPrice)
+            else:
+                total_price = quantity * unit_price
+            
+            tank = {
+                "sl_no": sl_no,
+                "name": option.tankName or "",
+                "partition": option.hasPartition,
+                "type": option.tankType or "",
+                "length": length if length else 0.0,
+                "length_display": option.length or "",
+                "width": width if width else 0.0,
+                "width_display": option.width or "",
+                "height": height if height else 0.0,
+                "volume_m3": volume_m3,
+                "gallons": gallons,
+                "free_board": free_board_m,
+                "need_free_board": need_free_board,
+                "net_volume_m3": net_volume_m3,
+                "net_height": (height - free_board_m) if height else 0.0,
+                "skid": skid,
+                "unit": option.unit or "",
+                "qty": quantity,
+                "unit_price": unit_price,
+                "total_price": total_price,
+                "option_number": option_idx + 1,
+                "option_total": num_options,
+                "option_roman": to_roman(option_idx + 1),
+                "support_system": option.supportSystem if hasattr(option, 'supportSystem') and option.supportSystem else "Internal",
+                "has_discount": has_discount
+            }
+            generator.tanks.append(tank)
+        
+        # Increment sl_no only after all options of this tank
+        sl_no += 1
+    
+    # ── Process Dismantling Tanks ──
+    generator.dismantling_tanks = []
+    for item in (request.dismantlingTanks or []):
+        unit_price = float(item.unitPrice) if item.unitPrice else 0.0
+        quantity   = float(item.quantity) if item.quantity else 0.0
+        if item.hasDiscount and item.discountedTotalPrice:
+            total_price = float(item.discountedTotalPrice)
+        else:
+            total_price = unit_price * quantity
+        generator.dismantling_tanks.append({
+            "tank_name":   item.tankName or "",
+            "length":      item.length or "",
+            "width":       item.width or "",
+            "height":      item.height or "",
+            "unit":        item.unit or "",
+            "quantity":    quantity,
+            "unit_price":  unit_price,
+            "total_price": total_price,
+            "has_discount": item.hasDiscount,
+        })
+
+    # ── Process Cylindrical Tanks ──
+    generator.cylindrical_tanks = []
+    gallon_type_for_cyl = request.gallonType if request.gallonType else "USG"
+    for item in (request.cylindricalTanks or []):
+        unit_price = float(item.unitPrice) if item.unitPrice else 0.0
+        quantity   = float(item.quantity) if item.quantity else 0.0
+        if item.hasDiscount and item.discountedTotalPrice:
+            total_price = float(item.discountedTotalPrice)
+        else:
+            total_price = unit_price * quantity
+        # Look up the size from the dimensions Excel
+        try:
+            size_str = generator.get_cylindrical_tank_size(
+                item.material, item.orientation, float(item.capacity)
+            )
+        except Exception:
+            size_str = "SIZE N/A"
+        generator.cylindrical_tanks.append({
+            "tank_name":      item.tankName or "",
+            "material":       item.material or "PVC",
+            "orientation":    item.orientation or "Vertical",
+            "layers":         int(item.layers) if item.layers else None,
+            "ground_location": item.groundLocation or "Above Ground",
+            "capacity":       float(item.capacity) if item.capacity else 0.0,
+            "size":           size_str,
+            "unit":           item.unit or "Nos",
+            "quantity":       quantity,
+            "unit_price":     unit_price,
+            "total_price":    total_price,
+            "has_discount":   item.hasDiscount,
+        })
+
+    # Calculate total pages (estimate based on tanks)
+    tanks_per_page = 3
+    total_item_count = len(generator.tanks) + len(generator.dismantling_tanks) + len(generator.cylindrical_tanks)
+    generator.total_pages = max(1, (total_item_count + tanks_per_page - 1) // tanks_per_page)
+    generator.quote_page = f"1/{generator.total_pages}"
+    
+    # Check if ladder is needed
+    generator.needs_ladder = any(float(tank.get('height', 0)) > 2.0 for tank in generator.tanks)
+    
+    # Check if any tank has discount enabled (across all sections)
+    generator.has_discount = (
+        any(tank.get('has_discount', False) for tank in generator.tanks) or
+        any(t.get('has_discount', False) for t in generator.dismantling_tanks) or
+        any(t.get('has_discount', False) for t in generator.cylindrical_tanks)
+    )
+    
+    # Set flags for showing totals
+    generator.show_sub_total = request.showSubTotal
+    generator.show_vat = request.showVat
+    generator.show_grand_total = request.showGrandTotal
+    
+    # Set sections configuration based on terms
+    generator.sections = {
+        'note': request.terms['note'].action == 'yes' if 'note' in request.terms else False,
+        'closing': True,  # Default closing paragraph
+        'signature': request.quotationFrom == 'Sales' or request.quotationFrom == 'Office',
+        'material_spec': request.terms['materialSpecification'].action == 'yes' if 'materialSpecification' in request.terms else False,
+        'warranty': request.terms['warrantyExclusions'].action == 'yes' if 'warrantyExclusions' in request.terms else False,
+        'terms': request.terms['termsConditions'].action == 'yes' if 'termsConditions' in request.terms else False,
+        'extra_note': request.terms['extraNote'].action == 'yes' if 'extraNote' in request.terms else True,  # Default to True
+        'supplier_scope': request.terms['supplierScope'].action == 'yes' if 'supplierScope' in request.terms else False,
+        'customer_scope': request.terms['customerScope'].action == 'yes' if 'customerScope' in request.terms else False,
+        'scope_of_work': request.terms['scopeOfWork'].action == 'yes' if 'scopeOfWork' in request.terms else False,
+        'work_excluded': request.terms['workExcluded'].action == 'yes' if 'workExcluded' in request.terms else False,
+        'final_note': False,  # Can be enabled if needed
+        'thank_you': True,
+    }
+    
+    # Set section content
+    generator.section_content = {}
+    
+    # NOTE section
+    if generator.sections['note']:
+        note_data = request.terms['note']
+        generator.section_content['note'] = note_data.details + note_data.custom
+    
+    # MATERIAL SPECIFICATION
+    if generator.sections['material_spec']:
+        mat_spec_data = request.terms['materialSpecification']
+        generator.section_content['material_spec'] = mat_spec_data.details + mat_spec_data.custom
+    
+    # WARRANTY
+    if generator.sections['warranty']:
+        warranty_data = request.terms['warrantyExclusions']
+        generator.section_content['warranty'] = warranty_data.details + warranty_data.custom
+    
+    # TERMS AND CONDITIONS
+    if generator.sections['terms']:
+        terms_data = request.terms['termsConditions']
+        # For terms, we need to format as dict for key-value terms
+        # and keep a list for plain custom terms without colons
+        terms_list = terms_data.details + terms_data.custom
+        print(f"  Terms & Conditions - Total entries: {len(terms_list)}")
+        print(f"    Default entries: {len(terms_data.details)}")
+        print(f"    Custom entries: {len(terms_data.custom)}")
+        if terms_data.custom:
+            print(f"    Custom entries content: {terms_data.custom}")
+        
+        generator.section_content['terms'] = {}
+        generator.section_content['terms_plain'] = []  # For custom terms without colons
+        
+        for idx, term in enumerate(terms_list):
+            if ':' in term:
+                key, value = term.split(':', 1)
+                key_clean = key.strip()
+                value_clean = value.strip()
+                generator.section_content['terms'][key_clean] = value_clean
+                print(f"      Added formatted term: '{key_clean}' = '{value_clean[:50]}...'")
+            else:
+                # Add plain custom terms to separate list
+                generator.section_content['terms_plain'].append(term.strip())
+                print(f"      Added plain term: {term[:50]}")
+        
+        print(f"    Final terms dict has {len(generator.section_content['terms'])} formatted entries")
+        print(f"    Final terms_plain list has {len(generator.section_content['terms_plain'])} plain entries")
+    
+    # EXTRA NOTE
+    if generator.sections['extra_note']:
+        if 'extraNote' in request.terms:
+            extra_note_data = request.terms['extraNote']
+            generator.section_content['extra_note'] = extra_note_data.details + extra_note_data.custom
+        else:
+            # Use default extra note content
+            company_name = generator._get_company_name()
+            generator.section_content['extra_note'] = [
+                "Any deviations from this quotation to suit the site's condition will have additional cost implications.",
+                "If the work is indefinitely delayed beyond 30 days after the delivery of materials due to the issues caused by the customer or site condition, the Company will not be liable for any damage to the supplied materials.",
+                "The submission of all related documents, including the warranty certificate, will be done upon receiving the final payment.",
+                "Any additional test / lab charges incurred from third parties / external agencies are under the scope of the contractor / client.",
+                f"Until receiving the final settlement from the client, {company_name} has reserved the right to use the supplied materials at the site.",
+                "The testing and commissioning should be completed within a period of 15 to 30 days from the installation completion date by the Contractor/Client.",
+                "For the net volume, a minimum of 30 cm freeboard area is to be calculated from the total height of the tank."
+            ]
+    
+    # SUPPLIER SCOPE
+    if generator.sections['supplier_scope']:
+        supplier_data = request.terms['supplierScope']
+        generator.section_content['supplier_scope'] = supplier_data.details + supplier_data.custom
+    
+    # CUSTOMER SCOPE
+    if generator.sections['customer_scope']:
+        customer_data = request.terms['customerScope']
+        generator.section_content['customer_scope'] = customer_data.details + customer_data.custom
+    
+    # SCOPE OF WORK
+    if generator.sections['scope_of_work']:
+        scope_of_work_data = request.terms['scopeOfWork']
+        generator.section_content['scope_of_work'] = scope_of_work_data.details + scope_of_work_data.custom
+    
+    # WORK EXCLUDED
+    if generator.sections['work_excluded']:
+        work_excluded_data = request.terms['workExcluded']
+        generator.section_content['work_excluded'] = work_excluded_data.details + work_excluded_data.custom
+    # Signature block details were looked up from the database in plan_quotation()
+    if generator.sections['signature'] and plan.get('signature'):
+        generator.section_content['signature'] = plan['signature']
+    
+    # Closing paragraph content
+    if generator.sections['closing']:
+        generator.section_content['closing'] = (
+            "We hope the above offer meets your requirements and awaiting the valuable order confirmation.\n"
+            "If you have any questions concerning the offer, please contact the undersigned."
+        )
+    
+    # DEBUG: Check section_content right before document generation
+    print(f"\n{'='*60}")
+    print(f"FINAL CHECK BEFORE DOCUMENT GENERATION")
+    print(f"{'='*60}")
+    if 'terms' in generator.section_content:
+        print(f"  terms section exists: {len(generator.section_content['terms'])} entries")
+        for key, val in generator.section_content['terms'].items():
+            print(f"    - {key}: {val[:40]}...")
+    else:
+        print(f"  ⚠️  NO TERMS in section_content!")
+    print(f"{'='*60}\n")
+    
+    # Generate the document
+    generator.create_invoice_table()
+    return generator
+
+
+def render_quotation(request: QuotationRequest, plan: dict) -> bytes:
+    """Build the quotation document and return it as .docx bytes"""
+    generator = build_generator(request, plan)
+    return generator.save_to_stream().getvalue()
+
+
+def render_quotation_fanout(requests: List[QuotationRequest], plans: List[dict]) -> List[bytes]:
+    """
+    Render one quotation body for several recipients. The first document
+    is built in full; for each further recipient only the "To." table and
+    the header quote box are rebuilt before packaging again.
+    """
+    generator = build_generator(requests[0], plans[0])
+    documents = [generator.save_to_stream().getvalue()]
+    for request, plan in zip(requests[1:], plans[1:]):
+        apply_recipient(generator, request, plan)
+        generator.rerender_recipient_blocks()
+        documents.append(generator.save_to_stream().getvalue())
+    return documents
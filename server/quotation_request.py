@@ -0,0 +1,124 @@
+"""Request schema for quotation generation (importable by generation worker processes)"""
+from typing import List, Optional, Dict
+
+from pydantic import BaseModel
+
+from invoice_table_xml import DEFAULT_TABLE_ENGINE
+
+
+class TankOption(BaseModel):
+    tankName: str
+    quantity: int
+    hasPartition: bool
+    tankType: str
+    length: str
+    width: str
+    height: str
+    unit: str
+    unitPrice: str
+    needFreeBoard: Optional[bool] = False
+    freeBoardSize: Optional[str] = ""
+    supportSystem: Optional[str] = "Internal"  # "Internal" or "External"
+    hasDiscount: Optional[bool] = False
+    discountedTotalPrice: Optional[str] = ""
+
+
+class TankData(BaseModel):
+    tankNumber: int
+    optionEnabled: bool
+    optionNumbers: int
+    options: List[TankOption]
+
+
+class DismantlingTankItem(BaseModel):
+    tankName: str
+    length: str = ""
+    width: str = ""
+    height: str = ""
+    unit: str = ""
+    quantity: float = 1
+    unitPrice: float = 0.0
+    hasDiscount: bool = False
+    discountedTotalPrice: str = ""
+
+
+class CylindricalTankItem(BaseModel):
+    tankName: str
+    material: str        # "PVC" or "GRP"
+    layers: Optional[int] = None
+    groundLocation: Optional[str] = "Above Ground"  # "Above Ground" or "Below Ground"
+    orientation: str     # "Horizontal" or "Vertical"
+    capacity: float      # in US Gallons (or selected gallon type)
+    unit: str = "Nos"
+    quantity: float = 1
+    unitPrice: float = 0.0
+    hasDiscount: bool = False
+    discountedTotalPrice: str = ""
+
+
+
+class TermSection(BaseModel):
+    action: str
+    details: List[str]
+    custom: List[str]
+
+class AdditionalDetail(BaseModel):
+    key: str
+    value: str
+
+class QuotationRequest(BaseModel):
+    fromCompany: str
+    companyCode: Optional[str] = ""
+    companyShortName: Optional[str] = ""  # company_name from company_details.xlsx
+    templatePath: Optional[str] = ""
+    recipientTitle: str
+    recipientName: str
+    role: Optional[str] = ""
+    companyName: str
+    location: Optional[str] = ""
+    phoneNumber: Optional[str] = ""
+    email: Optional[str] = ""
+    quotationDate: str
+    quotationFrom: str
+    salesPersonName: Optional[str] = ""
+    officePersonName: Optional[str] = ""
+    quotationNumber: str
+    revisionNumber: int = 0
+    subject: str
+    projectLocation: str
+    generatedBy: Optional[str] = ""
+    additionalDetails: Optional[List[AdditionalDetail]] = []
+    gallonType: Optional[str] = "USG"
+    numberOfTanks: int
+    showSubTotal: bool
+    showVat: bool
+    showGrandTotal: bool
+    tanks: List[TankData]
+    dismantlingTanks: Optional[List[DismantlingTankItem]] = []
+    cylindricalTanks: Optional[List[CylindricalTankItem]] = []
+    terms: Dict[str, TermSection]
+    tableEngine: Optional[str] = DEFAULT_TABLE_ENGINE  # "docx" or "lxml" (see invoice_table_xml.py)
+
+
+class FanoutRecipient(BaseModel):
+    recipientTitle: Optional[str] = ""
+    recipientName: str
+    role: Optional[str] = ""
+    companyName: str
+    location: Optional[str] = ""
+    phoneNumber: Optional[str] = ""
+    email: Optional[str] = ""
+    quotationNumber: str  # each recipient gets its own quote number / file
+    revisionNumber: int = 0
+
+
+class FanoutQuotationRequest(BaseModel):
+    quotation: QuotationRequest  # shared body; its own recipient fields are replaced
+    recipients: List[FanoutRecipient]
+
+    def recipient_requests(self) -> List[QuotationRequest]:
+        """One full QuotationRequest per recipient"""
+        return [
+            self.quotation.model_copy(update=recipient.model_dump())
+            for recipient in self.recipients
+        ]
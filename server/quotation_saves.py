@@ -0,0 +1,77 @@
+"""The rows /api/save-quotation writes: recipient, quotation, contractual terms and tank lines"""
+from sqlalchemy import cast, column, delete, insert, select, values
+
+from models import QuotationTankLine
+from tank_lines import write_tank_lines
+from upserts import supports_writable_ctes, upsert, upsert_statement
+
+
+# Conflict keys (unique constraints) and the columns a save overwrites
+RECIPIENT_KEY = ("recipient_name", "to_company_name")
+RECIPIENT_UPDATES = ("recipient_title", "role_of_recipient", "to_company_location", "phone_number", "email",
+                     "last_updated_time")
+QUOTATION_KEY = ("company_id", "quotation_number", "revision_number")
+QUOTATION_UPDATES = (
+    "full_main_quote_number", "final_doc_file_path", "recipient_id", "sales_person_id",
+    "project_manager_id", "quotation_date", "subject", "project_location", "generated_by",
+    "tanks_data", "form_options", "additional_data", "delta_base_id", "revision_delta",
+    "subtotal", "discount_percentage", "discount_amount", "tax_percentage", "tax_amount", "total_amount",
+    "status", "last_updated_time"
+)
+TERMS_KEY = ("full_main_quote_number",)
+
+
+def write_quotation(session, recipient, quotation, tank_lines, terms=None, terms_updates=()):
+    """
+    Upsert recipient, then quotation with its recipient_id, then terms when
+    given (updating terms_updates), and replace the quotation's tank lines
+    with tank_lines (from tank_lines_from_data()). Returns (recipient,
+    quotation, terms or None) as stored, each with `inserted`; the caller
+    commits.
+
+    On PostgreSQL all of it is one statement, the writes chained as WITH
+    CTEs; other databases get one statement per write.
+    """
+    if not supports_writable_ctes(session):
+        saved_recipient = upsert(session, recipient, RECIPIENT_KEY, RECIPIENT_UPDATES)
+        quotation.recipient_id = saved_recipient.id
+        saved_quotation = upsert(session, quotation, QUOTATION_KEY, QUOTATION_UPDATES)
+        saved_terms = upsert(session, terms, TERMS_KEY, terms_updates) if terms is not None else None
+        write_tank_lines(session, saved_quotation.id, tank_lines)
+        return saved_recipient, saved_quotation, saved_terms
+
+    saved = [upsert_statement(session, recipient, RECIPIENT_KEY, RECIPIENT_UPDATES).cte("saved_recipient")]
+    saved.append(upsert_statement(session, quotation, QUOTATION_KEY, QUOTATION_UPDATES,
+                                  references={"recipient_id": saved[0].c.id}).cte("saved_quotation"))
+    joined = saved[0].join(saved[1], saved[1].c.recipient_id == saved[0].c.id)
+    if terms is not None:
+        saved.append(upsert_statement(session, terms, TERMS_KEY, terms_updates).cte("saved_terms"))
+        joined = joined.join(saved[2], saved[2].c.full_main_quote_number == saved[1].c.full_main_quote_number)
+
+    # The DELETE sees only the lines stored before this statement, never the new ones
+    lines = QuotationTankLine.__table__
+    quotation_id = select(saved[1].c.id).scalar_subquery()
+    tank_line_writes = [delete(lines).where(lines.c.quotation_id == quotation_id).cte("deleted_tank_lines")]
+    if tank_lines:
+        names = list(tank_lines[0])
+        rows = values(*(column(name, lines.c[name].type) for name in names), name="new_tank_lines").data(
+            [tuple(line[name] for name in names) for line in tank_lines])
+        tank_line_writes.append(insert(lines).from_select(
+            ["quotation_id", *names],
+            select(quotation_id, *(cast(rows.c[name], lines.c[name].type) for name in names)),
+        ).cte("inserted_tank_lines"))
+
+    statement = select(*(
+        result.c[name].label(f"{result.name}_{name}") for result in saved for name in result.c.keys()
+    )).select_from(joined).add_cte(*tank_line_writes)
+    row = session.execute(statement).one()._mapping
+    stored = [
+        _StoredRow({name: row[f"{result.name}_{name}"] for name in result.c.keys()})
+        for result in saved
+    ]
+    return stored[0], stored[1], stored[2] if terms is not None else None
+
+
+class _StoredRow(dict):
+    """Columns returned for one written row, read as attributes like a result row"""
+    __getattr__ = dict.__getitem__
@@ -0,0 +1,80 @@
+"""Named styles injected into every quotation template"""
+from docx.oxml import parse_xml
+from docx.oxml.ns import nsdecls, qn
+
+
+# Character styles: every quotation run is Calibri 10pt, optionally bold
+QUOTE_TEXT = 'QuoteText'
+QUOTE_BOLD = 'QuoteBold'
+
+# Paragraph styles. They carry spacing/indentation only and no run
+# properties, so paragraph marks keep the template's Normal font.
+QUOTE_BODY = 'QuoteBody'                        # single-spaced, no space before/after
+QUOTE_TABLE_HEADER = 'QuoteTableHeader'         # QuoteBody, centred
+QUOTE_SECTION_HEADING = 'QuoteSectionHeading'   # 6pt after
+QUOTE_BULLET = 'QuoteBullet'                    # ➢ items under a section heading
+
+QUOTE_TABLE = 'QuoteTable'
+
+_BORDERS = (
+    '<w:tblBorders>'
+    '<w:top w:val="single" w:sz="4" w:space="0" w:color="000000"/>'
+    '<w:left w:val="single" w:sz="4" w:space="0" w:color="000000"/>'
+    '<w:bottom w:val="single" w:sz="4" w:space="0" w:color="000000"/>'
+    '<w:right w:val="single" w:sz="4" w:space="0" w:color="000000"/>'
+    '<w:insideH w:val="single" w:sz="4" w:space="0" w:color="000000"/>'
+    '<w:insideV w:val="single" w:sz="4" w:space="0" w:color="000000"/>'
+    '</w:tblBorders>'
+)
+
+_STYLES = [
+    ('<w:style %s w:type="character" w:customStyle="1" w:styleId="QuoteText">'
+     '<w:name w:val="Quote Text"/><w:rPr><w:rFonts w:ascii="Calibri" w:hAnsi="Calibri"/>'
+     '<w:sz w:val="20"/></w:rPr></w:style>'),
+    ('<w:style %s w:type="character" w:customStyle="1" w:styleId="QuoteBold">'
+     '<w:name w:val="Quote Bold"/><w:basedOn w:val="QuoteText"/><w:rPr><w:b/></w:rPr></w:style>'),
+    ('<w:style %s w:type="paragraph" w:customStyle="1" w:styleId="QuoteBody">'
+     '<w:name w:val="Quote Body"/><w:basedOn w:val="{normal}"/>'
+     '<w:pPr><w:spacing w:before="0" w:after="0" w:line="240" w:lineRule="auto"/></w:pPr></w:style>'),
+    ('<w:style %s w:type="paragraph" w:customStyle="1" w:styleId="QuoteTableHeader">'
+     '<w:name w:val="Quote Table Header"/><w:basedOn w:val="QuoteBody"/>'
+     '<w:pPr><w:jc w:val="center"/></w:pPr></w:style>'),
+    ('<w:style %s w:type="paragraph" w:customStyle="1" w:styleId="QuoteSectionHeading">'
+     '<w:name w:val="Quote Section Heading"/><w:basedOn w:val="{normal}"/>'
+     '<w:pPr><w:spacing w:before="0" w:after="120"/></w:pPr></w:style>'),
+    ('<w:style %s w:type="paragraph" w:customStyle="1" w:styleId="QuoteBullet">'
+     '<w:name w:val="Quote Bullet"/><w:basedOn w:val="{normal}"/>'
+     '<w:pPr><w:spacing w:before="0" w:after="0"/><w:ind w:left="720" w:hanging="360"/></w:pPr></w:style>'),
+]
+
+
+def _table_style_xml(has_table_grid):
+    """Quotation table style: Table Grid when the template has it, plain single borders otherwise"""
+    if has_table_grid:
+        return ('<w:style %s w:type="table" w:customStyle="1" w:styleId="QuoteTable">'
+                '<w:name w:val="Quote Table"/><w:basedOn w:val="TableGrid"/></w:style>')
+    return ('<w:style %s w:type="table" w:customStyle="1" w:styleId="QuoteTable">'
+            '<w:name w:val="Quote Table"/><w:tblPr>' + _BORDERS + '</w:tblPr></w:style>')
+
+
+def _style_ids(styles_element):
+    return {style.get(qn('w:styleId')) for style in styles_element.iterchildren(qn('w:style'))}
+
+
+def ensure_quote_styles(doc):
+    """Add the quotation styles to doc's styles part (no-op when already present)"""
+    styles_element = doc.styles.element
+    style_ids = _style_ids(styles_element)
+    if QUOTE_TEXT in style_ids:
+        return
+
+    normal = 'Normal'
+    for style in styles_element.iterchildren(qn('w:style')):
+        if style.get(qn('w:type')) == 'paragraph' and style.get(qn('w:default')) == '1':
+            normal = style.get(qn('w:styleId'))
+            break
+
+    definitions = [xml.replace('{normal}', normal) for xml in _STYLES]
+    definitions.append(_table_style_xml('TableGrid' in style_ids))
+    for xml in definitions:
+        styles_element.append(parse_xml(xml % nsdecls('w')))
@@ -0,0 +1,67 @@
+"""Quotation totals (subtotal, discount, VAT, grand total) computed from the saved form data"""
+from decimal import Decimal, InvalidOperation
+
+# VAT the document footer adds to the subtotal for GRAND TOTAL (formOptions.showVat only hides its row)
+VAT_PERCENTAGE = Decimal("5")
+CENTS = Decimal("0.01")
+
+
+def _amount(value):
+    """A number typed in the form as a Decimal; 0 when empty or not a number"""
+    if value is None or isinstance(value, bool):
+        return Decimal(0)
+    try:
+        amount = Decimal(str(value).strip() or "0")
+    except InvalidOperation:
+        return Decimal(0)
+    return amount if amount.is_finite() else Decimal(0)
+
+
+def priced_items(tanks_data):
+    """
+    Every priced line of tanks_data: each option of the panel tanks (a tank
+    without options is one line, as in tank_lines_from_data()), then any
+    dismantling and cylindrical tanks
+    """
+    if not isinstance(tanks_data, dict):
+        return
+    for tank in tanks_data.get("tanks") or []:
+        if not isinstance(tank, dict):
+            continue
+        options = tank.get("options")
+        if not isinstance(options, list) or not options:
+            options = [tank]
+        yield from (option for option in options if isinstance(option, dict))
+    for section in ("dismantlingTanks", "cylindricalTanks"):
+        yield from (item for item in tanks_data.get(section) or [] if isinstance(item, dict))
+
+
+def quotation_totals(tanks_data):
+    """
+    Values of the quotation's total columns, computed like the document
+    footer: a line costs its discounted total when it has a discount (and
+    one is filled in), else quantity x unit price; VAT is VAT_PERCENTAGE
+    of the subtotal, included in the grand total whether or not the VAT
+    row is shown.
+    """
+    subtotal = Decimal(0)
+    list_total = Decimal(0)
+    for item in priced_items(tanks_data):
+        list_price = _amount(item.get("quantity")) * _amount(item.get("unitPrice"))
+        list_total += list_price
+        if item.get("hasDiscount") and item.get("discountedTotalPrice"):
+            subtotal += _amount(item.get("discountedTotalPrice"))
+        else:
+            subtotal += list_price
+    discount = list_total - subtotal
+    tax = subtotal * VAT_PERCENTAGE / 100
+    # A discounted total above the list price is no discount percentage (the column holds 0-100)
+    discount_percentage = min(max(discount * 100 / list_total, Decimal(0)), Decimal(100)) if list_total else Decimal(0)
+    return {
+        "subtotal": subtotal.quantize(CENTS),
+        "discount_percentage": discount_percentage.quantize(CENTS),
+        "discount_amount": discount.quantize(CENTS),
+        "tax_percentage": VAT_PERCENTAGE.quantize(CENTS),
+        "tax_amount": tax.quantize(CENTS),
+        "total_amount": (subtotal + tax).quantize(CENTS),
+    }
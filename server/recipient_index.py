@@ -0,0 +1,361 @@
+"""In-memory prefix index of recipient_details for autocomplete (/api/recipients/suggest)"""
+import re
+import threading
+import time
+from bisect import bisect_left, insort
+
+from sqlalchemy import func
+from sqlmodel import Session, select
+
+from database import engine
+from models import RecipientDetails
+from worker_pools import int_env
+
+
+# Seconds between checks of recipient_details for changes made by other processes
+RECIPIENT_INDEX_CHECK_SECONDS = max(int_env("RECIPIENT_INDEX_CHECK_SECONDS", 30), 0)
+
+SUGGEST_DEFAULT_LIMIT = 10
+SUGGEST_MAX_LIMIT = 50
+
+# Recipient matches are ranked by the first tier they are found in
+TIERS = ("name", "name_word", "company", "phone", "email")
+
+_WORD_SPLIT = re.compile(r"[^\w]+")
+_NON_DIGITS = re.compile(r"\D+")
+_PHONE_QUERY = re.compile(r"[\d +()\-.]*\d[\d +()\-.]*")
+
+
+def normalize(value):
+    """Case-folded text with runs of whitespace collapsed"""
+    return " ".join((value or "").casefold().split())
+
+
+def words(value):
+    """Normalized words of a name or company ("Al-Noor Trading" -> al, noor, trading)"""
+    return [word for word in _WORD_SPLIT.split(normalize(value)) if word]
+
+
+def digits(value):
+    return _NON_DIGITS.sub("", value or "")
+
+
+def recipient_item(recipient):
+    """Recipient as listed by /api/recipients"""
+    return {
+        "title": recipient.recipient_title or "Mr.",
+        "name": recipient.recipient_name,
+        "role": recipient.role_of_recipient or "",
+        "company": recipient.to_company_name or "",
+        "location": recipient.to_company_location or "",
+        "phone": recipient.phone_number or "",
+        "email": recipient.email or "",
+    }
+
+
+class PrefixList:
+    """Sorted (key, sort name, value) entries; every entry whose key starts with a prefix, in key order"""
+
+    def __init__(self, entries=()):
+        self._entries = sorted(entries)
+
+    def add(self, entry):
+        insort(self._entries, entry)
+
+    def remove(self, entry):
+        position = bisect_left(self._entries, entry)
+        if position < len(self._entries) and self._entries[position] == entry:
+            del self._entries[position]
+
+    def prefixed(self, prefix):
+        entries = self._entries
+        for position in range(bisect_left(entries, (prefix,)), len(entries)):
+            entry = entries[position]
+            if not entry[0].startswith(prefix):
+                return
+            yield entry
+
+    def __len__(self):
+        return len(self._entries)
+
+
+def _recipient_keys(item):
+    """(tier, key) pairs under which one recipient is found"""
+    keys = {("name", normalize(item["name"]))}
+    keys.update(("name_word", word) for word in words(item["name"]))
+    if item["company"]:
+        keys.add(("company", normalize(item["company"])))
+        keys.update(("company", word) for word in words(item["company"]))
+    if digits(item["phone"]):
+        keys.add(("phone", digits(item["phone"])))
+    email = normalize(item["email"])
+    if email:
+        keys.add(("email", email))
+        if "@" in email:
+            keys.add(("email", email.split("@", 1)[1]))
+    return keys
+
+
+def _company_keys(company):
+    return {normalize(company), *words(company)}
+
+
+class RecipientPrefixes:
+    """
+    Recipients (id -> recipient item) and the sorted prefix lists over their
+    names, companies, phone numbers and emails. Not thread-safe: RecipientIndex
+    serialises access.
+    """
+
+    def __init__(self, recipients=()):
+        self.items = {}  # recipient id -> recipient item
+        self._keys = {}  # recipient id -> its (tier, key) pairs
+        self.company_counts = {}  # company name -> recipients with it
+        tier_entries = {tier: [] for tier in TIERS}
+        for recipient in recipients:
+            if not recipient.recipient_name:  # Only recipients with a name are listed
+                continue
+            item = recipient_item(recipient)
+            self.items[recipient.id] = item
+            self._keys[recipient.id] = _recipient_keys(item)
+            for tier, key in self._keys[recipient.id]:
+                tier_entries[tier].append((key, normalize(item["name"]), recipient.id))
+            if item["company"]:
+                self.company_counts[item["company"]] = self.company_counts.get(item["company"], 0) + 1
+        self._tiers = {tier: PrefixList(entries) for tier, entries in tier_entries.items()}
+        self._company_names = PrefixList(
+            (key, normalize(company), company)
+            for company in self.company_counts
+            for key in _company_keys(company)
+        )
+
+    def key_count(self):
+        return sum(len(entries) for entries in self._tiers.values())
+
+    def remove(self, recipient_id):
+        item = self.items.pop(recipient_id, None)
+        if item is None:
+            return
+        for tier, key in self._keys.pop(recipient_id):
+            self._tiers[tier].remove((key, normalize(item["name"]), recipient_id))
+        company = item["company"]
+        if company:
+            self.company_counts[company] -= 1
+            if not self.company_counts[company]:
+                del self.company_counts[company]
+                for key in _company_keys(company):
+                    self._company_names.remove((key, normalize(company), company))
+
+    def put(self, recipient_id, item):
+        """Add or replace a recipient (item from recipient_item()); one without a name is removed"""
+        self.remove(recipient_id)
+        if not item["name"]:
+            return
+        self.items[recipient_id] = item
+        self._keys[recipient_id] = _recipient_keys(item)
+        for tier, key in self._keys[recipient_id]:
+            self._tiers[tier].add((key, normalize(item["name"]), recipient_id))
+        company = item["company"]
+        if company:
+            if company not in self.company_counts:
+                self.company_counts[company] = 0
+                for key in _company_keys(company):
+                    self._company_names.add((key, normalize(company), company))
+            self.company_counts[company] += 1
+
+    def suggest(self, q, limit=SUGGEST_DEFAULT_LIMIT):
+        """
+        Recipients and recipient company names matching q, at most limit of each.
+
+        Every word of q must start a word of the recipient's name or company
+        (or q starts the full name, phone digits or email). Recipients whose
+        full name starts with q come first, then name words, company, phone
+        and email matches, alphabetically within each.
+        """
+        query = normalize(q)
+        tokens = words(q)
+        if not query:
+            return {"recipients": [], "companies": []}
+
+        recipient_ids = []
+        seen = set()
+
+        def collect(tier, prefix, accept=None):
+            if not prefix:
+                return
+            for _, _, recipient_id in self._tiers[tier].prefixed(prefix):
+                if len(recipient_ids) >= limit:
+                    return
+                if recipient_id in seen or (accept and not accept(recipient_id)):
+                    continue
+                seen.add(recipient_id)
+                recipient_ids.append(recipient_id)
+
+        def all_tokens_match(recipient_id):
+            recipient_words = [key for tier, key in self._keys[recipient_id] if tier in ("name_word", "company")]
+            return all(any(word.startswith(token) for word in recipient_words) for token in tokens)
+
+        collect("name", query)
+        if tokens:
+            collect("name_word", tokens[0], all_tokens_match)
+            collect("company", tokens[0], all_tokens_match)
+        if _PHONE_QUERY.fullmatch(query):
+            collect("phone", digits(query))
+        if " " not in query:
+            collect("email", query)
+
+        companies = []
+        for _, _, company in self._company_names.prefixed(query):
+            if len(companies) >= limit:
+                break
+            if company not in companies:
+                companies.append(company)
+        if tokens and len(companies) < limit:
+            for _, _, company in self._company_names.prefixed(tokens[0]):
+                if len(companies) >= limit:
+                    break
+                company_words = words(company)
+                if company not in companies and all(
+                    any(word.startswith(token) for word in company_words) for token in tokens
+                ):
+                    companies.append(company)
+
+        return {
+            "recipients": [self.items[recipient_id] for recipient_id in recipient_ids],
+            "companies": companies,
+        }
+
+
+class RecipientIndex:
+    """
+    Prefix lookups over recipient names, companies, phone numbers and emails.
+
+    Built once from recipient_details and kept in memory as sorted lists, so
+    a suggestion is a few bisects instead of a table scan or a full list
+    download. save_quotation applies its recipient with upsert(); every
+    check_seconds a count / newest last_updated_time query spots changes
+    made elsewhere and the index is rebuilt.
+
+    The check and any rebuild run outside the lock, one at a time; other
+    requests keep answering from the current lists until the new ones are
+    swapped in.
+    """
+
+    def __init__(self, check_seconds=RECIPIENT_INDEX_CHECK_SECONDS):
+        self.check_seconds = check_seconds
+        self._prefixes = None  # RecipientPrefixes, None until built
+        self._fingerprint = None
+        self._checked_at = 0.0
+        self._pending = None  # upserts applied while a rebuild reads the table
+        self._lock = threading.Lock()  # guards the attributes above; never held for a query
+        self._refresh_lock = threading.Lock()  # one check / rebuild at a time
+        self.builds = 0
+        self.checks = 0
+        self.updates = 0
+
+    @staticmethod
+    def _read_fingerprint(session):
+        return tuple(session.exec(
+            select(func.count(RecipientDetails.id), func.max(RecipientDetails.last_updated_time))
+        ).one())
+
+    @staticmethod
+    def _read_recipients(session):
+        return session.exec(select(RecipientDetails).order_by(RecipientDetails.id)).all()
+
+    def _is_fresh(self, now):
+        # Callers hold self._lock
+        return self._prefixes is not None and now - self._checked_at < self.check_seconds
+
+    def _current(self):
+        """The current RecipientPrefixes, checked against the table first when due"""
+        while True:
+            prefixes = self._refresh()
+            if prefixes is not None:  # None: invalidated during the check
+                return prefixes
+
+    def _refresh(self):
+        with self._lock:
+            if self._is_fresh(time.monotonic()):
+                return self._prefixes
+            prefixes = self._prefixes
+        # The first build is waited for; later ones happen while others read the current lists
+        if not self._refresh_lock.acquire(blocking=prefixes is None):
+            return prefixes
+        try:
+            now = time.monotonic()
+            with self._lock:
+                if self._is_fresh(now):  # refreshed while this request waited
+                    return self._prefixes
+                self._pending = []
+            built = None
+            with Session(engine) as session:
+                fingerprint = self._read_fingerprint(session)
+                with self._lock:
+                    self.checks += 1
+                    stale = self._prefixes is None or fingerprint != self._fingerprint
+                if stale:
+                    built = RecipientPrefixes(self._read_recipients(session))
+            with self._lock:
+                pending, self._pending = self._pending, None
+                if built is not None:
+                    # Saves committed during the rebuild may be missing from what it read
+                    for recipient_id, item in pending:
+                        built.put(recipient_id, item)
+                    self._prefixes = built
+                    self._fingerprint = fingerprint
+                    self.builds += 1
+                    print(f"✓ Built recipient index: {len(built.items)} recipients, "
+                          f"{len(built.company_counts)} companies")
+                # After replaying saves, check again on next use rather than trust the fingerprint
+                self._checked_at = now if built is None or not pending else float("-inf")
+                return self._prefixes
+        finally:
+            self._refresh_lock.release()
+
+    def upsert(self, recipient_id, item, last_updated_time, created):
+        """
+        Apply a recipient this process just committed (item from recipient_item()).
+        The expected table fingerprint moves with it, so the next check only
+        rebuilds if someone else changed recipients too.
+        """
+        with self._lock:
+            if self._pending is not None:
+                self._pending.append((recipient_id, item))
+            if self._prefixes is None:
+                return  # Built from the table on first use
+            self._prefixes.put(recipient_id, item)
+            count, newest = self._fingerprint
+            if created:
+                count += 1
+            if newest is None or last_updated_time > newest:
+                newest = last_updated_time
+            self._fingerprint = (count, newest)
+            self.updates += 1
+
+    def suggest(self, q, limit=SUGGEST_DEFAULT_LIMIT):
+        """Recipients and recipient company names matching q (see RecipientPrefixes.suggest)"""
+        prefixes = self._current()
+        with self._lock:
+            return prefixes.suggest(q, limit)
+
+    def invalidate(self):
+        """Rebuild on next use"""
+        with self._lock:
+            self._prefixes = None
+
+    def stats(self):
+        with self._lock:
+            prefixes = self._prefixes
+            return {
+                "built": prefixes is not None,
+                "recipients": len(prefixes.items) if prefixes is not None else 0,
+                "companies": len(prefixes.company_counts) if prefixes is not None else 0,
+                "keys": prefixes.key_count() if prefixes is not None else 0,
+                "checks": self.checks,
+                "builds": self.builds,
+                "updates": self.updates,
+            }
+
+
+recipient_index = RecipientIndex()
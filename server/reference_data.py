@@ -0,0 +1,152 @@
+"""Process-wide snapshot of the reference tables: companies, sales persons, project managers"""
+import os
+import threading
+import time
+
+from sqlalchemy import func
+from sqlmodel import Session, select
+
+from database import engine
+from models import CompanyDetails, SalesDetails, ProjectManagerDetails
+from worker_pools import int_env
+
+
+# Seconds between checks of the tables for changes (0 checks on every use)
+REFERENCE_DATA_CHECK_SECONDS = max(int_env("REFERENCE_DATA_CHECK_SECONDS", 30), 0)
+
+SIGNATURE_EXTENSIONS = ('.png', '.jpg', '.jpeg')
+REFERENCE_MODELS = (CompanyDetails, SalesDetails, ProjectManagerDetails)
+
+
+def _first_by(rows, attribute):
+    """attribute value -> first row with it (like .first() on an equality select)"""
+    index = {}
+    for row in rows:
+        index.setdefault(getattr(row, attribute), row)
+    return index
+
+
+class ReferenceSnapshot:
+    """Rows of the three tables as read at one moment, with lookup maps"""
+
+    def __init__(self, companies, sales_persons, project_managers, version=None):
+        self.version = version  # fingerprint of the tables when read
+        self.companies = companies
+        self.sales_persons = sales_persons
+        self.project_managers = project_managers
+        self.company_by_full_name = _first_by(companies, "full_name")
+        self.company_by_code = _first_by(companies, "code")
+        self.sales_by_name = _first_by(sales_persons, "sales_person_name")
+        self.sales_by_code = _first_by(sales_persons, "code")
+        self.manager_by_name = _first_by(project_managers, "manager_name")
+        self.manager_by_code = _first_by(project_managers, "code")
+
+    @property
+    def default_manager(self):
+        """Project manager used when none is chosen"""
+        return self.project_managers[0] if self.project_managers else None
+
+
+class ReferenceData:
+    """
+    Serves a ReferenceSnapshot without querying the database per lookup.
+
+    Every check_seconds one small query fingerprints the tables (row count
+    and newest last_updated_time of each); the snapshot is reloaded only
+    when that changes, e.g. after sync_excel_to_db.py ran in another
+    process. Signature image lookups are memoised the same way and probed
+    again after each check, so new files in signs&seals are picked up.
+    """
+
+    def __init__(self, check_seconds=REFERENCE_DATA_CHECK_SECONDS):
+        self.check_seconds = check_seconds
+        self._snapshot = None
+        self._fingerprint = None
+        self._checked_at = 0.0
+        self._signature_images = {}
+        self._lock = threading.Lock()
+        self.loads = 0
+        self.checks = 0
+
+    @staticmethod
+    def _read_fingerprint(session):
+        columns = []
+        for model in REFERENCE_MODELS:
+            columns.append(select(func.count(model.id)).scalar_subquery())
+            columns.append(select(func.max(model.last_updated_time)).scalar_subquery())
+        return tuple(session.exec(select(*columns)).one())
+
+    @staticmethod
+    def _read_snapshot(session, fingerprint):
+        companies, sales_persons, project_managers = (
+            list(session.exec(select(model).order_by(model.id)).all()) for model in REFERENCE_MODELS
+        )
+        return ReferenceSnapshot(companies, sales_persons, project_managers, version=fingerprint)
+
+    def snapshot(self):
+        """Current snapshot, reloaded first if the tables changed"""
+        with self._lock:
+            now = time.monotonic()
+            if self._snapshot is not None and now - self._checked_at < self.check_seconds:
+                return self._snapshot
+            with Session(engine) as session:
+                fingerprint = self._read_fingerprint(session)
+                self.checks += 1
+                if self._snapshot is None or fingerprint != self._fingerprint:
+                    self._snapshot = self._read_snapshot(session, fingerprint)
+                    self._fingerprint = fingerprint
+                    self.loads += 1
+                    print(f"✓ Loaded reference data: {len(self._snapshot.companies)} companies, "
+                          f"{len(self._snapshot.sales_persons)} sales persons, "
+                          f"{len(self._snapshot.project_managers)} project managers")
+            self._checked_at = now
+            self._signature_images = {}
+            return self._snapshot
+
+    def signature_image(self, data_path, sign_base):
+        """
+        Path of the signature image DATA_PATH/signs&seals/<sign_base>.png|.jpg|.jpeg
+        (also tried in lower case), or "" when there is none
+        """
+        key = (data_path, sign_base)
+        path = self._signature_images.get(key)
+        if path is None:
+            path = ""
+            signs_dir = os.path.join(data_path, 'signs&seals')
+            for ext in SIGNATURE_EXTENSIONS:
+                if path:
+                    break
+                for name_variant in [sign_base, sign_base.lower()]:
+                    candidate = os.path.join(signs_dir, name_variant + ext)
+                    if os.path.exists(candidate):
+                        path = candidate
+                        break
+            self._signature_images[key] = path
+        return path
+
+    def expire(self):
+        """Check the tables on next use (reloading only if they changed)"""
+        with self._lock:
+            self._checked_at = float("-inf")
+
+    def invalidate(self):
+        """Reload on next use"""
+        with self._lock:
+            self._snapshot = None
+            self._signature_images = {}
+
+    def stats(self):
+        with self._lock:
+            snapshot = self._snapshot
+            return {
+                "loaded": snapshot is not None,
+                "companies": len(snapshot.companies) if snapshot else 0,
+                "sales_persons": len(snapshot.sales_persons) if snapshot else 0,
+                "project_managers": len(snapshot.project_managers) if snapshot else 0,
+                "signature_images": len(self._signature_images),
+                "checks": self.checks,
+                "loads": self.loads,
+            }
+
+
+reference_data = ReferenceData()
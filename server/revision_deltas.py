@@ -0,0 +1,122 @@
+"""
+Delta-encoded storage of quotation revisions.
+
+A revision after R0 may keep its tanks_data / form_options / additional_data
+as a JSON Patch (revision_delta) against an earlier revision of the same
+quotation that is stored in full (delta_base_id). Bases are always full
+rows, so reading a revision costs at most one base row and one patch. A
+revision whose delta is not compact (over REVISION_DELTA_MAX_PERCENT of the
+full document) is stored in full and becomes the base of later revisions.
+Contractual terms rows stay full: the search document is built from them in SQL.
+"""
+import json
+
+from sqlalchemy.orm.attributes import flag_modified, set_committed_value
+from sqlmodel import select
+
+from json_patches import apply_json_patch, diff_json
+from models import QuotationWebpageInputDetailsSave
+from worker_pools import int_env
+
+
+# Largest delta stored, as a percentage of the full document's size
+REVISION_DELTA_MAX_PERCENT = max(int_env("REVISION_DELTA_MAX_PERCENT", 50), 0)
+
+# Document member -> quotation column
+DOCUMENT_COLUMNS = {
+    "tanksData": "tanks_data",
+    "formOptions": "form_options",
+    "additionalData": "additional_data",
+}
+
+
+def _encoded_size(value):
+    return len(json.dumps(value, separators=(",", ":"), default=str))
+
+
+def stored_document(quotation):
+    """The quotation's JSON columns as stored (not reconstructed)"""
+    return {member: getattr(quotation, column) for member, column in DOCUMENT_COLUMNS.items()}
+
+
+def full_columns(document):
+    """Columns storing document in full"""
+    columns = {column: document[member] for member, column in DOCUMENT_COLUMNS.items()}
+    columns.update(delta_base_id=None, revision_delta=None)
+    return columns
+
+
+def encode_revision(document, base_id=None, base_document=None):
+    """Columns to store for a revision: a delta against the base when compact enough, otherwise the full document"""
+    if base_id is None:
+        return full_columns(document)
+    delta = diff_json(base_document, document)
+    if _encoded_size(delta) * 100 > _encoded_size(document) * REVISION_DELTA_MAX_PERCENT:
+        return full_columns(document)
+    return {
+        "tanks_data": {},  # NOT NULL; the content is in revision_delta
+        "form_options": None,
+        "additional_data": None,
+        "delta_base_id": base_id,
+        "revision_delta": delta,
+    }
+
+
+def load_revisions(session, company_id, quotation_number, lock=False):
+    """All stored revisions of one quotation, oldest first (locked FOR UPDATE when lock)"""
+    Q = QuotationWebpageInputDetailsSave
+    statement = select(Q).where(Q.company_id == company_id, Q.quotation_number == quotation_number).order_by(Q.revision_number)
+    if lock:
+        statement = statement.with_for_update()
+    return list(session.exec(statement).all())
+
+
+def plan_revision(revisions, revision_number, document):
+    """
+    (columns to store, the existing row for revision_number or None, rows
+    stored as deltas against that row). A row other revisions depend on stays
+    full; otherwise the base is the latest earlier revision stored in full.
+    """
+    current = next((row for row in revisions if row.revision_number == revision_number), None)
+    dependents = [row for row in revisions if current is not None and row.delta_base_id == current.id]
+    if dependents or revision_number <= 0:
+        return full_columns(document), current, dependents
+    bases = [
+        row for row in revisions
+        if row.delta_base_id is None and row.revision_number < revision_number and row is not current
+    ]
+    if not bases:
+        return full_columns(document), current, dependents
+    base = bases[-1]
+    return encode_revision(document, base.id, stored_document(base)), current, dependents
+
+
+def store_columns(quotation, columns):
+    """Set stored columns on an ORM row; always written, even if equal to a reconstructed value"""
+    for column, value in columns.items():
+        setattr(quotation, column, value)
+        flag_modified(quotation, column)
+
+
+def rebase_dependents(dependents, old_base_document, base_id, new_base_document):
+    """Re-encode revisions stored against a base whose document is about to change (caller commits)"""
+    for row in dependents:
+        document = apply_json_patch(old_base_document, row.revision_delta)
+        store_columns(row, encode_revision(document, base_id, new_base_document))
+    return len(dependents)
+
+
+def materialize(session, quotation, base=None):
+    """
+    Fill a delta-stored revision's JSON columns from its base, in memory only
+    (nothing is marked for writing). Full rows are returned unchanged. Pass
+    the base row when it was loaded with the revision; otherwise it is read.
+    """
+    if quotation is None or quotation.delta_base_id is None:
+        return quotation
+    if base is None:
+        base = session.get(QuotationWebpageInputDetailsSave, quotation.delta_base_id)
+    document = apply_json_patch(stored_document(base), quotation.revision_delta or [])
+    for member, column in DOCUMENT_COLUMNS.items():
+        set_committed_value(quotation, column, document[member])
+    return quotation
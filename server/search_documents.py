@@ -0,0 +1,46 @@
+"""Full-text search document (search_document) of saved quotations, PostgreSQL only"""
+from sqlalchemy import case, func, literal_column, text
+
+# Text search configuration used by quotation_search_document() in the database
+SEARCH_TEXT_CONFIG = "english"
+
+# Not mapped on the model: tsvector only exists on PostgreSQL
+search_document = literal_column("quotation_webpage_input_details_save.search_document")
+
+# Short fields are highlighted whole, the terms as a few fragments
+HEADLINE_OPTIONS = "StartSel=<mark>, StopSel=</mark>, HighlightAll=true"
+TERMS_HEADLINE_OPTIONS = (
+    "StartSel=<mark>, StopSel=</mark>, MaxFragments=3, MaxWords=20, MinWords=8, FragmentDelimiter=\" ... \""
+)
+
+
+def supports_full_text(session):
+    """True when the session's database has the search document (PostgreSQL)"""
+    return session.get_bind().dialect.name == "postgresql"
+
+
+def keyword_query(q):
+    """tsquery for a user's keywords: words, "quoted phrases", OR and -excluded"""
+    return func.websearch_to_tsquery(SEARCH_TEXT_CONFIG, q)
+
+
+def headline(text_expression, query, options=HEADLINE_OPTIONS):
+    """Field text with the matched words marked, or NULL when the field does not match"""
+    matches = func.to_tsvector(SEARCH_TEXT_CONFIG, func.coalesce(text_expression, "")).bool_op("@@")(query)
+    return case((matches, func.ts_headline(SEARCH_TEXT_CONFIG, text_expression, query, options)), else_=None)
+
+
+def refresh_search_document(session, quotation_id):
+    """Recompute one quotation's search document from its saved rows (caller commits)"""
+    if not supports_full_text(session):
+        return False
+    session.flush()  # the quotation and its terms must be visible to the UPDATE
+    session.execute(
+        text(
+            "UPDATE quotation_webpage_input_details_save "
+            "SET search_document = quotation_search_document(:quotation_id) "
+            "WHERE id = :quotation_id"
+        ),
+        {"quotation_id": quotation_id},
+    )
+    return True
@@ -0,0 +1,214 @@
+"""Cylindrical tank size catalogue loaded from DATA/tank_dimensions.xlsx"""
+import bisect
+import os
+import threading
+
+import pandas as pd
+
+
+DEFAULT_CATALOGUE_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), 'DATA', 'tank_dimensions.xlsx'
+)
+
+# Capacities closer than this (in gallons) to a catalogue entry are an exact match
+EXACT_MATCH_TOLERANCE = 0.5
+
+
+def load_cylindrical_dimensions(excel_path):
+    """Parse tank_dimensions.xlsx into {SECTION_KEY: {capacity: dims}}."""
+    if not os.path.exists(excel_path):
+        print(f"⚠ tank_dimensions.xlsx not found at {excel_path}")
+        return {}
+
+    dimensions = {
+        'PVC_HORIZONTAL': {},
+        'PVC_VERTICAL': {},
+        'GRP_HORIZONTAL': {},
+        'GRP_VERTICAL': {},
+    }
+    try:
+        dfs = pd.read_excel(excel_path, sheet_name=None, header=None)
+    except Exception as e:
+        print(f"⚠ Could not read tank_dimensions.xlsx: {e}")
+        return dimensions
+
+    # ── PVC sheet ──
+    if 'PVC' in dfs:
+        pvc_df = dfs['PVC']
+        current_section = None
+        for _, row in pvc_df.iterrows():
+            cell0 = str(row.iloc[0]).strip()
+            if 'PVC HORIZONTAL' in cell0.upper():
+                current_section = 'PVC_HORIZONTAL'
+                continue
+            if 'PVC VERTICAL' in cell0.upper():
+                current_section = 'PVC_VERTICAL'
+                continue
+            if current_section is None:
+                continue
+            try:
+                capacity = float(row.iloc[1])
+                if pd.isna(capacity):
+                    continue  # blank row – NaN would break the sorted lookup
+                diameter = float(row.iloc[2])
+                height = float(row.iloc[3])
+                if capacity in dimensions[current_section]:
+                    pass  # first entry wins – skip duplicates (e.g. PVC Vertical 1000 gal)
+                elif current_section == 'PVC_HORIZONTAL':
+                    raw_len = row.iloc[4]
+                    length = float(raw_len) if pd.notna(raw_len) else 0.0
+                    dimensions[current_section][capacity] = {
+                        'diameter': diameter, 'height': height, 'length': length
+                    }
+                else:
+                    dimensions[current_section][capacity] = {
+                        'diameter': diameter, 'height': height
+                    }
+            except (ValueError, TypeError):
+                pass
+
+    # ── FIBER (GRP) sheet ──
+    if 'FIBER' in dfs:
+        fiber_df = dfs['FIBER']
+        current_section = None
+        for _, row in fiber_df.iterrows():
+            cell0 = str(row.iloc[0]).strip()
+            if 'GRP HORIZONTAL' in cell0.upper():
+                current_section = 'GRP_HORIZONTAL'
+                continue
+            if 'GRP VERTICAL' in cell0.upper():
+                current_section = 'GRP_VERTICAL'
+                continue
+            if current_section is None:
+                continue
+            try:
+                capacity = float(row.iloc[0])
+                if pd.isna(capacity):
+                    continue
+                if current_section == 'GRP_HORIZONTAL':
+                    dimensions[current_section][capacity] = {
+                        'length': float(row.iloc[1]),
+                        'width':  float(row.iloc[2]),
+                        'height': float(row.iloc[3]),
+                    }
+                else:
+                    dimensions[current_section][capacity] = {
+                        'diameter': float(row.iloc[1]),
+                        'height':   float(row.iloc[2]),
+                    }
+            except (ValueError, TypeError):
+                pass
+
+    return dimensions
+
+
+def format_cylindrical_size(material, orientation, data):
+    """Format catalogue dimensions the way they are printed in the quotation."""
+    if orientation.upper() == 'VERTICAL':
+        return f"{data['diameter']:.3f} DIA X {data['height']:.2f} MTR (H)"
+    if material.upper() == 'PVC':
+        return f"{data['diameter']:.3f} DIA X {data['height']:.2f} MTR (H)"
+    # GRP horizontal: L x W x H
+    return (f"{data['length']:.2f} M (L) X {data['width']:.2f} M (W)"
+            f" X {data['height']:.2f} M (H)")
+
+
+class CylindricalTankCatalogue:
+    """
+    In-memory cylindrical tank catalogue.
+
+    The workbook is parsed once and kept as sorted capacity arrays per
+    MATERIAL_ORIENTATION section, so lookups are a bisect instead of a
+    pandas read. The workbook is re-parsed only when its mtime changes.
+    """
+
+    def __init__(self, excel_path=DEFAULT_CATALOGUE_PATH):
+        self.excel_path = excel_path
+        self._lock = threading.Lock()
+        # (mtime, {section: {capacity: dims}}, {section: sorted capacities}),
+        # replaced as a whole so readers never see a half-swapped catalogue
+        self._loaded = (None, {}, {})
+
+    def _current_mtime(self):
+        try:
+            return os.stat(self.excel_path).st_mtime_ns
+        except OSError:
+            return None
+
+    def _snapshot(self):
+        """(dimensions, capacities) of the current workbook, re-parsed if its mtime changed"""
+        mtime = self._current_mtime()
+        loaded = self._loaded
+        if mtime is not None and mtime == loaded[0]:
+            return loaded[1], loaded[2]
+        with self._lock:
+            loaded = self._loaded
+            if mtime is None or mtime != loaded[0]:
+                dimensions = load_cylindrical_dimensions(self.excel_path)
+                capacities = {key: sorted(section) for key, section in dimensions.items()}
+                loaded = (mtime, dimensions, capacities)
+                self._loaded = loaded
+                if mtime is not None:
+                    print(f"✓ Loaded cylindrical tank catalogue: "
+                          f"{sum(len(c) for c in capacities.values())} sizes")
+            return loaded[1], loaded[2]
+
+    def dimensions(self):
+        """Return {SECTION_KEY: {capacity: dims}} (same shape as the workbook parser)."""
+        return self._snapshot()[0]
+
+    def _match_capacity(self, capacities, capacity_usg):
+        # Exact match: the smallest catalogue capacity within the tolerance
+        idx = bisect.bisect_right(capacities, capacity_usg - EXACT_MATCH_TOLERANCE)
+        if idx < len(capacities) and abs(capacities[idx] - capacity_usg) < EXACT_MATCH_TOLERANCE:
+            return capacities[idx]
+
+        # Otherwise the nearest capacity (the smaller one wins a tie)
+        idx = bisect.bisect_left(capacities, capacity_usg)
+        if idx == 0:
+            return capacities[0]
+        if idx == len(capacities):
+            return capacities[-1]
+        below, above = capacities[idx - 1], capacities[idx]
+        return below if capacity_usg - below <= above - capacity_usg else above
+
+    def lookup(self, material, orientation, capacity_usg):
+        """Return (matched_capacity, dims) for the closest size, or None."""
+        dimensions, all_capacities = self._snapshot()
+        key = f"{material.upper()}_{orientation.upper()}"
+        capacities = all_capacities.get(key)
+        if not capacities:
+            return None
+        matched = self._match_capacity(capacities, capacity_usg)
+        return matched, dimensions[key][matched]
+
+    def get_size(self, material, orientation, capacity_usg):
+        """Return a size string for given material / orientation / capacity."""
+        found = self.lookup(material, orientation, capacity_usg)
+        if found is None:
+            return "SIZE N/A"
+        return format_cylindrical_size(material, orientation, found[1])
+
+    def listing(self, material=None, orientation=None):
+        """List catalogue entries (optionally filtered) for UI dropdowns."""
+        dimensions, all_capacities = self._snapshot()
+        entries = []
+        for key, capacities in all_capacities.items():
+            key_material, key_orientation = key.split('_', 1)
+            if material and key_material != material.upper():
+                continue
+            if orientation and key_orientation != orientation.upper():
+                continue
+            for capacity in capacities:
+                data = dimensions[key][capacity]
+                entries.append({
+                    "material": key_material,
+                    "orientation": key_orientation.title(),
+                    "capacity": capacity,
+                    "size": format_cylindrical_size(key_material, key_orientation, data),
+                    **data,
+                })
+        return entries
+
+
+cylindrical_catalogue = CylindricalTankCatalogue()
@@ -0,0 +1,74 @@
+"""Normalized tank lines (quotation_tank_lines) kept in step with quotation tanks_data"""
+import re
+
+from sqlalchemy import delete
+
+from models import QuotationTankLine
+
+
+def parse_dimension(value):
+    """
+    Metres as a float, or None.
+
+    Accepts numbers and the form's strings, including partition notation
+    like "2(1+1)" where only the part before "(" counts (same as the preview).
+    """
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    cleaned = re.sub(r"[^0-9.]", "", str(value).split("(")[0])
+    match = re.match(r"\d+(?:\.\d*)?|\.\d+", cleaned)
+    return float(match.group()) if match else None
+
+
+def _parse_quantity(value):
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return None
+
+
+def tank_lines_from_data(tanks_data):
+    """
+    Line dicts for every tank option in a quotation's tanks_data.
+
+    Saved quotations keep each tank's sizes under tanks[].options[]; a
+    tank without options is read as a single line from its own keys.
+    """
+    tanks = tanks_data.get("tanks", []) if isinstance(tanks_data, dict) else []
+    lines = []
+    for index, tank in enumerate(tanks or []):
+        if not isinstance(tank, dict):
+            continue
+        tank_number = _parse_quantity(tank.get("tankNumber")) or index + 1
+        options = tank.get("options")
+        if not isinstance(options, list) or not options:
+            options = [tank]
+        for option_index, option in enumerate(options):
+            if not isinstance(option, dict):
+                continue
+            lines.append({
+                "tank_number": tank_number,
+                "option_number": option_index + 1,
+                "tank_name": option.get("tankName") or None,
+                "tank_type": option.get("tankType") or option.get("type") or None,
+                "support_system": option.get("supportSystem") or option.get("support_system") or None,
+                "length": parse_dimension(option.get("length")),
+                "width": parse_dimension(option.get("width")),
+                "height": parse_dimension(option.get("height")),
+                "quantity": _parse_quantity(option.get("quantity")),
+            })
+    return lines
+
+
+def write_tank_lines(session, quotation_id, lines):
+    """Replace the tank lines of one quotation with lines (caller commits)"""
+    session.execute(delete(QuotationTankLine).where(QuotationTankLine.quotation_id == quotation_id))
+    session.add_all(QuotationTankLine(quotation_id=quotation_id, **line) for line in lines)
+    return len(lines)
+
+
+def replace_tank_lines(session, quotation_id, tanks_data):
+    """Rewrite the tank lines of one quotation from its tanks_data (caller commits)"""
+    return write_tank_lines(session, quotation_id, tank_lines_from_data(tanks_data))
@@ -0,0 +1,95 @@
+"""Process-wide cache of parsed quotation templates"""
+import copy
+import os
+import threading
+
+from docx import Document
+from docx.oxml.ns import qn
+
+from docx_packager import PackageIndex
+from quotation_styles import ensure_quote_styles
+
+
+def strip_document_protection(doc):
+    """Remove read-only / document protection inherited from a template"""
+    settings_element = doc.settings.element
+    write_protection = settings_element.find(qn('w:writeProtection'))
+    if write_protection is not None:
+        settings_element.remove(write_protection)
+    doc_protection = settings_element.find(qn('w:documentProtection'))
+    if doc_protection is not None:
+        settings_element.remove(doc_protection)
+
+
+class TemplateCache:
+    """
+    Keeps one pristine parsed copy of each template document.
+
+    Entries are keyed by absolute path and invalidated when the file's
+    mtime or size changes, so replacing a template on disk is picked up
+    by the next request. Callers always receive a private deep copy and
+    never the pristine document itself. Each entry also keeps the
+    template's compressed package entries so saves can reuse them.
+    """
+
+    def __init__(self):
+        self._entries = {}  # abs path -> (signature, pristine Document, PackageIndex)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _signature(path):
+        stat_result = os.stat(path)
+        return (stat_result.st_mtime_ns, stat_result.st_size)
+
+    def _load(self, path):
+        doc = Document(path)
+        try:
+            strip_document_protection(doc)
+        except Exception:
+            pass  # Silently continue if protection removal fails on load
+        # Quotation styles are added once here instead of once per request
+        ensure_quote_styles(doc)
+        return doc, PackageIndex.build(doc, path)
+
+    def _entry(self, path):
+        # Callers hold self._lock
+        signature = self._signature(path)
+        entry = self._entries.get(path)
+        if entry is None or entry[0] != signature:
+            entry = (signature, *self._load(path))
+            self._entries[path] = entry
+            self.misses += 1
+            print(f"✓ Parsed and cached template: {path}")
+        else:
+            self.hits += 1
+        return entry
+
+    def get_document(self, template_path):
+        """Return a private, mutable copy of the parsed template"""
+        return self.get_document_and_index(template_path)[0]
+
+    def get_document_and_index(self, template_path):
+        """Return (private copy of the template, its PackageIndex for fast saves)"""
+        path = os.path.abspath(template_path)
+        with self._lock:
+            entry = self._entry(path)
+            # lxml trees must not be read concurrently while copying, so the
+            # (cheap) deep copy happens under the lock as well
+            return copy.deepcopy(entry[1]), entry[2]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "templates": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+template_cache = TemplateCache()
@@ -0,0 +1,67 @@
+"""
+Shared pytest fixtures. Run from server/:  python -m pytest tests
+The server modules are flat, so server/ goes on sys.path. The app runs on an
+in-memory SQLite database (swapped in before any server module reads
+database.engine); tests that need PostgreSQL use TEST_DATABASE_URL and are
+skipped without it.
+"""
+import os
+import sys
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.pool import StaticPool
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if SERVER_DIR not in sys.path:
+    sys.path.insert(0, SERVER_DIR)
+
+import database  # noqa: E402
+
+
+def _split_part(value, delimiter, index):
+    """PostgreSQL split_part(), for the generated quote number columns"""
+    if value is None:
+        return None
+    parts = value.split(delimiter)
+    return parts[index - 1] if 0 < index <= len(parts) else ""
+
+
+sqlite_engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+event.listen(sqlite_engine, "connect",
+             lambda connection, _: connection.create_function("split_part", 3, _split_part, deterministic=True))
+database.engine = sqlite_engine
+
+
+def seed_reference_data(engine):
+    from sqlmodel import Session
+    from models import CompanyDetails, ProjectManagerDetails, SalesDetails
+    with Session(engine) as session:
+        session.add(CompanyDetails(company_name="GRP", full_name="GRP TANKS TRADING L.L.C", code="GRP",
+                                   template_path="grp_template", company_domain="grptanks.com",
+                                   company_storage_path=os.path.join(SERVER_DIR, "Final_Doc", "GRP")))
+        session.add(SalesDetails(sales_person_name="Vinu Varghese", code="VV", designation="Sales Manager",
+                                 phone_number="050", email_name="vinu"))
+        session.add(ProjectManagerDetails(manager_name="Mohamed M", code="MM", designation="Manager - Projects",
+                                          phone_number="052", email_name="mm"))
+        session.commit()
+
+
+@pytest.fixture(scope="session")
+def client():
+    """TestClient for the app on the seeded SQLite database"""
+    from fastapi.testclient import TestClient
+    from sqlmodel import SQLModel
+    import api_server
+    SQLModel.metadata.create_all(sqlite_engine)
+    seed_reference_data(sqlite_engine)
+    return TestClient(api_server.app)
+
+
+@pytest.fixture(scope="session")
+def pg_engine():
+    """Engine on an empty PostgreSQL database (TEST_DATABASE_URL); its tables are replaced"""
+    url = os.getenv("TEST_DATABASE_URL")
+    if not url:
+        pytest.skip("TEST_DATABASE_URL is not set")
+    return create_engine(url)
@@ -0,0 +1,55 @@
+"""Quotation request bodies and render plans for the tests"""
+import os
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+TEMPLATE_DIR = os.path.join(SERVER_DIR, "DATA", "template")
+
+
+def tank_option(i):
+    return {
+        "tankName": f"Tank {i}", "quantity": 1 + i % 3, "hasPartition": i % 2 == 0,
+        "tankType": "GRP SECTIONAL PANEL" if i % 3 else "HDG",
+        "length": "3", "width": str(2 + i % 4), "height": ["1.5", "2", "3", "4"][i % 4],
+        "unit": "Nos", "unitPrice": str(1000 + i), "needFreeBoard": i % 3 == 0, "freeBoardSize": "25",
+        "supportSystem": "Internal" if i % 2 else "External",
+        "hasDiscount": i % 5 == 4, "discountedTotalPrice": "999",
+    }
+
+
+def quotation_request_data(n_tanks, table_engine="docx"):
+    """/generate-quotation body with n_tanks panel tanks, one dismantling and one cylindrical tank"""
+    return {
+        "fromCompany": "GRP TANKS TRADING L.L.C", "companyCode": "GRP", "companyShortName": "GRP",
+        "recipientTitle": "Mr.", "recipientName": "John Smith", "role": "Manager", "companyName": "ACME LLC",
+        "location": "Dubai", "phoneNumber": "+971 50", "email": "john@acme.com", "quotationDate": "15/10/26",
+        "quotationFrom": "Office", "officePersonName": "Mohamed M", "quotationNumber": "0324",
+        "subject": "Supply of GRP tanks", "projectLocation": "Dubai Marina", "gallonType": "USG",
+        "numberOfTanks": n_tanks, "showSubTotal": True, "showVat": True, "showGrandTotal": True,
+        "tanks": [
+            {"tankNumber": t + 1, "optionEnabled": False, "optionNumbers": 1, "options": [tank_option(t)]}
+            for t in range(n_tanks)
+        ],
+        "dismantlingTanks": [{"tankName": "Old tank", "length": "2", "width": "2", "height": "2",
+                              "unit": "Nos", "quantity": 1, "unitPrice": 500}],
+        "cylindricalTanks": [{"tankName": "Cyl", "material": "PVC", "layers": 3, "orientation": "Vertical",
+                              "capacity": 1000, "quantity": 2, "unitPrice": 300}],
+        "terms": {"termsConditions": {"action": "yes", "details": ["Payment: 50% advance"], "custom": []}},
+        "tableEngine": table_engine,
+    }
+
+
+def render_plan(table_engine="docx"):
+    """What plan_quotation() resolves, without the database"""
+    return {
+        "template_path": os.path.join(TEMPLATE_DIR, "grp_template.docx"),
+        "table_engine": table_engine,
+        "company_code": "GRP",
+        "quote_number": "GRP/2610/MM/0324",
+        "signature": {
+            "left_name": "Mohamed M", "left_title": "Manager - Projects", "left_mobile": "052",
+            "left_email": "mm@grptanks.com", "right_name": "", "right_title": "", "right_mobile": "",
+            "right_email": "", "signature_image": None,
+        },
+        "output_dir": None,
+    }
@@ -0,0 +1,67 @@
+"""docx_packager writes the same package as doc.save(), at any stream position and past ZIP64 limits"""
+import io
+import struct
+import zipfile
+
+import docx
+import pytest
+
+import docx_packager
+from quotation_data import TEMPLATE_DIR
+
+TEMPLATE = f"{TEMPLATE_DIR}/grp_template.docx"
+
+
+@pytest.fixture
+def document():
+    doc = docx.Document(TEMPLATE)
+    doc.add_paragraph("Packaged by docx_packager")
+    return doc
+
+
+def members(data):
+    with zipfile.ZipFile(io.BytesIO(data)) as package:
+        assert package.testzip() is None
+        return {name: package.read(name) for name in package.namelist()}
+
+
+def saved_members(doc):
+    stream = io.BytesIO()
+    doc.save(stream)
+    return members(stream.getvalue())
+
+
+def central_directory_offset(data):
+    end = data.rindex(b"PK\x05\x06")
+    return struct.unpack("<L", data[end + 16:end + 20])[0]
+
+
+def test_same_members_as_doc_save(document):
+    index = docx_packager.PackageIndex.build(docx.Document(TEMPLATE), TEMPLATE)
+    assert members(docx_packager.package_bytes(document, index)) == saved_members(document)
+
+
+def test_offsets_are_absolute_when_the_stream_is_not_at_zero(document):
+    prefix = b"not part of the zip"
+    stream = io.BytesIO()
+    stream.write(prefix)
+    docx_packager.write_package(document, stream)
+    data = stream.getvalue()
+    assert data[central_directory_offset(data):][:4] == b"PK\x01\x02"
+    assert members(data) == saved_members(document)
+
+
+def test_zip64_records_past_the_limits(document, monkeypatch):
+    expected = saved_members(document)
+    monkeypatch.setattr(docx_packager, "_ZIP64_LIMIT", 2000)
+    monkeypatch.setattr(docx_packager, "_ZIP64_COUNT_LIMIT", 3)
+    data = docx_packager.package_bytes(document)
+    assert b"PK\x06\x06" in data and b"PK\x06\x07" in data
+    assert central_directory_offset(data) == 0xFFFFFFFF
+    assert members(data) == expected
+
+
+def test_falls_back_to_doc_save_without_the_python_docx_internals(document, monkeypatch):
+    monkeypatch.setattr(docx_packager, "_ContentTypesItem", None)
+    assert len(docx_packager.PackageIndex.build(document, TEMPLATE)) == 0
+    assert members(docx_packager.package_bytes(document)) == saved_members(document)
@@ -0,0 +1,20 @@
+"""Errors raised while planning keep their status code"""
+from quotation_data import quotation_request_data
+
+
+def test_missing_template_is_404(client):
+    body = dict(quotation_request_data(1), templatePath="no_such_template")
+    response = client.post("/generate-quotation", json=body)
+    assert response.status_code == 404
+    assert "no_such_template.docx" in response.json()["detail"]
+
+
+def test_fan_out_missing_template_is_404(client):
+    body = {
+        "quotation": dict(quotation_request_data(1), templatePath="no_such_template"),
+        "recipients": [{"recipientName": "Mr. A", "companyName": "A", "quotationNumber": "7001"},
+                       {"recipientName": "Mr. B", "companyName": "B", "quotationNumber": "7002"}],
+    }
+    response = client.post("/generate-quotation/fan-out", json=body)
+    assert response.status_code == 404
+    assert "no_such_template.docx" in response.json()["detail"]
@@ -0,0 +1,55 @@
+"""GenerationJobStore queue bound and retention of finished jobs"""
+import asyncio
+
+import pytest
+
+from generation_jobs import GenerationJobStore, GenerationJobsFull
+
+
+def test_queue_is_bounded_by_queue_size():
+    async def scenario():
+        store = GenerationJobStore(concurrency=1, queue_size=2)
+        gate = asyncio.Event()
+
+        async def pipeline(job):
+            job.status = "rendering"
+            await gate.wait()
+            return {}
+
+        running = store.submit(pipeline)
+        await asyncio.sleep(0)  # takes the only slot
+        store.submit(pipeline)
+        store.submit(pipeline)
+        with pytest.raises(GenerationJobsFull):
+            store.submit(pipeline)
+        assert store.stats()["queued"] == 2 and running.status == "rendering"
+        gate.set()
+        await asyncio.gather(*store._tasks)
+    asyncio.run(scenario())
+
+
+def finish_jobs(store, sizes):
+    async def scenario():
+        jobs = []
+        for size in sizes:
+            async def pipeline(job, size=size):
+                job.document = b"x" * size
+                return {"filename": "q.docx"}
+            jobs.append(store.submit(pipeline))
+            await asyncio.gather(*store._tasks)
+        return jobs
+    return asyncio.run(scenario())
+
+
+def test_finished_jobs_are_capped_oldest_first():
+    store = GenerationJobStore(concurrency=1, queue_size=10, max_finished=3)
+    jobs = finish_jobs(store, [10] * 5)
+    assert [store.get(job.id) is not None for job in jobs] == [False, False, True, True, True]
+
+
+def test_documents_beyond_the_byte_cap_are_dropped_oldest_first():
+    store = GenerationJobStore(concurrency=1, queue_size=10, max_document_bytes=250)
+    jobs = finish_jobs(store, [100, 100, 100])
+    assert [job.document is not None for job in jobs] == [False, True, True]
+    assert jobs[0].document_evicted and store.get(jobs[0].id).status == "done"
+    assert store.stats()["document_bytes"] == 200
@@ -0,0 +1,55 @@
+"""Cached quotation payloads follow changes to the rows they were built from"""
+from datetime import datetime
+
+from sqlmodel import Session, select
+
+import database
+from models import ProjectManagerDetails
+from payload_cache import payload_cache
+
+
+def save(client, quotation_number, phone_number="050 111", manager="Mohamed M"):
+    body = {
+        "quotationNumber": quotation_number, "fullQuoteNumber": f"GRP/2610/MM/{quotation_number}",
+        "fromCompany": "GRP TANKS TRADING L.L.C", "recipientTitle": "Mr.", "recipientName": "Cache Recipient",
+        "companyName": "Cache Co", "phoneNumber": phone_number, "quotationDate": "15/10/26",
+        "quotationFrom": "Office", "officePersonName": manager, "subject": "Supply of GRP tanks",
+        "projectLocation": "Dubai", "tanksData": {"tanks": []},
+    }
+    response = client.post("/api/save-quotation", json=body)
+    assert response.status_code == 200, response.text
+    return response.json()["id"]
+
+
+def test_recipient_saved_with_another_quotation_is_not_served_stale(client):
+    payload_cache.clear()
+    quotation_id = save(client, "0801", phone_number="050 111")
+    first = client.get(f"/api/quotations/{quotation_id}").json()
+    by_number = client.get("/api/quotation", params={"quote_number": "0801"}).json()
+    assert first["quotation"]["phone_number"] == by_number["phoneNumber"] == "050 111"
+    assert payload_cache.stats()["entries"] == 2
+
+    # Another quotation for the same recipient updates the shared recipient row
+    save(client, "0802", phone_number="050 222")
+
+    assert client.get(f"/api/quotations/{quotation_id}").json()["quotation"]["phone_number"] == "050 222"
+    assert client.get("/api/quotation", params={"quote_number": "0801"}).json()["phoneNumber"] == "050 222"
+
+
+def test_reference_data_sync_is_not_served_stale(client):
+    with Session(database.engine) as session:
+        session.add(ProjectManagerDetails(manager_name="Cache Manager", code="CM", designation="Engineer"))
+        session.commit()
+    payload_cache.clear()
+    quotation_id = save(client, "0803", manager="Cache Manager")
+    assert client.get(f"/api/quotations/{quotation_id}").json()["quotation"]["office_person_name"] == "Cache Manager"
+
+    # What sync_excel_to_db.py does to a changed row
+    with Session(database.engine) as session:
+        manager = session.exec(select(ProjectManagerDetails).where(ProjectManagerDetails.code == "CM")).one()
+        manager.manager_name = "Cache Manager Renamed"
+        manager.last_updated_time = datetime.utcnow()
+        session.commit()
+
+    response = client.get(f"/api/quotations/{quotation_id}").json()
+    assert response["quotation"]["office_person_name"] == "Cache Manager Renamed"
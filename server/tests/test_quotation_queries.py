@@ -0,0 +1,74 @@
+"""Statements issued to load a saved quotation, including revisions stored as deltas"""
+import contextlib
+
+from sqlalchemy import event
+
+import database
+from payload_cache import payload_cache
+
+MAX_STATEMENTS = 2  # the version lookup, then the joined quotation bundle
+
+
+def save_body(revision, n_tanks):
+    return {
+        "quotationNumber": "0701", "fullQuoteNumber": "GRP/2610/MM/0701" + (f"-R{revision}" if revision else ""),
+        "fromCompany": "GRP TANKS TRADING L.L.C", "recipientTitle": "Mr.", "recipientName": "Query Count",
+        "companyName": "ACME LLC", "quotationDate": "15/10/26", "quotationFrom": "Office",
+        "officePersonName": "Mohamed M", "subject": "Supply of GRP tanks", "projectLocation": "Dubai",
+        "tanksData": {"tanks": [{"tankNumber": t + 1, "options": [{"tankName": f"Tank {t + 1}", "length": "3"}]}
+                                for t in range(n_tanks)]},
+        "terms": {"termsConditions": {"action": "yes", "details": ["Payment: 50% advance"], "custom": []}},
+        "revisionNumber": revision,
+    }
+
+
+@contextlib.contextmanager
+def count_statements():
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(database.engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(database.engine, "before_cursor_execute", before_cursor_execute)
+
+
+def saved_revisions(client):
+    """ids of R0 (stored in full) and R1 (stored as a delta against R0)"""
+    ids = []
+    for revision, n_tanks in ((0, 30), (1, 31)):
+        response = client.post("/api/save-quotation", json=save_body(revision, n_tanks))
+        assert response.status_code == 200, response.text
+        ids.append(response.json()["id"])
+    return ids
+
+
+def test_get_quotation_statement_budget(client):
+    saved_revisions(client)
+    for revision, n_tanks in (("0", 30), ("1", 31)):
+        payload_cache.clear()
+        with count_statements() as statements:
+            response = client.get("/api/quotation", params={"quote_number": "0701", "revision": revision})
+        assert response.status_code == 200
+        assert len(response.json()["tanksData"]["tanks"]) == n_tanks
+        assert len(statements) <= MAX_STATEMENTS, statements
+        with count_statements() as statements:
+            client.get("/api/quotation", params={"quote_number": "0701", "revision": revision})
+        assert len(statements) == 1, statements  # cached payload: only the version lookup
+
+
+def test_get_quotation_by_id_statement_budget(client):
+    for quotation_id, n_tanks in zip(saved_revisions(client), (30, 31)):
+        payload_cache.clear()
+        with count_statements() as statements:
+            response = client.get(f"/api/quotations/{quotation_id}")
+        assert response.status_code == 200
+        assert len(response.json()["tanks"]["tanks"]) == n_tanks
+        assert response.json()["terms"]["termsConditions"]["details"] == ["Payment: 50% advance"]
+        assert len(statements) <= MAX_STATEMENTS, statements
+        with count_statements() as statements:
+            client.get(f"/api/quotations/{quotation_id}")
+        assert len(statements) == 1, statements
@@ -0,0 +1,84 @@
+"""
+write_quotation() on PostgreSQL: one statement for every row a save writes.
+Needs TEST_DATABASE_URL.
+"""
+from datetime import date, datetime
+
+import pytest
+from sqlalchemy import event, func
+from sqlmodel import Session, SQLModel, select
+
+from conftest import seed_reference_data
+from models import (
+    CompanyDetails, ContractualTermsSpecifications, QuotationTankLine, QuotationWebpageInputDetailsSave,
+    RecipientDetails,
+)
+from quotation_saves import write_quotation
+from tank_lines import tank_lines_from_data
+
+
+@pytest.fixture(scope="module")
+def save_db(pg_engine):
+    SQLModel.metadata.drop_all(pg_engine)
+    SQLModel.metadata.create_all(pg_engine)
+    seed_reference_data(pg_engine)
+    return pg_engine
+
+
+def rows(session, company_name, n_tanks, terms=True):
+    now = datetime.utcnow()
+    company = session.exec(select(CompanyDetails)).first()
+    recipient = RecipientDetails(recipient_name="Save Test", to_company_name=company_name, phone_number=str(n_tanks),
+                                 created_time=now, last_updated_time=now)
+    quotation = QuotationWebpageInputDetailsSave(
+        quotation_number="0901", full_main_quote_number="GRP/2610/MM/0901", company_id=company.id,
+        quotation_date=date(2026, 10, 15), subject="Supply of GRP tanks", revision_number=0,
+        tanks_data={"tanks": [{"tankNumber": t + 1, "options": [{"tankName": f"Tank {t + 1}", "length": "3"}]}
+                              for t in range(n_tanks)]},
+        created_time=now, last_updated_time=now)
+    contractual_terms = ContractualTermsSpecifications(
+        full_main_quote_number="GRP/2610/MM/0901", note={"details": [str(n_tanks)]},
+        created_time=now, last_updated_time=now) if terms else None
+    lines = tank_lines_from_data(quotation.tanks_data)
+    return recipient, quotation, lines, contractual_terms, ("note", "last_updated_time")
+
+
+def test_save_is_one_statement(save_db):
+    statements = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    with Session(save_db) as session:
+        for n_tanks, inserted in ((3, True), (5, False)):
+            save = rows(session, "ACME LLC", n_tanks)
+            event.listen(save_db, "before_cursor_execute", count)
+            recipient, quotation, terms = write_quotation(session, *save)
+            event.remove(save_db, "before_cursor_execute", count)
+            assert len(statements) == 1, statements
+            statements.clear()
+            assert recipient.inserted is quotation.inserted is terms.inserted is inserted
+            assert quotation.recipient_id == recipient.id and recipient.phone_number == str(n_tanks)
+            assert terms.note == {"details": [str(n_tanks)]}
+            session.commit()
+            lines = session.exec(select(QuotationTankLine.tank_number).where(
+                QuotationTankLine.quotation_id == quotation.id).order_by(QuotationTankLine.tank_number)).all()
+            assert lines == list(range(1, n_tanks + 1))
+
+        save = rows(session, "ACME LLC", 0, terms=False)
+        event.listen(save_db, "before_cursor_execute", count)
+        _, _, terms = write_quotation(session, *save)
+        event.remove(save_db, "before_cursor_execute", count)
+        assert len(statements) == 1 and terms is None
+        session.commit()
+        assert session.exec(select(func.count(QuotationTankLine.id))).one() == 0
+
+
+def test_recipient_without_company_is_not_duplicated(save_db):
+    with Session(save_db) as session:
+        first, _, _ = write_quotation(session, *rows(session, None, 1))
+        second, _, _ = write_quotation(session, *rows(session, None, 2))
+        session.commit()
+        assert first.inserted and not second.inserted and first.id == second.id
+        count = session.exec(select(func.count(RecipientDetails.id)).where(RecipientDetails.to_company_name.is_(None)))
+        assert count.one() == 1
@@ -0,0 +1,76 @@
+"""Quotation totals are computed on save, like the document footer"""
+from decimal import Decimal
+
+from sqlmodel import Session
+
+import database
+from models import CompanyDetails
+from quotation_data import tank_option
+from quotation_totals import quotation_totals
+from reference_data import reference_data
+
+
+def tanks_data(n_tanks):
+    return {"tanks": [{"tankNumber": t + 1, "options": [tank_option(t)]} for t in range(n_tanks)]}
+
+
+def test_totals_follow_the_document_footer():
+    # 1x1000 + 2x1001 + 3x1002 + 1x1003, and 2x1004 discounted to 999
+    totals = quotation_totals(tanks_data(5))
+    assert totals == {
+        "subtotal": Decimal("8010.00"),
+        "discount_percentage": Decimal("11.19"),
+        "discount_amount": Decimal("1009.00"),
+        "tax_percentage": Decimal("5.00"),
+        "tax_amount": Decimal("400.50"),
+        "total_amount": Decimal("8410.50"),
+    }
+
+
+def test_totals_ignore_what_is_not_a_price():
+    data = {"tanks": [
+        {"tankNumber": 1, "options": [{"quantity": "2", "unitPrice": ""}, {"quantity": "x", "unitPrice": "5"}]},
+        {"tankNumber": 2, "quantity": 2, "unitPrice": "2.5", "hasDiscount": True, "discountedTotalPrice": ""},
+    ], "dismantlingTanks": [{"quantity": 1, "unitPrice": 500}]}
+    totals = quotation_totals(data)
+    assert totals["subtotal"] == Decimal("505.00") and totals["discount_amount"] == 0
+    assert quotation_totals({})["total_amount"] == 0
+
+
+def test_saved_totals_are_listed_with_the_revisions(client):
+    body = {
+        "quotationNumber": "0951", "fullQuoteNumber": "GRP/2610/MM/0951", "fromCompany": "GRP TANKS TRADING L.L.C",
+        "recipientTitle": "Mr.", "recipientName": "Totals", "companyName": "ACME LLC", "quotationDate": "15/10/26",
+        "quotationFrom": "Office", "officePersonName": "Mohamed M", "subject": "Supply of GRP tanks",
+        "projectLocation": "Dubai", "tanksData": tanks_data(5), "formOptions": {"showVat": False},
+    }
+    assert client.post("/api/save-quotation", json=body).status_code == 200
+    # showVat only hides the VAT row: GRAND TOTAL on the document still includes it
+    assert client.post("/api/save-quotation", json={**body, "fullQuoteNumber": "GRP/2610/MM/0951-R1",
+                                                    "revisionNumber": 1, "tanksData": tanks_data(1)}).status_code == 200
+    revisions = client.get("/api/quotations/0951/revisions", params={"company": "GRP"}).json()["revisions"]
+    assert [(r["subtotal"], r["tax_amount"], r["total_amount"]) for r in revisions] == [
+        (8010.0, 400.5, 8410.5), (1000.0, 50.0, 1050.0)]
+
+
+def test_revisions_are_listed_for_one_company(client):
+    with Session(database.engine) as session:
+        session.add(CompanyDetails(company_name="GRPPT", full_name="GRP PIPECO TANKS TRADING L.L.C", code="GRPPT",
+                                   template_path="grppt_template", company_domain="grppipeco.com"))
+        session.commit()
+    reference_data.invalidate()
+    body = {
+        "quotationNumber": "0952", "fullQuoteNumber": "GRP/2610/MM/0952", "fromCompany": "GRP TANKS TRADING L.L.C",
+        "recipientTitle": "Mr.", "recipientName": "Totals", "companyName": "ACME LLC", "quotationDate": "15/10/26",
+        "quotationFrom": "Office", "officePersonName": "Mohamed M", "subject": "Supply of GRP tanks",
+        "projectLocation": "Dubai", "tanksData": tanks_data(1),
+    }
+    assert client.post("/api/save-quotation", json=body).status_code == 200
+    assert client.post("/api/save-quotation", json={**body, "fullQuoteNumber": "GRPPT/2610/MM/0952",
+                                                    "fromCompany": "GRP PIPECO TANKS TRADING L.L.C",
+                                                    "tanksData": tanks_data(2)}).status_code == 200
+    assert client.get("/api/quotations/0952/revisions").status_code == 422
+    for company, quote_number, subtotal in (("GRP", "GRP/2610/MM/0952", 1000.0),
+                                            ("GRPPT", "GRPPT/2610/MM/0952", 3002.0)):
+        revisions = client.get("/api/quotations/0952/revisions", params={"company": company}).json()["revisions"]
+        assert [(r["full_main_quote_number"], r["subtotal"]) for r in revisions] == [(quote_number, subtotal)]
@@ -0,0 +1,155 @@
+"""Recipient autocomplete index: incremental updates, ranking, and reads during a rebuild"""
+import threading
+import time
+from datetime import datetime
+from types import SimpleNamespace
+
+from recipient_index import RecipientIndex, RecipientPrefixes, recipient_item
+
+N_RECIPIENTS = 20_000
+MAX_SUGGEST_SECONDS = 0.001
+
+
+def recipient(recipient_id, name, company="", phone="", email=""):
+    return SimpleNamespace(id=recipient_id, recipient_title="Mr.", recipient_name=name, role_of_recipient="",
+                           to_company_name=company, to_company_location="", phone_number=phone, email=email)
+
+
+def names(result):
+    return [item["name"] for item in result["recipients"]]
+
+
+def assert_same_as_built(prefixes, recipients, queries):
+    """Incremental updates leave the lists a fresh build of the same recipients would have"""
+    built = RecipientPrefixes(recipients)
+    assert prefixes.items == built.items and prefixes.company_counts == built.company_counts
+    assert prefixes.key_count() == built.key_count()
+    for q in queries:
+        assert prefixes.suggest(q) == built.suggest(q), q
+
+
+def test_insert():
+    prefixes = RecipientPrefixes([recipient(1, "John Smith", "ACME LLC")])
+    added = recipient(2, "Joan Stone", "Al-Noor Trading", "+971 50 123 4567", "joan@alnoor.ae")
+    prefixes.put(2, recipient_item(added))
+    assert names(prefixes.suggest("jo")) == ["Joan Stone", "John Smith"]
+    assert prefixes.suggest("noor")["companies"] == ["Al-Noor Trading"]
+    # Phone digits and email (or its domain) match from their start
+    assert names(prefixes.suggest("971 50")) == names(prefixes.suggest("alnoor.ae")) == ["Joan Stone"]
+    assert names(prefixes.suggest("050 123")) == names(prefixes.suggest("noor.ae")) == []
+    assert_same_as_built(prefixes, [recipient(1, "John Smith", "ACME LLC"), added], ["jo", "al", "acme", "971"])
+
+
+def test_rename():
+    prefixes = RecipientPrefixes([recipient(1, "John Smith", "ACME LLC"), recipient(2, "Mary Jones", "ACME LLC")])
+    prefixes.put(1, recipient_item(recipient(1, "Jonathan Smythe", "ACME LLC")))
+    assert names(prefixes.suggest("john")) == []
+    assert names(prefixes.suggest("smy")) == ["Jonathan Smythe"]
+    assert names(prefixes.suggest("acme")) == ["Jonathan Smythe", "Mary Jones"]
+    assert_same_as_built(
+        prefixes, [recipient(1, "Jonathan Smythe", "ACME LLC"), recipient(2, "Mary Jones", "ACME LLC")],
+        ["jo", "sm", "acme", "mary"])
+
+
+def test_company_change_and_last_recipient_leaving_a_company():
+    prefixes = RecipientPrefixes([
+        recipient(1, "John Smith", "ACME LLC"), recipient(2, "Mary Jones", "ACME LLC"),
+        recipient(3, "Ali Hassan", "Gulf Pipes"),
+    ])
+    prefixes.put(1, recipient_item(recipient(1, "John Smith", "Gulf Pipes")))
+    assert prefixes.company_counts == {"ACME LLC": 1, "Gulf Pipes": 2}
+    assert prefixes.suggest("acme")["companies"] == ["ACME LLC"]
+    assert names(prefixes.suggest("acme")) == ["Mary Jones"]
+
+    prefixes.put(2, recipient_item(recipient(2, "Mary Jones", "Gulf Pipes")))
+    assert prefixes.company_counts == {"Gulf Pipes": 3}
+    assert prefixes.suggest("acme") == {"recipients": [], "companies": []}
+    assert names(prefixes.suggest("gulf")) == ["Ali Hassan", "John Smith", "Mary Jones"]
+
+    prefixes.put(3, recipient_item(recipient(3, "", "Gulf Pipes")))  # no name: no longer listed
+    assert names(prefixes.suggest("ali")) == []
+    assert_same_as_built(
+        prefixes, [recipient(1, "John Smith", "Gulf Pipes"), recipient(2, "Mary Jones", "Gulf Pipes")],
+        ["acme", "gulf", "pipes", "jo", "ma"])
+
+
+def test_ranking_across_tiers():
+    prefixes = RecipientPrefixes([
+        recipient(1, "Zed Dubai", "Other"),  # name word
+        recipient(2, "Dubai Water", "Other"),  # full name
+        recipient(3, "Amir Khan", "Dubai Tanks"),  # company
+        recipient(4, "Basil Omar", "Other", email="dubai@example.com"),  # email
+        recipient(5, "Ahmed Ali", "Dubai Tanks"),  # company, alphabetically first
+    ])
+    assert names(prefixes.suggest("dubai")) == ["Dubai Water", "Zed Dubai", "Ahmed Ali", "Amir Khan", "Basil Omar"]
+    # Every word must start a name or company word
+    assert names(prefixes.suggest("dubai ta")) == ["Ahmed Ali", "Amir Khan"]
+
+
+def test_limit_caps_recipients_and_companies():
+    prefixes = RecipientPrefixes(recipient(i, f"Khalid {i:02d}", f"Khalid Trading {i:02d}") for i in range(30))
+    result = prefixes.suggest("khalid", limit=5)
+    assert names(result) == [f"Khalid {i:02d}" for i in range(5)]
+    assert result["companies"] == [f"Khalid Trading {i:02d}" for i in range(5)]
+
+
+def test_suggest_is_well_under_a_millisecond():
+    prefixes = RecipientPrefixes(
+        recipient(i, f"Recipient {i:05d} {chr(97 + i % 26)}{i % 997}", f"Company {i % 2000:04d} Trading",
+                  f"+971 50 {i:07d}", f"user{i}@company{i % 2000}.ae")
+        for i in range(N_RECIPIENTS)
+    )
+    queries = ["rec", "recipient 1", "company 12", "971 50 00", "user42", "b", "trading", "nothing here"]
+    timings = []
+    for _ in range(20):
+        for q in queries:
+            started = time.perf_counter()
+            prefixes.suggest(q)
+            timings.append(time.perf_counter() - started)
+    timings.sort()
+    median = timings[len(timings) // 2]
+    print(f"suggest over {N_RECIPIENTS} recipients: median {median * 1e6:.0f} us, max {timings[-1] * 1e6:.0f} us")
+    assert median < MAX_SUGGEST_SECONDS
+
+
+class BlockingIndex(RecipientIndex):
+    """RecipientIndex over a list instead of the table; a rebuild waits for `release` once `block` is set"""
+
+    def __init__(self, recipients):
+        super().__init__(check_seconds=0)
+        self.recipients = recipients
+        self.block = False
+        self.reading = threading.Event()
+        self.release = threading.Event()
+
+    def _read_fingerprint(self, session):
+        return (len(self.recipients), None)
+
+    def _read_recipients(self, session):
+        if self.block:
+            self.reading.set()
+            assert self.release.wait(10)
+        return list(self.recipients)
+
+
+def test_suggest_answers_from_current_lists_while_rebuilding():
+    index = BlockingIndex([recipient(1, "John Smith", "ACME LLC")])
+    assert names(index.suggest("jo")) == ["John Smith"]
+
+    # Another process added a recipient: the next check rebuilds, blocked in the read
+    index.recipients.append(recipient(2, "Joan Stone"))
+    index.block = True
+    rebuild = threading.Thread(target=index.suggest, args=("jo",))
+    rebuild.start()
+    assert index.reading.wait(10)
+    started = time.perf_counter()
+    assert names(index.suggest("jo")) == ["John Smith"]
+    assert time.perf_counter() - started < 1
+
+    # Saved here while the rebuild reads (and missing from what it read): replayed onto the new lists
+    index.upsert(3, recipient_item(recipient(3, "Jody Fox")), datetime.utcnow(), created=True)
+    index.release.set()
+    rebuild.join(10)
+    assert not rebuild.is_alive()
+    assert names(index.suggest("jo")) == ["Joan Stone", "Jody Fox", "John Smith"]
+    assert index.stats()["builds"] == 2
@@ -0,0 +1,89 @@
+"""
+Render timings: the quotation table stays linear in the number of tanks,
+and each extra fan-out recipient costs a fraction of a full render
+"""
+import contextlib
+import io
+import time
+import zipfile
+
+import pytest
+
+from quotation_data import quotation_request_data, render_plan
+from invoice_table_xml import TABLE_ENGINES
+from quotation_request import FanoutQuotationRequest, QuotationRequest
+import quotation_render
+import user_input_tank_generator
+
+SMALL_TANKS = 5
+LARGE_TANKS = 500
+# 100x the tanks: linear work is at most ~100x the time (fixed costs make it
+# less); the old quadratic table fill was several thousand times slower
+MAX_SLOWDOWN = 200
+
+FANOUT_TANKS = 25
+FANOUT_RECIPIENTS = 9
+# An extra recipient rebuilds two small tables and repackages (~5-15% of a full render)
+MAX_EXTRA_RECIPIENT_SHARE = 0.3
+
+
+def best_seconds(render, repeat=3):
+    best = None
+    for _ in range(repeat):
+        with contextlib.redirect_stdout(io.StringIO()):
+            started = time.perf_counter()
+            render()
+            elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def render_seconds(n_tanks, table_engine, repeat=3):
+    request = QuotationRequest(**quotation_request_data(n_tanks, table_engine))
+    plan = render_plan(table_engine)
+    return best_seconds(lambda: quotation_render.render_quotation(request, plan), repeat)
+
+
+def fanout_requests(n_tanks, n_recipients):
+    """Requests and plans of one quotation body sent to n_recipients, each with its own quote number"""
+    requests = FanoutQuotationRequest(quotation=quotation_request_data(n_tanks), recipients=[
+        {"recipientName": f"Recipient {i}", "companyName": f"Company {i}", "quotationNumber": f"{324 + i:04d}"}
+        for i in range(n_recipients)
+    ]).recipient_requests()
+    plans = [{**render_plan(), "quote_number": f"GRP/2610/MM/{324 + i:04d}"} for i in range(n_recipients)]
+    return requests, plans
+
+
+def document_xml(n_tanks, table_engine="docx"):
+    request = QuotationRequest(**quotation_request_data(n_tanks, table_engine))
+    with contextlib.redirect_stdout(io.StringIO()):
+        document = quotation_render.render_quotation(request, render_plan(table_engine))
+    with zipfile.ZipFile(io.BytesIO(document)) as package:
+        return package.read("word/document.xml")
+
+
+@pytest.mark.parametrize("table_engine", TABLE_ENGINES)
+def test_render_time_grows_linearly_with_tanks(table_engine):
+    render_seconds(SMALL_TANKS, table_engine, repeat=1)  # warm the template cache
+    small = render_seconds(SMALL_TANKS, table_engine)
+    large = render_seconds(LARGE_TANKS, table_engine, repeat=1)
+    print(f"{table_engine}: {SMALL_TANKS} tanks {small:.3f}s, {LARGE_TANKS} tanks {large:.3f}s ({large / small:.0f}x)")
+    assert large / small < MAX_SLOWDOWN
+
+
+def test_merge_fallback_renders_the_same_table(monkeypatch):
+    expected = document_xml(20)
+    monkeypatch.setattr(user_input_tank_generator, "ST_Merge", None)
+    assert document_xml(20) == expected
+
+
+def test_extra_fanout_recipient_costs_a_fraction_of_a_full_render():
+    requests, plans = fanout_requests(FANOUT_TANKS, FANOUT_RECIPIENTS)
+    render_seconds(SMALL_TANKS, "docx", repeat=1)  # warm the template cache
+    full = best_seconds(lambda: quotation_render.render_quotation(requests[0], plans[0]))
+    one = best_seconds(lambda: quotation_render.render_quotation_fanout(requests[:1], plans[:1]))
+    all_recipients = best_seconds(lambda: quotation_render.render_quotation_fanout(requests, plans))
+    per_extra = (all_recipients - one) / (FANOUT_RECIPIENTS - 1)
+    print(f"fan-out: full render {full * 1000:.0f} ms, {per_extra * 1000:.0f} ms per extra recipient "
+          f"({per_extra / full:.0%})")
+    assert per_extra / full < MAX_EXTRA_RECIPIENT_SHARE
@@ -0,0 +1,123 @@
+"""
+The partial-match search filters use the pg_trgm indexes on a large table.
+Needs PostgreSQL with pg_trgm (TEST_DATABASE_URL).
+"""
+import hashlib
+import os
+
+import pytest
+from sqlalchemy import func, select, text
+from sqlmodel import SQLModel
+
+import api_server
+from quotation_data import SERVER_DIR
+
+ROWS = 100_000
+MIGRATIONS_DIR = os.path.join(os.path.dirname(SERVER_DIR), "bin", "migrations")
+TRIGRAM_MIGRATIONS = (
+    "20261017110000_add_search_trigram_indexes.sql",
+    "20261017120000_add_quotation_tank_lines.sql",
+)
+
+SEED = """
+INSERT INTO company_details (id, company_name, full_name, code, created_time, last_updated_time)
+VALUES (1, 'GRP', 'GRP TANKS TRADING L.L.C', 'GRP', now(), now());
+
+INSERT INTO sales_details (id, sales_person_name, code, created_time, last_updated_time)
+SELECT i, 'Sales ' || md5(i || 's'), 'S' || i, now(), now() FROM generate_series(1, :rows) i;
+
+INSERT INTO project_manager_details (id, manager_name, code, created_time, last_updated_time)
+SELECT i, 'Manager ' || md5(i || 'm'), 'M' || i, now(), now() FROM generate_series(1, :rows) i;
+
+INSERT INTO recipient_details (id, recipient_title, recipient_name, to_company_name, phone_number, email,
+                               created_time, last_updated_time)
+SELECT i, 'Mr.', 'Recipient ' || md5(i || 'r'), 'Company ' || md5(i || 'c'),
+       '+971 ' || lpad(((i * 7919) % 100000000)::text, 8, '0'), md5(i || 'e') || '@example.com', now(), now()
+FROM generate_series(1, :rows) i;
+
+INSERT INTO quotation_webpage_input_details_save (
+    id, quotation_number, full_main_quote_number, company_id, recipient_id, sales_person_id,
+    project_manager_id, quotation_date, subject, generated_by, tanks_data, status, revision_number,
+    created_time, last_updated_time)
+SELECT i, lpad(i::text, 6, '0'), 'GRPPT/2512/VV/' || lpad(i::text, 6, '0'), 1, i, i, i,
+       date '2025-01-01' + (i % 365), 'Supply of tanks ' || md5(i || 'q'), 'User ' || md5(i || 'g'),
+       '{}', 'draft', 0, now(), now()
+FROM generate_series(1, :rows) i;
+
+INSERT INTO quotation_tank_lines (quotation_id, tank_number, option_number, tank_type, support_system,
+                                  length, width, height, quantity)
+SELECT i, 1, 1, 'GRP ' || md5(i || 't'), 'Skid ' || md5(i || 'k'), 2, 2, 2, 1
+FROM generate_series(1, :rows) i;
+"""
+
+
+def term(row, salt):
+    """8 characters from the middle of a seeded md5 value: matches about one row"""
+    return hashlib.md5(f"{row}{salt}".encode()).hexdigest()[10:18]
+
+
+# (index, GET /api/quotations filter parameter, search term)
+FILTERS = [
+    ("idx_recipient_name_trgm", "recipient_name", term(4242, "r")),
+    ("idx_recipient_company_trgm", "company_name", term(4242, "c")),
+    ("idx_recipient_phone_trgm", "phone_number", f"{(4242 * 7919) % 100000000:08d}"),
+    ("idx_recipient_email_trgm", "email", term(4242, "e")),
+    ("idx_quotation_subject_trgm", "subject", term(4242, "q")),
+    ("idx_quotation_generated_by_trgm", "generated_by", term(4242, "g")),
+    ("idx_sales_person_name_trgm", "sales_person", term(4242, "s")),
+    ("idx_manager_name_trgm", "office_person", term(4242, "m")),
+    ("idx_tank_lines_type_trgm", "tank_type", term(4242, "t")),
+    ("idx_tank_lines_support_trgm", "support_system", term(4242, "k")),
+]
+
+
+def trigram_statements():
+    """The pg_trgm extension and *_trgm index statements of the migrations"""
+    for name in TRIGRAM_MIGRATIONS:
+        with open(os.path.join(MIGRATIONS_DIR, name), encoding="utf-8") as migration:
+            sql = "\n".join(line for line in migration if not line.lstrip().startswith("--"))
+        for statement in sql.split(";"):
+            statement = statement.strip()
+            if statement.startswith("CREATE EXTENSION") or "gin_trgm_ops" in statement:
+                yield statement
+
+
+@pytest.fixture(scope="module")
+def search_db(pg_engine):
+    SQLModel.metadata.drop_all(pg_engine)
+    SQLModel.metadata.create_all(pg_engine)
+    with pg_engine.begin() as connection:
+        for statement in trigram_statements():
+            connection.exec_driver_sql(statement)
+        for statement in SEED.split(";"):
+            if statement.strip():
+                connection.execute(text(statement), {"rows": ROWS})
+    with pg_engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        connection.exec_driver_sql("ANALYZE")
+    return pg_engine
+
+
+def test_trigram_indexes_are_those_of_the_partial_match_filters(search_db):
+    with search_db.connect() as connection:
+        indexes = connection.execute(text("SELECT indexname FROM pg_indexes WHERE indexname LIKE '%trgm'"))
+        names = {row[0] for row in indexes}
+    assert names == {index for index, _, _ in FILTERS}
+
+
+def explain(connection, statement):
+    compiled = statement.compile(dialect=connection.dialect)
+    return "\n".join(row[0] for row in connection.exec_driver_sql("EXPLAIN " + compiled.string, compiled.params))
+
+
+@pytest.mark.parametrize("index, parameter, search", FILTERS, ids=[f[0] for f in FILTERS])
+def test_search_filter_uses_trigram_index(search_db, index, parameter, search):
+    # The count and the first page, as search_quotations() sends them
+    filtered = api_server.search_statement(**{parameter: search})
+    count = select(func.count()).select_from(filtered.subquery())
+    page = api_server.search_page_statement(filtered, "-date", None, api_server.SEARCH_PAGE_SIZE)
+    with search_db.connect() as connection:
+        for statement in (count, page):
+            plan = explain(connection, statement)
+            assert f"Bitmap Index Scan on {index}" in plan, plan
+        matches = connection.execute(page).all()
+    assert [row.id for row in matches] == [4242]
@@ -0,0 +1,82 @@
+"""GenerationPool admission and waiting, and blocking pool sizing"""
+import asyncio
+import threading
+import time
+
+import pytest
+
+import worker_pools
+from worker_pools import GenerationPool, GenerationPoolFull
+
+
+def blocked_job(gate, started):
+    started.set()
+    gate.wait(5)
+    return time.perf_counter()
+
+
+def test_blocking_workers_fit_the_connection_pool():
+    connections = worker_pools.DB_POOL_SIZE + worker_pools.DB_MAX_OVERFLOW
+    assert worker_pools.BLOCKING_WORKERS * worker_pools.CONNECTIONS_PER_WORKER <= connections
+
+
+def test_full_pool_rejects_without_wait():
+    async def scenario():
+        pool = GenerationPool("thread", workers=1, queue_size=0)
+        gate, started = threading.Event(), threading.Event()
+        running = asyncio.ensure_future(pool.run(blocked_job, gate, started))
+        await asyncio.get_running_loop().run_in_executor(None, started.wait)
+        with pytest.raises(GenerationPoolFull):
+            await pool.run(time.perf_counter)
+        gate.set()
+        await running
+        assert pool.stats()["running"] == 0
+        pool.shutdown()
+    asyncio.run(scenario())
+
+
+def test_waiters_get_freed_slots_in_order_without_polling():
+    async def scenario():
+        pool = GenerationPool("thread", workers=1, queue_size=0)
+        gate, started = threading.Event(), threading.Event()
+        running = asyncio.ensure_future(pool.run(blocked_job, gate, started))
+        await asyncio.get_running_loop().run_in_executor(None, started.wait)
+        order = []
+
+        async def waiter(name):
+            started_at = await pool.run(time.perf_counter, wait=True)
+            order.append(name)
+            return started_at
+
+        waiters = [asyncio.ensure_future(waiter(name)) for name in ("first", "second", "third")]
+        await asyncio.sleep(0.05)
+        assert pool.stats()["running"] == 1 and order == []
+        gate.set()
+        finished_at = await running
+        started_at = await waiters[0]
+        await asyncio.gather(*waiters)
+        assert order == ["first", "second", "third"]
+        assert started_at - finished_at < 0.05  # handed over, not picked up by a 0.1 s poll
+        assert pool.stats()["running"] == 0 and pool.stats()["queued"] == 0
+        pool.shutdown()
+    asyncio.run(scenario())
+
+
+def test_cancelled_waiter_does_not_hold_a_slot():
+    async def scenario():
+        pool = GenerationPool("thread", workers=1, queue_size=0)
+        gate, started = threading.Event(), threading.Event()
+        running = asyncio.ensure_future(pool.run(blocked_job, gate, started))
+        await asyncio.get_running_loop().run_in_executor(None, started.wait)
+        cancelled = asyncio.ensure_future(pool.run(time.perf_counter, wait=True))
+        await asyncio.sleep(0.01)
+        cancelled.cancel()
+        gate.set()
+        await running
+        with pytest.raises(asyncio.CancelledError):
+            await cancelled
+        # The slot is free again: a non-waiting run is admitted
+        await asyncio.wait_for(pool.run(time.perf_counter), 1)
+        assert pool.stats()["running"] == 0
+        pool.shutdown()
+    asyncio.run(scenario())
@@ -0,0 +1,62 @@
+"""Single-statement INSERT ... ON CONFLICT DO UPDATE ... RETURNING for saved rows (PostgreSQL)"""
+from sqlalchemy import cast, literal, literal_column, select
+from sqlalchemy.dialects.postgresql import insert
+
+
+def insert_values(row):
+    """Column values of a new model instance, as the ORM would insert them (no id, no generated columns)"""
+    return {
+        column.name: getattr(row, column.name)
+        for column in row.__table__.columns
+        if not column.primary_key and column.computed is None
+    }
+
+
+def supports_writable_ctes(session):
+    """True when upserts can be chained in one statement as WITH ... INSERT CTEs (PostgreSQL)"""
+    return session.get_bind().dialect.name == "postgresql"
+
+
+def inserted_flag(session, row):
+    """RETURNING expression: true when the upsert inserted row, false when it updated an existing one"""
+    if supports_writable_ctes(session):
+        # A row version written by INSERT has xmax 0; ON CONFLICT DO UPDATE sets it
+        return literal_column("xmax = 0")
+    # No xmax (the SQLite test database): an updated row kept its original created_time
+    return row.__table__.c.created_time == row.created_time
+
+
+def upsert_statement(session, row, conflict_columns, update_columns, references=None):
+    """
+    INSERT ... ON CONFLICT DO UPDATE ... RETURNING for row: the stored columns
+    plus `inserted`. references maps column names to a column of an earlier
+    upsert's CTE (recipient_id -> saved recipient id); the row is then
+    inserted from a SELECT over that CTE.
+    """
+    table = row.__table__
+    values = insert_values(row)
+    if references:
+        for name in references:
+            values.pop(name, None)
+        source = select(
+            *(cast(literal(value, table.c[name].type), table.c[name].type) for name, value in values.items()),
+            *references.values(),
+        )
+        statement = insert(table).from_select([*values, *references], source)
+    else:
+        statement = insert(table).values(values)
+    statement = statement.on_conflict_do_update(
+        index_elements=list(conflict_columns),
+        set_={column: statement.excluded[column] for column in update_columns},
+    )
+    return statement.returning(*table.columns, inserted_flag(session, row).label("inserted"))
+
+
+def upsert(session, row, conflict_columns, update_columns):
+    """
+    Insert row, or update update_columns of the existing row with the same
+    conflict_columns (which must have a unique constraint). Returns the
+    stored row as the database has it, triggers included, with `inserted`
+    true when it was created.
+    """
+    return session.execute(upsert_statement(session, row, conflict_columns, update_columns)).one()
@@ -3,10 +3,24 @@ from docx.shared import Pt, RGBColor, Inches
 from docx.enum.text import WD_ALIGN_PARAGRAPH
 from docx.oxml.ns import qn
 from docx.oxml import OxmlElement
+try:
+    from docx.oxml.simpletypes import ST_Merge
+except ImportError:  # not in every python-docx release; _merge_cells falls back to cell.merge()
+    ST_Merge = None
+from docx.table import Table, _Cell
 import datetime
+import io
 import os
 import stat
 import pandas as pd
+from template_cache import template_cache
+from docx_packager import write_package
+from tank_catalogue import cylindrical_catalogue
+from invoice_table_xml import DEFAULT_TABLE_ENGINE, InvoiceTableXmlBuilder
+from quotation_styles import (
+    ensure_quote_styles, QUOTE_TEXT, QUOTE_BOLD, QUOTE_BODY, QUOTE_TABLE_HEADER,
+    QUOTE_SECTION_HEADING, QUOTE_BULLET,
+)
 
 class TankInvoiceGenerator:
     def delete_tables_in_first_page_header(self):
@@ -22,25 +36,16 @@ class TankInvoiceGenerator:
             print(f"Deleted {len(tables)} table(s) from first page header.")
     def __init__(self, template_path="Template.docx"):
         """Initialize the document from template"""
-        # Load the template document
+        # Load the template document (parsed once per process, copied per request;
+        # read-only protection is already stripped from the cached copy)
+        # package_index holds the template's compressed zip entries reused by save()
         if os.path.exists(template_path):
-            self.doc = Document(template_path)
+            self.doc, self.package_index = template_cache.get_document_and_index(template_path)
             print(f"✓ Loaded template: {template_path}")
-            
-            # Remove any read-only protection inherited from template
-            try:
-                settings_element = self.doc.settings.element
-                write_protection = settings_element.find(qn('w:writeProtection'))
-                if write_protection is not None:
-                    settings_element.remove(write_protection)
-                doc_protection = settings_element.find(qn('w:documentProtection'))
-                if doc_protection is not None:
-                    settings_element.remove(doc_protection)
-            except:
-                pass  # Silently continue if protection removal fails during init
         else:
             print(f"⚠ Template not found at {template_path}, creating new document")
             self.doc = Document()
+            self.package_index = None
             
             # Set page margins to accommodate wider table
             sections = self.doc.sections
@@ -49,8 +54,11 @@ class TankInvoiceGenerator:
                 section.right_margin = Inches(0.5)  # Reduced from default 1 inch
                 section.top_margin = Inches(0.75)
                 section.bottom_margin = Inches(0.75)
+            ensure_quote_styles(self.doc)
         
         self.table = None
+        self._table_trs = []  # Cached <w:tr> elements of self.table (see _row_cells)
+        self._table_context = None  # Per-table facts shared by all tank rows
         self.tanks = []
         self.dismantling_tanks = []   # List of dismantling tank dicts
         self.cylindrical_tanks = []   # List of cylindrical tank dicts
@@ -66,6 +74,8 @@ class TankInvoiceGenerator:
         self.show_vat = True
         self.show_grand_total = True
         self.has_discount = False
+        # Table rendering engine: "docx" (object API) or "lxml" (single XML fragment)
+        self.table_engine = DEFAULT_TABLE_ENGINE
         
     def get_user_inputs(self):
         """Collect all user inputs for tanks"""
@@ -912,6 +922,11 @@ class TankInvoiceGenerator:
                     spacer.paragraph_format.first_line_indent = Pt(0)
         
         
+        self._quote_box_header = header
+        self._quote_box_table = self._add_quote_box_table(header)
+    
+    def _add_quote_box_table(self, header):
+        """Add the QUOTE NO / DATE / PAGE NO box table at the end of a header"""
         # Box width based on template
         if self.template_path.lower().endswith("colex_template.docx"):
             box_width = Inches(8)
@@ -1026,14 +1041,10 @@ class TankInvoiceGenerator:
         para.paragraph_format.space_before = Pt(0)
         para.paragraph_format.space_after = Pt(0)
         run = para.add_run(f'QUOTE NO : ')
-        run.font.name = 'Calibri'
-        run.font.size = Pt(10)
-        run.font.bold = True
+        self._style_run(run, bold=True)
         run.font.color.rgb = sky_blue
         run = para.add_run(self.quote_number)
-        run.font.name = 'Calibri'
-        run.font.size = Pt(10)
-        run.font.bold = True
+        self._style_run(run, bold=True)
         run.font.color.rgb = sky_blue
         
         # Cell 2: DATE
@@ -1049,14 +1060,10 @@ class TankInvoiceGenerator:
         para.paragraph_format.space_before = Pt(0)
         para.paragraph_format.space_after = Pt(0)
         run = para.add_run(f'DATE : ')
-        run.font.name = 'Calibri'
-        run.font.size = Pt(10)
-        run.font.bold = True
+        self._style_run(run, bold=True)
         run.font.color.rgb = sky_blue
         run = para.add_run(self.quote_date)
-        run.font.name = 'Calibri'
-        run.font.size = Pt(10)
-        run.font.bold = True
+        self._style_run(run, bold=True)
         run.font.color.rgb = sky_blue
         
         # Cell 3: PAGE NO
@@ -1072,17 +1079,14 @@ class TankInvoiceGenerator:
         para.paragraph_format.space_before = Pt(0)
         para.paragraph_format.space_after = Pt(0)
         run = para.add_run(f'PAGE NO : ')
-        run.font.name = 'Calibri'
-        run.font.size = Pt(10)
-        run.font.bold = True
+        self._style_run(run, bold=True)
         run.font.color.rgb = sky_blue
         
         run = para.add_run()
-        run.font.name = 'Calibri'
-        run.font.size = Pt(10)
-        run.font.bold = True
+        self._style_run(run, bold=True)
         run.font.color.rgb = sky_blue
         self._add_page_number_field(run)
+        return quote_table
 
     def _add_page_number_field(self, run, use_blue_color=True):
         """Add a dynamic PAGE/NUMPAGES field to a run for automatic page numbering"""
@@ -1232,14 +1236,10 @@ class TankInvoiceGenerator:
         para.paragraph_format.space_before = Pt(0)
         para.paragraph_format.space_after = Pt(0)
         run = para.add_run(f'QUOTE NO : ')
-        run.font.name = 'Calibri'
-        run.font.size = Pt(10)
-        run.font.bold = True
+        self._style_run(run, bold=True)
         run.font.color.rgb = sky_blue
         run = para.add_run(self.quote_number)
-        run.font.name = 'Calibri'
-        run.font.size = Pt(10)
-        run.font.bold = True
+        self._style_run(run, bold=True)
         run.font.color.rgb = sky_blue
         
         # Cell 2: DATE
@@ -1255,14 +1255,10 @@ class TankInvoiceGenerator:
         para.paragraph_format.space_before = Pt(0)
         para.paragraph_format.space_after = Pt(0)
         run = para.add_run(f'DATE : ')
-        run.font.name = 'Calibri'
-        run.font.size = Pt(10)
-        run.font.bold = True
+        self._style_run(run, bold=True)
         run.font.color.rgb = sky_blue
         run = para.add_run(self.quote_date)
-        run.font.name = 'Calibri'
-        run.font.size = Pt(10)
-        run.font.bold = True
+        self._style_run(run, bold=True)
         run.font.color.rgb = sky_blue
         
         # Cell 3: PAGE NO
@@ -1278,16 +1274,12 @@ class TankInvoiceGenerator:
         para.paragraph_format.space_before = Pt(0)
         para.paragraph_format.space_after = Pt(0)
         run = para.add_run(f'PAGE NO : ')
-        run.font.name = 'Calibri'
-        run.font.size = Pt(10)
-        run.font.bold = True
+        self._style_run(run, bold=True)
         run.font.color.rgb = sky_blue
         
         # Add static page number "1/3" for first page
         run = para.add_run('1/3')
-        run.font.name = 'Calibri'
-        run.font.size = Pt(10)
-        run.font.bold = True
+        self._style_run(run, bold=True)
         run.font.color.rgb = sky_blue
         
         # Add spacing after the quote box
@@ -1377,14 +1369,10 @@ class TankInvoiceGenerator:
         para.paragraph_format.space_before = Pt(0)
         para.paragraph_format.space_after = Pt(0)
         run = para.add_run(f'QUOTE NO : ')
-        run.font.name = 'Calibri'
-        run.font.size = Pt(10)
-        run.font.bold = True
+        self._style_run(run, bold=True)
         run.font.color.rgb = sky_blue
         run = para.add_run(self.quote_number)
-        run.font.name = 'Calibri'
-        run.font.size = Pt(10)
-        run.font.bold = True
+        self._style_run(run, bold=True)
         run.font.color.rgb = sky_blue
         
         # Cell 2: DATE
@@ -1401,14 +1389,10 @@ class TankInvoiceGenerator:
         para.paragraph_format.space_before = Pt(0)
         para.paragraph_format.space_after = Pt(0)
         run = para.add_run(f'DATE : ')
-        run.font.name = 'Calibri'
-        run.font.size = Pt(10)
-        run.font.bold = True
+        self._style_run(run, bold=True)
         run.font.color.rgb = sky_blue
         run = para.add_run(self.quote_date)
-        run.font.name = 'Calibri'
-        run.font.size = Pt(10)
-        run.font.bold = True
+        self._style_run(run, bold=True)
         run.font.color.rgb = sky_blue
         
         # Cell 3: PAGE NO
@@ -1425,15 +1409,12 @@ class TankInvoiceGenerator:
         para.paragraph_format.space_before = Pt(0)
         para.paragraph_format.space_after = Pt(0)
         run = para.add_run(f'PAGE NO : ')
-        run.font.name = 'Calibri'
-        run.font.size = Pt(10)
-        run.font.bold = True
+        self._style_run(run, bold=True)
         run.font.color.rgb = sky_blue
         
         # Add dynamic page number field (current/total)
         run = para.add_run()
-        run.font.name = 'Calibri'
-        run.font.size = Pt(10)
+        self._style_run(run)
         self._add_page_number_field(run)
         
         # Add spacing after the table
@@ -1446,117 +1427,12 @@ class TankInvoiceGenerator:
     # ─────────────────────────────────────────────────────────────────────────
 
     def _load_cylindrical_dimensions(self):
-        """Load cylindrical tank dimensions from tank_dimensions.xlsx in DATA folder."""
-        import os as _os
-        script_dir = _os.path.dirname(_os.path.abspath(__file__))
-        excel_path = _os.path.join(script_dir, 'DATA', 'tank_dimensions.xlsx')
-        if not _os.path.exists(excel_path):
-            print(f"⚠ tank_dimensions.xlsx not found at {excel_path}")
-            return {}
-
-        dimensions = {
-            'PVC_HORIZONTAL': {},
-            'PVC_VERTICAL': {},
-            'GRP_HORIZONTAL': {},
-            'GRP_VERTICAL': {},
-        }
-        try:
-            dfs = pd.read_excel(excel_path, sheet_name=None, header=None)
-        except Exception as e:
-            print(f"⚠ Could not read tank_dimensions.xlsx: {e}")
-            return dimensions
-
-        # ── PVC sheet ──
-        if 'PVC' in dfs:
-            pvc_df = dfs['PVC']
-            current_section = None
-            for _, row in pvc_df.iterrows():
-                cell0 = str(row.iloc[0]).strip()
-                if 'PVC HORIZONTAL' in cell0.upper():
-                    current_section = 'PVC_HORIZONTAL'
-                    continue
-                if 'PVC VERTICAL' in cell0.upper():
-                    current_section = 'PVC_VERTICAL'
-                    continue
-                if current_section is None:
-                    continue
-                try:
-                    capacity = float(row.iloc[1])
-                    diameter = float(row.iloc[2])
-                    height = float(row.iloc[3])
-                    if capacity in dimensions[current_section]:
-                        pass  # first entry wins – skip duplicates (e.g. PVC Vertical 1000 gal)
-                    elif current_section == 'PVC_HORIZONTAL':
-                        raw_len = row.iloc[4]
-                        length = float(raw_len) if pd.notna(raw_len) else 0.0
-                        dimensions[current_section][capacity] = {
-                            'diameter': diameter, 'height': height, 'length': length
-                        }
-                    else:
-                        dimensions[current_section][capacity] = {
-                            'diameter': diameter, 'height': height
-                        }
-                except (ValueError, TypeError):
-                    pass
-
-        # ── FIBER (GRP) sheet ──
-        if 'FIBER' in dfs:
-            fiber_df = dfs['FIBER']
-            current_section = None
-            for _, row in fiber_df.iterrows():
-                cell0 = str(row.iloc[0]).strip()
-                if 'GRP HORIZONTAL' in cell0.upper():
-                    current_section = 'GRP_HORIZONTAL'
-                    continue
-                if 'GRP VERTICAL' in cell0.upper():
-                    current_section = 'GRP_VERTICAL'
-                    continue
-                if current_section is None:
-                    continue
-                try:
-                    capacity = float(row.iloc[0])
-                    if current_section == 'GRP_HORIZONTAL':
-                        dimensions[current_section][capacity] = {
-                            'length': float(row.iloc[1]),
-                            'width':  float(row.iloc[2]),
-                            'height': float(row.iloc[3]),
-                        }
-                    else:
-                        dimensions[current_section][capacity] = {
-                            'diameter': float(row.iloc[1]),
-                            'height':   float(row.iloc[2]),
-                        }
-                except (ValueError, TypeError):
-                    pass
-
-        return dimensions
+        """Return cylindrical tank dimensions from the shared catalogue (DATA/tank_dimensions.xlsx)."""
+        return cylindrical_catalogue.dimensions()
 
     def get_cylindrical_tank_size(self, material: str, orientation: str, capacity_usg: float) -> str:
         """Return a size string for given material / orientation / capacity."""
-        dims = self._load_cylindrical_dimensions()
-        key = f"{material.upper()}_{orientation.upper()}"
-        section = dims.get(key, {})
-        if not section:
-            return "SIZE N/A"
-
-        capacities = sorted(section.keys())
-        matched = None
-        for c in capacities:
-            if abs(c - capacity_usg) < 0.5:
-                matched = c
-                break
-        if matched is None:
-            matched = min(capacities, key=lambda c: abs(c - capacity_usg))
-
-        data = section[matched]
-        if orientation.upper() == 'VERTICAL':
-            return f"{data['diameter']:.3f} DIA X {data['height']:.2f} MTR (H)"
-        else:  # HORIZONTAL
-            if material.upper() == 'PVC':
-                return f"{data['diameter']:.3f} DIA X {data['height']:.2f} MTR (H)"
-            else:  # GRP horizontal: L x W x H
-                return (f"{data['length']:.2f} M (L) X {data['width']:.2f} M (W)"
-                        f" X {data['height']:.2f} M (H)")
+        return cylindrical_catalogue.get_size(material, orientation, capacity_usg)
 
     # ─────────────────────────────────────────────────────────────────────────
     # GENERIC TABLE HELPERS (work on any table, not only self.table)
@@ -1642,14 +1518,9 @@ class TankInvoiceGenerator:
             vAlign.set(qn('w:val'), 'bottom')
             tcPr.append(vAlign)
             for paragraph in cell.paragraphs:
-                paragraph.alignment = WD_ALIGN_PARAGRAPH.CENTER
-                paragraph.paragraph_format.space_before = Pt(0)
-                paragraph.paragraph_format.space_after = Pt(0)
-                paragraph.paragraph_format.line_spacing = 1.0
+                self._style_paragraph(paragraph, QUOTE_TABLE_HEADER)
                 for run in paragraph.runs:
-                    run.font.bold = True
-                    run.font.name = 'Calibri'
-                    run.font.size = Pt(10)
+                    self._style_run(run, bold=True)
                     run.font.color.rgb = RGBColor(255, 255, 255)
 
     def _build_quotation_table(self, num_rows, has_discount=False):
@@ -1666,15 +1537,13 @@ class TankInvoiceGenerator:
         return table
 
     def _apply_font_to_table(self, table):
-        """Apply Calibri 10 to all cells of a table."""
+        """Give unstyled runs of a table the Calibri 10 text style."""
         for row in table.rows:
             for cell in row.cells:
                 for paragraph in cell.paragraphs:
                     for run in paragraph.runs:
-                        if not run.font.name:
-                            run.font.name = 'Calibri'
-                        if not run.font.size:
-                            run.font.size = Pt(10)
+                        if run._r.style is None:
+                            self._style_run(run)
 
     def _center_cell(self, cell):
         for p in cell.paragraphs:
@@ -1701,36 +1570,32 @@ class TankInvoiceGenerator:
             return start_row
 
         # ── Separator/common row (merged, blank) ──
-        self._merge_in(self.table, start_row, 0, start_row, 5)
-        common_cell = self.table.rows[start_row].cells[0]
+        self._merge_cells(start_row, 0, start_row, 5)
+        common_cell = self._table_cell(start_row, 0)
         common_cell.text = " "
         for paragraph in common_cell.paragraphs:
             paragraph.paragraph_format.space_before = Pt(0)
             paragraph.paragraph_format.space_after = Pt(0)
             for run in paragraph.runs:
-                run.font.bold = True
-                run.font.name = 'Calibri'
-                run.font.size = Pt(10)
+                self._style_run(run, bold=True)
 
         current_row = start_row + 1
 
         # ── Data rows ──
         for i, tank in enumerate(self.dismantling_tanks):
-            row = self.table.rows[current_row]
+            cells = self._row_cells(current_row)
 
             # SL NO
-            sl_cell = row.cells[0]
+            sl_cell = cells[0]
             sl_cell.text = str(i + 1)
             self._center_cell(sl_cell)
             self._vcenter_cell(sl_cell)
 
             # ITEM DESCRIPTION
-            desc_cell = row.cells[1]
+            desc_cell = cells[1]
             desc_cell.text = ""
             para = desc_cell.paragraphs[0]
-            para.paragraph_format.space_before = Pt(0)
-            para.paragraph_format.space_after = Pt(0)
-            para.paragraph_format.line_spacing = 1.0
+            self._style_paragraph(para, QUOTE_BODY)
             ts = para.paragraph_format.tab_stops
             ts.add_tab_stop(Inches(1.05))
             ts.add_tab_stop(Inches(1.25))
@@ -1740,9 +1605,7 @@ class TankInvoiceGenerator:
             if tank_name:
                 run = para.add_run(tank_name)
                 run.underline = True
-                run.font.bold = True
-                run.font.name = 'Calibri'
-                run.font.size = Pt(10)
+                self._style_run(run, bold=True)
 
             # Size line
             length = tank.get('length', '')
@@ -1750,9 +1613,7 @@ class TankInvoiceGenerator:
             height = tank.get('height', '')
             if length or width or height:
                 size_para = desc_cell.add_paragraph()
-                size_para.paragraph_format.space_before = Pt(0)
-                size_para.paragraph_format.space_after  = Pt(0)
-                size_para.paragraph_format.line_spacing = 1.0
+                self._style_paragraph(size_para, QUOTE_BODY)
                 sts = size_para.paragraph_format.tab_stops
                 sts.add_tab_stop(Inches(1.05))
                 sts.add_tab_stop(Inches(1.25))
@@ -1764,44 +1625,39 @@ class TankInvoiceGenerator:
                 except (ValueError, TypeError):
                     size_txt = f"SIZE\t:\t{length} M (L) X {width} M (W) X {height} M (H)"
                 r = size_para.add_run(size_txt)
-                r.font.bold = True
-                r.font.name = 'Calibri'
-                r.font.size = Pt(10)
+                self._style_run(r, bold=True)
 
             # UNIT
-            unit_cell = row.cells[2]
+            unit_cell = cells[2]
             unit_cell.text = tank.get('unit', '')
             self._center_cell(unit_cell)
             self._vcenter_cell(unit_cell)
 
             # QTY
-            qty_cell = row.cells[3]
+            qty_cell = cells[3]
             qty = tank.get('quantity', 0)
             qty_cell.text = str(int(qty) if isinstance(qty, float) and qty.is_integer() else qty)
             self._center_cell(qty_cell)
             self._vcenter_cell(qty_cell)
 
             # UNIT PRICE
-            up_cell = row.cells[4]
+            up_cell = cells[4]
             unit_price = tank.get('unit_price', 0.0)
             up_cell.text = f"{unit_price:,.2f}" if unit_price else ""
             self._right_cell(up_cell)
             self._vcenter_cell(up_cell)
             for p in up_cell.paragraphs:
                 for r in p.runs:
-                    r.font.name = 'Calibri'
-                    r.font.size = Pt(10)
+                    self._style_run(r)
 
             # TOTAL/DISCOUNTED PRICE
-            tp_cell = row.cells[5]
+            tp_cell = cells[5]
             tp_cell.text = ""
             tp_para = tp_cell.paragraphs[0]
             tp_para.alignment = WD_ALIGN_PARAGRAPH.RIGHT
             total_price = tank.get('total_price', 0.0)
             tp_run = tp_para.add_run(f"{total_price:,.2f}" if total_price else "")
-            tp_run.font.bold = True
-            tp_run.font.name = 'Calibri'
-            tp_run.font.size = Pt(10)
+            self._style_run(tp_run, bold=True)
             self._vcenter_cell(tp_cell)
 
             current_row += 1
@@ -1825,34 +1681,30 @@ class TankInvoiceGenerator:
             data_row_idx   = current_row + 1
 
             # Section header (tank name, merged full width)
-            self._merge_in(self.table, header_row_idx, 0, header_row_idx, 5)
-            hdr_cell = self.table.rows[header_row_idx].cells[0]
+            self._merge_cells(header_row_idx, 0, header_row_idx, 5)
+            hdr_cell = self._table_cell(header_row_idx, 0)
             hdr_cell.text = tank.get('tank_name', '').upper()
             for paragraph in hdr_cell.paragraphs:
                 paragraph.paragraph_format.space_before = Pt(0)
                 paragraph.paragraph_format.space_after  = Pt(0)
                 for run in paragraph.runs:
-                    run.font.bold = True
-                    run.font.name = 'Calibri'
-                    run.font.size = Pt(10)
+                    self._style_run(run, bold=True)
 
             # Data row
-            row = self.table.rows[data_row_idx]
+            cells = self._row_cells(data_row_idx)
 
             # SL NO
-            sl_cell = row.cells[0]
+            sl_cell = cells[0]
             sl_cell.text = str(sl_no)
             self._center_cell(sl_cell)
             self._vcenter_cell(sl_cell)
             sl_no += 1
 
             # ITEM DESCRIPTION
-            desc_cell = row.cells[1]
+            desc_cell = cells[1]
             desc_cell.text = ""
             para = desc_cell.paragraphs[0]
-            para.paragraph_format.space_before = Pt(0)
-            para.paragraph_format.space_after = Pt(0)
-            para.paragraph_format.line_spacing = 1.0
+            self._style_paragraph(para, QUOTE_BODY)
             ts = para.paragraph_format.tab_stops
             ts.add_tab_stop(Inches(1.35))
             ts.add_tab_stop(Inches(1.55))
@@ -1872,25 +1724,19 @@ class TankInvoiceGenerator:
             else:
                 above_text = f"BELOW GROUND-{layers} LAYER" if layers else "BELOW GROUND"
             r = para.add_run(above_text)
-            r.font.bold = True
+            self._style_run(r, bold=True)
             r.font.underline = True
-            r.font.name = 'Calibri'
-            r.font.size = Pt(10)
 
             def _add_desc_line(cell, label, value):
                 p = cell.add_paragraph()
-                p.paragraph_format.space_before = Pt(0)
-                p.paragraph_format.space_after  = Pt(0)
-                p.paragraph_format.line_spacing = 1.0
+                self._style_paragraph(p, QUOTE_BODY)
                 p.paragraph_format.left_indent       = Inches(1.55)
                 p.paragraph_format.first_line_indent = Inches(-1.55)
                 ts2 = p.paragraph_format.tab_stops
                 ts2.add_tab_stop(Inches(1.35))
                 ts2.add_tab_stop(Inches(1.55))
                 r2 = p.add_run(f"{label}\t:\t{value}")
-                r2.font.bold = True
-                r2.font.name = 'Calibri'
-                r2.font.size = Pt(10)
+                self._style_run(r2, bold=True)
 
             type_str = f"{material} \u2013 {('VERTICAL' if orientation == 'VERTICAL' else 'HORIZONTAL')}"
             _add_desc_line(desc_cell, "TYPE",     type_str)
@@ -1900,39 +1746,36 @@ class TankInvoiceGenerator:
             _add_desc_line(desc_cell, "SIZE",     size_str if size_str else "N/A")
 
             # UNIT
-            unit_cell = row.cells[2]
+            unit_cell = cells[2]
             unit_cell.text = tank.get('unit', '')
             self._center_cell(unit_cell)
             self._vcenter_cell(unit_cell)
 
             # QTY
-            qty_cell = row.cells[3]
+            qty_cell = cells[3]
             qty = tank.get('quantity', 0)
             qty_cell.text = str(int(qty) if isinstance(qty, float) and qty.is_integer() else qty)
             self._center_cell(qty_cell)
             self._vcenter_cell(qty_cell)
 
             # UNIT PRICE
-            up_cell = row.cells[4]
+            up_cell = cells[4]
             unit_price = tank.get('unit_price', 0.0)
             up_cell.text = f"{unit_price:,.2f}" if unit_price else ""
             self._right_cell(up_cell)
             self._vcenter_cell(up_cell)
             for p in up_cell.paragraphs:
                 for r in p.runs:
-                    r.font.name = 'Calibri'
-                    r.font.size = Pt(10)
+                    self._style_run(r)
 
             # TOTAL/DISCOUNTED PRICE
-            tp_cell = row.cells[5]
+            tp_cell = cells[5]
             tp_cell.text = ""
             tp_para = tp_cell.paragraphs[0]
             tp_para.alignment = WD_ALIGN_PARAGRAPH.RIGHT
             total_price = tank.get('total_price', 0.0)
             tp_run = tp_para.add_run(f"{total_price:,.2f}" if total_price else "")
-            tp_run.font.bold = True
-            tp_run.font.name = 'Calibri'
-            tp_run.font.size = Pt(10)
+            self._style_run(tp_run, bold=True)
             self._vcenter_cell(tp_cell)
 
             current_row += 2
@@ -2003,13 +1846,17 @@ class TankInvoiceGenerator:
             p = para._element
             p.getparent().remove(p)
 
+        if self.table_engine == "lxml":
+            self._create_invoice_table_lxml()
+            self._add_additional_sections()
+            return
+
         # Create single combined table
         self.table = self.doc.add_table(rows=total_rows, cols=6)
-        try:
-            self.table.style = 'Table Grid'
-        except KeyError:
-            print("⚠ 'Table Grid' style not found in template, applying manual borders")
-            self._apply_table_borders()
+        self._table_trs = self.table._tbl.tr_lst
+        self._table_context = None
+        # Quote Table is Table Grid, or plain single borders when the template lacks it
+        self.table.style = self.doc.styles['Quote Table']
 
         self._remove_cell_padding()
         widths = [Inches(0.6), Inches(9.625), Inches(1.1), Inches(1.0), Inches(1.4), Inches(1.4)]
@@ -2037,19 +1884,20 @@ class TankInvoiceGenerator:
             self._fill_common_row(row_idx=current_row)
             current_row += 1
 
-            tank_start_rows = {}
+            # Option groups are counted while filling: sl_no -> [start row, option count]
+            option_groups = {}
             for tank in self.tanks:
                 sl_no = tank['sl_no']
-                if sl_no not in tank_start_rows:
-                    tank_start_rows[sl_no] = current_row
+                if sl_no not in option_groups:
+                    option_groups[sl_no] = [current_row, 0]
+                option_groups[sl_no][1] += 1
                 self._fill_tank_row(current_row, tank)
                 current_row += 1
 
             # Merge SL. NO. cells for tanks with multiple options
-            for sl_no, start_r in tank_start_rows.items():
-                tanks_with_sl = [t for t in self.tanks if t['sl_no'] == sl_no]
-                if len(tanks_with_sl) > 1:
-                    self._merge_cells(start_r, 0, start_r + len(tanks_with_sl) - 1, 0)
+            for start_r, option_count in option_groups.values():
+                if option_count > 1:
+                    self._merge_cells(start_r, 0, start_r + option_count - 1, 0)
 
         # Footer rows
         if num_footer_rows > 0:
@@ -2063,58 +1911,19 @@ class TankInvoiceGenerator:
         # Add additional sections after the table (these will flow across all pages)
         self._add_additional_sections()
 
-    def _create_quotation_header(self):
-        """Create quotation header content above the table"""
-        # CRITICAL FIX: Remove ALL paragraphs from document body to eliminate any gaps
-        # This ensures we start with a completely clean slate
-        while len(self.doc.paragraphs) > 0:
-            para = self.doc.paragraphs[0]  # Always remove first paragraph
-            p = para._element
-            p.getparent().remove(p)
-        
-        # ADJUSTED: Line ~281 - QUOTATION title with ABSOLUTELY NO spacing above
-        title = self.doc.add_paragraph()
-        title.alignment = WD_ALIGN_PARAGRAPH.CENTER
-        
-        # Remove ALL spacing - above, below, and line spacing
-        fmt = title.paragraph_format
-        fmt.space_before = Pt(0)
-        fmt.space_after = Pt(0)
-        fmt.line_spacing = 1.0
-        fmt.line_spacing_rule = 1  # Single line spacing rule
-        
-        # Also remove any inherited spacing
-        title._element.get_or_add_pPr()
-        pPr = title._element.pPr
-        # Remove spacing element if exists
-        for spacing in pPr.findall(qn('w:spacing')):
-            pPr.remove(spacing)
-        # Add explicit zero spacing
-        spacing_elem = OxmlElement('w:spacing')
-        spacing_elem.set(qn('w:before'), '0')
-        spacing_elem.set(qn('w:after'), '0')
-        spacing_elem.set(qn('w:line'), '240')  # 240 twips = 12pt single spacing
-        spacing_elem.set(qn('w:lineRule'), 'auto')
-        pPr.append(spacing_elem)
-        
-        run = title.add_run('QUOTATION')
-        run.font.name = 'Calibri'
-        run.font.size = Pt(14)
-        run.font.bold = True
-        run.font.italic = True
-        run.font.color.rgb = RGBColor(0, 32, 96)  # Color #002060
-        run.underline = True
-        
-        # "To." text outside table
-        to_para = self.doc.add_paragraph()
-        to_para.paragraph_format.space_before = Pt(0)
-        to_para.paragraph_format.space_after = Pt(0)
-        to_para.paragraph_format.line_spacing = 1.0
-        run = to_para.add_run('To.')
-        run.font.name = 'Calibri'
-        run.font.size = Pt(10)
-        run.font.bold = True
-        
+    def _create_invoice_table_lxml(self):
+        """Render the combined table as one XML fragment (same output as the docx engine)"""
+        self._table_context = None
+        tbl = InvoiceTableXmlBuilder(self).build()
+        self.doc.element.body._insert_tbl(tbl)
+        self.table = Table(tbl, self.doc._body)
+        self._table_trs = tbl.tr_lst
+        # Quote Table is Table Grid, or plain single borders when the template lacks it
+        self.table.style = self.doc.styles['Quote Table']
+        self._remove_cell_padding()
+
+    def _add_recipient_info_table(self):
+        """Add the "To." recipient details / date / quote no table at the end of the body"""
         # Create table with 1 row and 2 columns for side-by-side layout
         info_table = self.doc.add_table(rows=1, cols=2)
         info_table.autofit = False
@@ -2197,9 +2006,7 @@ class TankInvoiceGenerator:
             para.paragraph_format.space_before = Pt(0)
             para.paragraph_format.space_after = Pt(0)
             run = para.add_run(self.recipient_name)
-            run.font.name = 'Calibri'
-            run.font.size = Pt(10)
-            run.font.bold = True
+            self._style_run(run, bold=True)
         
         # Company name (only add if not empty)
         if self.recipient_company:
@@ -2207,9 +2014,7 @@ class TankInvoiceGenerator:
             para.paragraph_format.space_before = Pt(0)
             para.paragraph_format.space_after = Pt(0)
             run = para.add_run(self.recipient_company)
-            run.font.name = 'Calibri'
-            run.font.size = Pt(10)
-            run.font.bold = True
+            self._style_run(run, bold=True)
         
         # Location (only add if not empty)
         if self.recipient_location:
@@ -2217,9 +2022,7 @@ class TankInvoiceGenerator:
             para.paragraph_format.space_before = Pt(0)
             para.paragraph_format.space_after = Pt(0)
             run = para.add_run(self.recipient_location)
-            run.font.name = 'Calibri'
-            run.font.size = Pt(10)
-            run.font.bold = True
+            self._style_run(run, bold=True)
         
         # Phone (only add if not empty)
         if self.recipient_phone and self.recipient_phone.strip():
@@ -2232,15 +2035,11 @@ class TankInvoiceGenerator:
             if ':' in phone_text:
                 # Add with colon on same line
                 run = para.add_run(phone_text)
-                run.font.name = 'Calibri'
-                run.font.size = Pt(10)
-                run.font.bold = True
+                self._style_run(run, bold=True)
             else:
                 # No colon, add as-is
                 run = para.add_run(phone_text)
-                run.font.name = 'Calibri'
-                run.font.size = Pt(10)
-                run.font.bold = True
+                self._style_run(run, bold=True)
         
         # Email (only add if not empty)
         if self.recipient_email and self.recipient_email.strip():
@@ -2253,15 +2052,11 @@ class TankInvoiceGenerator:
             if ':' in email_text:
                 # Add with colon on same line
                 run = para.add_run(email_text)
-                run.font.name = 'Calibri'
-                run.font.size = Pt(10)
-                run.font.bold = True
+                self._style_run(run, bold=True)
             else:
                 # No colon, add as-is
                 run = para.add_run(email_text)
-                run.font.name = 'Calibri'
-                run.font.size = Pt(10)
-                run.font.bold = True
+                self._style_run(run, bold=True)
         
         # Set left cell width using XML (7200 twips = 5.0 inches)
         tcW = OxmlElement('w:tcW')
@@ -2305,9 +2100,7 @@ class TankInvoiceGenerator:
             date_str = f"{d}/{m}/{y}"
         # Add Date with value on same line
         run = para.add_run('Date            : {}'.format(date_str))
-        run.font.name = 'Calibri'
-        run.font.size = Pt(10)
-        run.font.bold = True
+        self._style_run(run, bold=True)
         
         # Page - Keep blank (no page number displayed)
         para = right_cell.add_paragraph()
@@ -2319,9 +2112,7 @@ class TankInvoiceGenerator:
         
         # Add Page with value on same line
         run = para.add_run('Page            : ')
-        run.font.name = 'Calibri'
-        run.font.size = Pt(10)
-        run.font.bold = True
+        self._style_run(run, bold=True)
         
         # Add the page number field to the same run
         self._add_page_number_field(run, use_blue_color=False)
@@ -2335,9 +2126,60 @@ class TankInvoiceGenerator:
         tab_stops.add_tab_stop(Inches(1.2))  # Position for colon
         # Add Quote No with value on same line
         run = para.add_run('Quote No.  : {}'.format(self.quote_number))
+        self._style_run(run, bold=True)
+        
+        return info_table
+    
+    def _create_quotation_header(self):
+        """Create quotation header content above the table"""
+        # CRITICAL FIX: Remove ALL paragraphs from document body to eliminate any gaps
+        # This ensures we start with a completely clean slate
+        while len(self.doc.paragraphs) > 0:
+            para = self.doc.paragraphs[0]  # Always remove first paragraph
+            p = para._element
+            p.getparent().remove(p)
+        
+        # ADJUSTED: Line ~281 - QUOTATION title with ABSOLUTELY NO spacing above
+        title = self.doc.add_paragraph()
+        title.alignment = WD_ALIGN_PARAGRAPH.CENTER
+        
+        # Remove ALL spacing - above, below, and line spacing
+        fmt = title.paragraph_format
+        fmt.space_before = Pt(0)
+        fmt.space_after = Pt(0)
+        fmt.line_spacing = 1.0
+        fmt.line_spacing_rule = 1  # Single line spacing rule
+        
+        # Also remove any inherited spacing
+        title._element.get_or_add_pPr()
+        pPr = title._element.pPr
+        # Remove spacing element if exists
+        for spacing in pPr.findall(qn('w:spacing')):
+            pPr.remove(spacing)
+        # Add explicit zero spacing
+        spacing_elem = OxmlElement('w:spacing')
+        spacing_elem.set(qn('w:before'), '0')
+        spacing_elem.set(qn('w:after'), '0')
+        spacing_elem.set(qn('w:line'), '240')  # 240 twips = 12pt single spacing
+        spacing_elem.set(qn('w:lineRule'), 'auto')
+        pPr.append(spacing_elem)
+        
+        run = title.add_run('QUOTATION')
         run.font.name = 'Calibri'
-        run.font.size = Pt(10)
+        run.font.size = Pt(14)
         run.font.bold = True
+        run.font.italic = True
+        run.font.color.rgb = RGBColor(0, 32, 96)  # Color #002060
+        run.underline = True
+        
+        # "To." text outside table
+        to_para = self.doc.add_paragraph()
+        self._style_paragraph(to_para, QUOTE_BODY)
+        run = to_para.add_run('To.')
+        self._style_run(run, bold=True)
+        
+        # Recipient / quote info table (rebuilt per recipient by rerender_recipient_blocks)
+        self._recipient_table = self._add_recipient_info_table()
         
         # Spacing after table
         spacer = self.doc.add_paragraph()
@@ -2351,13 +2193,9 @@ class TankInvoiceGenerator:
         subject_para.paragraph_format.space_after = Pt(0)
         # Add Subject with value on same line
         run = subject_para.add_run('Subject          : ')
-        run.font.name = 'Calibri'
-        run.font.size = Pt(10)
-        run.font.bold = True
+        self._style_run(run, bold=True)
         run2 = subject_para.add_run(self.subject)
-        run2.font.name = 'Calibri'
-        run2.font.size = Pt(10)
-        run2.font.bold = True
+        self._style_run(run2, bold=True)
         run2.underline = True
         
         # Project line
@@ -2366,13 +2204,9 @@ class TankInvoiceGenerator:
         project_para.paragraph_format.space_after = Pt(0)  # Remove gap
         # Add Project with value on same line
         run = project_para.add_run('Project           : ')
-        run.font.name = 'Calibri'
-        run.font.size = Pt(10)
-        run.font.bold = True
+        self._style_run(run, bold=True)
         run2 = project_para.add_run(self.project)
-        run2.font.name = 'Calibri'
-        run2.font.size = Pt(10)
-        run2.font.bold = True
+        self._style_run(run2, bold=True)
         run2.underline = True
         
         # Additional details - Display like Subject and Project (simple paragraphs)
@@ -2396,15 +2230,11 @@ class TankInvoiceGenerator:
                 padded_key = key_text + ' ' * padding_needed + ': '
                 
                 run = detail_para.add_run(padded_key)
-                run.font.name = 'Calibri'
-                run.font.size = Pt(10)
-                run.font.bold = True
+                self._style_run(run, bold=True)
                 
                 # Add value (bold and underlined like Subject/Project)
                 run2 = detail_para.add_run(value)
-                run2.font.name = 'Calibri'
-                run2.font.size = Pt(10)
-                run2.font.bold = True
+                self._style_run(run2, bold=True)
                 run2.underline = True
         
         # Add spacing
@@ -2417,27 +2247,22 @@ class TankInvoiceGenerator:
         dear_para.paragraph_format.space_before = Pt(0)
         dear_para.paragraph_format.space_after = Pt(0)
         for run in dear_para.runs:
-            run.font.name = 'Calibri'
-            run.font.size = Pt(10)
+            self._style_run(run)
         
         # Introductory text
         intro_para = self.doc.add_paragraph()
         intro_para.paragraph_format.space_before = Pt(0)
         intro_para.paragraph_format.space_after = Pt(0)  # Remove gap
         run = intro_para.add_run('With reference to your enquiry, we would like to give our competitive offer for ')
-        run.font.name = 'Calibri'
-        run.font.size = Pt(10)
+        self._style_run(run)
         run = intro_para.add_run(self.subject)
-        run.font.name = 'Calibri'
-        run.font.size = Pt(10)
-        run.font.bold = True
+        self._style_run(run, bold=True)
         run = intro_para.add_run(' as follows')
-        run.font.name = 'Calibri'
-        run.font.size = Pt(10)
+        self._style_run(run)
     
     def _create_header(self):
         """Create and format header row"""
-        header_cells = self.table.rows[0].cells
+        header_cells = self._row_cells(0)
         
         # Determine if discount is applied
         has_discount = getattr(self, 'has_discount', False)
@@ -2470,17 +2295,12 @@ class TankInvoiceGenerator:
             tcPr.append(vAlign)
             
             for paragraph in cell.paragraphs:
-                paragraph.alignment = WD_ALIGN_PARAGRAPH.CENTER
-                paragraph.paragraph_format.space_before = Pt(0)
-                paragraph.paragraph_format.space_after = Pt(0)
-                paragraph.paragraph_format.line_spacing = 1.0
+                self._style_paragraph(paragraph, QUOTE_TABLE_HEADER)
                 for run in paragraph.runs:
-                    run.font.bold = True
-                    run.font.name = 'Calibri'
-                    run.font.size = Pt(10)
+                    self._style_run(run, bold=True)
     
-    def _fill_common_row(self, row_idx=1):
-        """Fill the common row with preset phrases and common elements"""
+    def _common_row_text(self):
+        """Text of the merged common information row above the panel tanks"""
         # Get company brand name from frontend or fallback to template-based detection
         if self.company_short_name:
             brand_name = self.company_short_name
@@ -2494,14 +2314,15 @@ class TankInvoiceGenerator:
         common_text = f"GRP SECTIONAL WATER TANK - 10 YEAR WARRANTY - {brand_name}"
         
         # Check if all tanks have the same support system and add to line 1
-        common_support = self._get_common_support_system()
+        table_context = self._get_table_context()
+        common_support = table_context["common_support"]
         if common_support:
             # All tanks have the same support system, add to common row
             support_text = self._get_support_system_text(common_support)
             common_text += f" - {support_text}"
         
         # Find common elements
-        common_elements = self._find_common_elements()
+        common_elements = table_context["common_elements"]
         
         # Line 2: Tank type (insulation details)
         # Line 3: Skid base details
@@ -2514,30 +2335,30 @@ class TankInvoiceGenerator:
                     common_text += f"\nWITHOUT SKID"
                 else:
                     common_text += f"\n{element_value}"
-        
+        return common_text
+    
+    def _fill_common_row(self, row_idx=1):
+        """Fill the common row with preset phrases and common elements"""
         # Set the text in the merged cell
-        cell = self.table.rows[row_idx].cells[0]
-        cell.text = common_text
+        cell = self._table_cell(row_idx, 0)
+        cell.text = self._common_row_text()
         
         # Make everything bold and Calibri 11, remove spacing
         for paragraph in cell.paragraphs:
-            paragraph.paragraph_format.space_before = Pt(0)
-            paragraph.paragraph_format.space_after = Pt(0)
-            paragraph.paragraph_format.line_spacing = 1.0
+            self._style_paragraph(paragraph, QUOTE_BODY)
             for run in paragraph.runs:
-                run.font.bold = True
-                run.font.name = 'Calibri'
-                run.font.size = Pt(10)
+                self._style_run(run, bold=True)
     
     def _fill_tank_row(self, row_idx, tank):
         """Fill a tank row with data"""
-        row = self.table.rows[row_idx]
+        cells = self._row_cells(row_idx)
+        table_context = self._get_table_context()
         
         # SL. NO. (center alignment)
         # Only set if this is the first option (option_number == 1)
         # For subsequent options, the cell will be merged later
         if tank.get('option_number', 1) == 1:
-            cell = row.cells[0]
+            cell = cells[0]
             cell.text = str(tank["sl_no"])
             for paragraph in cell.paragraphs:
                 paragraph.alignment = WD_ALIGN_PARAGRAPH.CENTER
@@ -2548,19 +2369,16 @@ class TankInvoiceGenerator:
                 vAlign.set(qn('w:val'), 'center')
                 tcPr.append(vAlign)
         
-        # Find common elements
-        common_elements = self._find_common_elements()
-        common_types = {elem[0] for elem in common_elements}
+        # Common elements are computed once per table, not once per row
+        common_types = table_context["common_types"]
         
         # Item Description
-        cell = row.cells[1]
+        cell = cells[1]
         cell.text = ""  # Clear cell first
         paragraph = cell.paragraphs[0]
         
         # Set compact spacing for the paragraph
-        paragraph.paragraph_format.space_before = Pt(0)
-        paragraph.paragraph_format.space_after = Pt(0)
-        paragraph.paragraph_format.line_spacing = 1.0  # Single line spacing
+        self._style_paragraph(paragraph, QUOTE_BODY)
         
         # Add tab stops for vertical alignment of colons and values
         # ADJUSTED: Colon position reduced to 1.05 inches, values at 1.25 inches
@@ -2573,7 +2391,7 @@ class TankInvoiceGenerator:
         option_roman = tank.get('option_roman', '')
         
         # Check if support systems are mixed across tanks
-        common_support = self._get_common_support_system()
+        common_support = table_context["common_support"]
         
         if option_total > 1:
             # When there are options, check if we need to add support system on same line
@@ -2582,24 +2400,18 @@ class TankInvoiceGenerator:
                 tank_support = tank.get('support_system', 'Internal')
                 support_text = self._get_support_system_text(tank_support)
                 run = paragraph.add_run(f"OPTION {option_roman} - {support_text}\n")
-                run.font.bold = True
-                run.font.name = 'Calibri'
-                run.font.size = Pt(10)
+                self._style_run(run, bold=True)
             else:
                 # All same support system - just add OPTION label
                 run = paragraph.add_run(f"OPTION {option_roman}\n")
-                run.font.bold = True
-                run.font.name = 'Calibri'
-                run.font.size = Pt(10)
+                self._style_run(run, bold=True)
         else:
             # No options - if mixed support, add support system text above tank name
             if common_support is None:
                 tank_support = tank.get('support_system', 'Internal')
                 support_text = self._get_support_system_text(tank_support)
                 run = paragraph.add_run(f"{support_text}\n")
-                run.font.bold = True
-                run.font.name = 'Calibri'
-                run.font.size = Pt(10)
+                self._style_run(run, bold=True)
         
         # Tank name with underline and optionally skid in brackets
         tank_name = (tank.get('name', '') or '').upper()
@@ -2614,36 +2426,24 @@ class TankInvoiceGenerator:
             if tank_skid and not skid_is_common:
                 run = paragraph.add_run(tank_name + partition_status)
                 run.underline = True
-                run.font.bold = True
-                run.font.name = 'Calibri'
-                run.font.size = Pt(10)
+                self._style_run(run, bold=True)
                 run = paragraph.add_run(" (")
                 run.underline = True
-                run.font.bold = True
-                run.font.name = 'Calibri'
-                run.font.size = Pt(10)
+                self._style_run(run, bold=True)
                 run = paragraph.add_run(tank_skid)
                 run.underline = True
-                run.font.bold = True
-                run.font.name = 'Calibri'
-                run.font.size = Pt(10)
+                self._style_run(run, bold=True)
                 run = paragraph.add_run(")")
                 run.underline = True
-                run.font.bold = True
-                run.font.name = 'Calibri'
-                run.font.size = Pt(10)
+                self._style_run(run, bold=True)
             else:
                 run = paragraph.add_run(tank_name + partition_status)
                 run.underline = True
-                run.font.bold = True
-                run.font.name = 'Calibri'
-                run.font.size = Pt(10)
+                self._style_run(run, bold=True)
         elif tank_skid and "skid" not in common_types:
             # Always print skid (including 'WITHOUT SKID') without brackets if no name
             run = paragraph.add_run(tank_skid)
-            run.font.bold = True
-            run.font.name = 'Calibri'
-            run.font.size = Pt(10)
+            self._style_run(run, bold=True)
         
         # Type (only if not common) - with hanging indent for wrapped lines
         tank_type = (tank.get('type', '') or '').upper()
@@ -2652,9 +2452,7 @@ class TankInvoiceGenerator:
             type_para = cell.add_paragraph()
             
             # Set compact spacing
-            type_para.paragraph_format.space_before = Pt(0)
-            type_para.paragraph_format.space_after = Pt(0)
-            type_para.paragraph_format.line_spacing = 1.0  # Single line spacing
+            self._style_paragraph(type_para, QUOTE_BODY)
             
             # Set up tab stops for Type paragraph
             # ADJUSTED: Colon at 1.05 inches, value start at 1.25 inches
@@ -2667,17 +2465,13 @@ class TankInvoiceGenerator:
             type_para.paragraph_format.first_line_indent = Inches(-1.25)
             
             run = type_para.add_run(f"Type\t:\t{tank_type}")
-            run.font.bold = True
-            run.font.name = 'Calibri'
-            run.font.size = Pt(10)
+            self._style_run(run, bold=True)
         
         # Add a new paragraph for Size and remaining items to keep them separate from Type
         size_para = cell.add_paragraph()
         
         # Set compact spacing
-        size_para.paragraph_format.space_before = Pt(0)
-        size_para.paragraph_format.space_after = Pt(0)
-        size_para.paragraph_format.line_spacing = 1.0  # Single line spacing
+        self._style_paragraph(size_para, QUOTE_BODY)
         
         # Set up tab stops for size paragraph
         # ADJUSTED: Colon at 1.05 inches, values at 1.25 inches
@@ -2705,9 +2499,7 @@ class TankInvoiceGenerator:
         if length_display or width_display or height_display:
             size_text = f"SIZE\t:\t{length_display} M (L) X {width_display} M (W) X {height_display} M (H)\n"
             run = size_para.add_run(size_text)
-            run.font.bold = True
-            run.font.name = 'Calibri'
-            run.font.size = Pt(10)
+            self._style_run(run, bold=True)
         
         # Total Capacity (aligned format with tabs for colon alignment)
         # Only show if volume exists (dimensions were provided)
@@ -2723,9 +2515,7 @@ class TankInvoiceGenerator:
                 capacity_text += "\n"
             
             run = size_para.add_run(capacity_text)
-            run.font.bold = True
-            run.font.name = 'Calibri'
-            run.font.size = Pt(10)
+            self._style_run(run, bold=True)
             
             # Show Net Volume and Free Board only if needFreeBoard is enabled
             if need_free_board:
@@ -2737,20 +2527,16 @@ class TankInvoiceGenerator:
                 else:
                     net_volume_gallons = net_volume_m3 * 219.969
                 run = size_para.add_run(f"NET VOLUME\t:\t{net_volume_m3:.2f} M³ ({net_volume_gallons:.0f} {self.gallon_type})\n")
-                run.font.bold = True
-                run.font.name = 'Calibri'
-                run.font.size = Pt(10)
+                self._style_run(run, bold=True)
                 # Free Board below Net Volume (aligned format with tabs for colon alignment)
                 free_board_m = tank.get('free_board', 0.3)
                 free_board_cm = free_board_m * 100  # Convert meters to cm
                 # Always format free_board_m as decimal
                 run = size_para.add_run(f"FREE BOARD\t:\t{free_board_cm:.0f} CM ({free_board_m:.1f} M)")
-                run.font.bold = True
-                run.font.name = 'Calibri'
-                run.font.size = Pt(10)
+                self._style_run(run, bold=True)
         
         # Unit (center alignment both horizontal and vertical)
-        cell = row.cells[2]
+        cell = cells[2]
         cell.text = tank.get("unit", "") or ""
         for paragraph in cell.paragraphs:
             paragraph.alignment = WD_ALIGN_PARAGRAPH.CENTER
@@ -2762,7 +2548,7 @@ class TankInvoiceGenerator:
         tcPr.append(vAlign)
         
         # QTY (center alignment both horizontal and vertical)
-        cell = row.cells[3]
+        cell = cells[3]
         qty = tank.get("qty", 0) or 0
         if qty:
             cell.text = str(int(qty) if isinstance(qty, float) and qty.is_integer() else qty)
@@ -2778,7 +2564,7 @@ class TankInvoiceGenerator:
         tcPr.append(vAlign)
         
         # Unit Price (right alignment horizontal, center vertical)
-        cell = row.cells[4]
+        cell = cells[4]
         unit_price = tank.get('unit_price', 0.0) or 0.0
         if unit_price:
             cell.text = f"{unit_price:,.2f}"
@@ -2794,7 +2580,7 @@ class TankInvoiceGenerator:
         tcPr.append(vAlign)
         
         # Total Price (right alignment horizontal, center vertical, make bold)
-        cell = row.cells[5]
+        cell = cells[5]
         cell.text = ""
         paragraph = cell.paragraphs[0]
         paragraph.alignment = WD_ALIGN_PARAGRAPH.RIGHT
@@ -2803,9 +2589,7 @@ class TankInvoiceGenerator:
             run = paragraph.add_run(f"{total_price:,.2f}")
         else:
             run = paragraph.add_run("")
-        run.font.bold = True
-        run.font.name = 'Calibri'
-        run.font.size = Pt(10)
+        self._style_run(run, bold=True)
         # Set vertical alignment to center
         tc = cell._element
         tcPr = tc.get_or_add_tcPr()
@@ -2815,17 +2599,17 @@ class TankInvoiceGenerator:
     
     def _add_ladder_row(self, row_idx):
         """Add ladder row if any tank is above 2M height"""
-        row = self.table.rows[row_idx]
+        cells = self._row_cells(row_idx)
         
         # Find the highest sl_no
         max_sl_no = max(tank["sl_no"] for tank in self.tanks)
         
-        row.cells[0].text = str(max_sl_no + 1)
-        row.cells[1].text = "INTERNAL SS 316 AND EXTERNAL HDG SUPPORT SYSTEM "
-        row.cells[2].text = "Set"
-        row.cells[3].text = "1"
-        row.cells[4].text = "0.00"
-        row.cells[5].text = "0.00"
+        cells[0].text = str(max_sl_no + 1)
+        cells[1].text = "INTERNAL SS 316 AND EXTERNAL HDG SUPPORT SYSTEM "
+        cells[2].text = "Set"
+        cells[3].text = "1"
+        cells[4].text = "0.00"
+        cells[5].text = "0.00"
     
     def _create_footer(self, start_row, override_subtotal=None):
         """Create footer rows with totals.
@@ -2847,7 +2631,7 @@ class TankInvoiceGenerator:
         self._merge_cells(start_row, 0, start_row + rows_to_show - 1, 1)
         
         # Remove left border and bottom border for the merged cell
-        merged_cell = self.table.rows[start_row].cells[0]
+        merged_cell = self._table_cell(start_row, 0)
         tc = merged_cell._element
         tcPr = tc.get_or_add_tcPr()
         
@@ -2912,7 +2696,7 @@ class TankInvoiceGenerator:
         # Row 1: SUB TOTAL (if enabled)
         if show_sub:
             self._merge_cells(current_row, 2, current_row, 3)
-            cell = self.table.rows[current_row].cells[2]
+            cell = self._table_cell(current_row, 2)
             # Change label based on discount status
             if has_discount:
                 cell.text = 'DISCOUNTED SUB TOTAL:'
@@ -2922,151 +2706,154 @@ class TankInvoiceGenerator:
             cell.paragraphs[0].paragraph_format.space_after = Pt(0)
             
             # Make AED bold and center aligned
-            cell = self.table.rows[current_row].cells[4]
+            cell = self._table_cell(current_row, 4)
             cell.text = ""
             cell.paragraphs[0].alignment = WD_ALIGN_PARAGRAPH.CENTER
             cell.paragraphs[0].paragraph_format.space_after = Pt(0)
             run = cell.paragraphs[0].add_run('AED')
-            run.font.bold = True
-            run.font.name = 'Calibri'
-            run.font.size = Pt(10)
+            self._style_run(run, bold=True)
             
             # Make subtotal bold and right-aligned
-            cell = self.table.rows[current_row].cells[5]
+            cell = self._table_cell(current_row, 5)
             cell.text = ""
             cell.paragraphs[0].alignment = WD_ALIGN_PARAGRAPH.RIGHT
             cell.paragraphs[0].paragraph_format.space_after = Pt(0)
             run = cell.paragraphs[0].add_run(f'{subtotal:,.2f}')
-            run.font.bold = True
-            run.font.name = 'Calibri'
-            run.font.size = Pt(10)
+            self._style_run(run, bold=True)
             
             # Apply bold to label
-            for paragraph in self.table.rows[current_row].cells[2].paragraphs:
+            for paragraph in self._table_cell(current_row, 2).paragraphs:
                 for run in paragraph.runs:
-                    run.font.bold = True
-                    run.font.name = 'Calibri'
-                    run.font.size = Pt(10)
+                    self._style_run(run, bold=True)
             
             current_row += 1
         
         # Row 2: VAT 5% (if enabled)
         if show_vat:
             self._merge_cells(current_row, 2, current_row, 3)
-            cell = self.table.rows[current_row].cells[2]
+            cell = self._table_cell(current_row, 2)
             cell.text = 'VAT 5%:'
             cell.paragraphs[0].alignment = WD_ALIGN_PARAGRAPH.LEFT
             cell.paragraphs[0].paragraph_format.space_after = Pt(0)
             
             # Make AED bold and center aligned
-            cell = self.table.rows[current_row].cells[4]
+            cell = self._table_cell(current_row, 4)
             cell.text = ""
             cell.paragraphs[0].alignment = WD_ALIGN_PARAGRAPH.CENTER
             cell.paragraphs[0].paragraph_format.space_after = Pt(0)
             run = cell.paragraphs[0].add_run('AED')
-            run.font.bold = True
-            run.font.name = 'Calibri'
-            run.font.size = Pt(10)
+            self._style_run(run, bold=True)
             
             # Make VAT bold and right-aligned
-            cell = self.table.rows[current_row].cells[5]
+            cell = self._table_cell(current_row, 5)
             cell.text = ""
             cell.paragraphs[0].alignment = WD_ALIGN_PARAGRAPH.RIGHT
             cell.paragraphs[0].paragraph_format.space_after = Pt(0)
             run = cell.paragraphs[0].add_run(f'{vat:,.2f}')
-            run.font.bold = True
-            run.font.name = 'Calibri'
-            run.font.size = Pt(10)
+            self._style_run(run, bold=True)
             
             # Apply bold to label
-            for paragraph in self.table.rows[current_row].cells[2].paragraphs:
+            for paragraph in self._table_cell(current_row, 2).paragraphs:
                 for run in paragraph.runs:
-                    run.font.bold = True
-                    run.font.name = 'Calibri'
-                    run.font.size = Pt(10)
+                    self._style_run(run, bold=True)
             
             current_row += 1
         
         # Row 3: GRAND TOTAL (if enabled)
         if show_grand:
             self._merge_cells(current_row, 2, current_row, 3)
-            cell = self.table.rows[current_row].cells[2]
+            cell = self._table_cell(current_row, 2)
             cell.text = 'GRAND TOTAL:'
             cell.paragraphs[0].alignment = WD_ALIGN_PARAGRAPH.LEFT
             cell.paragraphs[0].paragraph_format.space_after = Pt(0)
             
             # Make AED bold and center aligned
-            cell = self.table.rows[current_row].cells[4]
+            cell = self._table_cell(current_row, 4)
             cell.text = ""
             cell.paragraphs[0].alignment = WD_ALIGN_PARAGRAPH.CENTER
             cell.paragraphs[0].paragraph_format.space_after = Pt(0)
             run = cell.paragraphs[0].add_run('AED')
-            run.font.bold = True
-            run.font.name = 'Calibri'
-            run.font.size = Pt(10)
+            self._style_run(run, bold=True)
             
             # Make grand total bold and right-aligned
-            cell = self.table.rows[current_row].cells[5]
+            cell = self._table_cell(current_row, 5)
             cell.text = ""
             cell.paragraphs[0].alignment = WD_ALIGN_PARAGRAPH.RIGHT
             cell.paragraphs[0].paragraph_format.space_after = Pt(0)
             run = cell.paragraphs[0].add_run(f'{grand_total:,.2f}')
-            run.font.bold = True
-            run.font.name = 'Calibri'
-            run.font.size = Pt(10)
+            self._style_run(run, bold=True)
             
             # Apply bold to label
-            for paragraph in self.table.rows[current_row].cells[2].paragraphs:
+            for paragraph in self._table_cell(current_row, 2).paragraphs:
                 for run in paragraph.runs:
-                    run.font.bold = True
-                    run.font.name = 'Calibri'
-                    run.font.size = Pt(10)
+                    self._style_run(run, bold=True)
+    
+    def _row_cells(self, row_idx):
+        """Return the cells of one table row, indexed by grid column.
+
+        table.rows[i].cells rebuilds the cell grid of the whole table on every
+        call, which made filling a table quadratic in its row count. This only
+        walks the requested row (a spanning cell repeats across its columns).
+        """
+        cells = []
+        for tc in self._table_trs[row_idx].tc_lst:
+            cell = _Cell(tc, self.table)
+            cells.extend([cell] * tc.grid_span)
+        return cells
+    
+    def _table_cell(self, row_idx, col_idx):
+        """Return the cell at a grid position (the top-left cell of a merge)"""
+        return self._row_cells(row_idx)[col_idx]
+    
+    def _get_table_context(self):
+        """Facts shared by every tank row, computed once per table"""
+        if self._table_context is None:
+            common_elements = self._find_common_elements()
+            self._table_context = {
+                "common_elements": common_elements,
+                "common_types": {elem[0] for elem in common_elements},
+                "common_support": self._get_common_support_system(),
+            }
+        return self._table_context
     
     def _merge_cells(self, row, start_col, end_row, end_col):
-        """Merge cells in the table"""
-        cell = self.table.cell(row, start_col)
-        end_cell = self.table.cell(end_row, end_col)
-        cell.merge(end_cell)
+        """Merge cells in the table.
+
+        Same result as table.cell(row, start_col).merge(table.cell(end_row, end_col))
+        for a block of unmerged cells, but rows are located through the cached
+        row list, so a merge costs O(rows spanned) instead of O(table size).
+        Uses python-docx internals (tc_at_grid_col, _span_to_width; pinned python-docx
+        1.1.0); when a release lacks them it falls back to the public merge.
+        """
+        width = end_col - start_col + 1
+        height = end_row - row + 1
+        top_tr = self._table_trs[row]
+        if ST_Merge is None or not hasattr(top_tr, "tc_at_grid_col") or not hasattr(top_tr.tc_lst[0], "_span_to_width"):
+            self.table.cell(row, start_col).merge(self.table.cell(end_row, end_col))
+            return
+        top_tc = top_tr.tc_at_grid_col(start_col)
+        for offset in range(height):
+            if offset == 0:
+                tc = top_tc
+                v_merge = ST_Merge.RESTART if height > 1 else None
+            else:
+                tc = self._table_trs[row + offset].tc_at_grid_col(start_col)
+                v_merge = ST_Merge.CONTINUE
+            tc._span_to_width(width, top_tc, v_merge)
     
     def _apply_font_to_all_cells(self):
-        """Apply Calibri 11 font to all cells"""
-        for row in self.table.rows:
-            for cell in row.cells:
-                for paragraph in cell.paragraphs:
-                    for run in paragraph.runs:
-                        run.font.name = 'Calibri'
-                        run.font.size = Pt(10)
+        """Give every run without a character style the Calibri 10 text style"""
+        for r in self.table._tbl.iter(qn('w:r')):
+            if r.style is None:
+                r.style = QUOTE_TEXT
     
-    def _apply_table_borders(self):
-        """Manually apply borders to the table when Table Grid style is not available"""
-        from docx.oxml import parse_xml
-        from docx.oxml.ns import nsdecls
-        
-        # Define border style
-        borders_xml = (
-            '<w:tblBorders %s>'
-            '<w:top w:val="single" w:sz="4" w:space="0" w:color="000000"/>'
-            '<w:left w:val="single" w:sz="4" w:space="0" w:color="000000"/>'
-            '<w:bottom w:val="single" w:sz="4" w:space="0" w:color="000000"/>'
-            '<w:right w:val="single" w:sz="4" w:space="0" w:color="000000"/>'
-            '<w:insideH w:val="single" w:sz="4" w:space="0" w:color="000000"/>'
-            '<w:insideV w:val="single" w:sz="4" w:space="0" w:color="000000"/>'
-            '</w:tblBorders>'
-        ) % nsdecls('w')
-        
-        # Apply borders to table
-        tbl = self.table._element
-        tblPr = tbl.tblPr
-        if tblPr is None:
-            tblPr = parse_xml('<w:tblPr %s/>' % nsdecls('w'))
-            tbl.insert(0, tblPr)
-        
-        # Remove existing borders if any
-        for borders in tblPr.findall(qn('w:tblBorders')):
-            tblPr.remove(borders)
-        
-        # Add new borders
-        tblPr.append(parse_xml(borders_xml))
+    def _style_run(self, run, bold=False):
+        """Format a run as Calibri 10 (bold) through the injected character styles"""
+        run._r.style = QUOTE_BOLD if bold else QUOTE_TEXT
+    
+    def _style_paragraph(self, paragraph, style_id):
+        """Apply one of the injected quotation paragraph styles (see quotation_styles.py)"""
+        paragraph._p.style = style_id
     
     def _remove_cell_padding(self):
         """Remove cell padding/margins to make text compact"""
@@ -3103,9 +2890,11 @@ class TankInvoiceGenerator:
         from docx.oxml.ns import nsdecls
         
         # 1 point = 20 dxa (twentieths of a point)
-        for row in self.table.rows:
+        # Columns are read once each (one grid scan per column instead of one per row)
+        column_cells = zip(self.table.column_cells(1), self.table.column_cells(4), self.table.column_cells(5))
+        for desc_cell, unit_price_cell, total_price_cell in column_cells:
             # Column 1 (ITEM DESCRIPTION) - add 1pt left margin
-            cell = row.cells[1]
+            cell = desc_cell
             tc = cell._element
             tcPr = tc.get_or_add_tcPr()
             
@@ -3122,7 +2911,7 @@ class TankInvoiceGenerator:
             tcPr.append(parse_xml(cell_mar_xml))
             
             # Column 4 (UNIT PRICE) - add 3pt right margin
-            cell = row.cells[4]
+            cell = unit_price_cell
             tc = cell._element
             tcPr = tc.get_or_add_tcPr()
             
@@ -3139,7 +2928,7 @@ class TankInvoiceGenerator:
             tcPr.append(parse_xml(cell_mar_xml))
             
             # Column 5 (TOTAL PRICE) - add 3pt right margin
-            cell = row.cells[5]
+            cell = total_price_cell
             tc = cell._element
             tcPr = tc.get_or_add_tcPr()
             
@@ -3209,9 +2998,7 @@ class TankInvoiceGenerator:
         para.paragraph_format.space_before = Pt(0)
         para.paragraph_format.space_after = Pt(0)
         run = para.add_run('NOTE:')
-        run.font.name = 'Calibri'
-        run.font.size = Pt(10)
-        run.font.bold = True
+        self._style_run(run, bold=True)
 
         # Add each note as a numbered point - NOW WITH BOLD TEXT
         notes = self.section_content['note']
@@ -3236,8 +3023,7 @@ class TankInvoiceGenerator:
         para.paragraph_format.space_before = Pt(0)
         para.paragraph_format.space_after = Pt(0)
         run = para.add_run(self.section_content['closing'])
-        run.font.name = 'Calibri'
-        run.font.size = Pt(10)
+        self._style_run(run)
     
     def _add_signature_section(self):
         """Add signature section with Yours truly and signatories"""
@@ -3252,8 +3038,7 @@ class TankInvoiceGenerator:
         para.paragraph_format.keep_with_next = True
         para.paragraph_format.keep_together = True
         for run in para.runs:
-            run.font.name = 'Calibri'
-            run.font.size = Pt(10)
+            self._style_run(run)
         
         # For GRP PIPECO TANKS TRADING L.L.C - keep with next
         para = self.doc.add_paragraph()
@@ -3262,9 +3047,7 @@ class TankInvoiceGenerator:
         para.paragraph_format.keep_with_next = True
         para.paragraph_format.keep_together = True
         run = para.add_run(f'For {self._get_company_name()}')
-        run.font.name = 'Calibri'
-        run.font.size = Pt(10)
-        run.font.bold = True
+        self._style_run(run, bold=True)
         run.font.italic = True
         
         # Add signature image if provided - keep with next
@@ -3407,9 +3190,7 @@ class TankInvoiceGenerator:
             para.paragraph_format.space_before = Pt(0)
             para.paragraph_format.space_after = Pt(0)
             run = para.add_run(name)
-            run.font.name = 'Calibri'
-            run.font.size = Pt(10)
-            run.font.bold = True
+            self._style_run(run, bold=True)
             content_added = True
         
         # Title - only if not empty
@@ -3418,9 +3199,7 @@ class TankInvoiceGenerator:
             para.paragraph_format.space_before = Pt(0)
             para.paragraph_format.space_after = Pt(0)
             run = para.add_run(title)
-            run.font.name = 'Calibri'
-            run.font.size = Pt(10)
-            run.font.bold = True
+            self._style_run(run, bold=True)
             content_added = True
         
         # Mobile - only if not empty
@@ -3429,9 +3208,7 @@ class TankInvoiceGenerator:
             para.paragraph_format.space_before = Pt(0)
             para.paragraph_format.space_after = Pt(0)
             run = para.add_run(f'MOB: {mobile}')
-            run.font.name = 'Calibri'
-            run.font.size = Pt(10)
-            run.font.bold = True
+            self._style_run(run, bold=True)
             content_added = True
         
         # Email - only if not empty
@@ -3440,12 +3217,9 @@ class TankInvoiceGenerator:
             para.paragraph_format.space_before = Pt(0)
             para.paragraph_format.space_after = Pt(0)
             run = para.add_run('EMAIL: ')
-            run.font.name = 'Calibri'
-            run.font.size = Pt(10)
-            run.font.bold = True
+            self._style_run(run, bold=True)
             run2 = para.add_run(email)
-            run2.font.name = 'Calibri'
-            run2.font.size = Pt(10)
+            self._style_run(run2)
             run2.font.color.rgb = RGBColor(0, 0, 255)
             run2.font.underline = True
             content_added = True
@@ -3465,24 +3239,16 @@ class TankInvoiceGenerator:
         
         # Heading
         heading = self.doc.add_paragraph()
-        heading.paragraph_format.space_before = Pt(0)
-        heading.paragraph_format.space_after = Pt(6)
+        self._style_paragraph(heading, QUOTE_SECTION_HEADING)
         run = heading.add_run('MATERIAL SPECIFICATION: -')
-        run.font.name = 'Calibri'
-        run.font.size = Pt(10)
-        run.font.bold = True
+        self._style_run(run, bold=True)
         
         # Add each spec
         for spec in self.section_content['material_spec']:
             para = self.doc.add_paragraph()
-            para.paragraph_format.space_before = Pt(0)
-            para.paragraph_format.space_after = Pt(0)
-            para.paragraph_format.left_indent = Inches(0.5)
-            para.paragraph_format.first_line_indent = Inches(-0.25)
+            self._style_paragraph(para, QUOTE_BULLET)
             run = para.add_run(f'➢  {spec}')
-            run.font.name = 'Calibri'
-            run.font.size = Pt(10)
-            run.font.bold = True
+            self._style_run(run, bold=True)
     
     def _add_warranty_section(self):
         """Add warranty section"""
@@ -3492,23 +3258,16 @@ class TankInvoiceGenerator:
         
         # Heading
         heading = self.doc.add_paragraph()
-        heading.paragraph_format.space_before = Pt(0)
-        heading.paragraph_format.space_after = Pt(6)
+        self._style_paragraph(heading, QUOTE_SECTION_HEADING)
         run = heading.add_run('THE WARRANTY WILL NOT BE APPLICABLE FOR THE FOLLOWING CASES:')
-        run.font.name = 'Calibri'
-        run.font.size = Pt(10)
-        run.font.bold = True
+        self._style_run(run, bold=True)
         
         # Add each item
         for item in self.section_content['warranty']:
             para = self.doc.add_paragraph()
-            para.paragraph_format.space_before = Pt(0)
-            para.paragraph_format.space_after = Pt(0)
-            para.paragraph_format.left_indent = Inches(0.5)
-            para.paragraph_format.first_line_indent = Inches(-0.25)
+            self._style_paragraph(para, QUOTE_BULLET)
             run = para.add_run(f'➢  {item}')
-            run.font.name = 'Calibri'
-            run.font.size = Pt(10)
+            self._style_run(run)
     
     def _add_terms_section(self):
         """Add terms and conditions section"""
@@ -3527,12 +3286,9 @@ class TankInvoiceGenerator:
         
         # Heading
         heading = self.doc.add_paragraph()
-        heading.paragraph_format.space_before = Pt(0)
-        heading.paragraph_format.space_after = Pt(6)
+        self._style_paragraph(heading, QUOTE_SECTION_HEADING)
         run = heading.add_run('TERMS AND CONDITIONS: -')
-        run.font.name = 'Calibri'
-        run.font.size = Pt(10)
-        run.font.bold = True
+        self._style_run(run, bold=True)
         
         # Add each formatted term (key: value) with specific spacing before colon for alignment
         spacing_map = {
@@ -3545,18 +3301,14 @@ class TankInvoiceGenerator:
         terms_added = 0
         for key, value in self.section_content['terms'].items():
             para = self.doc.add_paragraph()
-            para.paragraph_format.space_before = Pt(0)
-            para.paragraph_format.space_after = Pt(0)
-            para.paragraph_format.left_indent = Inches(0.5)
-            para.paragraph_format.first_line_indent = Inches(-0.25)
+            self._style_paragraph(para, QUOTE_BULLET)
             
             # Get spacing for this key, default to 2 spaces if not in map
             spacing = spacing_map.get(key, '  ')
             
             # Add key with colon and value on same line
             run = para.add_run(f'➢  {key}{spacing}: {value}')
-            run.font.name = 'Calibri'
-            run.font.size = Pt(10)
+            self._style_run(run)
             terms_added += 1
         
         # Add plain custom terms (without key: value format)
@@ -3564,14 +3316,10 @@ class TankInvoiceGenerator:
             for plain_term in self.section_content['terms_plain']:
                 if plain_term and plain_term.strip():  # Only add non-empty terms
                     para = self.doc.add_paragraph()
-                    para.paragraph_format.space_before = Pt(0)
-                    para.paragraph_format.space_after = Pt(0)
-                    para.paragraph_format.left_indent = Inches(0.5)
-                    para.paragraph_format.first_line_indent = Inches(-0.25)
+                    self._style_paragraph(para, QUOTE_BULLET)
                     
                     run = para.add_run(f'➢  {plain_term}')
-                    run.font.name = 'Calibri'
-                    run.font.size = Pt(10)
+                    self._style_run(run)
                     terms_added += 1
         
         print(f">>>   Terms actually added to document: {terms_added}")
@@ -3585,37 +3333,26 @@ class TankInvoiceGenerator:
         
         # Heading
         heading = self.doc.add_paragraph()
-        heading.paragraph_format.space_before = Pt(0)
-        heading.paragraph_format.space_after = Pt(6)
+        self._style_paragraph(heading, QUOTE_SECTION_HEADING)
         run = heading.add_run('NOTE:')
-        run.font.name = 'Calibri'
-        run.font.size = Pt(10)
-        run.font.bold = True
+        self._style_run(run, bold=True)
         
         # Add each item with bullet points, bold company name if present
         company_name = self._get_company_name()
         for item in self.section_content['extra_note']:
             para = self.doc.add_paragraph()
-            para.paragraph_format.space_before = Pt(0)
-            para.paragraph_format.space_after = Pt(0)
-            para.paragraph_format.left_indent = Inches(0.5)
-            para.paragraph_format.first_line_indent = Inches(-0.25)
+            self._style_paragraph(para, QUOTE_BULLET)
             if company_name in item:
                 before, after = item.split(company_name, 1)
                 run = para.add_run('➢  ' + before)
-                run.font.name = 'Calibri'
-                run.font.size = Pt(10)
+                self._style_run(run)
                 run = para.add_run(company_name)
-                run.font.name = 'Calibri'
-                run.font.size = Pt(10)
-                run.font.bold = True
+                self._style_run(run, bold=True)
                 run = para.add_run(after)
-                run.font.name = 'Calibri'
-                run.font.size = Pt(10)
+                self._style_run(run)
             else:
                 run = para.add_run(f'➢  {item}')
-                run.font.name = 'Calibri'
-                run.font.size = Pt(10)
+                self._style_run(run)
     
     def _add_supplier_scope_section(self):
         """Add supplier scope section"""
@@ -3625,23 +3362,16 @@ class TankInvoiceGenerator:
         
         # Heading
         heading = self.doc.add_paragraph()
-        heading.paragraph_format.space_before = Pt(0)
-        heading.paragraph_format.space_after = Pt(6)
+        self._style_paragraph(heading, QUOTE_SECTION_HEADING)
         run = heading.add_run('SUPPLIER SCOPE: -')
-        run.font.name = 'Calibri'
-        run.font.size = Pt(10)
-        run.font.bold = True
+        self._style_run(run, bold=True)
         
         # Add each item
         for item in self.section_content['supplier_scope']:
             para = self.doc.add_paragraph()
-            para.paragraph_format.space_before = Pt(0)
-            para.paragraph_format.space_after = Pt(0)
-            para.paragraph_format.left_indent = Inches(0.5)
-            para.paragraph_format.first_line_indent = Inches(-0.25)
+            self._style_paragraph(para, QUOTE_BULLET)
             run = para.add_run(f'➢  {item}')
-            run.font.name = 'Calibri'
-            run.font.size = Pt(10)
+            self._style_run(run)
     
     def _add_customer_scope_section(self):
         """Add customer scope section"""
@@ -3651,23 +3381,16 @@ class TankInvoiceGenerator:
         
         # Heading
         heading = self.doc.add_paragraph()
-        heading.paragraph_format.space_before = Pt(0)
-        heading.paragraph_format.space_after = Pt(6)
+        self._style_paragraph(heading, QUOTE_SECTION_HEADING)
         run = heading.add_run('CUSTOMER SCOPE: -')
-        run.font.name = 'Calibri'
-        run.font.size = Pt(10)
-        run.font.bold = True
+        self._style_run(run, bold=True)
         
         # Add each item
         for item in self.section_content['customer_scope']:
             para = self.doc.add_paragraph()
-            para.paragraph_format.space_before = Pt(0)
-            para.paragraph_format.space_after = Pt(0)
-            para.paragraph_format.left_indent = Inches(0.5)
-            para.paragraph_format.first_line_indent = Inches(-0.25)
+            self._style_paragraph(para, QUOTE_BULLET)
             run = para.add_run(f'➢  {item}')
-            run.font.name = 'Calibri'
-            run.font.size = Pt(10)
+            self._style_run(run)
     
     def _add_scope_of_work_section(self):
         """Add scope of work section"""
@@ -3677,23 +3400,16 @@ class TankInvoiceGenerator:
         
         # Heading
         heading = self.doc.add_paragraph()
-        heading.paragraph_format.space_before = Pt(0)
-        heading.paragraph_format.space_after = Pt(6)
+        self._style_paragraph(heading, QUOTE_SECTION_HEADING)
         run = heading.add_run('SCOPE OF WORK: -')
-        run.font.name = 'Calibri'
-        run.font.size = Pt(10)
-        run.font.bold = True
+        self._style_run(run, bold=True)
         
         # Add each item
         for item in self.section_content['scope_of_work']:
             para = self.doc.add_paragraph()
-            para.paragraph_format.space_before = Pt(0)
-            para.paragraph_format.space_after = Pt(0)
-            para.paragraph_format.left_indent = Inches(0.5)
-            para.paragraph_format.first_line_indent = Inches(-0.25)
+            self._style_paragraph(para, QUOTE_BULLET)
             run = para.add_run(f'➢  {item}')
-            run.font.name = 'Calibri'
-            run.font.size = Pt(10)
+            self._style_run(run)
     
     def _add_work_excluded_section(self):
         """Add work excluded section"""
@@ -3703,23 +3419,16 @@ class TankInvoiceGenerator:
         
         # Heading
         heading = self.doc.add_paragraph()
-        heading.paragraph_format.space_before = Pt(0)
-        heading.paragraph_format.space_after = Pt(6)
+        self._style_paragraph(heading, QUOTE_SECTION_HEADING)
         run = heading.add_run('WORK EXCLUDED: -')
-        run.font.name = 'Calibri'
-        run.font.size = Pt(10)
-        run.font.bold = True
+        self._style_run(run, bold=True)
         
         # Add each item
         for item in self.section_content['work_excluded']:
             para = self.doc.add_paragraph()
-            para.paragraph_format.space_before = Pt(0)
-            para.paragraph_format.space_after = Pt(0)
-            para.paragraph_format.left_indent = Inches(0.5)
-            para.paragraph_format.first_line_indent = Inches(-0.25)
+            self._style_paragraph(para, QUOTE_BULLET)
             run = para.add_run(f'➢  {item}')
-            run.font.name = 'Calibri'
-            run.font.size = Pt(10)
+            self._style_run(run)
     
     def _add_final_note_section(self):
         """Add final note section"""
@@ -3729,44 +3438,33 @@ class TankInvoiceGenerator:
         
         # Heading
         heading = self.doc.add_paragraph()
-        heading.paragraph_format.space_before = Pt(0)
-        heading.paragraph_format.space_after = Pt(6)
+        self._style_paragraph(heading, QUOTE_SECTION_HEADING)
         run = heading.add_run('NOTE: -')
-        run.font.name = 'Calibri'
-        run.font.size = Pt(10)
-        run.font.bold = True
+        self._style_run(run, bold=True)
         
         # Add each note
         company_name = self._get_company_name()
         for note in self.section_content['final_note']:
             para = self.doc.add_paragraph()
-            para.paragraph_format.space_before = Pt(0)
-            para.paragraph_format.space_after = Pt(0)
-            para.paragraph_format.left_indent = Inches(0.5)
-            para.paragraph_format.first_line_indent = Inches(-0.25)
+            self._style_paragraph(para, QUOTE_BULLET)
             
             # Check if this note contains the company name
             if company_name in note:
                 # Split the note by company name and add with bold highlighting
                 parts = note.split(company_name)
                 run = para.add_run(f'➢  {parts[0]}')
-                run.font.name = 'Calibri'
-                run.font.size = Pt(10)
+                self._style_run(run)
                 
                 # Add company name in bold
                 run = para.add_run(company_name)
-                run.font.name = 'Calibri'
-                run.font.size = Pt(10)
-                run.font.bold = True
+                self._style_run(run, bold=True)
                 
                 # Add remaining text
                 run = para.add_run(parts[1])
-                run.font.name = 'Calibri'
-                run.font.size = Pt(10)
+                self._style_run(run)
             else:
                 run = para.add_run(f'➢  {note}')
-                run.font.name = 'Calibri'
-                run.font.size = Pt(10)
+                self._style_run(run)
     
     def _add_thank_you_section(self):
         """Add thank you section"""
@@ -3800,6 +3498,33 @@ class TankInvoiceGenerator:
             placeholder.paragraph_format.space_after = Pt(0)
             placeholder.add_run(f"[Page {page_num}]")  # Visible marker for debugging
     
+    @staticmethod
+    def _swap_table(old_table, new_table):
+        """Move new_table's element into old_table's position and drop the old one"""
+        old_tbl, new_tbl = old_table._tbl, new_table._tbl
+        parent = old_tbl.getparent()
+        if parent is None:
+            # The old table was removed after rendering; do not add it back
+            new_tbl.getparent().remove(new_tbl)
+            return old_table
+        old_tbl.addnext(new_tbl)
+        parent.remove(old_tbl)
+        return new_table
+    
+    def rerender_recipient_blocks(self):
+        """
+        Rebuild only the recipient-specific parts of an already created
+        document from the current recipient_* / quote_number / quote_date
+        attributes: the "To." info table and the header quote box.
+        Everything else (tanks table, terms, signature) is left as is.
+        """
+        self._recipient_table = self._swap_table(
+            self._recipient_table, self._add_recipient_info_table()
+        )
+        self._quote_box_table = self._swap_table(
+            self._quote_box_table, self._add_quote_box_table(self._quote_box_header)
+        )
+    
     def remove_document_protection(self):
         """Remove all document protection and read-only settings to make document fully editable"""
         try:
@@ -3822,7 +3547,15 @@ class TankInvoiceGenerator:
             print(f"⚠ Warning: Could not remove document protection: {e}")
             # Continue anyway - document will still be saved
     
-    def save(self, filename=None):
+    def save_to_stream(self, stream=None, compresslevel=None):
+        """Write the .docx into a binary stream (a new BytesIO by default) and return it"""
+        if stream is None:
+            stream = io.BytesIO()
+        self.remove_document_protection()
+        write_package(self.doc, stream, self.package_index, compresslevel)
+        return stream
+
+    def save(self, filename=None, compresslevel=None):
         """Save the document - will replace existing file with same name"""
         if filename is None:
             # Use quote number for filename, replacing invalid characters
@@ -3852,8 +3585,9 @@ class TankInvoiceGenerator:
         # Remove any document-level protection and read-only settings before saving
         self.remove_document_protection()
         
-        # Save document (will overwrite existing file)
-        self.doc.save(full_path)
+        # Save document (will overwrite existing file); unchanged template
+        # parts are copied already compressed instead of being re-deflated
+        write_package(self.doc, full_path, self.package_index, compresslevel)
         
         # Remove read-only attribute to ensure file is editable on server
         try:
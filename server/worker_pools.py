@@ -0,0 +1,201 @@
+"""Executors that keep blocking work (DB, SMB, python-docx) off the asyncio event loop"""
+import asyncio
+import collections
+import functools
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+
+def int_env(name, default):
+    """Non-negative integer from the environment, default when unset or invalid"""
+    try:
+        return max(int(os.getenv(name, default)), 0)
+    except ValueError:
+        return default
+
+
+# Database connection pool (database.py): pool_size and max_overflow
+DB_POOL_SIZE = max(int_env("DB_POOL_SIZE", 4), 1)
+DB_MAX_OVERFLOW = int_env("DB_MAX_OVERFLOW", 4)
+# Connections one offloaded handler may hold at once: its request session,
+# plus a reference-data or recipient-index reload opened from inside it
+CONNECTIONS_PER_WORKER = 2
+
+# Small dedicated pool for synchronous DB queries and file/SMB I/O. The
+# container runs with tight thread limits, so this stays bounded instead of
+# using the default anyio threadpool. Sized from the connection pool so busy
+# handlers never wait on it (QueuePool timeouts); BLOCKING_WORKERS can only lower it.
+MAX_BLOCKING_WORKERS = max((DB_POOL_SIZE + DB_MAX_OVERFLOW) // CONNECTIONS_PER_WORKER, 1)
+BLOCKING_WORKERS = min(max(int_env("BLOCKING_WORKERS", MAX_BLOCKING_WORKERS), 1), MAX_BLOCKING_WORKERS)
+
+def executor_env(name, default):
+    """'thread' or 'process' from the environment"""
+    kind = os.getenv(name, default).strip().lower()
+    if kind not in ("thread", "process"):
+        print(f"⚠ Unknown {name} '{kind}', using '{default}'")
+        return default
+    return kind
+
+
+# Document rendering: "thread" or "process" executor, how many renders run at
+# once, and how many more may wait before requests are rejected with 503
+GENERATION_EXECUTOR = executor_env("GENERATION_EXECUTOR", "thread")
+GENERATION_WORKERS = max(int_env("GENERATION_WORKERS", 2), 1)
+GENERATION_QUEUE_SIZE = int_env("GENERATION_QUEUE_SIZE", 8)
+
+# Batch generation (/generate-quotations/batch) renders in worker processes,
+# one per core by default, so throughput scales with CPUs rather than the GIL
+BATCH_GENERATION_EXECUTOR = executor_env("BATCH_GENERATION_EXECUTOR", "process")
+BATCH_GENERATION_WORKERS = max(int_env("BATCH_GENERATION_WORKERS", os.cpu_count() or 2), 1)
+
+_blocking_executor = ThreadPoolExecutor(max_workers=BLOCKING_WORKERS, thread_name_prefix="blocking")
+
+
+async def run_blocking(func, *args, **kwargs):
+    """Run a synchronous function in the blocking pool and await its result"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_blocking_executor, functools.partial(func, *args, **kwargs))
+
+
+def offload(func):
+    """
+    Turn a synchronous route handler into an async one that runs in the
+    blocking pool. FastAPI still resolves parameters and dependencies
+    from the wrapped function's signature.
+    """
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        return await run_blocking(func, *args, **kwargs)
+    return wrapper
+
+
+class GenerationPoolFull(Exception):
+    """Raised when every generation worker is busy and the queue is full"""
+
+
+class GenerationPool:
+    """
+    Bounded executor for document generation.
+
+    At most workers + queue_size renders are admitted at a time; further
+    submissions fail immediately with GenerationPoolFull rather than
+    piling up, or with wait=True wait their turn (first come, first served).
+    With the "process" executor the function and its arguments must be
+    picklable and importable by a fresh interpreter.
+    """
+
+    def __init__(self, kind=GENERATION_EXECUTOR, workers=GENERATION_WORKERS,
+                 queue_size=GENERATION_QUEUE_SIZE):
+        if kind not in ("thread", "process"):
+            raise ValueError(f"Invalid generation executor: {kind}. Use 'thread' or 'process'")
+        self.kind = kind
+        self.workers = workers
+        self.queue_size = queue_size
+        self._slots = threading.BoundedSemaphore(workers + queue_size)
+        self._admitted = 0
+        self._waiters = collections.deque()  # (loop, future) of run(wait=True) callers
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                if self.kind == "process":
+                    # spawn: never fork a process that is running the event loop and DB pool
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.workers,
+                        mp_context=multiprocessing.get_context("spawn"),
+                    )
+                else:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.workers, thread_name_prefix="generation"
+                    )
+            return self._executor
+
+    def _release(self, _future=None):
+        """Free a slot, or hand it straight to the longest waiting run(wait=True)"""
+        with self._lock:
+            while self._waiters:
+                loop, waiter = self._waiters.popleft()
+                if not waiter.done():
+                    loop.call_soon_threadsafe(self._grant, waiter)
+                    return
+            self._admitted -= 1
+            self._slots.release()
+
+    def _grant(self, waiter):
+        # On the waiter's loop; it may have been cancelled since it was picked
+        if waiter.cancelled():
+            self._release()
+        else:
+            waiter.set_result(None)
+
+    async def _wait_for_slot(self):
+        loop = asyncio.get_running_loop()
+        waiter = loop.create_future()
+        with self._lock:
+            if self._slots.acquire(blocking=False):
+                self._admitted += 1
+                return
+            self._waiters.append((loop, waiter))
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            with self._lock:
+                try:
+                    self._waiters.remove((loop, waiter))
+                except ValueError:
+                    pass  # already picked by _release
+            if waiter.done() and not waiter.cancelled():
+                self._release()  # granted just before the cancel landed
+            raise
+
+    async def run(self, func, *args, wait=False):
+        """
+        Run func(*args) in the pool. When saturated, raises GenerationPoolFull,
+        or with wait=True awaits a freed slot (background jobs).
+        """
+        if wait:
+            await self._wait_for_slot()
+        else:
+            with self._lock:
+                admitted = self._slots.acquire(blocking=False)
+                if admitted:
+                    self._admitted += 1
+            if not admitted:
+                raise GenerationPoolFull(
+                    f"Quotation generation is busy ({self.workers} running, "
+                    f"{self.queue_size} queued). Please retry shortly."
+                )
+        try:
+            future = self._get_executor().submit(func, *args)
+        except Exception:
+            self._release()
+            raise
+        # The slot is freed when the work finishes, even if the caller went away
+        future.add_done_callback(self._release)
+        return await asyncio.wrap_future(future)
+
+    def stats(self):
+        with self._lock:
+            admitted = self._admitted
+        return {
+            "executor": self.kind,
+            "workers": self.workers,
+            "queue_size": self.queue_size,
+            "running": min(admitted, self.workers),
+            "queued": max(admitted - self.workers, 0),
+        }
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+generation_pool = GenerationPool()
+# Batch items wait for a free worker (run(..., wait=True)), so no extra queue
+batch_generation_pool = GenerationPool(BATCH_GENERATION_EXECUTOR, BATCH_GENERATION_WORKERS, queue_size=0)